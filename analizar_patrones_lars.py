@@ -13,6 +13,12 @@ from pathlib import Path
 from datetime import datetime
 from collections import defaultdict, Counter
 import glob
+import sys
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from src.paquetes_reglas import obtener_gestor_reglas
 
 class AnalizadorPatronesLars:
     def __init__(self):
@@ -21,74 +27,11 @@ class AnalizadorPatronesLars:
         self.ruta_transcripciones_1 = r"C:\Users\hanns\Proyectos\whisper-pro\transcripciones\Audios de Lars -20251203T004029Z-1-001"
         self.ruta_transcripciones_2 = r"C:\Users\hanns\Proyectos\whisper-pro\transcripciones\Audios-20251203T004026Z-1-001"
 
-        # Patrones de comportamiento a identificar
-        self.patrones_comportamiento = {
-            "amenazas": [
-                r"report you",
-                r"take.*children.*away",
-                r"lose your children",
-                r"police.*come",
-                r"lose.*in a second",
-            ],
-            "manipulacion_financiera": [
-                r"don't have.*money",
-                r"who.*going to pay",
-                r"spend.*money",
-                r"trading",
-                r"lost.*money",
-                r"crypto",
-            ],
-            "culpabilizacion": [
-                r"it's your fault",
-                r"you.*responsible",
-                r"because of you",
-                r"you.*problem",
-                r"you.*destroying",
-            ],
-            "victimizacion": [
-                r"I don't want to live",
-                r"I am so stressed",
-                r"nightmare for me",
-                r"my life was.*quiet",
-                r"without any problem",
-            ],
-            "critica_hijos": [
-                r"your.*son",
-                r"he.*liar",
-                r"he.*mentiroso",
-                r"protecting him",
-                r"he can do whatever",
-            ],
-            "minimizacion_esfuerzos": [
-                r"you don't.*anything",
-                r"I.*working all.*day",
-                r"I.*cooking",
-                r"I.*doing.*best",
-                r"sitting.*not making",
-            ],
-            "amenazas_abandono": [
-                r"I.*moving away",
-                r"I.*leave",
-                r"sleep in other place",
-                r"go.*we can stay",
-            ],
-            "acusaciones_problemas_hogar": [
-                r"destroying my house",
-                r"toilet paper.*outside",
-                r"champú",
-                r"papel higiénico",
-                r"pared del baño",
-            ]
-        }
-
-        # Frases específicas de Lars identificadas en el caso legal
-        self.frases_caso_legal = [
-            "Rikke manipulerer børnene",
-            "Kristian lyver",
-            "Frederik syg",
-            "økonomiske problemer",
-            "trading tab",
-        ]
+        # Patrones de comportamiento a identificar y frases específicas de Lars
+        # identificadas en el caso legal (reglas/en/patrones_lars.json)
+        paquete = obtener_gestor_reglas().obtener('en', 'patrones_lars')
+        self.patrones_comportamiento = dict(paquete.categorias('comportamiento'))
+        self.frases_caso_legal = paquete.datos.get('frases_caso_legal', [])
 
         self.resultados = defaultdict(list)
         self.estadisticas = defaultdict(Counter)
@@ -0,0 +1,72 @@
+"""
+Compara el factor de tiempo real (RTF) de los motores de inferencia
+
+RTF = segundos de transcripción / segundos de audio (menor es mejor; < 1 es más rápido que tiempo real)
+
+Uso:
+    python benchmark_motores.py audio1.m4a audio2.mp3 --modelo large-v3 --motores whisper faster-whisper
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from src.transcriber import WhisperTranscriber
+from src.audio_decodificado import obtener_cache_audio, FRECUENCIA_MUESTREO
+from src.motores_inferencia import MOTORES
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de motores de inferencia (RTF)")
+    parser.add_argument('audios', nargs='+', help="Archivos de audio de prueba")
+    parser.add_argument('--modelo', default=os.getenv('WHISPER_MODEL', 'base'), help="Modelo Whisper")
+    parser.add_argument('--motores', nargs='+', default=sorted(MOTORES), choices=sorted(MOTORES))
+    parser.add_argument('--dispositivo', default=None, help="'cuda' o 'cpu' (por defecto: detección automática)")
+    parser.add_argument('--idioma', default=os.getenv('WHISPER_LANGUAGE', None))
+    args = parser.parse_args()
+
+    # Decodificar antes de medir para que el RTF solo incluya la inferencia
+    cache_audio = obtener_cache_audio()
+    audios = {ruta: cache_audio.obtener(ruta) for ruta in args.audios}
+    duracion_total = sum(len(audio) for audio in audios.values()) / FRECUENCIA_MUESTREO
+
+    print(f"Audio total: {duracion_total:.1f} segundos en {len(audios)} archivo(s), modelo {args.modelo}\n")
+    print(f"{'Motor':<16} {'Precisión':<10} {'Carga (s)':>10} {'Transcripción (s)':>18} {'RTF':>8}")
+    print("-" * 66)
+
+    for nombre_motor in args.motores:
+        try:
+            tiempo_inicio = time.time()
+            transcriptor = WhisperTranscriber(
+                modelo=args.modelo,
+                dispositivo=args.dispositivo,
+                motor=nombre_motor
+            )
+            tiempo_carga = time.time() - tiempo_inicio
+        except ImportError as e:
+            print(f"{nombre_motor:<16} no disponible: {str(e)}")
+            continue
+
+        tiempo_inicio = time.time()
+        for ruta, audio in audios.items():
+            transcriptor.transcribir(ruta, idioma=args.idioma, audio=audio, usar_cache=False)
+        tiempo_transcripcion = time.time() - tiempo_inicio
+
+        rtf = tiempo_transcripcion / duracion_total if duracion_total else 0.0
+        print(
+            f"{nombre_motor:<16} {transcriptor.precision:<10} {tiempo_carga:>10.2f} "
+            f"{tiempo_transcripcion:>18.2f} {rtf:>8.3f}"
+        )
+
+        # Liberar el modelo antes de cargar el siguiente motor
+        transcriptor.registro.expulsar(transcriptor.clave_modelo)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Microbenchmark del motor de patrones frente a la búsqueda patrón a patrón
+
+Usa las transcripciones incluidas en el repositorio (segmentos de los .json y frases
+de los .txt) y comprueba que ambos métodos clasifican cada segmento igual.
+
+Uso:
+    python benchmark_patrones.py --repeticiones 20
+"""
+
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from src.analizador_agresion import AgresionAnalyzer
+from src.violence_detector import ViolenceDetector
+
+
+def cargar_textos(carpeta: str) -> List[str]:
+    """
+    Reúne los textos de los segmentos de las transcripciones
+
+    Args:
+        carpeta: Carpeta raíz donde buscar .json (formato Whisper) y .txt
+
+    Returns:
+        Lista de textos de segmento
+    """
+    textos = []
+    for ruta in glob.glob(str(Path(carpeta) / '**' / '*.json'), recursive=True):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        if isinstance(datos, dict):
+            textos.extend(s.get('text', '') for s in datos.get('segments', []))
+
+    for ruta in glob.glob(str(Path(carpeta) / '**' / '*.txt'), recursive=True):
+        if 'INFORME' in Path(ruta).name:
+            continue
+        with open(ruta, 'r', encoding='utf-8', errors='ignore') as f:
+            textos.extend(re.split(r'(?<=[.!?])\s+', f.read()))
+
+    return [t for t in textos if t.strip()]
+
+
+def clasificar_secuencial(categorias, texto: str) -> Optional[str]:
+    """Clasificación anterior: re.search patrón a patrón en orden de prioridad"""
+    texto_lower = texto.lower()
+    for nombre, patrones in categorias:
+        for patron in patrones:
+            if re.search(patron, texto_lower, re.IGNORECASE):
+                return nombre
+    return None
+
+
+def medir(funcion, textos: List[str], repeticiones: int) -> float:
+    """Segundos medios por pasada sobre todos los textos"""
+    tiempo_inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for texto in textos:
+            funcion(texto)
+    return (time.perf_counter() - tiempo_inicio) / repeticiones
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark del motor de patrones")
+    parser.add_argument('--carpeta', default='.', help="Carpeta con transcripciones (.json/.txt)")
+    parser.add_argument('--repeticiones', type=int, default=10)
+    args = parser.parse_args()
+
+    textos = cargar_textos(args.carpeta)
+    print(f"{len(textos)} segmentos, {args.repeticiones} repeticiones\n")
+    print(f"{'Detector':<20} {'Secuencial (ms)':>16} {'Motor (ms)':>12} {'Aceleración':>12} {'Diferencias':>12}")
+    print("-" * 76)
+
+    detectores = [('AgresionAnalyzer', AgresionAnalyzer()), ('ViolenceDetector', ViolenceDetector())]
+    for nombre, detector in detectores:
+        motor = detector.motor_patrones
+        categorias = [(categoria, motor.patrones_de(categoria)) for categoria in motor.categorias]
+
+        def clasificar_motor(texto):
+            deteccion = motor.primera_por_prioridad(texto.lower())
+            return deteccion[0] if deteccion else None
+
+        diferencias = sum(
+            clasificar_secuencial(categorias, t) != clasificar_motor(t) for t in textos
+        )
+        tiempo_secuencial = medir(lambda t: clasificar_secuencial(categorias, t), textos, args.repeticiones)
+        tiempo_motor = medir(clasificar_motor, textos, args.repeticiones)
+        aceleracion = tiempo_secuencial / tiempo_motor if tiempo_motor else 0.0
+
+        print(
+            f"{nombre:<20} {tiempo_secuencial * 1000:>16.2f} {tiempo_motor * 1000:>12.2f} "
+            f"{aceleracion:>11.1f}x {diferencias:>12}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Compara el análisis de estrés vocal con FFmpeg + NumPy frente a librosa
+
+Mide el tiempo de importación de cada opción (en un proceso nuevo) y, por archivo, el
+tiempo de decodificación y de análisis. Los segmentos se leen del JSON de Whisper del
+audio si se indica; si no, se usan segmentos de 3 segundos.
+
+Uso:
+    python benchmark_voz.py audio1.m4a audio2.mp3
+    python benchmark_voz.py audio1.m4a --segmentos transcripciones/audio1.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from src.detector_voz import VoiceStressDetector, LIBROSA_AVAILABLE
+from src.audio_decodificado import decodificar_audio, FRECUENCIA_MUESTREO
+
+
+def medir_importacion(instruccion: str, repeticiones: int) -> float:
+    """Mejor tiempo, en segundos, de ejecutar una importación en un intérprete nuevo"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        tiempo_inicio = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', instruccion],
+            cwd=str(Path(__file__).parent),
+            check=True,
+            capture_output=True
+        )
+        mejor = min(mejor, time.perf_counter() - tiempo_inicio)
+    return mejor
+
+
+def cargar_segmentos(ruta_json: Optional[str], duracion: float) -> List[Dict[str, Any]]:
+    """
+    Segmentos de Whisper del JSON indicado, o segmentos de 3 segundos
+
+    Args:
+        ruta_json: Resultado de Whisper guardado en JSON (o None)
+        duracion: Duración del audio en segundos
+
+    Returns:
+        Lista de segmentos con 'start' y 'end'
+    """
+    if ruta_json:
+        with open(ruta_json, 'r', encoding='utf-8') as f:
+            return json.load(f).get('segments', [])
+    inicios = [i * 3.0 for i in range(int(duracion // 3.0) + 1)]
+    return [{'start': inicio, 'end': min(inicio + 3.0, duracion)} for inicio in inicios]
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark del análisis de estrés vocal")
+    parser.add_argument('audios', nargs='+', help="Archivos de audio de prueba")
+    parser.add_argument('--segmentos', nargs='*', default=[], help="JSON de Whisper de cada audio, en el mismo orden")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Importación':<28} {'Tiempo (s)':>10}")
+    print("-" * 40)
+    print(f"{'src.detector_voz':<28} {medir_importacion('import src.detector_voz', args.repeticiones):>10.2f}")
+    if LIBROSA_AVAILABLE:
+        # librosa carga sus submódulos al primer uso; se fuerza la carga de librosa.load
+        tiempo = medir_importacion('import librosa; librosa.load', args.repeticiones)
+        print(f"{'librosa':<28} {tiempo:>10.2f}")
+    else:
+        print(f"{'librosa':<28} {'no instalado':>10}")
+
+    rutas = {'ffmpeg+numpy': VoiceStressDetector()}
+    if LIBROSA_AVAILABLE:
+        rutas['librosa'] = VoiceStressDetector(usar_librosa=True)
+
+    print(f"\n{'Archivo':<28} {'Ruta':<14} {'Decodif. (s)':>12} {'Análisis (s)':>12} {'RTF':>8} {'Detecciones':>12}")
+    print("-" * 92)
+
+    for i, ruta_audio in enumerate(args.audios):
+        ruta_json = args.segmentos[i] if i < len(args.segmentos) else None
+        segmentos = None
+
+        for nombre, detector in rutas.items():
+            # Decodificación sin caché para comparar el coste real de cada ruta
+            tiempo_inicio = time.perf_counter()
+            if detector.usar_librosa:
+                audio, sr = detector._cargar_audio(ruta_audio)
+            else:
+                audio, sr = decodificar_audio(ruta_audio), FRECUENCIA_MUESTREO
+            tiempo_decodificacion = time.perf_counter() - tiempo_inicio
+
+            duracion = len(audio) / sr
+            if segmentos is None:
+                segmentos = cargar_segmentos(ruta_json, duracion)
+
+            tiempo_inicio = time.perf_counter()
+            for _ in range(args.repeticiones):
+                detecciones = detector._detectar_picos_bruscos(audio, sr, segmentos)
+            tiempo_analisis = (time.perf_counter() - tiempo_inicio) / args.repeticiones
+
+            rtf = (tiempo_decodificacion + tiempo_analisis) / duracion if duracion else 0.0
+            print(
+                f"{Path(ruta_audio).name[:28]:<28} {nombre:<14} {tiempo_decodificacion:>12.2f} "
+                f"{tiempo_analisis:>12.2f} {rtf:>8.4f} {len(detecciones):>12}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Herramienta para inspeccionar y mantener la caché de transcripciones y la de audio decodificado
+
+Uso:
+    python gestionar_cache.py listar
+    python gestionar_cache.py podar --dias 30 --max-mb 500
+    python gestionar_cache.py invalidar --audio ruta/al/audio.m4a
+    python gestionar_cache.py invalidar --modelo large-v3
+    python gestionar_cache.py invalidar --todo
+    python gestionar_cache.py --cache audio podar --max-mb 5000
+    python gestionar_cache.py --cache audio invalidar --audio ruta/al/audio.m4a
+
+Las transcripciones que usa reanalizar.py (registradas en cache/analisis/) no se eliminan
+salvo con --incluir-reanalisis.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from src.audio_decodificado import obtener_cache_audio
+from src.cache_transcripciones import obtener_cache_transcripciones
+from src.reanalisis import obtener_manifiesto_analisis
+from src.utils import calcular_sha256_archivo
+
+
+def listar(cache, args) -> int:
+    """Muestra las entradas de la caché"""
+    entradas = cache.listar()
+    if not entradas:
+        print(f"Caché vacía: {cache.carpeta_cache}")
+        return 0
+
+    total_bytes = 0
+    for entrada in sorted(entradas, key=lambda e: e['ultimo_uso'], reverse=True):
+        metadatos = entrada['metadatos']
+        total_bytes += entrada['tamano_bytes']
+        print(
+            f"{entrada['clave'][:12]}  "
+            f"{metadatos.get('archivo', '?'):<40}  "
+            f"{metadatos.get('modelo', '?'):<10}  "
+            f"{metadatos.get('task', '?'):<18}  "
+            f"{metadatos.get('idioma') or 'auto':<5}  "
+            f"{entrada['tamano_bytes'] / 1024:8.1f} KB  "
+            f"último uso {entrada['ultimo_uso'][:19]}"
+        )
+
+    print(f"\n{len(entradas)} entradas, {total_bytes / 1024**2:.2f} MB en {cache.carpeta_cache}")
+    return 0
+
+
+def listar_audio(cache, args) -> int:
+    """Muestra los buffers de la caché de audio decodificado"""
+    entradas = cache.listar()
+    if not entradas:
+        print(f"Caché vacía: {cache.carpeta_cache}")
+        return 0
+
+    total_bytes = 0
+    for entrada in sorted(entradas, key=lambda e: e['ultimo_uso'], reverse=True):
+        total_bytes += entrada['tamano_bytes']
+        print(
+            f"{entrada['sha256'][:12]}  "
+            f"{entrada['duracion_s'] / 60:8.1f} min  "
+            f"{entrada['tamano_bytes'] / 1024**2:8.1f} MB  "
+            f"último uso {entrada['ultimo_uso'][:19]}"
+        )
+
+    print(f"\n{len(entradas)} buffers, {total_bytes / 1024**2:.2f} MB en {cache.carpeta_cache}")
+    return 0
+
+
+def podar_audio(cache, args) -> int:
+    """Elimina buffers antiguos o los menos usados"""
+    if args.dias is None and args.max_mb is None:
+        print("Indica --dias y/o --max-mb")
+        return 1
+
+    print(f"Eliminados {cache.podar(max_dias=args.dias, max_mb=args.max_mb)} buffers")
+    return 0
+
+
+def invalidar_audio(cache, args) -> int:
+    """Elimina buffers concretos"""
+    sha256 = args.clave or (cache.hash_archivo(args.audio) if args.audio else None)
+
+    if args.modelo:
+        print("--modelo no se aplica a la caché de audio")
+        return 1
+    if not (sha256 or args.todo):
+        print("Indica --clave, --audio o --todo")
+        return 1
+
+    print(f"Eliminados {cache.invalidar(sha256=sha256, todo=args.todo)} buffers")
+    return 0
+
+
+def claves_protegidas(args) -> set:
+    """Claves que usa reanalizar.py, salvo que se pida eliminarlas también"""
+    if args.incluir_reanalisis:
+        return set()
+    return obtener_manifiesto_analisis().claves_transcripcion()
+
+
+def informar(cache, eliminadas: int, protegidas: set):
+    """Muestra el resultado de una poda o invalidación"""
+    print(f"Eliminadas {eliminadas} entradas")
+    conservadas = sum(1 for entrada in cache.listar() if entrada['clave'] in protegidas)
+    if conservadas:
+        print(
+            f"Se conservan {conservadas} entradas que usa reanalizar.py "
+            f"(--incluir-reanalisis para eliminarlas también)"
+        )
+
+
+def podar(cache, args) -> int:
+    """Elimina entradas antiguas o las menos usadas"""
+    if args.dias is None and args.max_mb is None:
+        print("Indica --dias y/o --max-mb")
+        return 1
+
+    protegidas = claves_protegidas(args)
+    eliminadas = cache.podar(max_dias=args.dias, max_mb=args.max_mb, claves_protegidas=protegidas)
+    informar(cache, eliminadas, protegidas)
+    return 0
+
+
+def invalidar(cache, args) -> int:
+    """Elimina entradas concretas"""
+    sha256_audio = calcular_sha256_archivo(args.audio) if args.audio else None
+
+    if not (args.clave or sha256_audio or args.modelo or args.todo):
+        print("Indica --clave, --audio, --modelo o --todo")
+        return 1
+
+    protegidas = claves_protegidas(args)
+    eliminadas = cache.invalidar(
+        clave=args.clave,
+        sha256_audio=sha256_audio,
+        modelo=args.modelo,
+        todo=args.todo,
+        claves_protegidas=protegidas
+    )
+    informar(cache, eliminadas, protegidas)
+    return 0
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Gestión de la caché de transcripciones y de audio decodificado")
+    parser.add_argument(
+        '--cache',
+        choices=['transcripciones', 'audio'],
+        default='transcripciones',
+        help="Caché sobre la que actuar (audio: buffers .npy de cache/audio)"
+    )
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    subparsers.add_parser('listar', help="Listar entradas de la caché")
+
+    parser_podar = subparsers.add_parser('podar', help="Eliminar entradas antiguas o exceso de tamaño")
+    parser_podar.add_argument('--dias', type=float, help="Eliminar entradas no usadas en más de N días")
+    parser_podar.add_argument('--max-mb', type=float, help="Tamaño máximo de la caché en MB")
+
+    parser_invalidar = subparsers.add_parser('invalidar', help="Eliminar entradas concretas")
+    parser_invalidar.add_argument('--clave', help="Clave completa de la entrada (SHA-256 del audio con --cache audio)")
+    parser_invalidar.add_argument('--audio', help="Eliminar todas las entradas de este archivo de audio")
+    parser_invalidar.add_argument('--modelo', help="Eliminar todas las entradas de este modelo")
+    parser_invalidar.add_argument('--todo', action='store_true', help="Vaciar la caché")
+
+    for subparser in (parser_podar, parser_invalidar):
+        subparser.add_argument(
+            '--incluir-reanalisis', action='store_true',
+            help="Eliminar también las transcripciones que usa reanalizar.py"
+        )
+
+    args = parser.parse_args()
+
+    if args.cache == 'audio':
+        cache = obtener_cache_audio()
+        comandos = {'listar': listar_audio, 'podar': podar_audio, 'invalidar': invalidar_audio}
+    else:
+        cache = obtener_cache_transcripciones()
+        comandos = {'listar': listar, 'podar': podar, 'invalidar': invalidar}
+    sys.exit(comandos[args.comando](cache, args))
+
+
+if __name__ == '__main__':
+    main()
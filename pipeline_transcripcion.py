@@ -18,6 +18,7 @@ from src.transcriber import WhisperTranscriber
 from src.audio_loader import AudioLoader
 from src.utils import crear_carpetas, sanitizar_nombre, configurar_logging, obtener_tamaño_archivo
 from src.violence_detector import ViolenceDetector
+from src.motores_inferencia import FASTER_WHISPER_AVAILABLE
 import logging
 
 
@@ -34,7 +35,8 @@ class PipelineTranscripcion:
         carpeta_logs: str = 'logs',
         modelo: str = 'large-v3',
         dispositivo: str = 'cuda',
-        fp16: bool = True
+        fp16: bool = True,
+        motor: str = 'whisper'
     ):
         """
         Inicializa el pipeline
@@ -47,6 +49,7 @@ class PipelineTranscripcion:
             modelo: Modelo de Whisper a usar
             dispositivo: 'cuda' o 'cpu'
             fp16: Usar precisión de 16 bits (más rápido en GPU)
+            motor: Motor de inferencia ('whisper' o 'faster-whisper')
         """
         self.carpeta_origen = carpeta_origen
         self.carpeta_audios = carpeta_audios
@@ -63,17 +66,20 @@ class PipelineTranscripcion:
         self.logger.info("=" * 80)
         
         # Inicializar componentes
-        self.logger.info(f"Inicializando transcriptor con modelo: {modelo}")
+        self.logger.info(f"Inicializando transcriptor con modelo: {modelo} (motor {motor})")
         # Si dispositivo es None, dejar que WhisperTranscriber detecte automáticamente
         dispositivo_transcriber = dispositivo if dispositivo else None
         self.transcriptor = WhisperTranscriber(
             modelo=modelo,
-            dispositivo=dispositivo_transcriber
+            dispositivo=dispositivo_transcriber,
+            motor=motor
         )
         
         # Mostrar información del dispositivo
         info = self.transcriptor.obtener_info_modelo()
         self.logger.info(f"Dispositivo: {info['dispositivo']}")
+        if 'tiempo_carga_s' in info:
+            self.logger.info(f"Modelo cargado en {info['tiempo_carga_s']:.2f} segundos ({info['tamano_mb']:.1f} MB en memoria)")
         if info['gpu_disponible']:
             self.logger.info(f"GPU: {info.get('gpu_nombre', 'N/A')}")
             self.logger.info(f"Memoria GPU: {info.get('gpu_memoria_total_gb', 0):.2f} GB")
@@ -151,22 +157,11 @@ class PipelineTranscripcion:
         tiempo_inicio = time.time()
         
         try:
-            # Transcripción en español
-            self.logger.info("Transcribiendo en español...")
-            resultado_es = self.transcriptor.transcribir(
+            # Transcripción en español y traducción al inglés con una sola codificación
+            self.logger.info("Transcribiendo en español y traduciendo al inglés...")
+            resultado_es, resultado_en = self.transcriptor.transcribir_y_traducir(
                 ruta_audio,
                 idioma='es',
-                task='transcribe',
-                fp16=self.fp16,
-                verbose=False
-            )
-            
-            # Traducción al inglés
-            self.logger.info("Traduciendo al inglés...")
-            resultado_en = self.transcriptor.transcribir(
-                ruta_audio,
-                idioma='es',
-                task='translate',
                 fp16=self.fp16,
                 verbose=False
             )
@@ -319,6 +314,8 @@ def main():
     # DISPOSITIVO = 'cuda'  # Deshabilitado temporalmente
     DISPOSITIVO = 'cpu'  # Forzar CPU hasta que PyTorch soporte RTX 5090
     FP16 = False  # FP16 requiere CUDA, deshabilitado en CPU
+    # En CPU, faster-whisper (CTranslate2 con pesos int8) es mucho más rápido que openai-whisper en fp32
+    MOTOR = os.getenv('WHISPER_BACKEND', 'faster-whisper' if FASTER_WHISPER_AVAILABLE else 'whisper')
     
     # Crear y ejecutar pipeline
     pipeline = PipelineTranscripcion(
@@ -328,7 +325,8 @@ def main():
         carpeta_logs=CARPETA_LOGS,
         modelo=MODELO,
         dispositivo=DISPOSITIVO,
-        fp16=FP16
+        fp16=FP16,
+        motor=MOTOR
     )
     
     pipeline.ejecutar()
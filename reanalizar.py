@@ -0,0 +1,100 @@
+"""
+Regenera los informes únicos a partir de transcripciones ya hechas
+
+Carga el resultado de Whisper y el análisis de voz guardados por run_transcription.py
+y vuelve a ejecutar solo los analizadores de texto y el generador de informes. Los
+audios cuyo informe ya corresponde a la transcripción y a las reglas actuales se
+saltan, así que tras editar un paquete de reglas solo se regenera lo necesario.
+
+Uso:
+    python reanalizar.py
+    python reanalizar.py --simular
+    python reanalizar.py --forzar
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from src.analizador_agresion import AgresionAnalyzer
+from src.detector_victimas import VictimDetector
+from src.analizador_forense_dk import AnalizadorForenseDK
+from src.analisis_unificado import AnalizadorUnificado
+from src.generador_informe_unico import GeneradorInformeUnico
+from src.reanalisis import generar_informe_audio, obtener_manifiesto_analisis
+from src.utils import configurar_logging
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Reanálisis incremental de transcripciones")
+    parser.add_argument('--forzar', action='store_true', help="Regenerar todos los informes aunque estén al día")
+    parser.add_argument('--simular', action='store_true', help="Solo mostrar qué informes se regenerarían")
+    parser.add_argument('--carpeta-salida', help="Guardar los informes aquí en lugar de en su carpeta original")
+    args = parser.parse_args()
+
+    logger = configurar_logging('logs', nombre_archivo=f"reanalisis_{time.strftime('%Y%m%d_%H%M%S')}.log")
+    manifiesto = obtener_manifiesto_analisis()
+    entradas = manifiesto.entradas()
+    if not entradas:
+        logger.warning(f"No hay análisis registrados en {manifiesto.carpeta}; ejecuta antes run_transcription.py")
+        sys.exit(1)
+
+    texto = AnalizadorUnificado(AgresionAnalyzer(), VictimDetector(), AnalizadorForenseDK())
+    generador = GeneradorInformeUnico()
+    huella_reglas = texto.huella_reglas()
+
+    pendientes = [
+        (clave, info) for clave, info in entradas.items()
+        if args.forzar or not manifiesto.esta_al_dia(info, huella_reglas)
+    ]
+    logger.info(f"{len(entradas)} audios registrados, {len(pendientes)} informes por regenerar")
+
+    if args.simular:
+        for _, info in pendientes:
+            print(info['archivo_audio'])
+        sys.exit(0)
+
+    tiempo_inicio = time.time()
+    regenerados = 0
+    fallidos = 0
+
+    for i, (clave, info) in enumerate(pendientes, 1):
+        nombre = os.path.basename(info['archivo_audio'])
+        logger.info(f"Reanalizando {i}/{len(pendientes)}: {nombre}")
+
+        datos = manifiesto.cargar(clave)
+        if datos is None:
+            fallidos += 1
+            continue
+
+        try:
+            resultado = datos['resultado']
+            ruta_informe = generar_informe_audio(
+                generador,
+                info['archivo_audio'],
+                resultado,
+                texto.analizar(resultado),
+                datos.get('analisis_voz', []),
+                args.carpeta_salida or info['carpeta_salida']
+            )
+            manifiesto.registrar_informe(clave, ruta_informe, info['hash_transcripcion'], huella_reglas)
+            regenerados += 1
+        except Exception as e:
+            logger.error(f"✗ Error al reanalizar {nombre}: {str(e)}")
+            logger.exception("Detalles del error:")
+            fallidos += 1
+
+    logger.info(
+        f"Reanálisis completado en {time.time() - tiempo_inicio:.2f} s: "
+        f"{regenerados} regenerados, {fallidos} fallidos, {len(entradas) - len(pendientes)} al día"
+    )
+
+
+if __name__ == '__main__':
+    main()
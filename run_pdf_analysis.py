@@ -1,23 +1,318 @@
 """
 Script principal para análisis forense de documentos PDF
 Procesa PDFs y genera informes forenses según Straffeloven §243
+
+Uso:
+    python run_pdf_analysis.py
+    python run_pdf_analysis.py --workers 4 --paginas-por-tramo 20
+    python run_pdf_analysis.py --streaming
 """
 
 import os
 import sys
 import time
+import json
+import argparse
 from pathlib import Path
+from typing import Any, Dict, Iterator, List
 
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from src.analizador_pdf_forense import AnalizadorPDFForense
+from src.motor_pdf_paralelo import MotorPDFParalelo
+from src.analisis_pdf_streaming import AnalizadorPDFStreaming
+from src.paquetes_reglas import obtener_gestor_reglas
 from src.utils import crear_carpetas, configurar_logging
 import logging
 
 
+# Etapas cuyo tiempo se registra por documento, en el orden en que se ejecutan
+ETAPAS = ['extraccion', 'deteccion', 'fusion', 'clasificacion', 'correlacion', 'agravantes', 'informe']
+
+
+def parsear_argumentos() -> argparse.Namespace:
+    """Lee las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Análisis forense de documentos PDF")
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv('WHISPER_PDF_WORKERS', '1')),
+        help="Procesos que extraen y analizan tramos de páginas en paralelo (1 = secuencial)"
+    )
+    parser.add_argument(
+        '--paginas-por-tramo',
+        type=int,
+        default=20,
+        help="Páginas de cada tarea en modo paralelo"
+    )
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help="Leer y analizar cada PDF página a página con memoria acotada (los informes no incluyen el texto completo)"
+    )
+    parser.add_argument(
+        '--solape',
+        type=int,
+        default=2000,
+        help="Caracteres de contexto a cada lado de la página analizada en modo streaming"
+    )
+    return parser.parse_args()
+
+
+def nombre_base_informe(archivo_pdf: str) -> str:
+    """Nombre del PDF sin extensión, apto para nombrar sus archivos de salida"""
+    nombre_base = os.path.splitext(os.path.basename(archivo_pdf))[0]
+    return nombre_base.replace(' ', '_').replace('/', '_').replace('\\', '_')
+
+
+def analizar_secuencial(
+    analizador: AnalizadorPDFForense,
+    archivos_pdf: List[str],
+    logger: logging.Logger
+) -> Iterator[Dict[str, Any]]:
+    """
+    Extrae y analiza los PDFs de uno en uno en este proceso
+
+    Args:
+        analizador: Analizador forense de PDFs
+        archivos_pdf: Rutas de los archivos PDF
+        logger: Logger del script
+
+    Returns:
+        Iterador de resultados con el mismo formato que MotorPDFParalelo.analizar()
+    """
+    for archivo_pdf in archivos_pdf:
+        # Aplicar las reglas editadas desde el PDF anterior
+        obtener_gestor_reglas().recargar_si_cambiaron()
+        
+        # Paso 1: Extraer texto
+        logger.info(f"Paso 1/7: Extrayendo texto de {os.path.basename(archivo_pdf)}...")
+        tiempo_inicio = time.perf_counter()
+        resultado = analizador.extraer_texto_pdf(archivo_pdf)
+        resultado['ruta_pdf'] = archivo_pdf
+        resultado['tiempos'] = {'extraccion': time.perf_counter() - tiempo_inicio}
+        
+        if not resultado.get('exito', False):
+            yield resultado
+            continue
+        
+        texto_completo = resultado['texto_completo']
+        indice_paginas = resultado['indice_paginas']
+        tiempo_inicio = time.perf_counter()
+        
+        try:
+            # Paso 2: Detectar agresión (con número de página; las citas se traducen al generar el informe)
+            logger.info("Paso 2/7: Detectando patrones de agresión psicológica...")
+            resultado['detecciones_agresion'] = analizador.detectar_agresion(texto_completo, indice_paginas=indice_paginas)
+            
+            # Paso 3: Detectar menciones a víctimas
+            logger.info("Paso 3/7: Detectando menciones a víctimas...")
+            resultado['menciones_victimas'] = analizador.detectar_menciones_victimas(texto_completo, indice_paginas)
+            
+            # Paso 4: Detectar contradicciones
+            logger.info("Paso 4/7: Detectando contradicciones internas...")
+            resultado['contradicciones'] = analizador.detectar_contradicciones(texto_completo, indice_paginas)
+        except Exception as e:
+            logger.exception("Detalles del error:")
+            resultado['exito'] = False
+            resultado['error'] = str(e)
+        
+        resultado['tiempos']['deteccion'] = time.perf_counter() - tiempo_inicio
+        resultado['tiempos']['total'] = resultado['tiempos']['extraccion'] + resultado['tiempos']['deteccion']
+        yield resultado
+
+
+def analizar_streaming(
+    analizador: AnalizadorPDFForense,
+    archivos_pdf: List[str],
+    carpeta_informes: str,
+    solape: int,
+    logger: logging.Logger
+) -> Iterator[Dict[str, Any]]:
+    """
+    Analiza los PDFs página a página, guardando cada hallazgo según se produce
+
+    Los hallazgos se escriben en {nombre}_PDF_HALLAZGOS.jsonl (una línea JSON por
+    hallazgo, con su 'clase' y los nombres protegidos) a medida que quedan definitivos. El texto del PDF no se
+    conserva: el resultado lleva 'modo_streaming' y el texto completo vacío.
+
+    Args:
+        analizador: Analizador forense de PDFs
+        archivos_pdf: Rutas de los archivos PDF
+        carpeta_informes: Carpeta donde guardar los hallazgos
+        solape: Caracteres de contexto a cada lado de la página analizada
+        logger: Logger del script
+
+    Returns:
+        Iterador de resultados con el mismo formato que MotorPDFParalelo.analizar()
+    """
+    streaming = AnalizadorPDFStreaming(analizador, solape=solape)
+    os.makedirs(carpeta_informes, exist_ok=True)
+    
+    for archivo_pdf in archivos_pdf:
+        # Aplicar las reglas editadas desde el PDF anterior
+        obtener_gestor_reglas().recargar_si_cambiaron()
+        
+        logger.info(f"Pasos 1-4/7: Analizando {os.path.basename(archivo_pdf)} página a página...")
+        detecciones_agresion = []
+        menciones_victimas = {victima: [] for victima in analizador.patrones_victimas}
+        contradicciones = []
+        ruta_hallazgos = os.path.join(carpeta_informes, f"{nombre_base_informe(archivo_pdf)}_PDF_HALLAZGOS.jsonl")
+        
+        try:
+            with open(ruta_hallazgos, 'w', encoding='utf-8') as f:
+                for clase, hallazgo in streaming.analizar(archivo_pdf):
+                    if clase == 'agresion':
+                        detecciones_agresion.append(hallazgo)
+                        registro = {'clase': clase, **hallazgo}
+                    elif clase == 'victima':
+                        victima, mencion = hallazgo
+                        menciones_victimas[victima].append(mencion)
+                        registro = {'clase': clase, 'victima': analizador.mapeo_victimas.get(victima, victima), **mencion}
+                    else:
+                        contradicciones.append(hallazgo)
+                        registro = {'clase': clase, **hallazgo}
+                    # Mismos nombres protegidos que en el informe; los campos privados
+                    # (línea sin proteger pendiente de traducir) no se escriben
+                    registro = {
+                        campo: analizador.proteger_nombres(valor) if isinstance(valor, str) else valor
+                        for campo, valor in registro.items() if not campo.startswith('_')
+                    }
+                    f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                    f.flush()
+        except Exception as e:
+            logger.exception("Detalles del error:")
+            # No dejar un archivo de hallazgos incompleto
+            if os.path.exists(ruta_hallazgos):
+                os.remove(ruta_hallazgos)
+            yield {'ruta_pdf': archivo_pdf, 'exito': False, 'error': str(e), 'tiempos': {}}
+            continue
+        
+        resumen = streaming.resumen
+        logger.info(
+            f"  Hallazgos guardados en {os.path.basename(ruta_hallazgos)} "
+            f"(ventana máxima: {resumen['max_caracteres_ventana']} caracteres)"
+        )
+        yield {
+            'ruta_pdf': archivo_pdf,
+            'texto_completo': '',
+            'modo_streaming': True,
+            'num_caracteres': resumen['num_caracteres'],
+            'indice_paginas': resumen['indice_paginas'],
+            'num_paginas': resumen['num_paginas'],
+            'exito': True,
+            'detecciones_agresion': detecciones_agresion,
+            'menciones_victimas': menciones_victimas,
+            'contradicciones': contradicciones,
+            'criterios_legales': resumen['criterios_legales'],
+            'tiempos': {'deteccion': resumen['segundos'], 'total': resumen['segundos']}
+        }
+
+
+def generar_informe_pdf(
+    analizador: AnalizadorPDFForense,
+    resultado: Dict[str, Any],
+    transcripciones: List[Dict[str, Any]],
+    carpeta_informes: str,
+    logger: logging.Logger
+) -> str:
+    """
+    Clasifica, correlaciona y genera el informe de un PDF ya extraído y analizado
+
+    Args:
+        analizador: Analizador forense de PDFs
+        resultado: Resultado de analizar_secuencial() o MotorPDFParalelo.analizar();
+            sus 'tiempos' se completan con las etapas de esta función
+        transcripciones: Transcripciones de audio para la correlación
+        carpeta_informes: Carpeta donde guardar el informe
+        logger: Logger del script
+
+    Returns:
+        Nombre del archivo de informe
+    """
+    archivo_pdf = resultado['ruta_pdf']
+    texto_completo = resultado['texto_completo']
+    detecciones_agresion = resultado['detecciones_agresion']
+    menciones_victimas = resultado['menciones_victimas']
+    contradicciones = resultado['contradicciones']
+    tiempos = resultado['tiempos']
+    
+    num_caracteres = resultado.get('num_caracteres', len(texto_completo))
+    logger.info(f"  Texto extraído: {num_caracteres} caracteres de {resultado['num_paginas']} páginas")
+    logger.info(f"  Detectadas {len(detecciones_agresion)} instancias de agresión")
+    total_menciones = sum(len(m) for m in menciones_victimas.values())
+    logger.info(f"  Detectadas {total_menciones} menciones a víctimas")
+    logger.info(f"  Detectadas {len(contradicciones)} posibles contradicciones")
+    
+    # Paso 5: Clasificación legal danesa
+    logger.info("Paso 5/7: Realizando clasificación legal danesa (§243)...")
+    tiempo_inicio = time.perf_counter()
+    clasificacion_legal = analizador.clasificar_legal_dk(
+        texto_completo, detecciones_agresion, resultado.get('criterios_legales')
+    )
+    tiempos['clasificacion'] = time.perf_counter() - tiempo_inicio
+    risikoniveau = clasificacion_legal.get('risikoniveau', 'lav')
+    logger.info(f"  Clasificación completada: Nivel de riesgo {risikoniveau.upper()}")
+    
+    # Paso 6: Correlacionar con audios
+    logger.info("Paso 6/7: Correlacionando agresiones con transcripciones de audio...")
+    tiempo_inicio = time.perf_counter()
+    detecciones_correlacionadas = analizador.correlacionar_con_audios(detecciones_agresion, transcripciones)
+    tiempos['correlacion'] = time.perf_counter() - tiempo_inicio
+    total_correlaciones = sum(len(det.get('correlaciones', [])) for det in detecciones_correlacionadas)
+    logger.info(f"  Encontradas {total_correlaciones} correlaciones con audios/videos")
+    
+    # Paso 7: Calcular agravantes legales
+    logger.info("Paso 7/7: Calculando agravantes legales por menores vulnerables...")
+    tiempo_inicio = time.perf_counter()
+    agravantes_legales = analizador.calcular_agravantes_legales(detecciones_correlacionadas, menciones_victimas)
+    tiempos['agravantes'] = time.perf_counter() - tiempo_inicio
+    nivel_final = agravantes_legales.get('nivel_riesgo_final', 'LAV')
+    logger.info(f"  Nivel de riesgo final (con agravantes): {nivel_final}")
+    
+    # Generar informe correlacional
+    logger.info("Generando informe correlacional...")
+    tiempo_inicio = time.perf_counter()
+    nombre_pdf = os.path.basename(archivo_pdf)
+    contenido_informe = analizador.generar_informe_correlacional(
+        nombre_pdf=nombre_pdf,
+        ruta_pdf=archivo_pdf,
+        texto_extraido=resultado,
+        detecciones_agresion=detecciones_correlacionadas,
+        menciones_victimas=menciones_victimas,
+        contradicciones=contradicciones,
+        clasificacion_legal=clasificacion_legal,
+        agravantes_legales=agravantes_legales,
+        transcripciones=transcripciones
+    )
+    estadisticas_citas = analizador.estadisticas_citas
+    logger.info(
+        f"  Citas traducidas: {estadisticas_citas['enriquecidas']} de "
+        f"{estadisticas_citas['coincidencias']} coincidencias "
+        f"({analizador.traducciones_evitadas()} traducciones evitadas)"
+    )
+    
+    # Guardar informe
+    nombre_archivo_informe = f"{nombre_base_informe(archivo_pdf)}_PDF_CORRELACIONAL.txt"
+    ruta_informe = os.path.join(carpeta_informes, nombre_archivo_informe)
+    
+    os.makedirs(carpeta_informes, exist_ok=True)
+    with open(ruta_informe, 'w', encoding='utf-8') as f:
+        f.write(contenido_informe)
+    tiempos['informe'] = time.perf_counter() - tiempo_inicio
+    
+    return nombre_archivo_informe
+
+
+def formatear_tiempos(tiempos: Dict[str, float]) -> str:
+    """Tiempos por etapa en una línea, en el orden de ETAPAS"""
+    return ', '.join(f"{etapa} {tiempos[etapa]:.2f} s" for etapa in ETAPAS if etapa in tiempos)
+
+
 def main():
     """Función principal"""
+    args = parsear_argumentos()
     
     # ============================================================
     # CONFIGURACIÓN DE RUTAS
@@ -87,106 +382,61 @@ def main():
         
         logger.info(f"Encontrados {len(archivos_pdf)} archivo(s) PDF para procesar")
         
-        # Procesar cada PDF
+        # Procesar los PDFs (en paralelo o página a página si se pidió)
         tiempo_inicio_total = time.time()
         exitosos = 0
         fallidos = 0
+        tiempos_etapas = {}
         
-        for i, archivo_pdf in enumerate(archivos_pdf, 1):
-            logger.info("-" * 60)
-            logger.info(f"Procesando PDF {i}/{len(archivos_pdf)}: {os.path.basename(archivo_pdf)}")
-            
-            tamaño_archivo = os.path.getsize(archivo_pdf)
-            tamaño_mb = tamaño_archivo / (1024 * 1024)
-            logger.info(f"Tamaño: {tamaño_mb:.2f} MB")
-            
-            tiempo_inicio = time.time()
-            
-            try:
-                # Paso 1: Extraer texto
-                logger.info("Paso 1/5: Extrayendo texto del PDF...")
-                texto_extraido = analizador.extraer_texto_pdf(archivo_pdf)
+        if args.streaming:
+            if args.workers > 1:
+                logger.warning("--streaming analiza los PDFs de uno en uno; se ignora --workers")
+            motor = None
+            resultados = analizar_streaming(analizador, archivos_pdf, CARPETA_TRANSCRIPCIONES, args.solape, logger)
+        elif args.workers > 1:
+            motor = MotorPDFParalelo(analizador, num_workers=args.workers, paginas_por_tramo=args.paginas_por_tramo)
+            motor.iniciar()
+            resultados = motor.analizar(archivos_pdf)
+        else:
+            motor = None
+            resultados = analizar_secuencial(analizador, archivos_pdf, logger)
+        
+        try:
+            for i, resultado in enumerate(resultados, 1):
+                archivo_pdf = resultado['ruta_pdf']
+                logger.info("-" * 60)
+                logger.info(f"PDF {i}/{len(archivos_pdf)}: {os.path.basename(archivo_pdf)}")
+                
+                tamaño_mb = os.path.getsize(archivo_pdf) / (1024 * 1024) if os.path.exists(archivo_pdf) else 0.0
+                logger.info(f"Tamaño: {tamaño_mb:.2f} MB")
                 
-                if not texto_extraido.get('exito', False):
-                    logger.error(f"Error al extraer texto: {texto_extraido.get('error', 'Error desconocido')}")
+                if not resultado.get('exito', False):
+                    logger.error(f"Error al analizar el PDF: {resultado.get('error', 'Error desconocido')}")
                     fallidos += 1
                     continue
                 
-                texto_completo = texto_extraido.get('texto_completo', '')
-                texto_por_pagina = texto_extraido.get('texto_por_pagina', [])
-                num_paginas = texto_extraido.get('num_paginas', 0)
-                logger.info(f"  Texto extraído: {len(texto_completo)} caracteres de {num_paginas} páginas")
-                
-                # Paso 2: Detectar agresión (con número de página y traducciones)
-                logger.info("Paso 2/7: Detectando patrones de agresión psicológica...")
-                detecciones_agresion = analizador.detectar_agresion(texto_completo, texto_por_pagina)
-                logger.info(f"  Detectadas {len(detecciones_agresion)} instancias de agresión")
-                
-                # Paso 3: Detectar menciones a víctimas
-                logger.info("Paso 3/7: Detectando menciones a víctimas...")
-                menciones_victimas = analizador.detectar_menciones_victimas(texto_completo)
-                total_menciones = sum(len(m) for m in menciones_victimas.values())
-                logger.info(f"  Detectadas {total_menciones} menciones a víctimas")
-                
-                # Paso 4: Detectar contradicciones
-                logger.info("Paso 4/7: Detectando contradicciones internas...")
-                contradicciones = analizador.detectar_contradicciones(texto_completo)
-                logger.info(f"  Detectadas {len(contradicciones)} posibles contradicciones")
-                
-                # Paso 5: Clasificación legal danesa
-                logger.info("Paso 5/7: Realizando clasificación legal danesa (§243)...")
-                clasificacion_legal = analizador.clasificar_legal_dk(texto_completo, detecciones_agresion)
-                risikoniveau = clasificacion_legal.get('risikoniveau', 'lav')
-                logger.info(f"  Clasificación completada: Nivel de riesgo {risikoniveau.upper()}")
-                
-                # Paso 6: Correlacionar con audios
-                logger.info("Paso 6/7: Correlacionando agresiones con transcripciones de audio...")
-                detecciones_correlacionadas = analizador.correlacionar_con_audios(detecciones_agresion, transcripciones)
-                total_correlaciones = sum(len(det.get('correlaciones', [])) for det in detecciones_correlacionadas)
-                logger.info(f"  Encontradas {total_correlaciones} correlaciones con audios/videos")
-                
-                # Paso 7: Calcular agravantes legales
-                logger.info("Paso 7/7: Calculando agravantes legales por menores vulnerables...")
-                agravantes_legales = analizador.calcular_agravantes_legales(detecciones_correlacionadas, menciones_victimas)
-                nivel_final = agravantes_legales.get('nivel_riesgo_final', 'LAV')
-                logger.info(f"  Nivel de riesgo final (con agravantes): {nivel_final}")
-                
-                # Generar informe correlacional
-                logger.info("Generando informe correlacional...")
-                nombre_pdf = os.path.basename(archivo_pdf)
-                contenido_informe = analizador.generar_informe_correlacional(
-                    nombre_pdf=nombre_pdf,
-                    ruta_pdf=archivo_pdf,
-                    texto_extraido=texto_extraido,
-                    detecciones_agresion=detecciones_correlacionadas,
-                    menciones_victimas=menciones_victimas,
-                    contradicciones=contradicciones,
-                    clasificacion_legal=clasificacion_legal,
-                    agravantes_legales=agravantes_legales,
-                    transcripciones=transcripciones
-                )
-                
-                # Guardar informe
-                nombre_base = os.path.splitext(nombre_pdf)[0]
-                nombre_base = nombre_base.replace(' ', '_').replace('/', '_').replace('\\', '_')
-                nombre_archivo_informe = f"{nombre_base}_PDF_CORRELACIONAL.txt"
-                ruta_informe = os.path.join(CARPETA_TRANSCRIPCIONES, nombre_archivo_informe)
-                
-                os.makedirs(CARPETA_TRANSCRIPCIONES, exist_ok=True)
-                with open(ruta_informe, 'w', encoding='utf-8') as f:
-                    f.write(contenido_informe)
-                
-                tiempo_procesamiento = time.time() - tiempo_inicio
-                logger.info(f"✓ Informe guardado: {nombre_archivo_informe}")
-                logger.info(f"  Tiempo de procesamiento: {tiempo_procesamiento:.2f} segundos")
-                
-                exitosos += 1
-                
-            except Exception as e:
-                tiempo_procesamiento = time.time() - tiempo_inicio
-                logger.error(f"✗ Error al procesar {os.path.basename(archivo_pdf)}: {str(e)}")
-                logger.exception("Detalles del error:")
-                fallidos += 1
+                tiempo_inicio = time.time()
+                try:
+                    nombre_archivo_informe = generar_informe_pdf(
+                        analizador, resultado, transcripciones, CARPETA_TRANSCRIPCIONES, logger
+                    )
+                    
+                    tiempo_procesamiento = time.time() - tiempo_inicio + resultado['tiempos'].get('total', 0.0)
+                    logger.info(f"✓ Informe guardado: {nombre_archivo_informe}")
+                    logger.info(f"  Tiempo de procesamiento: {tiempo_procesamiento:.2f} segundos")
+                    logger.info(f"  Tiempos por etapa: {formatear_tiempos(resultado['tiempos'])}")
+                    for etapa, segundos in resultado['tiempos'].items():
+                        tiempos_etapas[etapa] = tiempos_etapas.get(etapa, 0.0) + segundos
+                    
+                    exitosos += 1
+                    
+                except Exception as e:
+                    logger.error(f"✗ Error al procesar {os.path.basename(archivo_pdf)}: {str(e)}")
+                    logger.exception("Detalles del error:")
+                    fallidos += 1
+        finally:
+            if motor is not None:
+                motor.cerrar()
         
         # Resumen final
         tiempo_total = time.time() - tiempo_inicio_total
@@ -198,6 +448,7 @@ def main():
         logger.info(f"Tiempo total: {tiempo_total:.2f} segundos ({tiempo_total/60:.2f} minutos)")
         if exitosos > 0:
             logger.info(f"Tiempo promedio por archivo: {tiempo_total/exitosos:.2f} segundos")
+            logger.info(f"Tiempo acumulado por etapa: {formatear_tiempos(tiempos_etapas)}")
         logger.info("=" * 60)
         
     except KeyboardInterrupt:
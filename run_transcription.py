@@ -5,7 +5,11 @@ Script principal para transcribir todos los audios en la carpeta audios/
 import os
 import sys
 import time
+import argparse
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
@@ -23,12 +27,293 @@ from src.detector_voz import VoiceStressDetector
 from src.detector_victimas import VictimDetector
 from src.analizador_forense_dk import AnalizadorForenseDK
 from src.generador_informe_unico import GeneradorInformeUnico
+from src.analisis_unificado import AnalizadorUnificado
+from src.audio_decodificado import obtener_cache_audio
+from src.pool_transcripcion import PoolTranscripcion
+from src.transcripcion_fragmentada import TranscripcionFragmentada
+from src.pipeline_etapas import PipelineEtapas
+from src.motores_inferencia import MOTORES
+from src.paquetes_reglas import obtener_gestor_reglas
+from src.reanalisis import generar_informe_audio, obtener_manifiesto_analisis
 import logging
 
 
+def inicializar_analizadores(voz_streaming: bool = False) -> Dict[str, Any]:
+    """
+    Crea los analizadores de los pasos 2 a 6
+    
+    Args:
+        voz_streaming: Analizar el audio por bloques en lugar de cargarlo entero
+    
+    Returns:
+        Diccionario con los analizadores por nombre
+    """
+    analizadores = {
+        'agresion': AgresionAnalyzer(),
+        'voz': VoiceStressDetector(streaming=voz_streaming),
+        'victimas': VictimDetector(),
+        'forense_dk': AnalizadorForenseDK(),
+        'informe': GeneradorInformeUnico()
+    }
+    
+    # Pasos 2, 4 y 5 en un solo recorrido de los segmentos
+    analizadores['texto'] = AnalizadorUnificado(
+        analizadores['agresion'],
+        analizadores['victimas'],
+        analizadores['forense_dk']
+    )
+    return analizadores
+
+
+def guardar_y_analizar(
+    archivo_audio: str,
+    resultado: Dict[str, Any],
+    tiempo_transcripcion: float,
+    analizadores: Dict[str, Any],
+    carpeta_transcripciones: str,
+    formato_salida: str,
+    audio: Optional[np.ndarray] = None
+):
+    """
+    Guarda la transcripción de un archivo y ejecuta los pasos de análisis e informe
+    
+    Args:
+        archivo_audio: Ruta al archivo de audio
+        resultado: Resultado de Whisper
+        tiempo_transcripcion: Segundos empleados en la transcripción
+        analizadores: Analizadores creados con inicializar_analizadores()
+        carpeta_transcripciones: Carpeta de salida
+        formato_salida: Formato de la transcripción (txt, json, srt, vtt)
+        audio: Audio decodificado. Si None, se obtiene de la caché de audio (o se lee por
+               bloques con --voz-streaming, que descarta el audio recibido)
+    """
+    logger = logging.getLogger()
+    
+    # Guardar transcripción original (mantener funcionalidad original)
+    ruta_guardada = guardar_transcripcion(
+        resultado,
+        archivo_audio,
+        carpeta_transcripciones,
+        formato=formato_salida
+    )
+    
+    # Mostrar resumen básico
+    texto = resultado.get('text', '')
+    idioma_detectado = resultado.get('language', 'desconocido')
+    duracion_audio = resultado.get('segments', [{}])[-1].get('end', 0) if resultado.get('segments') else 0
+    
+    logger.info(f"✓ Transcripción completada en {tiempo_transcripcion:.2f} segundos")
+    logger.info(f"  Idioma detectado: {idioma_detectado}")
+    logger.info(f"  Duración del audio: {duracion_audio:.2f} segundos")
+    logger.info(f"  Caracteres transcritos: {len(texto)}")
+    logger.info(f"  Guardado en: {ruta_guardada}")
+    
+    # Reglas editadas desde el archivo anterior: se recargan sin volver a cargar el modelo
+    obtener_gestor_reglas().recargar_si_cambiaron()
+    
+    # b) Analizar agresión verbal (junto con víctimas y análisis forense DK, en una pasada)
+    logger.info("Paso 2/6: Analizando agresión verbal...")
+    analisis_texto = analizadores['texto'].analizar(resultado)
+    analisis_agresion = analisis_texto['agresion']
+    logger.info(f"  Detectadas {len(analisis_agresion)} instancias de agresión")
+    
+    # c) Analizar estrés vocal
+    logger.info("Paso 3/6: Analizando estrés vocal...")
+    # Con --voz-streaming el detector lee el archivo por bloques aunque haya buffer decodificado
+    analisis_voz = analizadores['voz'].analizar_audio(
+        archivo_audio,
+        resultado.get('segments', []),
+        audio=None if analizadores['voz'].streaming else audio
+    )
+    logger.info(f"  Detectados {len(analisis_voz)} momentos de voz elevada")
+    
+    # d) Analizar agresión dirigida a víctimas
+    logger.info("Paso 4/6: Analizando agresión dirigida a víctimas...")
+    analisis_victimas = analisis_texto['victimas']
+    logger.info(f"  Detectadas {len(analisis_victimas)} instancias de agresión dirigida")
+    
+    # e) Análisis forense DK (Straffeloven §243)
+    logger.info("Paso 5/6: Realizando análisis forense según legislación danesa...")
+    analisis_forense_dk = analisis_texto['forense_dk']
+    logger.info(f"  Análisis forense completado: {analisis_forense_dk['risikoniveau']}")
+    
+    # f) Generar informe único consolidado
+    logger.info("Paso 6/6: Generando informe único consolidado...")
+    ruta_informe_unico = generar_informe_audio(
+        analizadores['informe'],
+        archivo_audio,
+        resultado,
+        analisis_texto,
+        analisis_voz,
+        carpeta_transcripciones
+    )
+    
+    logger.info(f"✓ Informe único guardado: {os.path.basename(ruta_informe_unico)}")
+    
+    # Datos para regenerar el informe con reanalizar.py si cambian las reglas
+    try:
+        obtener_manifiesto_analisis().registrar(
+            archivo_audio,
+            resultado,
+            analisis_voz,
+            carpeta_transcripciones,
+            ruta_informe_unico,
+            analizadores['texto'].huella_reglas()
+        )
+    except Exception as e:
+        logger.warning(f"No se pudo registrar el análisis para reanalizar: {e}")
+
+
+def crear_pipeline(
+    transcriptor: WhisperTranscriber,
+    analizadores: Dict[str, Any],
+    idioma: Optional[str],
+    carpeta_transcripciones: str,
+    formato_salida: str,
+    vad: bool = False
+) -> PipelineEtapas:
+    """
+    Construye el pipeline decodificación → transcripción → análisis e informe
+    
+    Las colas entre etapas admiten un solo archivo, así que como máximo hay un
+    audio decodificado esperando por etapa.
+    
+    Args:
+        transcriptor: Transcriptor Whisper
+        analizadores: Analizadores creados con inicializar_analizadores()
+        idioma: Código de idioma o None para detección automática
+        carpeta_transcripciones: Carpeta de salida
+        formato_salida: Formato de la transcripción
+        vad: Recortar silencios antes de transcribir
+        
+    Returns:
+        Pipeline listo para ejecutar sobre una lista de rutas
+    """
+    logger = logging.getLogger()
+    
+    def decodificar(archivo_audio):
+        return archivo_audio, obtener_cache_audio().obtener(archivo_audio)
+    
+    def transcribir(entrada):
+        archivo_audio, audio = entrada
+        logger.info(f"Paso 1/6: Transcribiendo {os.path.basename(archivo_audio)}...")
+        tiempo_inicio = time.time()
+        resultado = transcriptor.transcribir(archivo_audio, idioma=idioma, verbose=False, audio=audio, vad=vad)
+        return archivo_audio, audio, resultado, time.time() - tiempo_inicio
+    
+    def analizar(entrada):
+        archivo_audio, audio, resultado, tiempo_transcripcion = entrada
+        logger.info("-" * 60)
+        logger.info(f"Analizando: {os.path.basename(archivo_audio)}")
+        guardar_y_analizar(
+            archivo_audio,
+            resultado,
+            tiempo_transcripcion,
+            analizadores,
+            carpeta_transcripciones,
+            formato_salida,
+            audio=audio
+        )
+    
+    return PipelineEtapas([
+        ('decodificacion', decodificar),
+        ('transcripcion', transcribir),
+        ('analisis_informe', analizar)
+    ])
+
+
+def transcribir_fragmentados(
+    pool: PoolTranscripcion,
+    archivos_audio: List[str],
+    idioma: Optional[str],
+    duracion_fragmento: float,
+    **opciones
+) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception], float]]:
+    """
+    Transcribe los archivos de uno en uno, repartiendo los fragmentos de cada uno entre los workers
+    
+    Args:
+        pool: Pool de transcripción ya configurado
+        archivos_audio: Rutas de los archivos de audio
+        idioma: Código de idioma o None para detección automática
+        duracion_fragmento: Duración aproximada de cada fragmento en segundos
+        **opciones: Argumentos adicionales para WhisperTranscriber.transcribir()
+        
+    Returns:
+        Iterador de tuplas (ruta, resultado, error, segundos), con el mismo formato que
+        PoolTranscripcion.transcribir()
+    """
+    fragmentador = TranscripcionFragmentada(pool, duracion_objetivo_s=duracion_fragmento)
+    for archivo_audio in archivos_audio:
+        tiempo_inicio = time.time()
+        try:
+            resultado = fragmentador.transcribir(archivo_audio, idioma=idioma, **opciones)
+            yield archivo_audio, resultado, None, time.time() - tiempo_inicio
+        except Exception as e:
+            yield archivo_audio, None, e, 0.0
+
+
+def parsear_argumentos() -> argparse.Namespace:
+    """Lee las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Transcripción y análisis forense de audios")
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv('WHISPER_WORKERS', '1')),
+        help="Procesos transcriptores en paralelo, cada uno con su copia del modelo (1 = secuencial)"
+    )
+    parser.add_argument(
+        '--backend',
+        choices=sorted(MOTORES),
+        default=os.getenv('WHISPER_BACKEND', 'whisper'),
+        help="Motor de inferencia (faster-whisper usa pesos int8 en CPU)"
+    )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help="Solapar la transcripción del siguiente archivo con el análisis e informe del actual"
+    )
+    parser.add_argument(
+        '--lote',
+        type=int,
+        default=1,
+        help="Clips cortos (<= 30 s) decodificados juntos en una pasada del modelo (1 = sin lotes)"
+    )
+    parser.add_argument(
+        '--vad',
+        action='store_true',
+        help="Recortar silencios antes de transcribir (los timestamps se mantienen en tiempo original)"
+    )
+    parser.add_argument(
+        '--fragmentar',
+        action='store_true',
+        help="Dividir cada audio largo en fragmentos cortados en pausas y transcribirlos en paralelo con los workers"
+    )
+    parser.add_argument(
+        '--duracion-fragmento',
+        type=float,
+        default=120.0,
+        help="Duración aproximada de cada fragmento en segundos (con --fragmentar)"
+    )
+    parser.add_argument(
+        '--hilos-por-worker',
+        type=int,
+        default=None,
+        help="Hilos de PyTorch por worker (por defecto: núcleos / workers)"
+    )
+    parser.add_argument(
+        '--voz-streaming',
+        action='store_true',
+        help="Análisis de voz leyendo el audio por bloques, sin cargarlo entero en memoria"
+    )
+    return parser.parse_args()
+
+
 def main():
     """Función principal"""
     
+    args = parsear_argumentos()
+    
     # Configurar rutas
     # Ruta absoluta donde están los audios originales (NO se copian ni mueven)
     CARPETA_AUDIOS = r"C:\Users\hanns\Downloads\Audios-20251203T004026Z-1-001\Audios"
@@ -57,24 +342,24 @@ def main():
     FORMATO_SALIDA = os.getenv('WHISPER_FORMAT', 'txt')  # txt, json, srt, vtt
     
     try:
-        # Inicializar transcriptor
-        logger.info(f"Configurando transcriptor con modelo: {MODELO}")
-        transcriptor = WhisperTranscriber(modelo=MODELO)
-        
         # Inicializar analizadores
         logger.info("Inicializando analizadores de agresión, voz, víctimas y análisis forense DK")
-        analizador_agresion = AgresionAnalyzer()
-        detector_voz = VoiceStressDetector()
-        detector_victimas = VictimDetector()
-        analizador_forense_dk = AnalizadorForenseDK()
-        generador_informe = GeneradorInformeUnico()
+        analizadores = inicializar_analizadores(voz_streaming=args.voz_streaming)
         
-        # Mostrar información del dispositivo
-        info = transcriptor.obtener_info_modelo()
-        logger.info(f"Dispositivo: {info['dispositivo']}")
-        if info['gpu_disponible']:
-            logger.info(f"GPU: {info.get('gpu_nombre', 'N/A')}")
-            logger.info(f"Memoria GPU: {info.get('gpu_memoria_total_gb', 0):.2f} GB")
+        # Inicializar transcriptor (en modo paralelo cada worker carga su propio modelo)
+        transcriptor = None
+        if args.workers <= 1 and not args.fragmentar:
+            logger.info(f"Configurando transcriptor con modelo: {MODELO} (motor {args.backend})")
+            transcriptor = WhisperTranscriber(modelo=MODELO, motor=args.backend)
+            
+            # Mostrar información del dispositivo
+            info = transcriptor.obtener_info_modelo()
+            logger.info(f"Dispositivo: {info['dispositivo']}")
+            if 'tiempo_carga_s' in info:
+                logger.info(f"Modelo cargado en {info['tiempo_carga_s']:.2f} segundos ({info['tamano_mb']:.1f} MB en memoria)")
+            if info['gpu_disponible']:
+                logger.info(f"GPU: {info.get('gpu_nombre', 'N/A')}")
+                logger.info(f"Memoria GPU: {info.get('gpu_memoria_total_gb', 0):.2f} GB")
         
         # Cargar archivos de audio (LEER directamente, SIN copiar ni mover)
         logger.info(f"Buscando archivos de audio en: {CARPETA_AUDIOS}")
@@ -101,106 +386,135 @@ def main():
         exitosos = 0
         fallidos = 0
         
-        for i, archivo_audio in enumerate(archivos_audio, 1):
-            logger.info("-" * 60)
-            logger.info(f"Procesando archivo {i}/{len(archivos_audio)}: {os.path.basename(archivo_audio)}")
-            logger.info(f"Tamaño: {obtener_tamaño_archivo(archivo_audio)}")
-            
-            tiempo_inicio = time.time()
-            
-            try:
-                # a) Transcribir audio
-                logger.info("Paso 1/6: Transcribiendo audio...")
-                resultado = transcriptor.transcribir(
-                    archivo_audio,
-                    idioma=IDIOMA,
-                    verbose=False
-                )
-                
-                # Guardar transcripción original (mantener funcionalidad original)
-                ruta_guardada = guardar_transcripcion(
-                    resultado,
-                    archivo_audio,
-                    CARPETA_TRANSCRIPCIONES,
-                    formato=FORMATO_SALIDA
-                )
-                
-                tiempo_transcripcion = time.time() - tiempo_inicio
-                
-                # Mostrar resumen básico
-                texto = resultado.get('text', '')
-                idioma_detectado = resultado.get('language', 'desconocido')
-                duracion_audio = resultado.get('segments', [{}])[-1].get('end', 0) if resultado.get('segments') else 0
-                
-                logger.info(f"✓ Transcripción completada en {tiempo_transcripcion:.2f} segundos")
-                logger.info(f"  Idioma detectado: {idioma_detectado}")
-                logger.info(f"  Duración del audio: {duracion_audio:.2f} segundos")
-                logger.info(f"  Caracteres transcritos: {len(texto)}")
-                logger.info(f"  Guardado en: {ruta_guardada}")
-                
-                # b) Analizar agresión verbal
-                logger.info("Paso 2/6: Analizando agresión verbal...")
-                analisis_agresion = analizador_agresion.analizar_transcripcion(resultado)
-                logger.info(f"  Detectadas {len(analisis_agresion)} instancias de agresión")
-                
-                # c) Analizar estrés vocal
-                logger.info("Paso 3/6: Analizando estrés vocal...")
-                analisis_voz = detector_voz.analizar_audio(
-                    archivo_audio,
-                    resultado.get('segments', [])
-                )
-                logger.info(f"  Detectados {len(analisis_voz)} momentos de voz elevada")
-                
-                # d) Analizar agresión dirigida a víctimas
-                logger.info("Paso 4/6: Analizando agresión dirigida a víctimas...")
-                analisis_victimas = detector_victimas.analizar_transcripcion(
-                    resultado,
-                    analisis_agresion
-                )
-                logger.info(f"  Detectadas {len(analisis_victimas)} instancias de agresión dirigida")
-                
-                # e) Análisis forense DK (Straffeloven §243)
-                logger.info("Paso 5/6: Realizando análisis forense según legislación danesa...")
-                analisis_forense_dk = analizador_forense_dk.analyser_transkription(resultado)
-                logger.info(f"  Análisis forense completado: {analisis_forense_dk['risikoniveau']}")
-                
-                # f) Generar informe único consolidado
-                logger.info("Paso 6/6: Generando informe único consolidado...")
-                
-                # Generar identificador único
-                timestamp = int(time.time())
-                identificador_unico = f"ID_{timestamp}_{os.path.splitext(os.path.basename(archivo_audio))[0]}"
-                fecha_analisis = time.strftime('%Y-%m-%d %H:%M:%S')
-                
-                # Generar contenido del informe único
-                contenido_informe = generador_informe.generar_informe(
-                    nombre_archivo=os.path.basename(archivo_audio),
-                    duracion_audio=duracion_audio,
-                    fecha_analisis=fecha_analisis,
-                    identificador_unico=identificador_unico,
-                    resultado_whisper=resultado,
-                    analisis_agresion=analisis_agresion,
-                    analisis_voz=analisis_voz,
-                    analisis_victimas=analisis_victimas,
-                    analisis_forense_dk=analisis_forense_dk
-                )
+        if transcriptor is None:
+            # Modo paralelo: los resultados llegan según terminan los workers
+            modo = "--fragmentar" if args.fragmentar else "--workers"
+            if args.pipeline:
+                logger.warning(f"{modo} transcribe con un pool de procesos; se ignora --pipeline")
+            if args.lote > 1:
+                logger.warning(f"{modo} transcribe los archivos de uno en uno; se ignora --lote")
+            with PoolTranscripcion(
+                modelo=MODELO,
+                num_workers=args.workers,
+                hilos_por_worker=args.hilos_por_worker,
+                motor=args.backend
+            ) as pool:
+                if args.fragmentar:
+                    completados = transcribir_fragmentados(
+                        pool, archivos_audio, IDIOMA, args.duracion_fragmento, verbose=False, vad=args.vad
+                    )
+                else:
+                    completados = pool.transcribir(archivos_audio, idioma=IDIOMA, verbose=False, vad=args.vad)
+                for i, (archivo_audio, resultado, error, tiempo_transcripcion) in enumerate(completados, 1):
+                    logger.info("-" * 60)
+                    logger.info(f"Archivo transcrito {i}/{len(archivos_audio)}: {os.path.basename(archivo_audio)}")
+                    
+                    try:
+                        if error is not None:
+                            raise error
+                        
+                        guardar_y_analizar(
+                            archivo_audio,
+                            resultado,
+                            tiempo_transcripcion,
+                            analizadores,
+                            CARPETA_TRANSCRIPCIONES,
+                            FORMATO_SALIDA
+                        )
+                        exitosos += 1
+                        
+                    except Exception as e:
+                        logger.error(f"✗ Error al transcribir {os.path.basename(archivo_audio)}: {str(e)}")
+                        logger.exception("Detalles del error:")
+                        fallidos += 1
+        elif args.pipeline:
+            # Modo pipeline: decodificación, transcripción y análisis en hilos separados
+            if args.lote > 1:
+                logger.warning("--pipeline transcribe los archivos de uno en uno; se ignora --lote")
+            pipeline = crear_pipeline(
+                transcriptor, analizadores, IDIOMA, CARPETA_TRANSCRIPCIONES, FORMATO_SALIDA, vad=args.vad
+            )
+            for archivo_audio, _, error in pipeline.ejecutar(archivos_audio):
+                if error is None:
+                    exitosos += 1
+                else:
+                    logger.error(f"✗ Error al transcribir {os.path.basename(archivo_audio)}: {str(error)}")
+                    fallidos += 1
+            pipeline.registrar_resumen()
+        elif args.lote > 1:
+            # Modo lote: los clips cortos de cada grupo comparten pasada del modelo
+            for inicio in range(0, len(archivos_audio), args.lote):
+                grupo = archivos_audio[inicio:inicio + args.lote]
+                logger.info("-" * 60)
+                logger.info(f"Paso 1/6: Transcribiendo lote de {len(grupo)} archivo(s)...")
+                tiempo_inicio = time.time()
                 
-                # Guardar informe único
-                ruta_informe_unico = generador_informe.guardar_informe(
-                    contenido=contenido_informe,
-                    nombre_archivo_audio=os.path.basename(archivo_audio),
-                    carpeta_salida=CARPETA_TRANSCRIPCIONES
-                )
+                try:
+                    resultados = transcriptor.transcribir_lote(
+                        grupo, idioma=IDIOMA, tamano_lote=args.lote, vad=args.vad
+                    )
+                except Exception as e:
+                    logger.error(f"✗ Error al transcribir el lote: {str(e)}")
+                    logger.exception("Detalles del error:")
+                    fallidos += len(grupo)
+                    continue
                 
-                logger.info(f"✓ Informe único guardado: {os.path.basename(ruta_informe_unico)}")
+                tiempo_por_archivo = (time.time() - tiempo_inicio) / len(grupo)
+                for archivo_audio, resultado in zip(grupo, resultados):
+                    logger.info(f"Procesando archivo: {os.path.basename(archivo_audio)}")
+                    try:
+                        guardar_y_analizar(
+                            archivo_audio,
+                            resultado,
+                            tiempo_por_archivo,
+                            analizadores,
+                            CARPETA_TRANSCRIPCIONES,
+                            FORMATO_SALIDA
+                        )
+                        exitosos += 1
+                    except Exception as e:
+                        logger.error(f"✗ Error al procesar {os.path.basename(archivo_audio)}: {str(e)}")
+                        logger.exception("Detalles del error:")
+                        fallidos += 1
+        else:
+            for i, archivo_audio in enumerate(archivos_audio, 1):
+                logger.info("-" * 60)
+                logger.info(f"Procesando archivo {i}/{len(archivos_audio)}: {os.path.basename(archivo_audio)}")
+                logger.info(f"Tamaño: {obtener_tamaño_archivo(archivo_audio)}")
                 
-                exitosos += 1
+                tiempo_inicio = time.time()
                 
-            except Exception as e:
-                tiempo_transcripcion = time.time() - tiempo_inicio
-                logger.error(f"✗ Error al transcribir {os.path.basename(archivo_audio)}: {str(e)}")
-                logger.exception("Detalles del error:")
-                fallidos += 1
+                try:
+                    # Decodificar una sola vez; transcriptor y detector de voz comparten el buffer
+                    audio = obtener_cache_audio().obtener(archivo_audio)
+                    
+                    # a) Transcribir audio
+                    logger.info("Paso 1/6: Transcribiendo audio...")
+                    resultado = transcriptor.transcribir(
+                        archivo_audio,
+                        idioma=IDIOMA,
+                        verbose=False,
+                        audio=audio,
+                        vad=args.vad
+                    )
+                    
+                    guardar_y_analizar(
+                        archivo_audio,
+                        resultado,
+                        time.time() - tiempo_inicio,
+                        analizadores,
+                        CARPETA_TRANSCRIPCIONES,
+                        FORMATO_SALIDA,
+                        audio=audio
+                    )
+                    
+                    exitosos += 1
+                    
+                except Exception as e:
+                    tiempo_transcripcion = time.time() - tiempo_inicio
+                    logger.error(f"✗ Error al transcribir {os.path.basename(archivo_audio)}: {str(e)}")
+                    logger.exception("Detalles del error:")
+                    fallidos += 1
         
         # Resumen final
         tiempo_total = time.time() - tiempo_inicio_total
@@ -0,0 +1,195 @@
+"""
+Análisis de PDFs página a página con memoria acotada
+Las páginas se leen de una en una y los detectores recorren una ventana deslizante con
+solape, de modo que las coincidencias que cruzan de una página a otra se encuentran igual
+que en el texto completo; los hallazgos se entregan según quedan definitivos
+"""
+
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+import logging
+
+from .indice_paginas import IndicePaginas
+from .motor_pdf_paralelo import SEPARADOR_PAGINAS, desplazar_coincidencias
+
+# Distancia a la que dos detecciones de agresión se consideran duplicadas (_eliminar_duplicados)
+DISTANCIA_DUPLICADOS = 20
+
+# Solape mínimo: el contexto más amplio que guarda un hallazgo (contradicciones, ±200)
+SOLAPE_MINIMO = 200
+
+
+class AnalizadorPDFStreaming:
+    """
+    Ejecuta los detectores de AnalizadorPDFForense sobre un PDF sin cargar su texto completo
+
+    En memoria solo se mantiene la página que se analiza, `solape` caracteres antes y
+    al menos `solape` después (las páginas siguientes necesarias) y las coincidencias de
+    agresión cuya eliminación de duplicados aún depende del texto que falta por leer.
+    """
+
+    def __init__(self, analizador, solape: int = 2000):
+        """
+        Inicializa el analizador
+
+        Args:
+            analizador: AnalizadorPDFForense con las reglas cargadas
+            solape: Caracteres de contexto a cada lado de la página analizada. Debe
+                cubrir la línea más larga del documento para que las citas sean completas
+        """
+        self.logger = logging.getLogger(__name__)
+        self.analizador = analizador
+        self.solape = max(solape, SOLAPE_MINIMO)
+        self.resumen: Dict[str, Any] = {}
+
+    def analizar(self, ruta_pdf: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Analiza un PDF página a página
+
+        Al terminar la iteración, `self.resumen` contiene 'indice_paginas', 'num_paginas',
+        'num_caracteres', 'criterios_legales' (para clasificar_legal_dk()),
+        'coincidencias_agresion', 'max_caracteres_ventana' y 'segundos'.
+
+        Args:
+            ruta_pdf: Ruta al archivo PDF
+
+        Returns:
+            Iterador de hallazgos (clase, hallazgo), en el orden en que quedan definitivos:
+                ('agresion', detección como las de detectar_agresion())
+                ('victima', (víctima, mención como las de detectar_menciones_victimas()))
+                ('contradiccion', contradicción como las de detectar_contradicciones())
+        """
+        tiempo_inicio = time.perf_counter()
+        self._indice = IndicePaginas([], len(SEPARADOR_PAGINAS))
+        self._ventana = ''
+        self._base = 0
+        self._agresion_pendiente: List[Tuple[int, str, int, int, str]] = []
+        self._criterios: Dict[str, int] = {}
+        self._coincidencias_agresion = 0
+        self._detecciones_agresion = 0
+        max_ventana = 0
+
+        # Páginas leídas pero aún sin analizar: (inicio, fin del texto de la página)
+        pendientes: List[Tuple[int, int]] = []
+
+        for num_pagina, texto_pagina in self.analizador.iterar_paginas_pdf(ruta_pdf):
+            if len(self._indice):
+                self._ventana += SEPARADOR_PAGINAS
+            inicio = self._indice.agregar_pagina(num_pagina, len(texto_pagina))
+            self._ventana += texto_pagina
+            pendientes.append((inicio, inicio + len(texto_pagina)))
+            max_ventana = max(max_ventana, len(self._ventana))
+
+            # Una página se analiza cuando ya hay `solape` caracteres leídos después de ella
+            while len(pendientes) > 1 and self._fin_leido() - pendientes[0][1] >= self.solape:
+                inicio_pagina, _ = pendientes.pop(0)
+                yield from self._analizar_tramo(inicio_pagina, pendientes[0][0], final=False)
+
+        # Fin del documento: el resto de páginas tiene ya todo su contexto
+        for i, (inicio_pagina, _) in enumerate(pendientes):
+            fin_tramo = pendientes[i + 1][0] if i + 1 < len(pendientes) else self._fin_leido()
+            yield from self._analizar_tramo(inicio_pagina, fin_tramo, final=i + 1 == len(pendientes))
+        if not pendientes:
+            yield from self._analizar_tramo(self._fin_leido(), self._fin_leido(), final=True)
+
+        self.analizador.estadisticas_citas = {
+            'coincidencias': self._coincidencias_agresion,
+            'detecciones': self._detecciones_agresion,
+            'enriquecidas': 0
+        }
+        self.resumen = {
+            'indice_paginas': self._indice,
+            'num_paginas': len(self._indice),
+            'num_caracteres': self._fin_leido(),
+            'criterios_legales': self._criterios,
+            'coincidencias_agresion': self._coincidencias_agresion,
+            'max_caracteres_ventana': max_ventana,
+            'segundos': time.perf_counter() - tiempo_inicio
+        }
+        self._ventana = ''
+
+    def _fin_leido(self) -> int:
+        """Posición en el documento del final del texto leído"""
+        return self._base + len(self._ventana)
+
+    def _analizar_tramo(self, desde: int, hasta: int, final: bool) -> Iterator[Tuple[str, Any]]:
+        """
+        Busca las coincidencias que empiezan en [desde, hasta) y entrega los hallazgos definitivos
+
+        Args:
+            desde: Inicio del tramo en el documento
+            hasta: Fin del tramo en el documento (exclusivo)
+            final: Si es el último tramo del documento
+
+        Returns:
+            Iterador de hallazgos (clase, hallazgo)
+        """
+        analizador = self.analizador
+        coincidencias = desplazar_coincidencias(
+            analizador.buscar_coincidencias(self._ventana, desde - self._base, hasta - self._base),
+            self._base
+        )
+
+        for criterio, count in coincidencias['criterios'].items():
+            self._criterios[criterio] = self._criterios.get(criterio, 0) + count
+
+        # Las menciones y contradicciones no dependen de otras coincidencias
+        menciones = analizador.construir_menciones_victimas(
+            self._ventana, coincidencias['victimas'], self._indice, self._base
+        )
+        for victima, mencion in sorted(
+            ((v, m) for v, lista in menciones.items() for m in lista),
+            key=lambda par: par[1]['posicion']
+        ):
+            yield 'victima', (victima, mencion)
+
+        contradicciones = analizador.construir_contradicciones(
+            self._ventana, coincidencias['contradicciones'], self._indice, self._base
+        )
+        for contradiccion in sorted(contradicciones, key=lambda c: c['posicion']):
+            yield 'contradiccion', contradiccion
+
+        # Agresión: una coincidencia es duplicada si otra anterior (en orden de patrón) está
+        # a menos de DISTANCIA_DUPLICADOS; los grupos de coincidencias encadenadas a esa
+        # distancia solo se resuelven cuando ninguna coincidencia futura puede unirse a ellos
+        self._agresion_pendiente.extend(coincidencias['agresion'])
+        self._agresion_pendiente.sort(key=lambda c: c[2])
+        completas = self._agresion_completas(None if final else hasta)
+        if completas:
+            self._agresion_pendiente = self._agresion_pendiente[len(completas):]
+            detecciones = analizador.construir_detecciones_agresion(
+                self._ventana, completas, self._indice, self._base
+            )
+            self._coincidencias_agresion += len(completas)
+            self._detecciones_agresion += len(detecciones)
+            for deteccion in sorted(detecciones, key=lambda d: d['posicion']):
+                yield 'agresion', deteccion
+
+        # Descartar el texto que ya no hará falta como contexto
+        necesario = min([hasta] + [c[2] for c in self._agresion_pendiente]) - self.solape
+        if necesario > self._base:
+            self._ventana = self._ventana[necesario - self._base:]
+            self._base = necesario
+
+    def _agresion_completas(self, frontera) -> List[Tuple[int, str, int, int, str]]:
+        """
+        Prefijo de las coincidencias pendientes (ordenadas por posición) que ya se pueden resolver
+
+        Args:
+            frontera: Posición desde la que pueden aparecer coincidencias nuevas, o None si
+                el documento ha terminado
+
+        Returns:
+            Coincidencias de los grupos completos
+        """
+        pendientes = self._agresion_pendiente
+        if frontera is None or not pendientes:
+            return list(pendientes)
+        if pendientes[-1][2] <= frontera - DISTANCIA_DUPLICADOS:
+            return list(pendientes)
+
+        # El último grupo (sin huecos de DISTANCIA_DUPLICADOS) aún puede crecer
+        inicio_ultimo = len(pendientes) - 1
+        while inicio_ultimo > 0 and pendientes[inicio_ultimo][2] - pendientes[inicio_ultimo - 1][2] < DISTANCIA_DUPLICADOS:
+            inicio_ultimo -= 1
+        return pendientes[:inicio_ultimo]
@@ -0,0 +1,116 @@
+"""
+Análisis de texto unificado: agresión, víctimas y análisis forense DK en una sola pasada
+Cada segmento se normaliza una vez y todas las familias de reglas se evalúan sobre ese
+mismo texto; cada analizador recibe sus resultados con su formato habitual
+"""
+
+from typing import Any, Dict, List, Tuple
+import hashlib
+import logging
+
+from .analizador_agresion import AgresionAnalyzer
+from .detector_victimas import VictimDetector
+from .analizador_forense_dk import AnalizadorForenseDK
+from .indice_temporal import IndiceTemporal
+
+
+class AnalizadorUnificado:
+    """
+    Ejecuta los analizadores de texto sobre una transcripción recorriendo los segmentos una vez
+    """
+
+    def __init__(
+        self,
+        agresion: AgresionAnalyzer,
+        victimas: VictimDetector,
+        forense_dk: AnalizadorForenseDK
+    ):
+        """
+        Inicializa el analizador
+
+        Args:
+            agresion: Analizador de agresión verbal
+            victimas: Detector de agresión dirigida a víctimas
+            forense_dk: Analizador forense según legislación danesa
+        """
+        self.logger = logging.getLogger(__name__)
+        self.agresion = agresion
+        self.victimas = victimas
+        self.forense_dk = forense_dk
+
+    def huella_reglas(self) -> str:
+        """
+        Hash combinado de los paquetes de reglas que usan los tres analizadores
+
+        Cambia cuando se edita cualquiera de ellos; sirve para saber qué informes hay
+        que regenerar.
+
+        Returns:
+            Hash hexadecimal
+        """
+        paquetes = [self.agresion.reglas, self.victimas.reglas, self.forense_dk.reglas]
+        descriptor = '\n'.join(f"{p.idioma}/{p.nombre}:{p.sha256}" for p in paquetes)
+        return hashlib.sha256(descriptor.encode('utf-8')).hexdigest()
+
+    def analizar(self, resultado_whisper: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analiza una transcripción completa
+
+        Args:
+            resultado_whisper: Resultado completo de Whisper
+
+        Returns:
+            Diccionario con:
+                'agresion': salida de AgresionAnalyzer.analizar_transcripcion()
+                'victimas': salida de VictimDetector.analizar_transcripcion()
+                'forense_dk': salida de AnalizadorForenseDK.analyser_transkription()
+        """
+        analisis_agresion = []
+        tidsbegivenheder = []
+        victimas_por_segmento: List[Tuple[Dict[str, Any], List[Tuple[str, str, str]]]] = []
+
+        for segmento in resultado_whisper.get('segments', []):
+            texto = segmento.get('text', '').strip()
+            if not texto:
+                continue
+
+            # Normalización única; los motores de cada analizador ya están compilados
+            texto_lower = texto.lower()
+
+            # Agresión: la categoría presente de mayor prioridad
+            deteccion = self.agresion.motor_patrones.primera_por_prioridad(texto_lower)
+            if deteccion:
+                analisis_agresion.append(self.agresion.crear_deteccion(segmento, deteccion[0]))
+
+            # Forense DK: todas las categorías presentes, en su orden
+            presentes = self.forense_dk.motor_patrones.categorias_presentes(texto_lower)
+            if presentes:
+                typer = [typ for typ, _, _ in self.forense_dk.kategorier if typ in presentes]
+                tidsbegivenheder.append(self.forense_dk.crear_tidsbegivenhed(segmento, typer))
+
+            # Víctimas: la clasificación dirigida solo para las mencionadas
+            mencionadas = self.victimas.motor_menciones.categorias_presentes(texto_lower)
+            if mencionadas:
+                victimas_por_segmento.append(
+                    (segmento, self.victimas.clasificar_victimas(texto_lower, mencionadas))
+                )
+
+        # La severidad de las víctimas depende de la agresión cercana, que ya está completa
+        indice_agresion = IndiceTemporal(analisis_agresion)
+        analisis_victimas = []
+        for segmento, clasificaciones in victimas_por_segmento:
+            analisis_correspondiente = indice_agresion.primero_en_ventana(segmento.get('start', 0), 1.0)
+            analisis_victimas.extend(
+                self.victimas.crear_detecciones(segmento, clasificaciones, analisis_correspondiente)
+            )
+
+        self.logger.info(
+            f"Análisis unificado: {len(analisis_agresion)} agresiones, "
+            f"{len(analisis_victimas)} agresiones dirigidas, {len(tidsbegivenheder)} eventos forenses DK"
+        )
+
+        return {
+            'agresion': analisis_agresion,
+            'victimas': analisis_victimas,
+            'forense_dk': self.forense_dk.analyser_tidsbegivenheder(resultado_whisper, tidsbegivenheder)
+        }
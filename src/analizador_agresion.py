@@ -3,91 +3,43 @@ Analizador avanzado de agresión verbal
 Detecta insultos, amenazas, descalificaciones, gaslighting, manipulación e invalidación
 """
 
-import re
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
+from .paquetes_reglas import GestorPaquetesReglas, PaqueteReglas, obtener_gestor_reglas
+
 
 class AgresionAnalyzer:
     """
     Clase para analizar agresión verbal en transcripciones
     """
     
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self._inicializar_patrones()
+    # Paquete de reglas (idioma, nombre) en reglas/
+    PAQUETE_REGLAS = ('es', 'agresion')
     
-    def _inicializar_patrones(self):
-        """Inicializa todos los patrones de detección"""
-        
-        # Insultos directos
-        self.insultos = [
-            r'\b(puta|puto|hijo de puta|hdp|maldito|maldita|imbécil|idiota|estúpido|estúpida|tonto|tonta|tarado|tarada|retrasado|retrasada)\b',
-            r'\b(maricón|marica|joto|jota|culero|culera|pendejo|pendeja|mamón|mamona)\b',
-            r'\b(chinga|chingado|chingada|verga|pinche|pinchi|joder|jodido|jodida)\b',
-            r'\b(cabrón|cabrona|hijueputa|hijueputo|malparido|malparida)\b',
-            r'\b(desgraciado|desgraciada|sinvergüenza|sinverguenza|canalla|basura|mierda)\b',
-            r'\b(inútil|incompetente|incapaz|inútil|inútil)\b'
-        ]
-        
-        # Amenazas
-        self.amenazas = [
-            r'\b(te voy a|vas a ver|te haré|te haré pagar|te voy a hacer)\b',
-            r'\b(te mato|te mataré|te voy a matar|te mato)\b',
-            r'\b(te voy a golpear|te golpeo|te pego|te voy a pegar)\b',
-            r'\b(te voy a dejar|te dejo|me voy|te abandono)\b',
-            r'\b(vas a arrepentirte|te arrepentirás|lo pagarás|pagarás)\b',
-            r'\b(te voy a denunciar|te denuncio|te denunciaré|te voy a reportar)\b',
-            r'\b(vas a pagar|pagarás|lo pagarás|te cobraré)\b',
-            r'\b(te voy a destruir|te destruiré|te voy a arruinar)\b'
-        ]
-        
-        # Descalificaciones
-        self.descalificaciones = [
-            r'\b(no sirves|no vales|no eres nada|no eres nadie)\b',
-            r'\b(eres un fracaso|eres un desastre|no haces nada bien)\b',
-            r'\b(no sabes hacer nada|no sabes nada|no entiendes nada)\b',
-            r'\b(eres inútil|no sirves para nada|no vales la pena)\b',
-            r'\b(estás loca|estás loco|estás mal de la cabeza)\b',
-            r'\b(no tienes cerebro|no piensas|no razonas)\b'
-        ]
-        
-        # Gaslighting
-        self.gaslighting = [
-            r'\b(eso nunca pasó|no pasó así|te lo estás inventando|eso no es verdad)\b',
-            r'\b(estás confundida|estás confundido|no fue así|te equivocas)\b',
-            r'\b(lo estás recordando mal|tienes mala memoria|no fue así)\b',
-            r'\b(estás loca|estás loco|estás alucinando|te lo inventaste)\b',
-            r'\b(eso no es verdad|eso es mentira|mientes|estás mintiendo)\b',
-            r'\b(no dije eso|nunca dije eso|te lo inventaste|no fue así)\b',
-            r'\b(estás exagerando|siempre exageras|no fue tan grave)\b',
-            r'\b(no fue así|no pasó|te lo estás imaginando)\b'
-        ]
+    def __init__(self, gestor_reglas: Optional[GestorPaquetesReglas] = None):
+        """
+        Inicializa el analizador
         
-        # Manipulación emocional
-        self.manipulacion = [
-            r'\b(no me quieres|no me amas|si me quisieras|si me amaras)\b',
-            r'\b(eres egoísta|solo piensas en ti|nunca me escuchas)\b',
-            r'\b(me haces sentir mal|me haces daño|me lastimas|me duele)\b',
-            r'\b(es tu culpa|tú tienes la culpa|por tu culpa|es por ti)\b',
-            r'\b(no entiendes|nunca entiendes|no me entiendes)\b',
-            r'\b(estás loca|estás loco|estás mal de la cabeza)\b',
-            r'\b(exageras|siempre exageras|estás exagerando)\b',
-            r'\b(me haces esto|me haces sufrir|me estás matando)\b',
-            r'\b(si me quisieras|si me amaras|si me respetaras)\b'
-        ]
+        Args:
+            gestor_reglas: Gestor de paquetes de reglas. Si None, el del proceso
+        """
+        self.logger = logging.getLogger(__name__)
+        gestor_reglas = gestor_reglas or obtener_gestor_reglas()
+        self._aplicar_reglas(gestor_reglas.obtener(*self.PAQUETE_REGLAS))
+        gestor_reglas.suscribir(*self.PAQUETE_REGLAS, self._aplicar_reglas)
+    
+    def _aplicar_reglas(self, paquete: PaqueteReglas):
+        """
+        Toma los patrones del paquete de reglas (al crear el analizador y al recargarlo)
         
-        # Invalidación
-        self.invalidacion = [
-            r'\b(no es para tanto|no es tan grave|no es nada)\b',
-            r'\b(estás exagerando|siempre exageras|no es tan malo)\b',
-            r'\b(no tienes razón|estás equivocada|estás equivocado)\b',
-            r'\b(tus sentimientos no importan|no es importante|no vale la pena)\b',
-            r'\b(no deberías sentirte así|no tienes por qué|no es para llorar)\b',
-            r'\b(eso no es nada|no es problema|no es tan grave)\b',
-            r'\b(te estás haciendo la víctima|siempre te haces la víctima)\b'
-        ]
+        Args:
+            paquete: Paquete 'agresion' con las categorías de mayor a menor gravedad
+        """
+        self.reglas = paquete
+        # Todas las categorías compiladas una vez; los textos se analizan ya en minúsculas
+        self.motor_patrones = paquete.compilado('principal')
     
     def _calcular_severidad(self, tipo: str, texto: str) -> str:
         """
@@ -135,39 +87,8 @@ class AgresionAnalyzer:
         Returns:
             Tupla (tipo, patrón_matched) o None
         """
-        texto_lower = texto.lower()
-        
-        # Verificar amenazas primero (más grave)
-        for patron in self.amenazas:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                return ('amenaza', patron)
-        
-        # Insultos
-        for patron in self.insultos:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                return ('insulto', patron)
-        
-        # Gaslighting
-        for patron in self.gaslighting:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                return ('gaslighting', patron)
-        
-        # Manipulación
-        for patron in self.manipulacion:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                return ('manipulación', patron)
-        
-        # Descalificaciones
-        for patron in self.descalificaciones:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                return ('descalificación', patron)
-        
-        # Invalidación
-        for patron in self.invalidacion:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                return ('invalidación', patron)
-        
-        return None
+        # Una pasada sobre el texto; si hay varias categorías gana la más grave
+        return self.motor_patrones.primera_por_prioridad(texto.lower())
     
     def analizar_segmento(
         self,
@@ -183,8 +104,6 @@ class AgresionAnalyzer:
             Diccionario con análisis o None si no hay agresión
         """
         texto = segmento.get('text', '').strip()
-        inicio = segmento.get('start', 0)
-        fin = segmento.get('end', 0)
         
         if not texto:
             return None
@@ -196,16 +115,31 @@ class AgresionAnalyzer:
             return None
         
         tipo, _ = resultado
+        return self.crear_deteccion(segmento, tipo)
+    
+    def crear_deteccion(
+        self,
+        segmento: Dict[str, Any],
+        tipo: str
+    ) -> Dict[str, Any]:
+        """
+        Construye la detección de un segmento ya clasificado
         
-        # Calcular severidad
-        severidad = self._calcular_severidad(tipo, texto)
+        Args:
+            segmento: Segmento de Whisper con 'text', 'start', 'end'
+            tipo: Tipo de agresión detectado
+            
+        Returns:
+            Diccionario con inicio, fin, tipo, frase y severidad
+        """
+        texto = segmento.get('text', '').strip()
         
         return {
-            'inicio': inicio,
-            'fin': fin,
+            'inicio': segmento.get('start', 0),
+            'fin': segmento.get('end', 0),
             'tipo': tipo,
             'frase': texto,
-            'severidad': severidad
+            'severidad': self._calcular_severidad(tipo, texto)
         }
     
     def analizar_transcripcion(
@@ -4,11 +4,12 @@ Análisis jurídico y psicológico según Straffeloven §243
 Módulo forense objetivo sin diagnósticos ni especulaciones
 """
 
-import re
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
+from .paquetes_reglas import GestorPaquetesReglas, PaqueteReglas, obtener_gestor_reglas
+
 
 class AnalizadorForenseDK:
     """
@@ -16,85 +17,39 @@ class AnalizadorForenseDK:
     Enfoque en Straffeloven §243 (violencia psicológica)
     """
     
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self._inicializar_patrones_dk()
+    # Paquete de reglas (idioma, nombre) en reglas/
+    PAQUETE_REGLAS = ('da', 'forense_dk')
     
-    def _inicializar_patrones_dk(self):
-        """Inicializa patrones de detección según criterios legales daneses"""
-        
-        # Kontrol (Control)
-        self.kontrol = [
-            r'\b(du må ikke|du skal ikke|du kan ikke|du får ikke lov|jeg tillader ikke)\b',
-            r'\b(jeg bestemmer|jeg bestemmer over|jeg kontrollerer|jeg styrer)\b',
-            r'\b(du skal spørge mig|du skal bede om tilladelse|du skal have min tilladelse)\b',
-            r'\b(jeg ved bedre|jeg ved hvad der er bedst|du ved ikke hvad du laver)\b',
-            r'\b(du kan ikke klare dig uden mig|du er afhængig af mig)\b'
-        ]
-        
-        # Økonomisk pres (Presión económica)
-        self.okonomisk_pres = [
-            r'\b(du får ingen penge|jeg giver dig ingen penge|du får ikke noget)\b',
-            r'\b(jeg betaler ikke|jeg stopper betalingen|du får ikke noget fra mig)\b',
-            r'\b(du skylder mig|du er i gæld til mig|du må betale)\b',
-            r'\b(jeg tager pengene|jeg stopper overførslen|ingen penge til dig)\b',
-            r'\b(du kan ikke få penge|du får ikke adgang til penge)\b'
-        ]
-        
-        # Nedværdigende adfærd (Comportamiento degradante)
-        self.nedvaerdigende = [
-            r'\b(du er intet værd|du er ingenting|du er ubrugelig|du er værdiløs)\b',
-            r'\b(du er dum|du er idiot|du er tåbelig|du er inkompetent)\b',
-            r'\b(ingen vil have dig|ingen kan lide dig|du er alene)\b',
-            r'\b(du er en fejl|du er en skuffelse|du er en byrde)\b',
-            r'\b(du er ikke god nok|du er utilstrækkelig)\b'
-        ]
-        
-        # Trusler (Amenazas)
-        self.trusler = [
-            r'\b(jeg gør dig noget|jeg skader dig|jeg gør ondt)\b',
-            r'\b(jeg tager børnene|du får ikke børnene|jeg tager dem fra dig)\b',
-            r'\b(jeg forlader dig|jeg går|jeg smutter|jeg dropper dig)\b',
-            r'\b(jeg anmelder dig|jeg melder dig|jeg rapporterer dig)\b',
-            r'\b(du kommer til at fortryde|du vil fortryde|du skal betale)\b',
-            r'\b(jeg ødelægger dig|jeg ruinerer dig|jeg knuser dig)\b'
-        ]
+    def __init__(self, gestor_reglas: Optional[GestorPaquetesReglas] = None):
+        """
+        Inicializa el analizador
         
-        # Gaslighting (Manipulación de la realidad)
-        self.gaslighting = [
-            r'\b(det skete ikke|det var ikke sådan|det er ikke sandt)\b',
-            r'\b(du husker forkert|du tager fejl|du har misforstået)\b',
-            r'\b(det var ikke så slemt|du overdriver|du gør det værre)\b',
-            r'\b(jeg sagde det ikke|jeg gjorde det ikke|det var ikke mig)\b',
-            r'\b(du opfinder ting|du finder på ting|du lyver)\b',
-            r'\b(du er forvirret|du er desorienteret|du ved ikke hvad du snakker om)\b'
-        ]
+        Args:
+            gestor_reglas: Gestor de paquetes de reglas. Si None, el del proceso
+        """
+        self.logger = logging.getLogger(__name__)
+        gestor_reglas = gestor_reglas or obtener_gestor_reglas()
+        self._aplicar_reglas(gestor_reglas.obtener(*self.PAQUETE_REGLAS))
+        gestor_reglas.suscribir(*self.PAQUETE_REGLAS, self._aplicar_reglas)
+    
+    def _aplicar_reglas(self, paquete: PaqueteReglas):
+        """
+        Toma los patrones según criterios legales daneses del paquete de reglas
         
-        # Manipulation (Manipulación)
-        self.manipulation = [
-            r'\b(hvis du elsker mig|hvis du holder af mig|hvis du respekterer mig)\b',
-            r'\b(det er din skyld|du har skylden|det er fordi af dig)\b',
-            r'\b(du gør mig ked af det|du sårer mig|du skader mig)\b',
-            r'\b(jeg lider på grund af dig|du får mig til at lide)\b',
-            r'\b(du er egoistisk|du tænker kun på dig selv)\b',
-            r'\b(hvis du ikke|hvis du gør det ikke|hvis du nægter)\b'
-        ]
+        Args:
+            paquete: Paquete 'forense_dk' con las kategorier y su beskrivelse
+        """
+        self.reglas = paquete
         
-        # Isolering (Aislamiento)
-        self.isolering = [
-            r'\b(du skal ikke se dem|du skal ikke snakke med dem|hold dig væk fra dem)\b',
-            r'\b(ingen kan lide dig|de vil ikke have dig|du er ikke velkommen)\b',
-            r'\b(du skal være alene|du skal isolere dig|hold dig væk)\b',
-            r'\b(jeg er den eneste der kan lide dig|kun jeg forstår dig)\b'
+        # Typer en el orden en que se listan en cada hændelse, con su beskrivelse
+        beskrivelser = dict(paquete.metadatos('kategorier', 'beskrivelse'))
+        self.kategorier = [
+            (typ, beskrivelser[typ], patrones) for typ, patrones in paquete.categorias('kategorier')
         ]
+        self._beskrivelse = beskrivelser
         
-        # Psykisk pres (Presión psicológica)
-        self.psykisk_pres = [
-            r'\b(du skal|du må|du er nødt til|du er tvunget til)\b',
-            r'\b(jeg kræver|jeg forlanger|jeg insisterer på)\b',
-            r'\b(du har ikke valg|du har ingen mulighed|du er tvunget)\b',
-            r'\b(du må gøre det|du skal gøre det|du er forpligtet)\b'
-        ]
+        # Todas las categorías compiladas una vez; un segmento puede tener varias
+        self.motor_patrones = paquete.compilado('kategorier')
     
     def _formatear_tiempo(self, segundos: float) -> str:
         """Formatea tiempo en formato MM:SS"""
@@ -102,25 +57,6 @@ class AnalizadorForenseDK:
         segs = int(segundos % 60)
         return f"{minutos:02d}:{segs:02d}"
     
-    def _detectar_patron(self, texto: str, patrones: List[str]) -> Optional[str]:
-        """
-        Detecta si un texto coincide con algún patrón
-        
-        Args:
-            texto: Texto a analizar
-            patrones: Lista de patrones regex
-            
-        Returns:
-            Nombre del patrón detectado o None
-        """
-        texto_lower = texto.lower()
-        
-        for patron in patrones:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                return patron
-        
-        return None
-    
     def _clasificar_tidsbegivenhed(
         self,
         segmento: Dict[str, Any]
@@ -135,66 +71,44 @@ class AnalizadorForenseDK:
             Diccionario con clasificación o None
         """
         texto = segmento.get('text', '').strip()
-        inicio = segmento.get('start', 0)
-        fin = segmento.get('end', 0)
         
         if not texto:
             return None
         
-        # Detectar tipo de comportamiento
-        tipos_detectados = []
-        beskrivelse = []
-        
-        # Kontrol
-        if self._detectar_patron(texto, self.kontrol):
-            tipos_detectados.append('Kontrol')
-            beskrivelse.append('Kontrolpræget udsagn')
-        
-        # Økonomisk pres
-        if self._detectar_patron(texto, self.okonomisk_pres):
-            tipos_detectados.append('Økonomisk pres')
-            beskrivelse.append('Mistænkeligt økonomisk pres')
-        
-        # Nedværdigende
-        if self._detectar_patron(texto, self.nedvaerdigende):
-            tipos_detectados.append('Nedværdigende')
-            beskrivelse.append('Nedværdigende kommentar')
-        
-        # Trusler
-        if self._detectar_patron(texto, self.trusler):
-            tipos_detectados.append('Trussel')
-            beskrivelse.append('Trussel eller trussel-lignende udsagn')
-        
-        # Gaslighting
-        if self._detectar_patron(texto, self.gaslighting):
-            tipos_detectados.append('Gaslighting')
-            beskrivelse.append('Gaslighting eller benægtelse af fakta')
-        
-        # Manipulation
-        if self._detectar_patron(texto, self.manipulation):
-            tipos_detectados.append('Manipulation')
-            beskrivelse.append('Manipulerende udsagn')
-        
-        # Isolering
-        if self._detectar_patron(texto, self.isolering):
-            tipos_detectados.append('Isolering')
-            beskrivelse.append('Isolerende adfærd')
-        
-        # Psykisk pres
-        if self._detectar_patron(texto, self.psykisk_pres):
-            tipos_detectados.append('Psykisk pres')
-            beskrivelse.append('Psykisk pres eller tvang')
+        # Detectar tipos de comportamiento (una pasada por todas las categorías)
+        presentes = self.motor_patrones.categorias_presentes(texto.lower())
+        tipos_detectados = [typ for typ, _, _ in self.kategorier if typ in presentes]
         
         if not tipos_detectados:
             return None
         
+        return self.crear_tidsbegivenhed(segmento, tipos_detectados)
+    
+    def crear_tidsbegivenhed(
+        self,
+        segmento: Dict[str, Any],
+        tipos_detectados: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Construye el evento de un segmento ya clasificado
+        
+        Args:
+            segmento: Segmento de transcripción
+            tipos_detectados: Typer detectados, en el orden de self.kategorier
+            
+        Returns:
+            Diccionario con la clasificación
+        """
+        inicio = segmento.get('start', 0)
+        beskrivelse = [self._beskrivelse[typ] for typ in tipos_detectados]
+        
         return {
             'inicio': inicio,
-            'fin': fin,
+            'fin': segmento.get('end', 0),
             'tidsstempel': self._formatear_tiempo(inicio),
             'typer': tipos_detectados,
             'beskrivelse': ', '.join(beskrivelse) if beskrivelse else 'Relevant udsagn',
-            'tekst': texto
+            'tekst': segmento.get('text', '').strip()
         }
     
     def _vurdere_straffelov_243(
@@ -321,8 +235,6 @@ class AnalizadorForenseDK:
             Diccionario con análisis forense completo
         """
         segmentos = resultado_whisper.get('segments', [])
-        texto_completo = resultado_whisper.get('text', '')
-        idioma = resultado_whisper.get('language', 'desconocido')
         
         # 1. Identificar tidsbegivenheder (eventos temporales)
         tidsbegivenheder = []
@@ -331,6 +243,27 @@ class AnalizadorForenseDK:
             if event:
                 tidsbegivenheder.append(event)
         
+        return self.analyser_tidsbegivenheder(resultado_whisper, tidsbegivenheder)
+    
+    def analyser_tidsbegivenheder(
+        self,
+        resultado_whisper: Dict[str, Any],
+        tidsbegivenheder: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Completa el análisis forense a partir de los eventos ya identificados
+        
+        Args:
+            resultado_whisper: Resultado completo de Whisper
+            tidsbegivenheder: Eventos creados con crear_tidsbegivenhed()
+            
+        Returns:
+            Diccionario con análisis forense completo
+        """
+        segmentos = resultado_whisper.get('segments', [])
+        texto_completo = resultado_whisper.get('text', '')
+        idioma = resultado_whisper.get('language', 'desconocido')
+        
         # 2. Juridisk klassifikation
         juridisk_vurdering = self._vurdere_straffelov_243(tidsbegivenheder)
         
@@ -8,11 +8,15 @@ import os
 import hashlib
 import re
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
 import logging
 from difflib import SequenceMatcher
 
+from .paquetes_reglas import GestorPaquetesReglas, PaqueteReglas, obtener_gestor_reglas
+from .servicio_traduccion import ServicioTraduccion, obtener_servicio_traduccion
+from .indice_paginas import IndicePaginas
+
 try:
     import fitz  # PyMuPDF
     PYMUPDF_AVAILABLE = True
@@ -20,12 +24,9 @@ except ImportError:
     PYMUPDF_AVAILABLE = False
     logging.warning("PyMuPDF no disponible. Instala con: pip install PyMuPDF")
 
-try:
-    from deep_translator import GoogleTranslator
-    TRANSLATOR_AVAILABLE = True
-except ImportError:
-    TRANSLATOR_AVAILABLE = False
-    logging.warning("deep-translator no disponible. Instala con: pip install deep-translator")
+# Campo privado de las detecciones con la línea sin proteger (nombres reales), pendiente
+# de traducir; enriquecer_detecciones() lo retira y no debe escribirse en ninguna salida
+CAMPO_LINEA_ORIGINAL = '_linea_original'
 
 
 class AnalizadorPDFForense:
@@ -34,146 +35,56 @@ class AnalizadorPDFForense:
     Enfoque en detección de violencia psicológica según legislación danesa
     """
     
-    def __init__(self, carpetas_audios: Optional[List[str]] = None):
+    # Paquetes de reglas (idioma, nombre) en reglas/
+    PAQUETE_REGLAS = ('es', 'pdf_forense')
+    PAQUETE_CRITERIOS_LEGALES = ('da', 'pdf_criterios_legales')
+    
+    def __init__(
+        self,
+        carpetas_audios: Optional[List[str]] = None,
+        gestor_reglas: Optional[GestorPaquetesReglas] = None,
+        servicio_traduccion: Optional[ServicioTraduccion] = None
+    ):
         self.logger = logging.getLogger(__name__)
         if not PYMUPDF_AVAILABLE:
             raise ImportError("PyMuPDF (fitz) no está instalado. Instala con: pip install PyMuPDF")
         
         self.carpetas_audios = carpetas_audios or []
-        self._inicializar_patrones_agresion()
-        self._inicializar_patrones_victimas()
-        self._inicializar_patrones_contradiccion()
-        self._inicializar_criterios_legales()
+        gestor_reglas = gestor_reglas or obtener_gestor_reglas()
+        self._aplicar_reglas(gestor_reglas.obtener(*self.PAQUETE_REGLAS))
+        self._aplicar_criterios_legales(gestor_reglas.obtener(*self.PAQUETE_CRITERIOS_LEGALES))
+        gestor_reglas.suscribir(*self.PAQUETE_REGLAS, self._aplicar_reglas)
+        gestor_reglas.suscribir(*self.PAQUETE_CRITERIOS_LEGALES, self._aplicar_criterios_legales)
         self._inicializar_mapeo_victimas()
         
-        # Inicializar traductor si está disponible
-        if TRANSLATOR_AVAILABLE:
-            try:
-                self.traductor_da_en = GoogleTranslator(source='da', target='en')
-                self.traductor_da_es = GoogleTranslator(source='da', target='es')
-                self.traductor_en_es = GoogleTranslator(source='en', target='es')
-            except Exception as e:
-                self.logger.warning(f"Error al inicializar traductor: {e}")
-                self.traductor_da_en = None
-                self.traductor_da_es = None
-                self.traductor_en_es = None
-        else:
-            self.traductor_da_en = None
-            self.traductor_da_es = None
-            self.traductor_en_es = None
+        # Traducción con caché, deduplicación y lotes (Google o diccionario local)
+        self.traductor = servicio_traduccion or obtener_servicio_traduccion()
+        self.estadisticas_citas = {'coincidencias': 0, 'detecciones': 0, 'enriquecidas': 0}
     
-    def _inicializar_patrones_agresion(self):
-        """Inicializa patrones de detección de agresión psicológica"""
-        self.patrones_agresion = {
-            'gaslighting': [
-                r'\b(no\s+recuerdo|nunca\s+dije|eso\s+no\s+pasó|estás\s+equivocad[ao]|te\s+lo\s+inventaste|no\s+es\s+así|estás\s+confundid[ao]|no\s+sucedió)',
-                r'\b(negación|negar|desmentir|contradecir\s+la\s+realidad)',
-                r'\b(no\s+es\s+verdad|eso\s+no\s+es\s+cierto|mientes|mentiras)'
-            ],
-            'coerción_económica': [
-                r'\b(dinero|pago|gastos|economía|finanzas|recursos\s+económicos|dinero\s+de|control\s+económico)',
-                r'\b(no\s+tienes\s+dinero|sin\s+dinero|dependes\s+de\s+mí|no\s+puedes\s+pagarlo)',
-                r'\b(control\s+de\s+cuentas|acceso\s+al\s+dinero|gastos\s+controlados)'
-            ],
-            'amenazas_directas': [
-                r'\b(te\s+voy\s+a|vas\s+a\s+ver|te\s+arrepentirás|consecuencias|pagaras|lo\s+vas\s+a\s+lamentar)',
-                r'\b(amenaza|amenazar|advertir|consecuencias\s+graves|te\s+va\s+a\s+ir\s+mal)',
-                r'\b(si\s+no\s+haces|si\s+no\s+obedeces|si\s+no\s+cumples)'
-            ],
-            'amenazas_veladas': [
-                r'\b(sería\s+una\s+lástima|no\s+quiero\s+que\s+pase|podría\s+suceder|mejor\s+que\s+no)',
-                r'\b(no\s+sería\s+bueno|no\s+te\s+conviene|sería\s+mejor\s+que)',
-                r'\b(espero\s+que\s+no|ojalá\s+no\s+tenga\s+que)'
-            ],
-            'invalidación': [
-                r'\b(no\s+es\s+para\s+tanto|exageras|no\s+es\s+tan\s+grave|te\s+quejas\s+de\s+nada)',
-                r'\b(no\s+tienes\s+razón|estás\s+mal|no\s+es\s+así\s+como\s+dices|minimizar)',
-                r'\b(no\s+es\s+importante|no\s+vale\s+la\s+pena|no\s+es\s+nada)'
-            ],
-            'manipulación_emocional': [
-                r'\b(por\s+mi\s+causa|por\s+tu\s+culpa|si\s+me\s+quieres|si\s+realmente\s+me\s+amas)',
-                r'\b(me\s+haces\s+daño|me\s+lastimas|me\s+decepcionas|no\s+me\s+quieres)',
-                r'\b(culpa|responsabilidad|deberías|tienes\s+que|debes)'
-            ],
-            'control_psicológico': [
-                r'\b(no\s+puedes|no\s+debes|no\s+te\s+permito|tienes\s+que\s+hacer|debes\s+obedecer)',
-                r'\b(control|controlar|decidir\s+por\s+ti|no\s+tienes\s+opción|sin\s+mi\s+permiso)',
-                r'\b(prohibir|prohibido|no\s+se\s+permite|no\s+está\s+permitido)'
-            ],
-            'aislamiento': [
-                r'\b(no\s+veas|no\s+hables|no\s+te\s+acerques|alejarte|separarte)',
-                r'\b(no\s+confíes|no\s+les\s+creas|ellos\s+no\s+te\s+quieren|solo\s+yo)',
-                r'\b(aislar|aislamiento|alejamiento|separación\s+de)'
-            ],
-            'humillación': [
-                r'\b(inútil|incapaz|no\s+sirves|no\s+vales|no\s+eres\s+nada)',
-                r'\b(desprecio|menosprecio|ridículo|burla|burlarse)',
-                r'\b(estúpido|tonto|idiota|sin\s+valor|sin\s+importancia)'
-            ],
-            'chantaje_emocional': [
-                r'\b(si\s+no\s+haces|si\s+no\s+obedeces|si\s+no\s+cumples|si\s+no\s+quieres)',
-                r'\b(te\s+dejo|me\s+voy|no\s+te\s+quiero|te\s+abandono)',
-                r'\b(chantaje|chantajear|presión\s+emocional|manipulación\s+emocional)'
-            ]
-        }
-    
-    def _inicializar_patrones_victimas(self):
-        """Inicializa patrones para detectar menciones a víctimas"""
-        self.patrones_victimas = {
-            'claudia': [
-                r'\bclaudia\b',
-                r'\bclau\b',
-                r'\bclaudi\b'
-            ],
-            'juan_diego': [
-                r'\bjuan\s+diego\b',
-                r'\bjuan\s+d\b',
-                r'\bj\.?\s*d\.?\b'
-            ],
-            'jose_carlos': [
-                r'\bjosé\s+carlos\b',
-                r'\bjose\s+carlos\b',
-                r'\bj\.?\s*c\.?\b'
-            ]
-        }
-    
-    def _inicializar_patrones_contradiccion(self):
-        """Inicializa patrones para detectar contradicciones"""
+    def _aplicar_reglas(self, paquete: PaqueteReglas):
+        """
+        Toma los patrones de agresión psicológica, víctimas y contradicciones del paquete de reglas
+        
+        Args:
+            paquete: Paquete 'pdf_forense' (al crear el analizador y al recargarlo)
+        """
+        self.patrones_agresion = dict(paquete.categorias('agresion'))
+        # Los patrones solo se evalúan en los tramos del texto que contienen sus palabras clave
+        self.prefiltro_agresion = paquete.compilado('agresion')
+        self.patrones_victimas = dict(paquete.categorias('victimas'))
         self.patrones_contradiccion = [
-            r'\b(antes\s+dije|ahora\s+digo|pero\s+antes|sin\s+embargo\s+antes)',
-            r'\b(cambiar\s+de\s+opinión|cambio\s+de\s+actitud|ahora\s+pienso\s+diferente)',
-            r'\b(no\s+es\s+lo\s+que\s+dije|me\s+malinterpretaste|no\s+es\s+así)'
+            patron for _, patrones in paquete.categorias('contradiccion') for patron in patrones
         ]
     
-    def _inicializar_criterios_legales(self):
-        """Inicializa criterios legales daneses"""
-        self.criterios_legales_dk = {
-            'kontrol': [
-                r'\b(kontrol|control|kontrollere|bestemme|afgøre\s+for)',
-                r'\b(ikke\s+må|skal\s+gøre|må\s+ikke|forbudt)',
-                r'\b(beslutte\s+for|bestemme\s+over|tvinge\s+til)'
-            ],
-            'psykisk_vold': [
-                r'\b(psykisk\s+vold|psykologisk\s+vold|emotionel\s+vold)',
-                r'\b(psykisk\s+pres|emotionelt\s+pres|psykologisk\s+pres)',
-                r'\b(manipulation|gaslighting|nedværdigelse)'
-            ],
-            'okonomisk_pres': [
-                r'\b(økonomisk\s+pres|økonomisk\s+kontrol|penge\s+kontrol)',
-                r'\b(ikke\s+adgang\s+til\s+penge|kontrollere\s+penge)',
-                r'\b(økonomisk\s+afhængighed|penge\s+afhængighed)'
-            ],
-            'nedvaerdigende_adfaerd': [
-                r'\b(nedværdigende|fornedrende|ydmygende|nedsættende)',
-                r'\b(usædvanlig|uværdig|værdiløs)',
-                r'\b(ikke\s+værd|uden\s+værdi|intet\s+værd)'
-            ],
-            'trusler': [
-                r'\b(trussel|true|advare|konsekvens|straffe)',
-                r'\b(hvis\s+ikke|hvis\s+du\s+ikke|hvis\s+du\s+gør)',
-                r'\b(ville\s+ikke\s+ville|kunne\s+skulle|måske\s+skulle)'
-            ]
-        }
+    def _aplicar_criterios_legales(self, paquete: PaqueteReglas):
+        """
+        Toma los criterios legales daneses del paquete de reglas
+        
+        Args:
+            paquete: Paquete 'pdf_criterios_legales'
+        """
+        self.criterios_legales_dk = dict(paquete.categorias('criterios'))
+        self.prefiltro_legal_dk = paquete.compilado('criterios')
     
     def _inicializar_mapeo_victimas(self):
         """Inicializa mapeo de nombres reales a nombres protegidos"""
@@ -185,7 +96,7 @@ class AnalizadorPDFForense:
     
     def traducir_texto(self, texto: str, idioma_origen: str = 'da', idioma_destino: str = 'en') -> str:
         """
-        Traduce texto usando deep-translator
+        Traduce texto con el servicio de traducción
         
         Args:
             texto: Texto a traducir
@@ -197,30 +108,7 @@ class AnalizadorPDFForense:
         """
         if not texto or not texto.strip():
             return texto
-        
-        if not TRANSLATOR_AVAILABLE or not self.traductor_da_en:
-            self.logger.warning("Traductor no disponible, retornando texto original")
-            return texto
-        
-        try:
-            # Limitar longitud para evitar errores
-            texto_limpiado = texto.strip()[:5000]  # Máximo 5000 caracteres por traducción
-            
-            if idioma_origen == 'da' and idioma_destino == 'en':
-                return self.traductor_da_en.translate(texto_limpiado)
-            elif idioma_origen == 'da' and idioma_destino == 'es':
-                return self.traductor_da_es.translate(texto_limpiado)
-            elif idioma_origen == 'en' and idioma_destino == 'es':
-                return self.traductor_en_es.translate(texto_limpiado)
-            else:
-                # Traducción en dos pasos si es necesario
-                if idioma_origen == 'da' and idioma_destino == 'es':
-                    texto_en = self.traductor_da_en.translate(texto_limpiado)
-                    return self.traductor_en_es.translate(texto_en)
-                return texto
-        except Exception as e:
-            self.logger.warning(f"Error en traducción: {e}")
-            return texto
+        return self.traductor.traducir(texto, idioma_origen, idioma_destino)
     
     def proteger_nombres(self, texto: str) -> str:
         """
@@ -290,7 +178,8 @@ class AnalizadorPDFForense:
             return {
                 'texto_completo': texto_unificado,
                 'texto_por_pagina': texto_por_pagina,
-                'num_paginas': len(doc),
+                'indice_paginas': IndicePaginas(texto_por_pagina),
+                'num_paginas': len(texto_por_pagina),
                 'metadata': metadata,
                 'exito': True
             }
@@ -299,121 +188,310 @@ class AnalizadorPDFForense:
             return {
                 'texto_completo': '',
                 'texto_por_pagina': [],
+                'indice_paginas': IndicePaginas([]),
                 'num_paginas': 0,
                 'metadata': {},
                 'exito': False,
                 'error': str(e)
             }
     
-    def detectar_agresion(self, texto: str, texto_por_pagina: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    def iterar_paginas_pdf(self, ruta_pdf: str) -> Iterator[Tuple[int, str]]:
+        """
+        Lee las páginas de un PDF de una en una, sin guardar el texto de las anteriores
+        
+        Args:
+            ruta_pdf: Ruta al archivo PDF
+        
+        Returns:
+            Iterador de tuplas (número de página, texto de la página)
+        """
+        doc = fitz.open(ruta_pdf)
+        try:
+            for num_pagina in range(len(doc)):
+                yield num_pagina + 1, doc.load_page(num_pagina).get_text()
+        finally:
+            doc.close()
+    
+    def detectar_agresion(
+        self,
+        texto: str,
+        texto_por_pagina: Optional[List[Dict[str, Any]]] = None,
+        indice_paginas: Optional[IndicePaginas] = None
+    ) -> List[Dict[str, Any]]:
         """
         Detecta patrones de agresión psicológica en el texto
-        Incluye número de página y traducciones
+        Incluye número de página; las traducciones se añaden con enriquecer_detecciones()
         
         Args:
             texto: Texto completo del PDF
             texto_por_pagina: Lista de textos por página con número de página
+            indice_paginas: Índice de páginas de extraer_texto_pdf(); si no se indica,
+                se construye a partir de texto_por_pagina
         
         Returns:
-            Lista de detecciones con citas textuales, traducciones y número de página
+            Lista de detecciones con cita textual y número de página
         """
-        detecciones = []
-        texto_lower = texto.lower()
+        if indice_paginas is None:
+            indice_paginas = IndicePaginas(texto_por_pagina or [])
         
-        # Mapeo de posición a página
-        mapa_pagina = {}
-        if texto_por_pagina:
-            posicion_actual = 0
-            for pagina_info in texto_por_pagina:
-                texto_pag = pagina_info.get('texto', '')
-                num_pag = pagina_info.get('pagina', 0)
-                longitud = len(texto_pag) + 2  # +2 por los \n\n
-                for i in range(posicion_actual, posicion_actual + longitud):
-                    mapa_pagina[i] = num_pag
-                posicion_actual += longitud
-        
-        for tipo_agresion, patrones in self.patrones_agresion.items():
+        coincidencias = self._coincidencias_agresion(texto.lower(), 0, len(texto))
+        return self.construir_detecciones_agresion(texto, coincidencias, indice_paginas)
+    
+    def buscar_coincidencias(self, texto: str, desde: int = 0, hasta: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Coincidencias en bruto de todos los detectores en un tramo del texto
+        
+        Solo se guardan las coincidencias que empiezan en [desde, hasta); el resto del
+        texto sirve de contexto para las que cruzan el límite del tramo. Las posiciones
+        son relativas a `texto`. Los resultados de varios tramos se unen concatenando
+        las listas (con las posiciones desplazadas) y sumando los contadores.
+        
+        Args:
+            texto: Texto en el que buscar
+            desde: Primera posición propia del tramo
+            hasta: Posición final propia del tramo (exclusiva). Si None, el final del texto
+        
+        Returns:
+            Diccionario con:
+                'agresion': lista de (orden, tipo, inicio, fin, patrón encontrado)
+                'victimas': lista de (orden, víctima, inicio, fin)
+                'contradicciones': lista de (orden, inicio, fin, patrón encontrado)
+                'criterios': coincidencias por criterio legal danés
+        """
+        if hasta is None:
+            hasta = len(texto)
+        texto_lower = texto.lower()
+        return {
+            'agresion': self._coincidencias_agresion(texto_lower, desde, hasta),
+            'victimas': self._coincidencias_victimas(texto_lower, desde, hasta),
+            'contradicciones': self._coincidencias_contradicciones(texto, desde, hasta),
+            'criterios': self._contar_criterios_legales(texto_lower, desde, hasta)
+        }
+    
+    def _coincidencias_agresion(self, texto_lower: str, desde: int, hasta: int) -> List[Tuple[int, str, int, int, str]]:
+        """Coincidencias de agresión (orden, tipo, inicio, fin, grupo), en el orden de los patrones"""
+        coincidencias = iter(self.prefiltro_agresion.coincidencias(texto_lower))
+        patrones = [
+            tipo_agresion
+            for tipo_agresion, patrones_tipo in self.patrones_agresion.items()
+            for _ in patrones_tipo
+        ]
+        return [
+            (orden, tipo_agresion, match.start(), match.end(), match.group())
+            for orden, tipo_agresion in enumerate(patrones)
+            for match in next(coincidencias)
+            if desde <= match.start() < hasta
+        ]
+    
+    def _coincidencias_victimas(self, texto_lower: str, desde: int, hasta: int) -> List[Tuple[int, str, int, int]]:
+        """Menciones a víctimas (orden, víctima, inicio, fin), en el orden de los patrones"""
+        patrones = [
+            (victima, patron)
+            for victima, patrones_victima in self.patrones_victimas.items()
+            for patron in patrones_victima
+        ]
+        return [
+            (orden, victima, match.start(), match.end())
+            for orden, (victima, patron) in enumerate(patrones)
+            for match in re.finditer(patron, texto_lower, re.IGNORECASE | re.MULTILINE)
+            if desde <= match.start() < hasta
+        ]
+    
+    def _coincidencias_contradicciones(self, texto: str, desde: int, hasta: int) -> List[Tuple[int, int, int, str]]:
+        """Contradicciones (orden, inicio, fin, grupo), en el orden de los patrones"""
+        return [
+            (orden, match.start(), match.end(), match.group())
+            for orden, patron in enumerate(self.patrones_contradiccion)
+            for match in re.finditer(patron, texto, re.IGNORECASE | re.MULTILINE)
+            if desde <= match.start() < hasta
+        ]
+    
+    def _contar_criterios_legales(self, texto_lower: str, desde: int, hasta: int) -> Dict[str, int]:
+        """Número de coincidencias de cada criterio legal danés"""
+        criterios_detectados = {}
+        coincidencias = iter(self.prefiltro_legal_dk.coincidencias(texto_lower))
+        for criterio, patrones in self.criterios_legales_dk.items():
+            count = 0
             for patron in patrones:
-                matches = re.finditer(patron, texto_lower, re.IGNORECASE | re.MULTILINE)
-                for match in matches:
-                    # Obtener contexto (50 caracteres antes y después)
-                    inicio_contexto = max(0, match.start() - 50)
-                    fin_contexto = min(len(texto), match.end() + 50)
-                    contexto = texto[inicio_contexto:fin_contexto].strip()
-                    
-                    # Obtener línea completa
-                    inicio_linea = texto.rfind('\n', 0, match.start()) + 1
-                    fin_linea = texto.find('\n', match.end())
-                    if fin_linea == -1:
-                        fin_linea = len(texto)
-                    linea_completa = texto[inicio_linea:fin_linea].strip()
-                    
-                    # Determinar número de página
-                    num_pagina = mapa_pagina.get(match.start(), 0)
-                    
-                    # Traducir cita
-                    cita_da = linea_completa
-                    cita_en = self.traducir_texto(cita_da, 'da', 'en')
-                    cita_es = self.traducir_texto(cita_da, 'da', 'es')
-                    
-                    # Proteger nombres en traducciones
-                    cita_da_protegida = self.proteger_nombres(cita_da)
-                    cita_en_protegida = self.proteger_nombres(cita_en)
-                    cita_es_protegida = self.proteger_nombres(cita_es)
-                    
-                    detecciones.append({
-                        'tipo': tipo_agresion,
-                        'patron_encontrado': match.group(),
-                        'posicion': match.start(),
-                        'cita_da': cita_da_protegida,
-                        'cita_en': cita_en_protegida,
-                        'cita_es': cita_es_protegida,
-                        'contexto': contexto,
-                        'num_pagina': num_pagina,
-                        'severidad': self._evaluar_severidad(tipo_agresion, linea_completa)
-                    })
-        
-        # Eliminar duplicados similares
-        detecciones = self._eliminar_duplicados(detecciones)
+                count += sum(1 for match in next(coincidencias) if desde <= match.start() < hasta)
+            criterios_detectados[criterio] = count
+        return criterios_detectados
+    
+    def construir_detecciones_agresion(
+        self,
+        texto: str,
+        coincidencias: List[Tuple[int, str, int, int, str]],
+        indice_paginas: IndicePaginas,
+        desplazamiento: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Detecciones de agresión a partir de las coincidencias en bruto
+        
+        Args:
+            texto: Texto completo del PDF, o el tramo que empieza en `desplazamiento`
+            coincidencias: Lista 'agresion' de buscar_coincidencias(), con posiciones
+                en el documento
+            indice_paginas: Índice de páginas del documento
+            desplazamiento: Posición del inicio de `texto` en el documento
+        
+        Returns:
+            Lista de detecciones con cita textual y número de página
+        """
+        detecciones = []
+        
+        # Mismo orden que una búsqueda secuencial: por patrón y, dentro de cada uno, por posición
+        encontradas = [
+            {'tipo': tipo, 'posicion': inicio, 'fin': fin, 'patron_encontrado': grupo}
+            for _, tipo, inicio, fin, grupo in sorted(coincidencias, key=lambda c: (c[0], c[2]))
+        ]
+        
+        # Eliminar duplicados similares antes de construir las citas
+        unicas = self._eliminar_duplicados(encontradas)
+        
+        for encontrada in unicas:
+            tipo_agresion = encontrada['tipo']
+            inicio, fin = encontrada['posicion'] - desplazamiento, encontrada['fin'] - desplazamiento
+            
+            # Obtener contexto (50 caracteres antes y después)
+            inicio_contexto = max(0, inicio - 50)
+            fin_contexto = min(len(texto), fin + 50)
+            contexto = texto[inicio_contexto:fin_contexto].strip()
+            
+            # Las traducciones se añaden después, en enriquecer_detecciones()
+            linea = self._linea_completa(texto, inicio, fin)
+            
+            deteccion = {
+                'tipo': tipo_agresion,
+                'patron_encontrado': encontrada['patron_encontrado'],
+                'posicion': encontrada['posicion'],
+                'cita_da': self.proteger_nombres(linea),
+                'contexto': contexto,
+                'num_pagina': indice_paginas.pagina(encontrada['posicion']),
+                'severidad': self._evaluar_severidad(tipo_agresion, linea)
+            }
+            # Línea sin proteger para traducirla; enriquecer_detecciones() la retira
+            deteccion[CAMPO_LINEA_ORIGINAL] = linea
+            detecciones.append(deteccion)
+        
+        self.estadisticas_citas = {
+            'coincidencias': len(encontradas),
+            'detecciones': len(detecciones),
+            'enriquecidas': 0
+        }
+        
+        return detecciones
+    
+    def enriquecer_detecciones(self, detecciones: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Añade las citas en inglés y español a las detecciones que aún no las tienen
+        
+        Se llama con las detecciones finales del informe, de modo que solo se traducen
+        las líneas que realmente se muestran. Modifica las detecciones en el sitio y les
+        retira la línea sin proteger (CAMPO_LINEA_ORIGINAL).
+        
+        Args:
+            detecciones: Detecciones devueltas por detectar_agresion()
+        
+        Returns:
+            Las mismas detecciones, con 'cita_en' y 'cita_es'
+        """
+        pendientes = []
+        lineas = []
+        for det in detecciones:
+            linea = det.pop(CAMPO_LINEA_ORIGINAL, None)
+            if linea is not None and 'cita_en' not in det:
+                pendientes.append(det)
+                lineas.append(linea)
+        if not pendientes:
+            return detecciones
         
+        traducciones = self.traductor.traducir_pares(lineas, [('da', 'en'), ('da', 'es')])
+        
+        for i, det in enumerate(pendientes):
+            det['cita_en'] = self.proteger_nombres(traducciones[('da', 'en')][i])
+            det['cita_es'] = self.proteger_nombres(traducciones[('da', 'es')][i])
+        
+        self.estadisticas_citas['enriquecidas'] += len(pendientes)
         return detecciones
     
-    def detectar_menciones_victimas(self, texto: str) -> Dict[str, List[Dict[str, Any]]]:
+    def traducciones_evitadas(self) -> int:
+        """
+        Citas que no se enviaron a traducir por traducirse solo las detecciones finales
+        
+        Cuenta una por idioma de destino y coincidencia descartada respecto a traducir
+        todas las coincidencias en bruto del último PDF analizado.
+        
+        Returns:
+            Número de traducciones evitadas
+        """
+        descartadas = self.estadisticas_citas['coincidencias'] - self.estadisticas_citas['enriquecidas']
+        return 2 * max(0, descartadas)
+    
+    @staticmethod
+    def _linea_completa(texto: str, inicio: int, fin: int) -> str:
+        """Línea del texto que contiene la coincidencia [inicio, fin)"""
+        inicio_linea = texto.rfind('\n', 0, inicio) + 1
+        fin_linea = texto.find('\n', fin)
+        if fin_linea == -1:
+            fin_linea = len(texto)
+        return texto[inicio_linea:fin_linea].strip()
+    
+    def detectar_menciones_victimas(
+        self,
+        texto: str,
+        indice_paginas: Optional[IndicePaginas] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Detecta menciones a víctimas específicas
         
+        Args:
+            texto: Texto completo del PDF
+            indice_paginas: Índice de páginas de extraer_texto_pdf() (opcional)
+        
         Returns:
             Diccionario con menciones por víctima
         """
-        menciones = {
-            'claudia': [],
-            'juan_diego': [],
-            'jose_carlos': []
-        }
+        coincidencias = self._coincidencias_victimas(texto.lower(), 0, len(texto))
+        return self.construir_menciones_victimas(texto, coincidencias, indice_paginas)
+    
+    def construir_menciones_victimas(
+        self,
+        texto: str,
+        coincidencias: List[Tuple[int, str, int, int]],
+        indice_paginas: Optional[IndicePaginas] = None,
+        desplazamiento: int = 0
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Menciones a víctimas a partir de las coincidencias en bruto
         
-        texto_lower = texto.lower()
+        Args:
+            texto: Texto completo del PDF, o el tramo que empieza en `desplazamiento`
+            coincidencias: Lista 'victimas' de buscar_coincidencias(), con posiciones
+                en el documento
+            indice_paginas: Índice de páginas del documento (opcional)
+            desplazamiento: Posición del inicio de `texto` en el documento
         
-        for victima, patrones in self.patrones_victimas.items():
-            for patron in patrones:
-                matches = re.finditer(patron, texto_lower, re.IGNORECASE | re.MULTILINE)
-                for match in matches:
-                    # Obtener contexto
-                    inicio_contexto = max(0, match.start() - 100)
-                    fin_contexto = min(len(texto), match.end() + 100)
-                    contexto = texto[inicio_contexto:fin_contexto].strip()
-                    
-                    # Obtener línea completa
-                    inicio_linea = texto.rfind('\n', 0, match.start()) + 1
-                    fin_linea = texto.find('\n', match.end())
-                    if fin_linea == -1:
-                        fin_linea = len(texto)
-                    linea_completa = texto[inicio_linea:fin_linea].strip()
-                    
-                    menciones[victima].append({
-                        'posicion': match.start(),
-                        'cita_textual': linea_completa,
-                        'contexto': contexto
-                    })
+        Returns:
+            Diccionario con menciones por víctima
+        """
+        menciones = {victima: [] for victima in self.patrones_victimas}
+        
+        for _, victima, posicion, fin in sorted(coincidencias, key=lambda c: (c[0], c[2])):
+            inicio, fin = posicion - desplazamiento, fin - desplazamiento
+            
+            # Obtener contexto
+            inicio_contexto = max(0, inicio - 100)
+            fin_contexto = min(len(texto), fin + 100)
+            contexto = texto[inicio_contexto:fin_contexto].strip()
+            
+            mencion = {
+                'posicion': posicion,
+                'cita_textual': self._linea_completa(texto, inicio, fin),
+                'contexto': contexto
+            }
+            if indice_paginas is not None:
+                mencion['num_pagina'] = indice_paginas.pagina(posicion)
+            menciones[victima].append(mencion)
         
         # Eliminar duplicados
         for victima in menciones:
@@ -421,42 +499,85 @@ class AnalizadorPDFForense:
         
         return menciones
     
-    def detectar_contradicciones(self, texto: str) -> List[Dict[str, Any]]:
-        """Detecta contradicciones internas y cambios bruscos de actitud"""
+    def detectar_contradicciones(
+        self,
+        texto: str,
+        indice_paginas: Optional[IndicePaginas] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Detecta contradicciones internas y cambios bruscos de actitud
+        
+        Args:
+            texto: Texto completo del PDF
+            indice_paginas: Índice de páginas de extraer_texto_pdf() (opcional)
+        
+        Returns:
+            Lista de contradicciones con patrón, posición y contexto
+        """
+        coincidencias = self._coincidencias_contradicciones(texto, 0, len(texto))
+        return self.construir_contradicciones(texto, coincidencias, indice_paginas)
+    
+    def construir_contradicciones(
+        self,
+        texto: str,
+        coincidencias: List[Tuple[int, int, int, str]],
+        indice_paginas: Optional[IndicePaginas] = None,
+        desplazamiento: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Contradicciones a partir de las coincidencias en bruto
+        
+        Args:
+            texto: Texto completo del PDF, o el tramo que empieza en `desplazamiento`
+            coincidencias: Lista 'contradicciones' de buscar_coincidencias(), con posiciones
+                en el documento
+            indice_paginas: Índice de páginas del documento (opcional)
+            desplazamiento: Posición del inicio de `texto` en el documento
+        
+        Returns:
+            Lista de contradicciones con patrón, posición y contexto
+        """
         contradicciones = []
         
-        for patron in self.patrones_contradiccion:
-            matches = re.finditer(patron, texto, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                # Obtener contexto amplio
-                inicio_contexto = max(0, match.start() - 200)
-                fin_contexto = min(len(texto), match.end() + 200)
-                contexto = texto[inicio_contexto:fin_contexto].strip()
-                
-                contradicciones.append({
-                    'patron_encontrado': match.group(),
-                    'posicion': match.start(),
-                    'contexto': contexto
-                })
+        for _, posicion, fin, grupo in sorted(coincidencias, key=lambda c: (c[0], c[1])):
+            inicio, fin = posicion - desplazamiento, fin - desplazamiento
+            
+            # Obtener contexto amplio
+            inicio_contexto = max(0, inicio - 200)
+            fin_contexto = min(len(texto), fin + 200)
+            contexto = texto[inicio_contexto:fin_contexto].strip()
+            
+            contradiccion = {
+                'patron_encontrado': grupo,
+                'posicion': posicion,
+                'contexto': contexto
+            }
+            if indice_paginas is not None:
+                contradiccion['num_pagina'] = indice_paginas.pagina(posicion)
+            contradicciones.append(contradiccion)
         
         return contradicciones
     
-    def clasificar_legal_dk(self, texto: str, detecciones_agresion: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def clasificar_legal_dk(
+        self,
+        texto: str,
+        detecciones_agresion: List[Dict[str, Any]],
+        criterios_detectados: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
         """
         Clasifica el documento según Straffeloven §243
         
+        Args:
+            texto: Texto completo del PDF
+            detecciones_agresion: Detecciones de detectar_agresion()
+            criterios_detectados: Conteo 'criterios' de buscar_coincidencias(), si ya se hizo
+        
         Returns:
             Diccionario con clasificación legal
         """
-        texto_lower = texto.lower()
-        
         # Contar criterios legales
-        criterios_detectados = {}
-        for criterio, patrones in self.criterios_legales_dk.items():
-            count = 0
-            for patron in patrones:
-                count += len(re.findall(patron, texto_lower, re.IGNORECASE))
-            criterios_detectados[criterio] = count
+        if criterios_detectados is None:
+            criterios_detectados = self._contar_criterios_legales(texto.lower(), 0, len(texto))
         
         # Evaluar si cumple criterios de §243
         cumple_criterios = False
@@ -847,15 +968,27 @@ class AnalizadorPDFForense:
         """
         lineas = []
         
+        # Traducir solo las citas que se van a mostrar
+        self.enriquecer_detecciones(detecciones_agresion)
+        
         # Obtener información del archivo
         tamaño_archivo = os.path.getsize(ruta_pdf)
         tamaño_mb = tamaño_archivo / (1024 * 1024)
         hash_sha256 = self.calcular_hash_sha256(ruta_pdf)
         fecha_procesamiento = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
+        # Páginas por posición; se reutiliza el índice de extraer_texto_pdf()
+        indice_paginas = texto_extraido.get('indice_paginas')
+        if indice_paginas is None:
+            indice_paginas = IndicePaginas(texto_extraido.get('texto_por_pagina', []))
+        
         texto_completo_da = texto_extraido.get('texto_completo', '')
-        texto_completo_en = self.traducir_texto(texto_completo_da, 'da', 'en') if texto_completo_da else ''
-        texto_completo_es = self.traducir_texto(texto_completo_da, 'da', 'es') if texto_completo_da else ''
+        texto_completo_en = texto_completo_es = ''
+        if texto_completo_da:
+            # Las dos traducciones se piden a la vez
+            traducciones = self.traductor.traducir_pares([texto_completo_da], [('da', 'en'), ('da', 'es')])
+            texto_completo_en = traducciones[('da', 'en')][0]
+            texto_completo_es = traducciones[('da', 'es')][0]
         
         # ============================================================
         # A. CABECERA Y CONTEXTO FORENSE
@@ -910,7 +1043,11 @@ class AnalizadorPDFForense:
         lineas.append("B. TEXTO EXTRAÍDO\n")
         lineas.append("=" * 80 + "\n\n")
         
-        if texto_extraido.get('exito', False):
+        if texto_extraido.get('modo_streaming', False):
+            # El texto no se guarda en memoria al analizar página a página
+            lineas.append("Texto completo no incluido: el PDF se analizó página a página (modo streaming).\n")
+            lineas.append("Las citas de cada detección se muestran en la sección C.\n\n")
+        elif texto_extraido.get('exito', False):
             lineas.append("TEXTO ORIGINAL (DANÉS):\n")
             lineas.append("-" * 80 + "\n")
             if texto_completo_da:
@@ -973,7 +1110,7 @@ class AnalizadorPDFForense:
                     
                     for det in por_tipo[tipo_key]:
                         severidad = det.get('severidad', 'media')
-                        num_pagina = det.get('num_pagina', 0)
+                        num_pagina = det.get('num_pagina') or indice_paginas.pagina(det.get('posicion', -1))
                         cita_da = det.get('cita_da', '')
                         cita_en = det.get('cita_en', '')
                         cita_es = det.get('cita_es', '')
@@ -1125,7 +1262,16 @@ class AnalizadorPDFForense:
         else:
             lineas.append("ninguna.\n")
         
-        lineas.append(f"- Se detectaron {len(contradicciones)} posibles contradicciones internas.\n\n")
+        paginas_contradicciones = sorted({
+            c.get('num_pagina') or indice_paginas.pagina(c.get('posicion', -1)) for c in contradicciones
+        } - {0})
+        if paginas_contradicciones:
+            lineas.append(
+                f"- Se detectaron {len(contradicciones)} posibles contradicciones internas "
+                f"(páginas {', '.join(str(p) for p in paginas_contradicciones)}).\n\n"
+            )
+        else:
+            lineas.append(f"- Se detectaron {len(contradicciones)} posibles contradicciones internas.\n\n")
         
         lineas.append(f"EVALUACIÓN LEGAL:\n")
         lineas.append(f"Según la evaluación bajo Straffeloven §243 sobre violencia psicológica, ")
@@ -0,0 +1,328 @@
+"""
+Caché de audio decodificado compartida por el transcriptor y los analizadores acústicos
+Cada archivo se decodifica una sola vez a PCM float32 mono de 16 kHz y se guarda en disco
+"""
+
+import os
+import time
+import subprocess
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from .utils import calcular_sha256_archivo
+
+
+# Frecuencia de muestreo de Whisper; todo el audio decodificado usa esta frecuencia
+FRECUENCIA_MUESTREO = 16000
+
+
+class CacheAudioDecodificado:
+    """
+    Decodifica audio con ffmpeg y lo guarda como .npy indexado por hash de contenido
+
+    Los buffers se devuelven mapeados en memoria (copy-on-write), de modo que
+    transcriptor y analizadores comparten las mismas páginas sin copiarlas.
+    """
+
+    def __init__(self, carpeta_cache: str = os.path.join('cache', 'audio')):
+        """
+        Inicializa la caché
+
+        Args:
+            carpeta_cache: Carpeta donde guardar los buffers decodificados
+        """
+        self.logger = logging.getLogger(__name__)
+        self.carpeta_cache = carpeta_cache
+        # (ruta absoluta, tamaño, mtime) -> hash, para no rehashear en el mismo proceso
+        self._hashes: Dict[Tuple[str, int, float], str] = {}
+        self._lock = threading.Lock()
+
+    def hash_archivo(self, ruta_audio: str) -> str:
+        """Devuelve el SHA-256 del archivo, reutilizando el calculado en este proceso"""
+        estado = os.stat(ruta_audio)
+        clave = (os.path.abspath(ruta_audio), estado.st_size, estado.st_mtime)
+
+        with self._lock:
+            sha256 = self._hashes.get(clave)
+        if sha256 is None:
+            sha256 = calcular_sha256_archivo(ruta_audio)
+            with self._lock:
+                self._hashes[clave] = sha256
+        return sha256
+
+    def ruta_cache(self, sha256: str) -> str:
+        """Ruta del buffer decodificado para un hash de contenido"""
+        return os.path.join(self.carpeta_cache, f"{sha256}.npy")
+
+    def obtener(self, ruta_audio: str) -> np.ndarray:
+        """
+        Devuelve el audio decodificado, decodificándolo solo si no está en caché
+
+        Args:
+            ruta_audio: Ruta al archivo de audio o video
+
+        Returns:
+            Array float32 mono a 16 kHz mapeado en memoria
+        """
+        if not os.path.exists(ruta_audio):
+            raise FileNotFoundError(f"El archivo no existe: {ruta_audio}")
+
+        ruta_npy = self.ruta_cache(self.hash_archivo(ruta_audio))
+
+        if not os.path.exists(ruta_npy):
+            self.logger.info(f"Decodificando audio: {os.path.basename(ruta_audio)}")
+            audio = decodificar_audio(ruta_audio)
+            os.makedirs(self.carpeta_cache, exist_ok=True)
+
+            # Escritura atómica para que otro proceso nunca lea un buffer a medias
+            ruta_temporal = f"{ruta_npy}.{os.getpid()}.tmp"
+            with open(ruta_temporal, 'wb') as f:
+                np.save(f, audio)
+            os.replace(ruta_temporal, ruta_npy)
+        else:
+            self.logger.debug(f"Audio decodificado en caché: {os.path.basename(ruta_audio)}")
+            # Marcar como usado recientemente para podar()
+            try:
+                os.utime(ruta_npy, None)
+            except OSError:
+                pass
+
+        return np.load(ruta_npy, mmap_mode='c')
+
+    def bloques(self, ruta_audio: str, muestras_por_bloque: int = FRECUENCIA_MUESTREO * 30) -> Iterator[np.ndarray]:
+        """
+        Devuelve el audio decodificado por bloques sin cargarlo entero en memoria
+
+        Si el audio ya está en caché se recorre el buffer mapeado; si no, se lee de
+        ffmpeg a medida que decodifica (sin guardarlo en la caché).
+
+        Args:
+            ruta_audio: Ruta al archivo de audio o video
+            muestras_por_bloque: Muestras de cada bloque
+
+        Returns:
+            Iterador de arrays float32 mono a 16 kHz
+        """
+        if not os.path.exists(ruta_audio):
+            raise FileNotFoundError(f"El archivo no existe: {ruta_audio}")
+
+        ruta_npy = self.ruta_cache(self.hash_archivo(ruta_audio))
+        if not os.path.exists(ruta_npy):
+            return leer_audio_por_bloques(ruta_audio, muestras_por_bloque=muestras_por_bloque)
+
+        audio = np.load(ruta_npy, mmap_mode='r')
+        return (audio[i:i + muestras_por_bloque] for i in range(0, len(audio), muestras_por_bloque))
+
+    def listar(self) -> List[Dict[str, Any]]:
+        """
+        Lista los buffers decodificados en caché
+
+        Returns:
+            Lista de diccionarios con sha256, duración en segundos, último uso y tamaño
+        """
+        if not os.path.isdir(self.carpeta_cache):
+            return []
+
+        entradas = []
+        for nombre in sorted(os.listdir(self.carpeta_cache)):
+            if not nombre.endswith('.npy'):
+                continue
+            try:
+                estado = os.stat(os.path.join(self.carpeta_cache, nombre))
+            except OSError:
+                continue
+            entradas.append({
+                'sha256': nombre[:-4],
+                # float32 a FRECUENCIA_MUESTREO; la cabecera .npy es despreciable
+                'duracion_s': estado.st_size / 4 / FRECUENCIA_MUESTREO,
+                'ultimo_uso': datetime.fromtimestamp(estado.st_mtime).isoformat(),
+                'tamano_bytes': estado.st_size
+            })
+        return entradas
+
+    def invalidar(self, sha256: Optional[str] = None, todo: bool = False) -> int:
+        """
+        Elimina buffers decodificados de la caché
+
+        Args:
+            sha256: Eliminar el buffer de este hash de contenido
+            todo: Vaciar la caché completa
+
+        Returns:
+            Número de buffers eliminados
+        """
+        if todo:
+            eliminados = sum(int(self._eliminar(self.ruta_cache(e['sha256']))) for e in self.listar())
+        elif sha256:
+            eliminados = int(self._eliminar(self.ruta_cache(sha256)))
+        else:
+            return 0
+
+        self.logger.info(f"Eliminados {eliminados} buffers de la caché de audio")
+        return eliminados
+
+    def podar(self, max_dias: Optional[float] = None, max_mb: Optional[float] = None) -> int:
+        """
+        Elimina buffers antiguos o los menos usados hasta respetar un tamaño máximo
+
+        Args:
+            max_dias: Eliminar buffers no usados en más de estos días
+            max_mb: Tamaño máximo de la caché en MB (se eliminan primero los menos usados)
+
+        Returns:
+            Número de buffers eliminados
+        """
+        if not os.path.isdir(self.carpeta_cache):
+            return 0
+
+        archivos = []
+        for nombre in os.listdir(self.carpeta_cache):
+            if nombre.endswith('.npy'):
+                ruta = os.path.join(self.carpeta_cache, nombre)
+                estado = os.stat(ruta)
+                archivos.append((estado.st_mtime, estado.st_size, ruta))
+
+        # Menos usados recientemente primero
+        archivos.sort()
+        eliminados = 0
+
+        if max_dias is not None:
+            limite = time.time() - max_dias * 86400
+            conservados = []
+            for mtime, tamano, ruta in archivos:
+                if mtime < limite:
+                    eliminados += int(self._eliminar(ruta))
+                else:
+                    conservados.append((mtime, tamano, ruta))
+            archivos = conservados
+
+        if max_mb is not None:
+            max_bytes = max_mb * 1024**2
+            total = sum(tamano for _, tamano, _ in archivos)
+            for mtime, tamano, ruta in archivos:
+                if total <= max_bytes:
+                    break
+                if self._eliminar(ruta):
+                    total -= tamano
+                    eliminados += 1
+
+        self.logger.info(f"Poda de caché de audio: {eliminados} buffers eliminados")
+        return eliminados
+
+    def _eliminar(self, ruta: str) -> bool:
+        """Elimina un buffer de la caché si existe"""
+        try:
+            os.remove(ruta)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            # En Windows no se puede borrar un buffer que otro proceso tiene mapeado
+            self.logger.warning(f"No se pudo eliminar {os.path.basename(ruta)}: {str(e)}")
+            return False
+
+
+def decodificar_audio(ruta_audio: str, sr: int = FRECUENCIA_MUESTREO) -> np.ndarray:
+    """
+    Decodifica un archivo a PCM float32 mono con ffmpeg (mismo proceso que whisper.load_audio)
+
+    Args:
+        ruta_audio: Ruta al archivo de audio o video
+        sr: Frecuencia de muestreo de salida
+
+    Returns:
+        Array float32 con muestras en [-1, 1]
+    """
+    comando = [
+        'ffmpeg', '-nostdin', '-threads', '0',
+        '-i', ruta_audio,
+        '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(sr),
+        '-'
+    ]
+    try:
+        salida = subprocess.run(comando, capture_output=True, check=True).stdout
+    except FileNotFoundError as e:
+        raise RuntimeError("ffmpeg no está instalado o no está en el PATH") from e
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg no pudo decodificar {ruta_audio}: {e.stderr.decode(errors='ignore')}") from e
+
+    return np.frombuffer(salida, np.int16).astype(np.float32) / 32768.0
+
+
+def leer_audio_por_bloques(
+    ruta_audio: str,
+    sr: int = FRECUENCIA_MUESTREO,
+    muestras_por_bloque: int = FRECUENCIA_MUESTREO * 30
+) -> Iterator[np.ndarray]:
+    """
+    Decodifica un archivo con ffmpeg y devuelve el audio por bloques según se lee de la tubería
+
+    Las muestras son las mismas que las de decodificar_audio(); en memoria solo está
+    el bloque en curso.
+
+    Args:
+        ruta_audio: Ruta al archivo de audio o video
+        sr: Frecuencia de muestreo de salida
+        muestras_por_bloque: Muestras de cada bloque (el último puede ser más corto)
+
+    Returns:
+        Iterador de arrays float32 con muestras en [-1, 1]
+    """
+    comando = [
+        'ffmpeg', '-nostdin', '-threads', '0',
+        '-i', ruta_audio,
+        '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(sr),
+        '-'
+    ]
+    try:
+        proceso = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError as e:
+        raise RuntimeError("ffmpeg no está instalado o no está en el PATH") from e
+    # stderr se vacía en un hilo para que ffmpeg no se bloquee si escribe mucho
+    errores = []
+    lector_errores = threading.Thread(target=lambda: errores.append(proceso.stderr.read()), daemon=True)
+    lector_errores.start()
+
+    try:
+        while True:
+            datos = proceso.stdout.read(2 * muestras_por_bloque)
+            if not datos:
+                break
+            yield np.frombuffer(datos[:len(datos) // 2 * 2], np.int16).astype(np.float32) / 32768.0
+    finally:
+        proceso.stdout.close()
+        if proceso.poll() is None:
+            proceso.kill()
+        codigo = proceso.wait()
+        lector_errores.join()
+
+    if codigo != 0:
+        detalle = errores[0].decode(errors='ignore') if errores else ''
+        raise RuntimeError(f"ffmpeg no pudo decodificar {ruta_audio}: {detalle}")
+
+
+_cache_global: Optional[CacheAudioDecodificado] = None
+_lock_global = threading.Lock()
+
+
+def obtener_cache_audio() -> CacheAudioDecodificado:
+    """
+    Devuelve la caché de audio decodificado del proceso
+
+    La carpeta se configura con la variable WHISPER_CACHE_AUDIO (por defecto cache/audio)
+
+    Returns:
+        Caché compartida
+    """
+    global _cache_global
+
+    with _lock_global:
+        if _cache_global is None:
+            _cache_global = CacheAudioDecodificado(
+                carpeta_cache=os.getenv('WHISPER_CACHE_AUDIO', os.path.join('cache', 'audio'))
+            )
+        return _cache_global
@@ -0,0 +1,389 @@
+"""
+Caché persistente de transcripciones direccionada por contenido
+Un resultado de Whisper se identifica por el hash del audio, el modelo, el idioma,
+la tarea y las opciones de decodificación
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+import logging
+
+
+class CacheTranscripciones:
+    """
+    Guarda el resultado bruto de Whisper (segmentos, idioma) en un JSON por clave
+    """
+
+    def __init__(self, carpeta_cache: str = os.path.join('cache', 'transcripciones')):
+        """
+        Inicializa la caché
+
+        Args:
+            carpeta_cache: Carpeta donde guardar los resultados
+        """
+        self.logger = logging.getLogger(__name__)
+        self.carpeta_cache = carpeta_cache
+
+    @staticmethod
+    def calcular_clave(
+        sha256_audio: str,
+        modelo: str,
+        idioma: Optional[str],
+        task: str,
+        opciones: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Calcula la clave de caché de una transcripción
+
+        Args:
+            sha256_audio: Hash del contenido del audio
+            modelo: Nombre del modelo (incluye precisión o motor si afectan al resultado)
+            idioma: Idioma forzado o None para detección automática
+            task: 'transcribe' o 'translate'
+            opciones: Opciones de decodificación que afectan al resultado
+
+        Returns:
+            Clave hexadecimal
+        """
+        descriptor = {
+            'audio': sha256_audio,
+            'modelo': modelo,
+            'idioma': idioma,
+            'task': task,
+            'opciones': opciones or {}
+        }
+        serializado = json.dumps(descriptor, sort_keys=True, default=str)
+        return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_contenido(resultado: Dict[str, Any]) -> str:
+        """
+        Hash del contenido de una transcripción (texto, idioma y segmentos)
+
+        Args:
+            resultado: Resultado de Whisper
+
+        Returns:
+            Hash hexadecimal
+        """
+        contenido = {
+            'text': resultado.get('text', ''),
+            'language': resultado.get('language'),
+            'segments': resultado.get('segments', [])
+        }
+        serializado = json.dumps(contenido, sort_keys=True, ensure_ascii=False, default=_a_json)
+        return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        """Ruta del archivo JSON de una clave"""
+        return os.path.join(self.carpeta_cache, f"{clave}.json")
+
+    @property
+    def carpeta_contenido(self) -> str:
+        """Carpeta de las referencias hash del contenido -> clave"""
+        return os.path.join(self.carpeta_cache, 'por_contenido')
+
+    def clave_por_contenido(self, hash_contenido: str) -> Optional[str]:
+        """
+        Clave de la entrada guardada con un contenido, sin tener que conocer sus opciones
+
+        Args:
+            hash_contenido: Hash calculado con hash_contenido()
+
+        Returns:
+            Clave de la entrada o None si ninguna entrada vigente tiene ese contenido
+        """
+        try:
+            with open(os.path.join(self.carpeta_contenido, hash_contenido), 'r', encoding='utf-8') as f:
+                clave = f.read().strip()
+        except OSError:
+            return None
+        return clave if clave and os.path.exists(self._ruta(clave)) else None
+
+    def obtener(self, clave: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve el resultado guardado para una clave
+
+        Args:
+            clave: Clave calculada con calcular_clave()
+
+        Returns:
+            Resultado de Whisper o None si no está en caché
+        """
+        ruta = self._ruta(clave)
+        if not os.path.exists(ruta):
+            return None
+
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                entrada = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Entrada de caché ilegible, se descarta: {ruta} ({str(e)})")
+            self._eliminar(ruta)
+            return None
+
+        # Marcar último uso para la poda por antigüedad
+        try:
+            os.utime(ruta, None)
+        except OSError:
+            pass
+
+        return entrada.get('resultado')
+
+    def guardar(
+        self,
+        clave: str,
+        resultado: Dict[str, Any],
+        metadatos: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Guarda un resultado en la caché
+
+        También anota la clave bajo el hash de su contenido (clave_por_contenido()), para que
+        el manifiesto de reanálisis la encuentre a partir del resultado.
+
+        Args:
+            clave: Clave calculada con calcular_clave()
+            resultado: Resultado de Whisper
+            metadatos: Información descriptiva (archivo, modelo, idioma...) para listar()
+
+        Returns:
+            Ruta del archivo guardado o None si el resultado no es serializable
+        """
+        os.makedirs(self.carpeta_cache, exist_ok=True)
+        ruta = self._ruta(clave)
+        try:
+            hash_contenido = self.hash_contenido(resultado)
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"No se pudo guardar la transcripción en caché: {str(e)}")
+            return None
+        entrada = {
+            'clave': clave,
+            'fecha': datetime.now().isoformat(),
+            'hash_contenido': hash_contenido,
+            'metadatos': metadatos or {},
+            'resultado': resultado
+        }
+
+        # Escritura atómica para no dejar entradas a medias
+        ruta_temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(ruta_temporal, 'w', encoding='utf-8') as f:
+                json.dump(entrada, f, ensure_ascii=False)
+            os.replace(ruta_temporal, ruta)
+        except (TypeError, ValueError, OSError) as e:
+            self.logger.warning(f"No se pudo guardar la transcripción en caché: {str(e)}")
+            self._eliminar(ruta_temporal)
+            return None
+
+        try:
+            os.makedirs(self.carpeta_contenido, exist_ok=True)
+            ruta_referencia = os.path.join(self.carpeta_contenido, hash_contenido)
+            with open(f"{ruta_referencia}.{os.getpid()}.{threading.get_ident()}.tmp", 'w', encoding='utf-8') as f:
+                f.write(clave)
+            os.replace(f.name, ruta_referencia)
+        except OSError as e:
+            self.logger.warning(f"No se pudo anotar el contenido de la transcripción en caché: {str(e)}")
+
+        return ruta
+
+    def listar(self) -> List[Dict[str, Any]]:
+        """
+        Lista las entradas de la caché
+
+        Returns:
+            Lista de diccionarios con clave, fecha, último uso, tamaño y metadatos
+        """
+        if not os.path.isdir(self.carpeta_cache):
+            return []
+
+        entradas = []
+        for nombre in sorted(os.listdir(self.carpeta_cache)):
+            if not nombre.endswith('.json'):
+                continue
+            ruta = os.path.join(self.carpeta_cache, nombre)
+            try:
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    entrada = json.load(f)
+                estado = os.stat(ruta)
+            except (OSError, json.JSONDecodeError):
+                continue
+
+            entradas.append({
+                'clave': entrada.get('clave', nombre[:-5]),
+                'fecha': entrada.get('fecha'),
+                'ultimo_uso': datetime.fromtimestamp(estado.st_mtime).isoformat(),
+                'tamano_bytes': estado.st_size,
+                'metadatos': entrada.get('metadatos', {})
+            })
+
+        return entradas
+
+    def invalidar(
+        self,
+        clave: Optional[str] = None,
+        sha256_audio: Optional[str] = None,
+        modelo: Optional[str] = None,
+        todo: bool = False,
+        claves_protegidas: Optional[Set[str]] = None
+    ) -> int:
+        """
+        Elimina entradas de la caché
+
+        Args:
+            clave: Eliminar la entrada con esta clave
+            sha256_audio: Eliminar todas las entradas de este audio
+            modelo: Eliminar todas las entradas de este modelo
+            todo: Vaciar la caché completa
+            claves_protegidas: Claves que no se eliminan aunque coincidan
+                (p. ej. ManifiestoAnalisis.claves_transcripcion())
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        if not (clave or sha256_audio or modelo or todo):
+            return 0
+
+        claves_protegidas = claves_protegidas or set()
+        eliminadas = 0
+        conservadas = 0
+        for entrada in self.listar():
+            metadatos = entrada['metadatos']
+            if not todo and (
+                (clave and entrada['clave'] != clave)
+                or (sha256_audio and metadatos.get('sha256_audio') != sha256_audio)
+                or (modelo and metadatos.get('modelo') != modelo)
+            ):
+                continue
+            if entrada['clave'] in claves_protegidas:
+                conservadas += 1
+                continue
+            eliminadas += int(self._eliminar(self._ruta(entrada['clave'])))
+
+        self._limpiar_referencias()
+        self.logger.info(
+            f"Eliminadas {eliminadas} entradas de la caché de transcripciones "
+            f"({conservadas} protegidas conservadas)"
+        )
+        return eliminadas
+
+    def podar(
+        self,
+        max_dias: Optional[float] = None,
+        max_mb: Optional[float] = None,
+        claves_protegidas: Optional[Set[str]] = None
+    ) -> int:
+        """
+        Elimina entradas antiguas o las menos usadas hasta respetar un tamaño máximo
+
+        Args:
+            max_dias: Eliminar entradas no usadas en más de estos días
+            max_mb: Tamaño máximo de la caché en MB (se eliminan primero las menos usadas)
+            claves_protegidas: Claves que no se eliminan nunca; siguen contando en el tamaño
+                (p. ej. ManifiestoAnalisis.claves_transcripcion())
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        if not os.path.isdir(self.carpeta_cache):
+            return 0
+
+        claves_protegidas = claves_protegidas or set()
+        archivos = []
+        for nombre in os.listdir(self.carpeta_cache):
+            if nombre.endswith('.json') and nombre[:-5] not in claves_protegidas:
+                ruta = os.path.join(self.carpeta_cache, nombre)
+                estado = os.stat(ruta)
+                archivos.append((estado.st_mtime, estado.st_size, ruta))
+
+        # Menos usadas recientemente primero
+        archivos.sort()
+        eliminadas = 0
+
+        if max_dias is not None:
+            limite = time.time() - max_dias * 86400
+            conservadas = []
+            for mtime, tamano, ruta in archivos:
+                if mtime < limite:
+                    eliminadas += int(self._eliminar(ruta))
+                else:
+                    conservadas.append((mtime, tamano, ruta))
+            archivos = conservadas
+
+        if max_mb is not None:
+            max_bytes = max_mb * 1024**2
+            total = sum(tamano for _, tamano, _ in archivos) + sum(
+                os.path.getsize(self._ruta(clave)) for clave in claves_protegidas
+                if os.path.exists(self._ruta(clave))
+            )
+            for mtime, tamano, ruta in archivos:
+                if total <= max_bytes:
+                    break
+                if self._eliminar(ruta):
+                    total -= tamano
+                    eliminadas += 1
+
+        self._limpiar_referencias()
+        self.logger.info(f"Poda de caché: {eliminadas} entradas eliminadas")
+        return eliminadas
+
+    def _limpiar_referencias(self):
+        """Elimina las referencias por contenido cuya entrada ya no existe"""
+        if not os.path.isdir(self.carpeta_contenido):
+            return
+        for nombre in os.listdir(self.carpeta_contenido):
+            ruta = os.path.join(self.carpeta_contenido, nombre)
+            try:
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    clave = f.read().strip()
+            except OSError:
+                continue
+            if not os.path.exists(self._ruta(clave)):
+                self._eliminar(ruta)
+
+    def _eliminar(self, ruta: str) -> bool:
+        """Elimina un archivo de la caché si existe"""
+        try:
+            os.remove(ruta)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+def _a_json(objeto: Any) -> Any:
+    """Convierte escalares de numpy y otros tipos no serializables"""
+    if hasattr(objeto, 'item'):
+        return objeto.item()
+    return str(objeto)
+
+
+_cache_global: Optional[CacheTranscripciones] = None
+_lock_global = threading.Lock()
+
+
+def obtener_cache_transcripciones() -> CacheTranscripciones:
+    """
+    Devuelve la caché de transcripciones del proceso
+
+    La carpeta se configura con la variable WHISPER_CACHE_TRANSCRIPCIONES
+    (por defecto cache/transcripciones)
+
+    Returns:
+        Caché compartida
+    """
+    global _cache_global
+
+    with _lock_global:
+        if _cache_global is None:
+            _cache_global = CacheTranscripciones(
+                carpeta_cache=os.getenv(
+                    'WHISPER_CACHE_TRANSCRIPCIONES',
+                    os.path.join('cache', 'transcripciones')
+                )
+            )
+        return _cache_global
@@ -0,0 +1,370 @@
+"""
+Características acústicas por trama para el análisis de estrés vocal
+Energía (RMS), tono (YIN) y flujo espectral se calculan en una sola pasada vectorizada
+sobre la forma de onda y se agregan sobre los segmentos de Whisper con np.add.reduceat
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .audio_decodificado import FRECUENCIA_MUESTREO
+
+
+class CaracteristicasTramas:
+    """
+    Características de un audio, una fila por trama de `salto` muestras
+
+    La trama k empieza en la muestra k * salto. `energia` es la suma de cuadrados de
+    sus `salto` muestras (sin solape), así que la energía de cualquier tramo de tramas
+    completas es una suma exacta; `f0` (Hz, NaN si no es sonora) y `flujo` se calculan
+    sobre la ventana de análisis que empieza en la trama.
+    """
+
+    def __init__(
+        self,
+        sr: int,
+        salto: int,
+        num_muestras: int,
+        energia: np.ndarray,
+        f0: np.ndarray,
+        flujo: np.ndarray,
+        prefijos: Optional[Dict[int, float]] = None
+    ):
+        self.sr = sr
+        self.salto = salto
+        self.num_muestras = num_muestras
+        self.energia = energia
+        self.f0 = f0
+        self.flujo = flujo
+        # Muestra -> suma de cuadrados desde el inicio de su trama (ver extraer_por_bloques())
+        self.prefijos = prefijos
+
+    def __len__(self) -> int:
+        return len(self.energia)
+
+
+class ExtractorCaracteristicas:
+    """
+    Calcula energía, tono y flujo espectral por trama y los agrega por segmento
+    """
+
+    def __init__(
+        self,
+        sr: int = FRECUENCIA_MUESTREO,
+        salto_segundos: float = 0.02,
+        ventana_segundos: float = 0.032,
+        f0_min: float = 75.0,
+        f0_max: float = 500.0,
+        umbral_yin: float = 0.15,
+        umbral_silencio_db: float = -50.0,
+        tramas_por_bloque: int = 4096
+    ):
+        """
+        Inicializa el extractor
+
+        Args:
+            sr: Sample rate del audio
+            salto_segundos: Separación entre tramas
+            ventana_segundos: Ventana de integración de YIN y del espectro
+            f0_min: Tono mínimo buscado en Hz (fija el retardo máximo de YIN)
+            f0_max: Tono máximo buscado en Hz
+            umbral_yin: Umbral de la diferencia normalizada de YIN para aceptar un periodo
+            umbral_silencio_db: Nivel (dBFS) por debajo del cual una trama no se considera sonora
+            tramas_por_bloque: Tramas procesadas por bloque; limita la memoria de las FFT
+        """
+        self.logger = logging.getLogger(__name__)
+        self.sr = sr
+        self.salto = max(1, int(round(salto_segundos * sr)))
+        self.ventana = max(2, int(round(ventana_segundos * sr)))
+        self.retardo_min = max(2, int(sr // f0_max))
+        self.retardo_max = int(np.ceil(sr / f0_min))
+        self.umbral_yin = umbral_yin
+        self.energia_silencio = self.ventana * 10 ** (umbral_silencio_db / 10)
+        self.tramas_por_bloque = tramas_por_bloque
+
+        # Cada trama analiza `ventana` muestras y sus desplazamientos hasta retardo_max
+        self.longitud_trama = self.ventana + self.retardo_max + 1
+        self.tamano_fft = 1 << int(np.ceil(np.log2(self.longitud_trama)))
+
+    def num_tramas(self, num_muestras: int) -> int:
+        """Número de tramas de un audio de num_muestras muestras"""
+        return -(-num_muestras // self.salto)
+
+    def extraer(self, audio: np.ndarray) -> CaracteristicasTramas:
+        """
+        Calcula las características de todas las tramas del audio
+
+        Args:
+            audio: Audio mono
+
+        Returns:
+            Características por trama
+        """
+        return self.extraer_por_bloques([audio])
+
+    def extraer_por_bloques(
+        self,
+        bloques: Iterable[np.ndarray],
+        puntos: Optional[Sequence[int]] = None
+    ) -> CaracteristicasTramas:
+        """
+        Calcula las características leyendo el audio bloque a bloque
+
+        Las tramas se procesan siempre en los mismos grupos de tramas_por_bloque, sea
+        cual sea el tamaño de los bloques de entrada, así que el resultado es idéntico
+        al de extraer() con el audio completo. Solo se retienen las muestras del grupo
+        en curso.
+
+        Args:
+            bloques: Bloques consecutivos de audio mono
+            puntos: Muestras en las que agregar() necesitará el resto de trama (inicios y
+                    fines de segmento); sin el audio completo se calculan al pasar por ellas
+
+        Returns:
+            Características por trama (con `prefijos` si se pasaron puntos)
+        """
+        por_grupo = self.tramas_por_bloque * self.salto
+        necesarias = (self.tramas_por_bloque - 1) * self.salto + self.longitud_trama
+        puntos = np.unique(np.maximum(np.asarray(puntos if puntos is not None else [], dtype=np.int64), 0))
+
+        energia, f0, flujo = [], [], []
+        prefijos: Dict[int, float] = {}
+        espectro_anterior = None
+        pendiente = np.zeros(0, dtype=np.float32)
+        base = 0
+
+        def procesar(muestras: np.ndarray, n: int, reales: int):
+            nonlocal espectro_anterior
+            bloque = np.asarray(muestras, dtype=np.float64)
+            if len(bloque) < necesarias:
+                bloque = np.pad(bloque, (0, necesarias - len(bloque)))
+            energia.append(self._energia(bloque, n))
+            f0_grupo, espectro = self._tono_y_espectro(bloque, n)
+            f0.append(f0_grupo)
+            flujo_grupo, espectro_anterior = self._flujo(espectro, espectro_anterior)
+            flujo.append(flujo_grupo)
+
+            # Restos de trama de los puntos que caen en las muestras reales de este grupo
+            en_grupo = puntos[(puntos >= base) & (puntos <= base + min(reales, por_grupo))]
+            inicios_trama = (en_grupo // self.salto) * self.salto
+            restos = _sumar_cuadrados(muestras, inicios_trama - base, en_grupo - base, self.salto)
+            prefijos.update(zip(en_grupo.tolist(), restos.tolist()))
+
+        for bloque in bloques:
+            pendiente = bloque if len(pendiente) == 0 else np.concatenate([pendiente, bloque])
+            while len(pendiente) >= necesarias:
+                procesar(pendiente[:necesarias], self.tramas_por_bloque, necesarias)
+                pendiente = pendiente[por_grupo:]
+                base += por_grupo
+
+        # Final del audio: grupos restantes completados con ceros
+        num_muestras = base + len(pendiente)
+        if len(puntos):
+            # agregar() recorta los segmentos al final del audio
+            puntos = np.union1d(puntos, [num_muestras])
+        while base < num_muestras:
+            n = min(self.tramas_por_bloque, self.num_tramas(num_muestras - base))
+            procesar(pendiente[:necesarias], n, len(pendiente))
+            pendiente = pendiente[por_grupo:]
+            base += por_grupo
+
+        vacio = np.zeros(0, dtype=np.float64)
+        return CaracteristicasTramas(
+            self.sr,
+            self.salto,
+            num_muestras,
+            np.concatenate(energia) if energia else vacio,
+            np.concatenate(f0) if f0 else vacio,
+            np.concatenate(flujo) if flujo else vacio,
+            prefijos=prefijos if len(puntos) else None
+        )
+
+    def _energia(self, bloque: np.ndarray, n: int) -> np.ndarray:
+        """Suma de cuadrados de las n tramas (sin solape) que empiezan en el bloque"""
+        cuadrados = bloque[:n * self.salto] ** 2
+        return cuadrados.reshape(n, self.salto).sum(axis=1)
+
+    def _tono_y_espectro(self, bloque: np.ndarray, n: int):
+        """
+        Tono YIN de n tramas y espectro de magnitud de su ventana de análisis
+
+        Solo se analizan las tramas cuya ventana supera el nivel de silencio; el resto
+        queda sin tono y con espectro nulo.
+
+        Returns:
+            Tupla (f0 en Hz con NaN en tramas no sonoras, espectro de magnitud)
+        """
+        W = self.ventana
+        f0 = np.full(n, np.nan)
+        espectro = np.zeros((n, self.tamano_fft // 2 + 1))
+
+        # Energía de x[i:i + W] para cada desplazamiento i del bloque, e(t) de cada trama como vista
+        acumulado = np.concatenate([[0.0], np.cumsum(bloque ** 2)])
+        energia_ventanas = acumulado[W:] - acumulado[:-W]
+        e = sliding_window_view(energia_ventanas, self.retardo_max + 1)[::self.salto][:n]
+        activas = np.flatnonzero(e[:, 0] > self.energia_silencio)
+        if len(activas) == 0:
+            return f0, espectro
+        e = e[activas]
+        tramas = sliding_window_view(bloque, self.longitud_trama)[::self.salto][activas].astype(np.float32)
+
+        # Correlación cruzada de la ventana con la trama completa: r[t] = sum_j x[j] x[j + t], j < W
+        espectro_ventana = np.fft.rfft(tramas[:, :W], self.tamano_fft)
+        espectro_trama = np.fft.rfft(tramas, self.tamano_fft)
+        r = np.fft.irfft(np.conj(espectro_ventana) * espectro_trama, self.tamano_fft)[:, :self.retardo_max + 1]
+
+        # Función diferencia d[t] = e(0) + e(t) - 2 r[t]
+        d = np.maximum(e[:, :1] + e - 2 * r, 0.0)
+
+        # Diferencia normalizada por la media acumulada (d'[0] = 1)
+        retardos = np.arange(self.retardo_max + 1)
+        suma = np.cumsum(d[:, 1:], axis=1)
+        dn = np.ones_like(d)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dn[:, 1:] = np.where(suma > 0, d[:, 1:] * retardos[1:] / suma, 1.0)
+
+        # Primer mínimo local por debajo del umbral dentro del rango de retardos
+        rango = dn[:, self.retardo_min:self.retardo_max]
+        siguiente = dn[:, self.retardo_min + 1:self.retardo_max + 1]
+        candidato = (rango < self.umbral_yin) & (rango <= siguiente)
+        sonora = candidato.any(axis=1)
+        t = np.argmax(candidato, axis=1) + self.retardo_min
+
+        # Interpolación parabólica alrededor del mínimo
+        filas = np.arange(len(activas))
+        izquierda = dn[filas, t - 1]
+        centro = dn[filas, t]
+        derecha = dn[filas, np.minimum(t + 1, self.retardo_max)]
+        curvatura = izquierda - 2 * centro + derecha
+        with np.errstate(divide='ignore', invalid='ignore'):
+            desplazamiento = np.where(curvatura > 0, 0.5 * (izquierda - derecha) / curvatura, 0.0)
+        periodo = t + np.clip(desplazamiento, -1.0, 1.0)
+
+        f0[activas[sonora]] = self.sr / periodo[sonora]
+        espectro[activas] = np.abs(espectro_ventana)
+        return f0, espectro
+
+    def _flujo(self, espectro: np.ndarray, anterior: Optional[np.ndarray]):
+        """
+        Flujo espectral rectificado de cada trama respecto a la anterior
+
+        Returns:
+            Tupla (flujo por trama, espectro de la última trama para el bloque siguiente)
+        """
+        if anterior is None:
+            anterior = espectro[:1]
+        previos = np.concatenate([anterior, espectro[:-1]], axis=0)
+        aumento = np.maximum(espectro - previos, 0.0)
+        flujo = np.sqrt((aumento ** 2).sum(axis=1)) / self.ventana
+        return flujo, espectro[-1:]
+
+    def agregar(
+        self,
+        caracteristicas: CaracteristicasTramas,
+        inicios: Sequence[float],
+        fines: Sequence[float],
+        audio: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Agrega las características de las tramas sobre segmentos
+
+        La energía de cada segmento se suma con np.add.reduceat sobre las tramas que
+        empiezan en él, corregida con los restos de trama de los extremos (sumados
+        muestra a muestra del audio, o tomados de los prefijos calculados en
+        extraer_por_bloques()), así que el RMS es exacto. El tono es la media geométrica
+        de las tramas sonoras cuyo inicio cae dentro del segmento.
+
+        Args:
+            caracteristicas: Salida de extraer() o extraer_por_bloques()
+            inicios: Inicio de cada segmento en segundos
+            fines: Fin de cada segmento en segundos
+            audio: Audio completo. Si None, se usan caracteristicas.prefijos; sin ellos
+                   la energía se redondea a tramas completas
+
+        Returns:
+            Diccionario de arrays (uno por segmento):
+                'muestras': muestras del segmento
+                'energia': suma de cuadrados
+                'tramas_sonoras': tramas con tono
+                'f0': tono medio en Hz (NaN sin tramas sonoras)
+                'flujo': flujo espectral medio
+        """
+        sr = caracteristicas.sr
+        salto = caracteristicas.salto
+        total = len(caracteristicas)
+        a = (np.asarray(inicios, dtype=np.float64) * sr).astype(np.int64)
+        b = (np.asarray(fines, dtype=np.float64) * sr).astype(np.int64)
+        a = np.clip(a, 0, caracteristicas.num_muestras)
+        b = np.clip(b, a, caracteristicas.num_muestras)
+
+        # Energía: tramas [a // salto, b // salto) menos el resto de trama antes de a más el de antes de b
+        energia = _sumar_rangos(caracteristicas.energia, a // salto, b // salto)
+        energia += self._restos(caracteristicas, b, audio) - self._restos(caracteristicas, a, audio)
+
+        # Tono y flujo: tramas que empiezan dentro del segmento (al menos una)
+        tramas_ini = np.minimum(a // salto, max(total - 1, 0))
+        tramas_fin = np.clip(-(-b // salto), tramas_ini + 1, total)
+        sonora = ~np.isnan(caracteristicas.f0)
+        log_f0 = np.where(sonora, np.log2(np.where(sonora, caracteristicas.f0, 1.0)), 0.0)
+        tramas_sonoras = _sumar_rangos(sonora.astype(np.float64), tramas_ini, tramas_fin)
+        suma_log = _sumar_rangos(log_f0, tramas_ini, tramas_fin)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f0 = np.where(tramas_sonoras > 0, 2.0 ** (suma_log / tramas_sonoras), np.nan)
+            flujo = _sumar_rangos(caracteristicas.flujo, tramas_ini, tramas_fin) / (tramas_fin - tramas_ini)
+
+        return {
+            'muestras': b - a,
+            'energia': energia,
+            'tramas_sonoras': tramas_sonoras.astype(np.int64),
+            'f0': f0,
+            'flujo': flujo
+        }
+
+    @staticmethod
+    def _restos(caracteristicas: CaracteristicasTramas, puntos: np.ndarray, audio: Optional[np.ndarray]) -> np.ndarray:
+        """Suma de cuadrados desde el inicio de la trama de cada punto hasta el punto"""
+        if audio is not None:
+            salto = caracteristicas.salto
+            return _sumar_cuadrados(audio, (puntos // salto) * salto, puntos, salto)
+        if caracteristicas.prefijos is None:
+            return np.zeros(len(puntos))
+        return np.array([caracteristicas.prefijos.get(int(p), 0.0) for p in puntos], dtype=np.float64)
+
+
+def _sumar_rangos(valores: np.ndarray, inicios: np.ndarray, fines: np.ndarray) -> np.ndarray:
+    """
+    Suma valores[inicios[i]:fines[i]] para cada i con una sola llamada a np.add.reduceat
+
+    Los rangos pueden solaparse o estar desordenados; los vacíos suman 0.
+    """
+    if len(inicios) == 0:
+        return np.zeros(0)
+    # reduceat suma entre índices consecutivos: con [i0, f0, i1, f1, ...] las posiciones pares son los rangos
+    extendidos = np.append(valores, 0.0)
+    indices = np.empty(2 * len(inicios), dtype=np.int64)
+    indices[0::2] = inicios
+    indices[1::2] = fines
+    sumas = np.add.reduceat(extendidos, indices)[0::2]
+    return np.where(fines > inicios, sumas, 0.0)
+
+
+def _sumar_cuadrados(audio: np.ndarray, inicios: np.ndarray, fines: np.ndarray, ancho: int) -> np.ndarray:
+    """
+    Suma de cuadrados de audio[inicios[i]:fines[i]] para rangos de menos de `ancho` muestras
+
+    Todas las filas se suman con el mismo ancho para que cada resultado no dependa de
+    los demás rangos del lote (mismo redondeo en memoria y por bloques).
+    """
+    inicios = np.asarray(inicios, dtype=np.int64)
+    fines = np.asarray(fines, dtype=np.int64)
+    longitudes = np.maximum(fines - inicios, 0)
+    if len(longitudes) == 0 or longitudes.max() == 0:
+        return np.zeros(len(longitudes))
+    desplazamientos = np.arange(ancho)
+    indices = inicios[:, None] + desplazamientos
+    validos = desplazamientos < longitudes[:, None]
+    muestras = np.asarray(audio[np.where(validos, indices, 0)], dtype=np.float64)
+    return (np.where(validos, muestras, 0.0) ** 2).sum(axis=1)
@@ -3,151 +3,143 @@ Detector de agresión dirigida a víctimas específicas
 Detecta menciones y agresiones dirigidas a Claudia, Juan Diego y José Carlos
 """
 
-import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 import logging
 
+from .motor_patrones import MotorPatrones
+from .indice_temporal import IndiceTemporal
+from .paquetes_reglas import GestorPaquetesReglas, PaqueteReglas, obtener_gestor_reglas
+
 
 class VictimDetector:
     """
     Clase para detectar agresión dirigida a víctimas específicas
     """
     
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self._inicializar_victimas()
-        self._inicializar_patrones_agresion()
+    # Paquete de reglas (idioma, nombre) en reglas/
+    PAQUETE_REGLAS = ('es', 'victimas')
     
-    def _inicializar_victimas(self):
-        """Inicializa los nombres de víctimas y sus variantes"""
-        self.victimas = {
-            'Claudia': {
-                'variantes': ['claudia', 'clau', 'claudita'],
-                'patron_base': r'\b(claudia|clau|claudita)\b'
-            },
-            'Juan Diego': {
-                'variantes': ['juan diego', 'juan', 'diego', 'juandiego'],
-                'patron_base': r'\b(juan\s+diego|juan|diego|juandiego)\b'
-            },
-            'José Carlos': {
-                'variantes': ['josé carlos', 'jose carlos', 'josé', 'jose', 'carlos'],
-                'patron_base': r'\b(jos[ée]\s+carlos|jos[ée]|carlos)\b'
-            }
-        }
+    def __init__(self, gestor_reglas: Optional[GestorPaquetesReglas] = None):
+        """
+        Inicializa el detector
+        
+        Args:
+            gestor_reglas: Gestor de paquetes de reglas. Si None, el del proceso
+        """
+        self.logger = logging.getLogger(__name__)
+        self._motores_por_patron: Dict[str, MotorPatrones] = {}
+        self._victimas_propias = False
+        gestor_reglas = gestor_reglas or obtener_gestor_reglas()
+        self._aplicar_reglas(gestor_reglas.obtener(*self.PAQUETE_REGLAS))
+        gestor_reglas.suscribir(*self.PAQUETE_REGLAS, self._aplicar_reglas)
     
-    def _inicializar_patrones_agresion(self):
-        """Inicializa patrones de agresión dirigida"""
+    def _aplicar_reglas(self, paquete: PaqueteReglas):
+        """
+        Toma las víctimas y las familias de agresión dirigida del paquete de reglas
         
-        # Insulto dirigido
-        self.insulto_dirigido = [
-            r'\b({victima}).*?(puta|puto|maldita|maldito|estúpida|estúpido|idiota|imbécil|tonta|tonto)\b',
-            r'\b(puta|puto|maldita|maldito|estúpida|estúpido|idiota|imbécil|tonta|tonto).*?({victima})\b'
-        ]
+        Las víctimas fijadas con establecer_victimas() se conservan al recargar.
         
-        # Amenaza dirigida
-        self.amenaza_dirigida = [
-            r'\b({victima}).*?(te voy a|vas a ver|te haré|te mato|te voy a matar|te voy a golpear)\b',
-            r'\b(te voy a|vas a ver|te haré|te mato|te voy a matar|te voy a golpear).*?({victima})\b'
-        ]
+        Args:
+            paquete: Paquete 'victimas'; los patrones de las familias llevan {victima}
+        """
+        self.reglas = paquete
         
-        # Invalidación dirigida
-        self.invalidacion_dirigida = [
-            r'\b({victima}).*?(no tienes razón|estás equivocada|estás equivocado|no es verdad|mientes)\b',
-            r'\b(no tienes razón|estás equivocada|estás equivocado|no es verdad|mientes).*?({victima})\b'
+        # Familias en orden de prioridad (la primera que coincide decide), con su severidad
+        severidades = dict(paquete.metadatos('familias', 'severidad'))
+        self.familias_dirigidas = [
+            (tipo, severidades[tipo], patrones) for tipo, patrones in paquete.categorias('familias')
         ]
+        self._severidad_familia = severidades
         
-        # Manipulación dirigida
-        self.manipulacion_dirigida = [
-            r'\b({victima}).*?(es tu culpa|por tu culpa|si me quisieras|si me amaras)\b',
-            r'\b(es tu culpa|por tu culpa|si me quisieras|si me amaras).*?({victima})\b'
-        ]
+        if not self._victimas_propias:
+            self.victimas = paquete.datos.get('victimas', {})
         
-        # Burla dirigida
-        self.burla_dirigida = [
-            r'\b({victima}).*?(ridícula|ridículo|tonta|tonto|estúpida|estúpido)\b',
-            r'\b(ridícula|ridículo|tonta|tonto|estúpida|estúpido).*?({victima})\b'
-        ]
+        # Las familias pueden haber cambiado: se especializan de nuevo para cada víctima
+        self._motores_por_patron = {}
+        self._compilar_victimas()
+    
+    def establecer_victimas(self, victimas: Dict[str, Dict[str, Any]]):
+        """
+        Cambia la lista de víctimas y compila sus patrones
         
-        # Presión emocional dirigida
-        self.presion_emocional_dirigida = [
-            r'\b({victima}).*?(me haces sentir mal|me lastimas|me haces daño|me duele)\b',
-            r'\b(me haces sentir mal|me lastimas|me haces daño|me duele).*?({victima})\b'
-        ]
+        Args:
+            victimas: Diccionario nombre -> {'variantes': [...], 'patron_base': regex}
+        """
+        self.victimas = victimas
+        self._victimas_propias = True
+        self._compilar_victimas()
+    
+    def _compilar_victimas(self):
+        """
+        Compila los patrones de cada víctima una sola vez
         
-        # Órdenes hostiles
-        self.ordenes_hostiles = [
-            r'\b({victima}).*?(cállate|cierra la boca|no hables|no digas nada|obedece)\b',
-            r'\b(cállate|cierra la boca|no hables|no digas nada|obedece).*?({victima})\b'
-        ]
+        Los motores se guardan por patrón base, así que al cambiar la lista solo se
+        compilan las víctimas nuevas.
+        """
+        patrones_base = {info['patron_base'] for info in self.victimas.values()}
+        self._motores_por_patron = {
+            patron: motor for patron, motor in self._motores_por_patron.items() if patron in patrones_base
+        }
+        for patron in patrones_base:
+            if patron not in self._motores_por_patron:
+                # Compartido con los demás detectores que usan el mismo paquete de reglas
+                self._motores_por_patron[patron] = self.reglas.derivado(
+                    ('victima', patron), lambda patron=patron: self._crear_motor_victima(patron)
+                )
+        
+        # Menciones de todas las víctimas en una sola pasada
+        categorias_menciones = tuple(
+            (nombre, (info['patron_base'],)) for nombre, info in self.victimas.items()
+        )
+        self.motor_menciones = self.reglas.derivado(
+            ('menciones', categorias_menciones),
+            lambda: MotorPatrones(
+                categorias_menciones,
+                flags=0  # los textos se analizan ya en minúsculas
+            )
+        )
+    
+    def _crear_motor_victima(self, patron_victima: str) -> MotorPatrones:
+        """
+        Especializa las familias de agresión dirigida para una víctima
+        
+        Args:
+            patron_victima: Patrón regex base de la víctima
+            
+        Returns:
+            Motor con una categoría por familia, en orden de prioridad
+        """
+        # Alternativas del patrón base sin límites de palabra ni paréntesis
+        patron_victima_clean = patron_victima.replace(r'\b', '').replace('(', '').replace(')', '')
+        
+        return MotorPatrones(
+            [
+                (tipo, [patron.format(victima=patron_victima_clean) for patron in patrones])
+                for tipo, _, patrones in self.familias_dirigidas
+            ],
+            flags=0  # los textos se analizan ya en minúsculas
+        )
     
     def _detectar_agresion_dirigida(
         self,
-        texto: str,
-        victima: str,
+        texto_lower: str,
         patron_victima: str
-    ) -> Optional[tuple]:
+    ) -> Tuple[str, str]:
         """
-        Detecta si hay agresión dirigida a una víctima específica
+        Clasifica la agresión dirigida a una víctima ya mencionada en el texto
         
         Args:
-            texto: Texto a analizar
-            victima: Nombre de la víctima
-            patron_victima: Patrón regex para la víctima
+            texto_lower: Texto a analizar en minúsculas
+            patron_victima: Patrón regex base de la víctima
             
         Returns:
-            Tupla (tipo_agresion, severidad) o None
+            Tupla (tipo_agresion, severidad); ('mención', 'baja') si no hay agresión específica
         """
-        texto_lower = texto.lower()
-        
-        # Verificar que se menciona la víctima
-        if not re.search(patron_victima, texto_lower, re.IGNORECASE):
-            return None
-        
-        # Reemplazar {victima} en patrones
-        patron_victima_clean = patron_victima.replace(r'\b', '').replace('(', '').replace(')', '').replace('|', '|')
-        
-        # Verificar amenaza dirigida (más grave)
-        for patron in self.amenaza_dirigida:
-            patron_final = patron.format(victima=patron_victima_clean)
-            if re.search(patron_final, texto_lower, re.IGNORECASE):
-                return ('amenaza dirigida', 'alta')
-        
-        # Insulto dirigido
-        for patron in self.insulto_dirigido:
-            patron_final = patron.format(victima=patron_victima_clean)
-            if re.search(patron_final, texto_lower, re.IGNORECASE):
-                return ('insulto dirigido', 'alta')
-        
-        # Órdenes hostiles
-        for patron in self.ordenes_hostiles:
-            patron_final = patron.format(victima=patron_victima_clean)
-            if re.search(patron_final, texto_lower, re.IGNORECASE):
-                return ('órdenes hostiles', 'media')
-        
-        # Presión emocional dirigida
-        for patron in self.presion_emocional_dirigida:
-            patron_final = patron.format(victima=patron_victima_clean)
-            if re.search(patron_final, texto_lower, re.IGNORECASE):
-                return ('presión emocional dirigida', 'media')
-        
-        # Manipulación dirigida
-        for patron in self.manipulacion_dirigida:
-            patron_final = patron.format(victima=patron_victima_clean)
-            if re.search(patron_final, texto_lower, re.IGNORECASE):
-                return ('manipulación dirigida', 'media')
-        
-        # Invalidación dirigida
-        for patron in self.invalidacion_dirigida:
-            patron_final = patron.format(victima=patron_victima_clean)
-            if re.search(patron_final, texto_lower, re.IGNORECASE):
-                return ('invalidación dirigida', 'media')
-        
-        # Burla dirigida
-        for patron in self.burla_dirigida:
-            patron_final = patron.format(victima=patron_victima_clean)
-            if re.search(patron_final, texto_lower, re.IGNORECASE):
-                return ('burla dirigida', 'baja')
+        deteccion = self._motores_por_patron[patron_victima].primera_por_prioridad(texto_lower)
+        if deteccion:
+            tipo = deteccion[0]
+            return (tipo, self._severidad_familia[tipo])
         
         # Si se menciona pero no hay agresión específica, retornar mención
         return ('mención', 'baja')
@@ -168,41 +160,76 @@ class VictimDetector:
             Lista de detecciones de agresión dirigida
         """
         texto = segmento.get('text', '').strip()
-        inicio = segmento.get('start', 0)
-        fin = segmento.get('end', 0)
         
         if not texto:
             return []
         
-        detecciones = []
+        texto_lower = texto.lower()
+        
+        # Víctimas mencionadas (una pasada); solo para ellas se evalúan sus patrones
+        mencionadas = self.motor_menciones.categorias_presentes(texto_lower)
+        clasificaciones = self.clasificar_victimas(texto_lower, mencionadas)
+        
+        return self.crear_detecciones(segmento, clasificaciones, analisis_agresion)
+    
+    def clasificar_victimas(
+        self,
+        texto_lower: str,
+        mencionadas: Set[str]
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Clasifica la agresión dirigida a cada víctima mencionada
         
-        # Verificar cada víctima
-        for nombre_victima, info in self.victimas.items():
-            patron_victima = info['patron_base']
+        Args:
+            texto_lower: Texto del segmento en minúsculas
+            mencionadas: Nombres de las víctimas mencionadas en el texto
             
-            # Detectar agresión dirigida
-            resultado = self._detectar_agresion_dirigida(texto, nombre_victima, patron_victima)
+        Returns:
+            Lista de (víctima, tipo, severidad) en el orden de self.victimas
+        """
+        return [
+            (nombre_victima, *self._detectar_agresion_dirigida(texto_lower, info['patron_base']))
+            for nombre_victima, info in self.victimas.items()
+            if nombre_victima in mencionadas
+        ]
+    
+    def crear_detecciones(
+        self,
+        segmento: Dict[str, Any],
+        clasificaciones: List[Tuple[str, str, str]],
+        analisis_agresion: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Construye las detecciones de un segmento ya clasificado
+        
+        Args:
+            segmento: Segmento de Whisper con 'text', 'start', 'end'
+            clasificaciones: Resultado de clasificar_victimas()
+            analisis_agresion: Análisis de agresión del AgresionAnalyzer (opcional)
             
-            if resultado:
-                tipo, severidad = resultado
-                
-                # Si hay análisis de agresión previo, combinar información
-                if analisis_agresion and analisis_agresion.get('tipo'):
-                    # Usar severidad más alta
-                    severidad_agresion = analisis_agresion.get('severidad', 'baja')
-                    if severidad_agresion == 'alta' or severidad == 'alta':
-                        severidad = 'alta'
-                    elif severidad_agresion == 'media' or severidad == 'media':
-                        severidad = 'media'
-                
-                detecciones.append({
-                    'victima': nombre_victima,
-                    'inicio': inicio,
-                    'fin': fin,
-                    'tipo': tipo,
-                    'frase': texto,
-                    'severidad': severidad
-                })
+        Returns:
+            Lista de detecciones de agresión dirigida
+        """
+        detecciones = []
+        
+        for nombre_victima, tipo, severidad in clasificaciones:
+            # Si hay análisis de agresión previo, combinar información
+            if analisis_agresion and analisis_agresion.get('tipo'):
+                # Usar severidad más alta
+                severidad_agresion = analisis_agresion.get('severidad', 'baja')
+                if severidad_agresion == 'alta' or severidad == 'alta':
+                    severidad = 'alta'
+                elif severidad_agresion == 'media' or severidad == 'media':
+                    severidad = 'media'
+            
+            detecciones.append({
+                'victima': nombre_victima,
+                'inicio': segmento.get('start', 0),
+                'fin': segmento.get('end', 0),
+                'tipo': tipo,
+                'frase': segmento.get('text', '').strip(),
+                'severidad': severidad
+            })
         
         return detecciones
     
@@ -224,23 +251,15 @@ class VictimDetector:
         segmentos = resultado_whisper.get('segments', [])
         detecciones = []
         
-        # Crear mapa de análisis de agresión por timestamp
-        agresion_por_timestamp = {}
-        for ag in analisis_agresion:
-            key = (ag['inicio'], ag['fin'])
-            agresion_por_timestamp[key] = ag
+        # Índice ordenado de las detecciones de agresión: búsqueda en O(log n) por segmento
+        indice_agresion = IndiceTemporal(analisis_agresion)
         
         # Analizar cada segmento
         for segmento in segmentos:
             inicio = segmento.get('start', 0)
-            fin = segmento.get('end', 0)
             
-            # Buscar análisis de agresión correspondiente
-            analisis_correspondiente = None
-            for ag in analisis_agresion:
-                if abs(ag['inicio'] - inicio) < 1.0:  # Dentro de 1 segundo
-                    analisis_correspondiente = ag
-                    break
+            # Buscar análisis de agresión correspondiente (dentro de 1 segundo)
+            analisis_correspondiente = indice_agresion.primero_en_ventana(inicio, 1.0)
             
             # Analizar segmento
             detecciones_segmento = self.analizar_segmento(segmento, analisis_correspondiente)
@@ -4,16 +4,17 @@ Analiza características acústicas del audio para detectar cambios en volumen y
 """
 
 import os
+import importlib.util
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import logging
 
-try:
-    import librosa
-    LIBROSA_AVAILABLE = True
-except ImportError:
-    LIBROSA_AVAILABLE = False
-    logging.warning("librosa no disponible, usando métodos alternativos")
+from .audio_decodificado import obtener_cache_audio, decodificar_audio, FRECUENCIA_MUESTREO
+from .caracteristicas_acusticas import ExtractorCaracteristicas
+
+# librosa no es necesario (decodificación con FFmpeg y características en NumPy); solo
+# se importa si se pide con usar_librosa, porque importarlo tarda varios segundos
+LIBROSA_AVAILABLE = importlib.util.find_spec('librosa') is not None
 
 
 class VoiceStressDetector:
@@ -21,110 +22,194 @@ class VoiceStressDetector:
     Clase para detectar estrés vocal y voz elevada en archivos de audio
     """
     
-    def __init__(self, umbral_db: float = 10.0, ventana_segundos: float = 2.0):
+    def __init__(
+        self,
+        umbral_db: float = 10.0,
+        ventana_segundos: float = 2.0,
+        umbral_semitonos: float = 6.0,
+        min_tramas_sonoras: int = 5,
+        streaming: bool = False,
+        segundos_por_bloque: float = 30.0,
+        usar_librosa: bool = False
+    ):
         """
         Inicializa el detector
         
         Args:
             umbral_db: Umbral de cambio en dB para considerar voz elevada
-            ventana_segundos: Tamaño de ventana para análisis en segundos
+            ventana_segundos: Tamaño de ventana para análisis en segundos; separación
+                              máxima entre dos segmentos para comparar su tono
+            umbral_semitonos: Salto de tono medio entre segmentos consecutivos para
+                              considerarlo un cambio brusco de tono
+            min_tramas_sonoras: Tramas con tono necesarias para estimar el tono de un segmento
+            streaming: Si True, el audio que no se recibe ya decodificado se lee por bloques
+                       en lugar de cargarlo entero en memoria (mismos resultados)
+            segundos_por_bloque: Duración de cada bloque en modo streaming
+            usar_librosa: Decodificar con librosa.load (a la frecuencia original del
+                          archivo) en lugar de FFmpeg
         """
         self.logger = logging.getLogger(__name__)
         self.umbral_db = umbral_db
         self.ventana_segundos = ventana_segundos
+        self.umbral_semitonos = umbral_semitonos
+        self.min_tramas_sonoras = min_tramas_sonoras
+        self.streaming = streaming
+        self.segundos_por_bloque = segundos_por_bloque
+        self.usar_librosa = usar_librosa
+        self._extractores: Dict[int, ExtractorCaracteristicas] = {}
         
-        if not LIBROSA_AVAILABLE:
+        if usar_librosa and not LIBROSA_AVAILABLE:
             self.logger.warning("librosa no está instalado. Instala con: pip install librosa")
     
-    def _calcular_rms_db(self, audio: np.ndarray, sr: int, inicio: float, fin: float) -> float:
+    def _extractor(self, sr: int) -> ExtractorCaracteristicas:
+        """Extractor de características para un sample rate (se reutiliza entre audios)"""
+        if sr not in self._extractores:
+            self._extractores[sr] = ExtractorCaracteristicas(sr=sr)
+        return self._extractores[sr]
+    
+    def _detectar_picos_bruscos(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        segmentos: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
         """
-        Calcula el RMS en dB para un segmento
+        Detecta picos bruscos de volumen y cambios bruscos de tono
+        
+        Las características se calculan por trama en una sola pasada sobre el audio
+        y se agregan por segmento; el nivel de cada segmento es el RMS en dB de sus
+        muestras.
         
         Args:
             audio: Array de audio
             sr: Sample rate
-            inicio: Tiempo de inicio en segundos
-            fin: Tiempo de fin en segundos
+            segmentos: Segmentos de transcripción con timestamps
             
         Returns:
-            RMS en dB
+            Lista de detecciones de picos, ordenada por inicio
         """
-        inicio_idx = int(inicio * sr)
-        fin_idx = int(fin * sr)
-        
-        if inicio_idx >= len(audio) or fin_idx > len(audio):
-            return 0.0
-        
-        segmento = audio[inicio_idx:fin_idx]
+        if len(segmentos) < 2:
+            return []
         
-        if len(segmento) == 0:
-            return 0.0
+        inicios, fines = self._tiempos_segmentos(segmentos)
+        extractor = self._extractor(sr)
+        caracteristicas = extractor.extraer(audio)
+        por_segmento = extractor.agregar(caracteristicas, inicios, fines, audio=audio)
+        return self._detectar_en_segmentos(segmentos, inicios, fines, por_segmento, sr, caracteristicas.num_muestras)
+    
+    def _detectar_picos_bruscos_por_bloques(
+        self,
+        bloques: Iterable[np.ndarray],
+        sr: int,
+        segmentos: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Igual que _detectar_picos_bruscos() leyendo el audio bloque a bloque
         
-        # Calcular RMS
-        rms = np.sqrt(np.mean(segmento**2))
+        La energía, el tono y el flujo de cada trama se acumulan según llegan los
+        bloques; en memoria solo quedan las características por trama, no el audio.
         
-        # Convertir a dB (evitar log de 0)
-        if rms > 0:
-            db = 20 * np.log10(rms + 1e-10)
-        else:
-            db = -np.inf
+        Args:
+            bloques: Bloques consecutivos de audio mono
+            sr: Sample rate
+            segmentos: Segmentos de transcripción con timestamps
+            
+        Returns:
+            Lista de detecciones de picos, ordenada por inicio
+        """
+        if len(segmentos) < 2:
+            return []
         
-        return db
+        inicios, fines = self._tiempos_segmentos(segmentos)
+        extractor = self._extractor(sr)
+        puntos = np.concatenate([(inicios * sr).astype(np.int64), (fines * sr).astype(np.int64)])
+        caracteristicas = extractor.extraer_por_bloques(bloques, puntos)
+        por_segmento = extractor.agregar(caracteristicas, inicios, fines)
+        return self._detectar_en_segmentos(segmentos, inicios, fines, por_segmento, sr, caracteristicas.num_muestras)
     
-    def _detectar_picos_bruscos(
+    @staticmethod
+    def _tiempos_segmentos(segmentos: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Inicios y fines de los segmentos en segundos (1 s de duración si no tienen fin)"""
+        inicios = np.array([seg.get('start', 0) for seg in segmentos], dtype=np.float64)
+        fines = np.array([seg.get('end', seg.get('start', 0) + 1) for seg in segmentos], dtype=np.float64)
+        return inicios, fines
+    
+    def _detectar_en_segmentos(
         self,
-        audio: np.ndarray,
+        segmentos: List[Dict[str, Any]],
+        inicios: np.ndarray,
+        fines: np.ndarray,
+        por_segmento: Dict[str, np.ndarray],
         sr: int,
-        segmentos: List[Dict[str, Any]]
+        num_muestras: int
     ) -> List[Dict[str, Any]]:
         """
-        Detecta picos bruscos de volumen
+        Aplica los umbrales de volumen y tono a las características agregadas por segmento
         
         Args:
-            audio: Array de audio
+            segmentos: Segmentos de transcripción
+            inicios: Inicio de cada segmento en segundos
+            fines: Fin de cada segmento en segundos
+            por_segmento: Salida de ExtractorCaracteristicas.agregar()
             sr: Sample rate
-            segmentos: Segmentos de transcripción con timestamps
+            num_muestras: Longitud del audio en muestras
             
         Returns:
-            Lista de detecciones de picos
+            Lista de detecciones, ordenada por inicio
         """
         detecciones = []
         
-        if len(segmentos) < 2:
-            return detecciones
-        
-        # Calcular niveles de volumen para cada segmento
-        niveles = []
-        for seg in segmentos:
-            inicio = seg.get('start', 0)
-            fin = seg.get('end', inicio + 1)
-            db = self._calcular_rms_db(audio, sr, inicio, fin)
-            niveles.append({
-                'inicio': inicio,
-                'fin': fin,
-                'db': db
-            })
+        # Nivel de volumen de cada segmento (0 dB fuera del audio, -inf en silencio digital)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rms = np.sqrt(por_segmento['energia'] / por_segmento['muestras'])
+            niveles = np.where(rms > 0, 20 * np.log10(rms + 1e-10), -np.inf)
+        fuera = (
+            ((inicios * sr).astype(np.int64) >= num_muestras)
+            | ((fines * sr).astype(np.int64) > num_muestras)
+            | (por_segmento['muestras'] == 0)
+        )
+        niveles[fuera] = 0.0
         
         # Calcular nivel promedio
-        db_promedio = np.mean([n['db'] for n in niveles if n['db'] > -np.inf])
+        db_promedio = np.mean(niveles[niveles > -np.inf])
         
         # Detectar segmentos con volumen elevado
-        for nivel in niveles:
-            if nivel['db'] > -np.inf and nivel['db'] > db_promedio + self.umbral_db:
-                detecciones.append({
-                    'inicio': nivel['inicio'],
-                    'fin': nivel['fin'],
-                    'tipo': 'voz elevada',
-                    'db_change': nivel['db'] - db_promedio,
-                    'db_absoluto': nivel['db']
-                })
+        for i in np.flatnonzero((niveles > -np.inf) & (niveles > db_promedio + self.umbral_db)):
+            detecciones.append({
+                'inicio': segmentos[i].get('start', 0),
+                'fin': fines[i].item(),
+                'tipo': 'voz elevada',
+                'db_change': (niveles[i] - db_promedio).item(),
+                'db_absoluto': niveles[i].item()
+            })
+        
+        # Detectar saltos de tono entre segmentos consecutivos cercanos
+        semitonos = 12 * np.log2(por_segmento['f0'])
+        con_tono = (por_segmento['tramas_sonoras'] >= self.min_tramas_sonoras) & ~fuera
+        salto = np.abs(np.diff(semitonos))
+        cercanos = (inicios[1:] - fines[:-1]) <= self.ventana_segundos
+        for i in np.flatnonzero(con_tono[1:] & con_tono[:-1] & cercanos & (salto >= self.umbral_semitonos)) + 1:
+            detecciones.append({
+                'inicio': segmentos[i].get('start', 0),
+                'fin': fines[i].item(),
+                'tipo': 'cambio_tono',
+                'semitonos': (semitonos[i] - semitonos[i - 1]).item(),
+                'tono_hz': por_segmento['f0'][i].item(),
+                'tono_anterior_hz': por_segmento['f0'][i - 1].item(),
+                'flujo_espectral': por_segmento['flujo'][i].item(),
+                'db_change': (niveles[i] - db_promedio).item() if niveles[i] > -np.inf else 0.0
+            })
         
+        detecciones.sort(key=lambda d: d['inicio'])
         return detecciones
     
     def analizar_audio(
         self,
         ruta_audio: str,
-        segmentos: List[Dict[str, Any]]
+        segmentos: List[Dict[str, Any]],
+        audio: Optional[np.ndarray] = None,
+        sr: Optional[int] = None,
+        streaming: Optional[bool] = None
     ) -> List[Dict[str, Any]]:
         """
         Analiza el audio para detectar estrés vocal
@@ -132,50 +217,85 @@ class VoiceStressDetector:
         Args:
             ruta_audio: Ruta al archivo de audio
             segmentos: Segmentos de transcripción con timestamps
+            audio: Audio ya decodificado (mono). Si None, se obtiene de la caché de audio
+            sr: Sample rate de audio. Si None, 16 kHz
+            streaming: Leer el audio por bloques si no se pasa decodificado. Si None, se
+                       usa el valor del constructor
             
         Returns:
             Lista de detecciones de estrés vocal
         """
-        if not os.path.exists(ruta_audio):
+        if audio is None and not os.path.exists(ruta_audio):
             self.logger.error(f"Archivo de audio no encontrado: {ruta_audio}")
             return []
         
-        if not LIBROSA_AVAILABLE:
-            self.logger.warning("librosa no disponible, usando análisis simplificado")
-            return self._analisis_simplificado(segmentos)
-        
         try:
-            # Cargar audio
             self.logger.info(f"Analizando audio: {os.path.basename(ruta_audio)}")
-            audio, sr = librosa.load(ruta_audio, sr=None, mono=True)
             
-            # Detectar picos bruscos
-            detecciones = self._detectar_picos_bruscos(audio, sr, segmentos)
+            if audio is None and (self.streaming if streaming is None else streaming):
+                bloques = obtener_cache_audio().bloques(
+                    ruta_audio,
+                    muestras_por_bloque=int(self.segundos_por_bloque * FRECUENCIA_MUESTREO)
+                )
+                detecciones = self._detectar_picos_bruscos_por_bloques(bloques, FRECUENCIA_MUESTREO, segmentos)
+            else:
+                if audio is None:
+                    audio, sr = self._cargar_audio(ruta_audio)
+                elif sr is None:
+                    sr = FRECUENCIA_MUESTREO
+                
+                # Detectar picos bruscos
+                detecciones = self._detectar_picos_bruscos(audio, sr, segmentos)
             
-            self.logger.info(f"Detectados {len(detecciones)} momentos de voz elevada")
+            num_tono = sum(1 for d in detecciones if d['tipo'] == 'cambio_tono')
+            self.logger.info(
+                f"Detectados {len(detecciones) - num_tono} momentos de voz elevada "
+                f"y {num_tono} cambios bruscos de tono"
+            )
             return detecciones
             
         except Exception as e:
             self.logger.error(f"Error al analizar audio: {str(e)}")
             return self._analisis_simplificado(segmentos)
     
+    def _cargar_audio(self, ruta_audio: str) -> Tuple[np.ndarray, int]:
+        """
+        Obtiene el audio decodificado de la caché compartida
+        
+        Si la caché no se puede usar (carpeta sin permisos, disco lleno), el audio se
+        decodifica con FFmpeg sin guardarlo. Con usar_librosa se carga con librosa.
+        
+        Args:
+            ruta_audio: Ruta al archivo de audio
+            
+        Returns:
+            Tupla (audio, sample rate)
+        """
+        if self.usar_librosa:
+            import librosa
+            return librosa.load(ruta_audio, sr=None, mono=True)
+        
+        try:
+            return obtener_cache_audio().obtener(ruta_audio), FRECUENCIA_MUESTREO
+        except OSError as e:
+            self.logger.warning(f"Caché de audio no disponible ({str(e)}), decodificando sin caché")
+            return decodificar_audio(ruta_audio), FRECUENCIA_MUESTREO
+    
     def _analisis_simplificado(
         self,
         segmentos: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """
-        Análisis simplificado cuando librosa no está disponible
-        Basado en duración y características del texto
+        Resultado cuando el audio no se puede decodificar ni analizar
         
         Args:
             segmentos: Segmentos de transcripción
             
         Returns:
-            Lista vacía o detecciones básicas
+            Lista vacía
         """
-        # Sin librosa, no podemos hacer análisis acústico real
-        # Retornar lista vacía
-        self.logger.warning("Análisis acústico no disponible sin librosa")
+        # Sin audio no hay análisis acústico posible
+        self.logger.warning("Análisis acústico no disponible para este audio")
         return []
     
     def exportar_json(
@@ -0,0 +1,71 @@
+"""
+Índice de páginas de un texto extraído de PDF
+Traduce posiciones del texto completo a números de página en O(log páginas) con bisect
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, List
+
+
+class IndicePaginas:
+    """
+    Desplazamientos acumulados del inicio de cada página en el texto completo
+
+    El texto completo es la unión de las páginas con un separador ('\\n\\n' en
+    extraer_texto_pdf); cada página abarca su texto más el separador que la sigue.
+    """
+
+    def __init__(self, texto_por_pagina: List[Dict[str, Any]], longitud_separador: int = 2):
+        """
+        Construye el índice
+
+        Args:
+            texto_por_pagina: Lista de diccionarios con 'pagina' y 'texto', en orden
+            longitud_separador: Caracteres que separan dos páginas en el texto completo
+        """
+        self.longitud_separador = longitud_separador
+        self._inicios: List[int] = []
+        self._paginas: List[int] = []
+        self._fin = 0
+        for pagina_info in texto_por_pagina:
+            self.agregar_pagina(pagina_info.get('pagina', 0), len(pagina_info.get('texto', '')))
+
+    def __len__(self) -> int:
+        return len(self._paginas)
+
+    @property
+    def fin(self) -> int:
+        """Posición siguiente al final de la última página indexada (con su separador)"""
+        return self._fin
+
+    def agregar_pagina(self, num_pagina: int, longitud: int) -> int:
+        """
+        Añade una página al final del índice (lectura página a página)
+
+        Args:
+            num_pagina: Número de página
+            longitud: Caracteres del texto de la página, sin el separador
+
+        Returns:
+            Posición de inicio de la página en el texto completo
+        """
+        inicio = self._fin
+        self._inicios.append(inicio)
+        self._paginas.append(num_pagina)
+        self._fin += longitud + self.longitud_separador
+        return inicio
+
+    def pagina(self, posicion: int) -> int:
+        """
+        Número de página que contiene una posición del texto completo
+
+        Args:
+            posicion: Desplazamiento en caracteres
+
+        Returns:
+            Número de página, o 0 si la posición queda fuera del texto indexado
+        """
+        if posicion < 0 or posicion >= self._fin:
+            return 0
+        return self._paginas[bisect_right(self._inicios, posicion) - 1]
+
@@ -0,0 +1,128 @@
+"""
+Índice temporal ordenado para cruzar detecciones y segmentos por tiempo
+Búsquedas por ventana, vecino más cercano y solape en O(log n) con bisect
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class IndiceTemporal:
+    """
+    Índice de elementos con tiempo de inicio y fin (detecciones, segmentos de Whisper...)
+
+    Los elementos se ordenan por inicio al construir el índice; el orden original se
+    conserva para desempatar, de modo que las búsquedas devuelven lo mismo que un
+    recorrido lineal de la lista original.
+    """
+
+    def __init__(
+        self,
+        elementos: Iterable[Dict[str, Any]],
+        clave_inicio: str = 'inicio',
+        clave_fin: str = 'fin'
+    ):
+        """
+        Construye el índice
+
+        Args:
+            elementos: Diccionarios con tiempos en segundos
+            clave_inicio: Clave del tiempo de inicio ('inicio' en detecciones, 'start' en segmentos)
+            clave_fin: Clave del tiempo de fin. Si un elemento no la tiene, se usa su inicio
+        """
+        ordenados = sorted(
+            enumerate(elementos),
+            key=lambda par: (par[1].get(clave_inicio, 0), par[0])
+        )
+        self._posiciones = [posicion for posicion, _ in ordenados]
+        self._elementos = [elemento for _, elemento in ordenados]
+        self._inicios = [e.get(clave_inicio, 0) for e in self._elementos]
+        self._fines = [e.get(clave_fin, e.get(clave_inicio, 0)) for e in self._elementos]
+
+        # Duración máxima: acota hacia atrás la búsqueda de intervalos solapados
+        self._duracion_max = max((f - i for i, f in zip(self._inicios, self._fines)), default=0)
+
+    def __len__(self) -> int:
+        return len(self._elementos)
+
+    def en_ventana(self, t: float, radio: float) -> List[Dict[str, Any]]:
+        """
+        Elementos cuyo inicio está a menos de `radio` segundos de t
+
+        Args:
+            t: Tiempo de referencia en segundos
+            radio: Distancia máxima (exclusiva)
+
+        Returns:
+            Elementos en el orden de la lista original
+        """
+        indices = sorted(self._indices_en_ventana(t, radio), key=lambda i: self._posiciones[i])
+        return [self._elementos[i] for i in indices]
+
+    def primero_en_ventana(self, t: float, radio: float) -> Optional[Dict[str, Any]]:
+        """
+        Primer elemento (en el orden de la lista original) con |inicio - t| < radio
+
+        Equivale a recorrer la lista original y quedarse con la primera coincidencia.
+
+        Args:
+            t: Tiempo de referencia en segundos
+            radio: Distancia máxima (exclusiva)
+
+        Returns:
+            Elemento o None
+        """
+        indices = self._indices_en_ventana(t, radio)
+        if not indices:
+            return None
+        return self._elementos[min(indices, key=lambda i: self._posiciones[i])]
+
+    def mas_cercano(self, t: float, distancia_max: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Elemento cuyo inicio está más cerca de t
+
+        Args:
+            t: Tiempo de referencia en segundos
+            distancia_max: Distancia máxima admitida (inclusiva). Si None, sin límite
+
+        Returns:
+            Elemento o None si el índice está vacío o ninguno está a distancia_max
+        """
+        if not self._elementos:
+            return None
+
+        i = bisect_left(self._inicios, t)
+        candidatos = [i] if i < len(self._inicios) else []
+        if i > 0:
+            # Con inicios repetidos, el primero en el orden original es el primero del grupo
+            candidatos.append(bisect_left(self._inicios, self._inicios[i - 1]))
+        mejor = min(candidatos, key=lambda j: (abs(self._inicios[j] - t), self._posiciones[j]))
+
+        if distancia_max is not None and abs(self._inicios[mejor] - t) > distancia_max:
+            return None
+        return self._elementos[mejor]
+
+    def solapados(self, inicio: float, fin: float) -> List[Dict[str, Any]]:
+        """
+        Elementos cuyo intervalo [inicio, fin] se solapa con el indicado
+
+        Args:
+            inicio: Inicio del intervalo en segundos
+            fin: Fin del intervalo en segundos
+
+        Returns:
+            Elementos ordenados por inicio
+        """
+        desde = bisect_left(self._inicios, inicio - self._duracion_max)
+        hasta = bisect_right(self._inicios, fin)
+        return [
+            self._elementos[i] for i in range(desde, hasta)
+            if self._fines[i] >= inicio and self._inicios[i] <= fin
+        ]
+
+    def _indices_en_ventana(self, t: float, radio: float) -> List[int]:
+        """Índices (en el orden del índice) con |inicio - t| < radio"""
+        desde = bisect_left(self._inicios, t - radio)
+        hasta = bisect_right(self._inicios, t + radio)
+        # El filtro exacto evita diferencias de redondeo en los bordes de la ventana
+        return [i for i in range(desde, hasta) if abs(self._inicios[i] - t) < radio]
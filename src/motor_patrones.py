@@ -0,0 +1,298 @@
+"""
+Motor de patrones precompilados para los detectores de agresión y violencia verbal
+Compila todas las categorías en una sola alternancia con grupos con nombre y analiza
+cada texto en una pasada
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+try:
+    import re._parser as _parser_re
+except ImportError:  # Python < 3.11
+    import sre_parse as _parser_re
+
+from .prefiltro_literales import AHOCORASICK_AVAILABLE, PrefiltroLiterales
+
+
+class Coincidencia(NamedTuple):
+    """Coincidencia de un patrón dentro de un texto"""
+    categoria: str
+    patron: str
+    inicio: int
+    fin: int
+    texto: str
+
+
+class MotorPatrones:
+    """
+    Conjunto de categorías de patrones con orden de prioridad
+
+    Las categorías se pasan de mayor a menor prioridad. Cada patrón se envuelve en un
+    grupo con nombre c{categoría}_p{patrón}, de modo que una sola búsqueda indica qué
+    categoría y qué patrón coinciden.
+    """
+
+    def __init__(
+        self,
+        categorias: Sequence[Tuple[str, Sequence[str]]],
+        flags: int = re.IGNORECASE,
+        prefiltro: Optional[bool] = None
+    ):
+        """
+        Compila los patrones
+
+        Args:
+            categorias: Lista de (nombre de categoría, patrones) ordenada por prioridad
+            flags: Flags de compilación de re. Si los textos ya llegan en minúsculas,
+                   flags=0 evita el coste de IGNORECASE y permite descartar alternativas
+                   por su primer carácter
+            prefiltro: Descartar sin evaluar la expresión los textos que no contienen
+                       ninguno de los literales de los patrones. Si None, solo se activa
+                       con pyahocorasick: en Python puro el autómata cuesta sobre textos
+                       cortos lo mismo que la propia alternancia
+        """
+        self.categorias = [nombre for nombre, _ in categorias]
+        self._prioridad = {nombre: i for i, nombre in enumerate(self.categorias)}
+        self._grupos: Dict[str, Tuple[str, str]] = {}
+
+        grupos_por_categoria: Dict[str, List[str]] = {}
+        for i, (nombre, patrones) in enumerate(categorias):
+            for j, patron in enumerate(patrones):
+                grupo = f"c{i}_p{j}"
+                self._grupos[grupo] = (nombre, patron)
+                grupos_por_categoria.setdefault(nombre, []).append(grupo)
+
+        # Caracteres con los que puede empezar cada patrón (None si no se pueden acotar)
+        self._primeros: Dict[str, Optional[Set[str]]] = {
+            grupo: _primeros_caracteres(patron, flags) for grupo, (_, patron) in self._grupos.items()
+        }
+        self._primeros_categoria: Dict[str, Optional[Set[str]]] = {}
+        for nombre, grupos in grupos_por_categoria.items():
+            primeros = [self._primeros[grupo] for grupo in grupos]
+            self._primeros_categoria[nombre] = set().union(*primeros) if all(primeros) else None
+
+        self._combinado = self._compilar(list(self._grupos), flags)
+
+        if prefiltro is None:
+            prefiltro = AHOCORASICK_AVAILABLE
+        self._prefiltro: Optional[PrefiltroLiterales] = None
+        if prefiltro:
+            self._prefiltro = PrefiltroLiterales(
+                [patron for _, patron in self._grupos.values()], flags
+            )
+
+        # Expresiones por categoría, para verificar las que un solape pueda ocultar
+        self._por_categoria: Dict[str, re.Pattern] = {
+            nombre: self._compilar(grupos, flags)
+            for nombre, grupos in grupos_por_categoria.items()
+        }
+
+    def _compilar(self, grupos: List[str], flags: int) -> re.Pattern:
+        """
+        Compila una alternancia de los patrones indicados, cada uno en su grupo con nombre
+
+        Args:
+            grupos: Nombres de grupo (claves de self._grupos)
+            flags: Flags de compilación de re
+
+        Returns:
+            Expresión compilada
+        """
+        if not grupos:
+            # Sin patrones, una expresión que nunca coincide
+            return re.compile(r'(?!)')
+
+        patrones = [self._grupos[grupo][1] for grupo in grupos]
+
+        # Si todos los patrones empiezan en un límite de palabra, se comprueba una sola vez
+        # por posición en lugar de una vez por alternativa
+        prefijo = ''
+        if all(patron.startswith(r'\b') for patron in patrones):
+            prefijo = r'\b'
+            patrones = [patron[2:] for patron in patrones]
+
+        # Cada alternativa va precedida de una comprobación de su primer carácter: el motor
+        # de re descarta así las alternativas que no pueden empezar en la posición actual
+        # sin entrar en sus grupos
+        primeros = [self._primeros[grupo] for grupo in grupos]
+        alternativas = '|'.join(
+            f"{_clase(caracteres)}(?P<{grupo}>{patron})" if caracteres else f"(?P<{grupo}>{patron})"
+            for grupo, patron, caracteres in zip(grupos, patrones, primeros)
+        )
+        if all(primeros):
+            prefijo += _clase(set().union(*primeros))
+
+        return re.compile(f"{prefijo}(?:{alternativas})", flags)
+
+    def patrones_de(self, categoria: str) -> List[str]:
+        """Patrones originales de una categoría, en el orden en que se definieron"""
+        return [patron for nombre, patron in self._grupos.values() if nombre == categoria]
+
+    def escanear(self, texto: str) -> List[Coincidencia]:
+        """
+        Recorre el texto una vez y devuelve todas las coincidencias
+
+        Las coincidencias no se solapan: si dos patrones coinciden en el mismo tramo,
+        se devuelve el que aparece antes en la lista de categorías.
+
+        Args:
+            texto: Texto a analizar
+
+        Returns:
+            Coincidencias en orden de aparición
+        """
+        if self._prefiltro is not None and not self._prefiltro.candidatos(texto):
+            return []
+        return [self._coincidencia(m) for m in self._combinado.finditer(texto)]
+
+    def categorias_presentes(self, texto: str) -> Set[str]:
+        """
+        Categorías con al menos una coincidencia en el texto
+
+        Args:
+            texto: Texto a analizar
+
+        Returns:
+            Conjunto de nombres de categoría
+        """
+        coincidencias = self.escanear(texto)
+        presentes = {c.categoria for c in coincidencias}
+
+        # Un tramo consumido por otra categoría puede ocultar coincidencias solapadas
+        if coincidencias:
+            for nombre in self.categorias:
+                if nombre not in presentes and self._buscar_oculta(texto, coincidencias, nombre):
+                    presentes.add(nombre)
+
+        return presentes
+
+    def primera_por_prioridad(self, texto: str) -> Optional[Tuple[str, str]]:
+        """
+        Categoría de mayor prioridad presente en el texto
+
+        Args:
+            texto: Texto a analizar
+
+        Returns:
+            Tupla (categoría, patrón que coincide) o None
+        """
+        coincidencias = self.escanear(texto)
+        if not coincidencias:
+            return None
+
+        mejor = min(coincidencias, key=lambda c: self._prioridad[c.categoria])
+
+        # Las categorías más prioritarias que la encontrada pueden estar ocultas por un solape
+        for nombre in self.categorias[:self._prioridad[mejor.categoria]]:
+            m = self._buscar_oculta(texto, coincidencias, nombre)
+            if m:
+                return nombre, self._grupos[m.lastgroup][1]
+
+        return mejor.categoria, mejor.patron
+
+    def _buscar_oculta(
+        self,
+        texto: str,
+        coincidencias: List[Coincidencia],
+        categoria: str
+    ) -> Optional[re.Match]:
+        """
+        Busca una coincidencia de la categoría que el escaneo no devolvió por solaparse
+
+        El escaneo prueba todas las alternativas en cada posición libre, así que una
+        coincidencia oculta solo puede empezar dentro de un tramo ya devuelto.
+
+        Args:
+            texto: Texto analizado
+            coincidencias: Resultado de escanear(texto)
+            categoria: Categoría a verificar
+
+        Returns:
+            Objeto Match de la categoría o None
+        """
+        patron = self._por_categoria.get(categoria)
+        if patron is None:
+            return None
+
+        primeros = self._primeros_categoria[categoria]
+        for coincidencia in coincidencias:
+            for posicion in range(coincidencia.inicio, max(coincidencia.fin, coincidencia.inicio + 1)):
+                if primeros is not None and texto[posicion:posicion + 1] not in primeros:
+                    continue
+                m = patron.match(texto, posicion)
+                if m:
+                    return m
+
+        return None
+
+    def _coincidencia(self, m: re.Match) -> Coincidencia:
+        """Convierte un objeto Match de la alternancia combinada"""
+        categoria, patron = self._grupos[m.lastgroup]
+        return Coincidencia(categoria, patron, m.start(), m.end(), m.group())
+
+
+def _clase(caracteres: Set[str]) -> str:
+    """Lookahead que exige uno de los caracteres indicados"""
+    return f"(?=[{re.escape(''.join(sorted(caracteres)))}])"
+
+
+def _primeros_caracteres(patron: str, flags: int = 0) -> Optional[Set[str]]:
+    """
+    Caracteres con los que puede empezar una coincidencia del patrón
+
+    Args:
+        patron: Expresión regular
+        flags: Flags de compilación
+
+    Returns:
+        Conjunto de caracteres, o None si no se puede determinar (clases como \\w,
+        repeticiones opcionales, IGNORECASE...)
+    """
+    # Con IGNORECASE, re aplica equivalencias Unicode que no se reducen a lower()/upper()
+    if flags & re.IGNORECASE:
+        return None
+
+    try:
+        arbol = _parser_re.parse(patron, flags)
+    except Exception:
+        return None
+
+    return _primeros_de_secuencia(list(arbol))
+
+
+def _primeros_de_secuencia(elementos) -> Optional[Set[str]]:
+    """Primeros caracteres de una secuencia del árbol de sre_parse"""
+    for operacion, argumento in elementos:
+        nombre = str(operacion)
+
+        if nombre == 'AT':
+            # Anclas (\b, ^...) no consumen caracteres
+            continue
+        if nombre == 'LITERAL':
+            return {chr(argumento)}
+        if nombre == 'SUBPATTERN':
+            return _primeros_de_secuencia(list(argumento[-1]))
+        if nombre == 'BRANCH':
+            caracteres: Set[str] = set()
+            for rama in argumento[1]:
+                primeros = _primeros_de_secuencia(list(rama))
+                if not primeros:
+                    return None
+                caracteres |= primeros
+            return caracteres
+        if nombre == 'IN':
+            caracteres = set()
+            for operacion_clase, valor in argumento:
+                if str(operacion_clase) == 'LITERAL':
+                    caracteres.add(chr(valor))
+                elif str(operacion_clase) == 'RANGE' and valor[1] - valor[0] < 64:
+                    caracteres.update(chr(c) for c in range(valor[0], valor[1] + 1))
+                else:
+                    return None
+            return caracteres
+        if nombre in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT') and argumento[0] >= 1:
+            return _primeros_de_secuencia(list(argumento[2]))
+        return None
+
+    return None
@@ -0,0 +1,334 @@
+"""
+Extracción y detección en paralelo para PDFs grandes o numerosos
+Cada documento se divide en tramos de páginas que procesan varios procesos, cada uno con
+su propio documento de PyMuPDF abierto; los resultados se unen con posiciones y números
+de página globales
+"""
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from .indice_paginas import IndicePaginas
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+
+# Separador de páginas en el texto completo (el mismo que extraer_texto_pdf)
+SEPARADOR_PAGINAS = '\n\n'
+
+# Analizador del proceso worker (uno por proceso, creado en el inicializador)
+_analizador_worker = None
+
+
+def _inicializar_worker():
+    """Inicializa un proceso worker: carga los paquetes de reglas y compila los patrones"""
+    global _analizador_worker
+
+    from .analizador_pdf_forense import AnalizadorPDFForense
+    _analizador_worker = AnalizadorPDFForense()
+
+
+def _analizar_tramo_en_worker(ruta_pdf: str, pagina_inicio: int, pagina_fin: int) -> Dict[str, Any]:
+    """
+    Extrae el texto de las páginas [pagina_inicio, pagina_fin) y busca coincidencias en él
+
+    La página siguiente se lee también para que las coincidencias que empiezan en el
+    tramo y cruzan a la página siguiente se encuentren igual que en el texto completo.
+
+    Args:
+        ruta_pdf: Ruta al archivo PDF
+        pagina_inicio: Primera página del tramo (desde 0)
+        pagina_fin: Página final del tramo (exclusiva)
+
+    Returns:
+        Diccionario con:
+            'textos': texto de cada página del tramo
+            'coincidencias': salida de buscar_coincidencias() con posiciones relativas
+                al inicio del tramo
+            'tiempos': segundos de 'extraccion' y 'deteccion'
+    """
+    from .paquetes_reglas import obtener_gestor_reglas
+
+    # Las reglas editadas desde el tramo anterior se aplican igual que en el proceso principal
+    obtener_gestor_reglas().recargar_si_cambiaron()
+
+    tiempo_inicio = time.perf_counter()
+    doc = fitz.open(ruta_pdf)
+    try:
+        num_paginas = len(doc)
+        textos = [doc.load_page(i).get_text() for i in range(pagina_inicio, pagina_fin)]
+        siguiente = ''
+        if pagina_fin < num_paginas:
+            siguiente = doc.load_page(pagina_fin).get_text()
+    finally:
+        doc.close()
+    tiempo_extraccion = time.perf_counter() - tiempo_inicio
+
+    # El tramo se busca con el separador anterior y la página siguiente alrededor;
+    # le pertenecen las coincidencias que empiezan en sus páginas o en el separador final
+    previo = SEPARADOR_PAGINAS if pagina_inicio > 0 else ''
+    propio = SEPARADOR_PAGINAS.join(textos)
+    if pagina_fin < num_paginas:
+        propio += SEPARADOR_PAGINAS
+        siguiente += SEPARADOR_PAGINAS if pagina_fin + 1 < num_paginas else ''
+
+    tiempo_inicio = time.perf_counter()
+    coincidencias = _analizador_worker.buscar_coincidencias(
+        previo + propio + siguiente, len(previo), len(previo) + len(propio)
+    )
+    tiempo_deteccion = time.perf_counter() - tiempo_inicio
+
+    return {
+        'textos': textos,
+        'coincidencias': desplazar_coincidencias(coincidencias, -len(previo)),
+        'tiempos': {'extraccion': tiempo_extraccion, 'deteccion': tiempo_deteccion}
+    }
+
+
+def desplazar_coincidencias(coincidencias: Dict[str, Any], desplazamiento: int) -> Dict[str, Any]:
+    """
+    Suma un desplazamiento a las posiciones de una salida de buscar_coincidencias()
+
+    Args:
+        coincidencias: Coincidencias en bruto
+        desplazamiento: Caracteres a sumar a cada inicio y fin
+
+    Returns:
+        Coincidencias con las posiciones desplazadas
+    """
+    d = desplazamiento
+    return {
+        'agresion': [(o, tipo, i + d, f + d, g) for o, tipo, i, f, g in coincidencias['agresion']],
+        'victimas': [(o, victima, i + d, f + d) for o, victima, i, f in coincidencias['victimas']],
+        'contradicciones': [(o, i + d, f + d, g) for o, i, f, g in coincidencias['contradicciones']],
+        'criterios': dict(coincidencias['criterios'])
+    }
+
+
+def unir_coincidencias(partes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Une las coincidencias en bruto de varios tramos (con posiciones ya globales)
+
+    Args:
+        partes: Salidas de buscar_coincidencias()
+
+    Returns:
+        Coincidencias de todo el texto
+    """
+    unidas = {'agresion': [], 'victimas': [], 'contradicciones': [], 'criterios': {}}
+    for parte in partes:
+        for clave in ('agresion', 'victimas', 'contradicciones'):
+            unidas[clave].extend(parte[clave])
+        for criterio, count in parte['criterios'].items():
+            unidas['criterios'][criterio] = unidas['criterios'].get(criterio, 0) + count
+    return unidas
+
+
+class MotorPDFParalelo:
+    """
+    Reparte tramos de páginas de uno o varios PDFs entre procesos y entrega cada
+    documento analizado en cuanto terminan todos sus tramos
+    """
+
+    def __init__(
+        self,
+        analizador,
+        num_workers: Optional[int] = None,
+        paginas_por_tramo: int = 20
+    ):
+        """
+        Inicializa el motor (los procesos se crean al entrar en el contexto)
+
+        Args:
+            analizador: AnalizadorPDFForense del proceso principal; construye las
+                detecciones finales a partir de las coincidencias de los tramos
+            num_workers: Número de procesos. Si None, uno por núcleo
+            paginas_por_tramo: Páginas que procesa cada tarea
+        """
+        self.logger = logging.getLogger(__name__)
+        if not PYMUPDF_AVAILABLE:
+            raise ImportError("PyMuPDF (fitz) no está instalado. Instala con: pip install PyMuPDF")
+
+        self.analizador = analizador
+        self.num_workers = max(1, num_workers or os.cpu_count() or 1)
+        self.paginas_por_tramo = max(1, paginas_por_tramo)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'MotorPDFParalelo':
+        self.iniciar()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
+
+    def iniciar(self):
+        """Arranca los procesos worker"""
+        if self._executor is not None:
+            return
+
+        self.logger.info(
+            f"Iniciando motor PDF paralelo: {self.num_workers} workers, "
+            f"{self.paginas_por_tramo} páginas por tramo"
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_inicializar_worker
+        )
+
+    def cerrar(self):
+        """Detiene los procesos worker"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _tramos(self, num_paginas: int) -> List[Tuple[int, int]]:
+        """Tramos (inicio, fin) de páginas de un documento; al menos uno aunque esté vacío"""
+        inicios = range(0, max(num_paginas, 1), self.paginas_por_tramo)
+        return [(inicio, min(inicio + self.paginas_por_tramo, num_paginas)) for inicio in inicios]
+
+    def analizar(self, rutas_pdf: List[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Extrae y analiza varios PDFs en paralelo
+
+        Args:
+            rutas_pdf: Rutas de los archivos PDF
+
+        Returns:
+            Iterador de resultados en orden de finalización. Cada resultado tiene las
+            claves de extraer_texto_pdf() ('texto_completo', 'texto_por_pagina',
+            'indice_paginas', 'num_paginas', 'metadata', 'exito' y, si falla, 'error') más:
+                'ruta_pdf': ruta del archivo
+                'detecciones_agresion', 'menciones_victimas', 'contradicciones':
+                    como detectar_agresion(), detectar_menciones_victimas() y
+                    detectar_contradicciones() sobre el texto completo
+                'criterios_legales': conteo para clasificar_legal_dk()
+                'tiempos': segundos por etapa ('extraccion' y 'deteccion' sumados en
+                    los workers, 'fusion' y 'total' en el proceso principal)
+        """
+        self.iniciar()
+
+        documentos = {}
+        futuros = {}
+        for ruta in rutas_pdf:
+            tiempo_inicio = time.perf_counter()
+            try:
+                doc = fitz.open(ruta)
+                num_paginas, metadata = len(doc), doc.metadata
+                doc.close()
+            except Exception as e:
+                self.logger.error(f"Error al abrir el PDF {ruta}: {str(e)}")
+                yield self._resultado_fallido(ruta, e, time.perf_counter() - tiempo_inicio)
+                continue
+
+            tramos = self._tramos(num_paginas)
+            documentos[ruta] = {
+                'num_paginas': num_paginas,
+                'metadata': metadata,
+                'partes': [None] * len(tramos),
+                'pendientes': len(tramos),
+                'error': None,
+                'tiempo_inicio': tiempo_inicio
+            }
+            for i, (inicio, fin) in enumerate(tramos):
+                futuro = self._executor.submit(_analizar_tramo_en_worker, ruta, inicio, fin)
+                futuros[futuro] = (ruta, i)
+
+        for futuro in as_completed(futuros):
+            ruta, i = futuros[futuro]
+            documento = documentos[ruta]
+            try:
+                documento['partes'][i] = futuro.result()
+            except Exception as e:
+                documento['error'] = documento['error'] or e
+
+            documento['pendientes'] -= 1
+            if documento['pendientes'] == 0:
+                del documentos[ruta]
+                tiempo_total = time.perf_counter() - documento['tiempo_inicio']
+                if documento['error'] is not None:
+                    self.logger.error(f"Error al analizar el PDF {ruta}: {str(documento['error'])}")
+                    yield self._resultado_fallido(ruta, documento['error'], tiempo_total)
+                else:
+                    yield self._unir_documento(ruta, documento)
+
+    def _unir_documento(self, ruta: str, documento: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Une los tramos de un documento y construye las detecciones finales
+
+        Args:
+            ruta: Ruta del PDF
+            documento: Estado del documento con las salidas de todos sus tramos
+
+        Returns:
+            Resultado del documento (ver analizar())
+        """
+        tiempo_inicio = time.perf_counter()
+
+        texto_por_pagina = []
+        partes = []
+        desplazamiento = 0
+        for parte in documento['partes']:
+            # Posición global del tramo: el texto de las páginas anteriores más sus separadores
+            partes.append(desplazar_coincidencias(parte['coincidencias'], desplazamiento))
+            for texto_pagina in parte['textos']:
+                texto_por_pagina.append({'pagina': len(texto_por_pagina) + 1, 'texto': texto_pagina})
+                desplazamiento += len(texto_pagina) + len(SEPARADOR_PAGINAS)
+
+        texto_completo = SEPARADOR_PAGINAS.join(p['texto'] for p in texto_por_pagina)
+        indice_paginas = IndicePaginas(texto_por_pagina, len(SEPARADOR_PAGINAS))
+        coincidencias = unir_coincidencias(partes)
+
+        detecciones = self.analizador.construir_detecciones_agresion(
+            texto_completo, coincidencias['agresion'], indice_paginas
+        )
+        menciones = self.analizador.construir_menciones_victimas(
+            texto_completo, coincidencias['victimas'], indice_paginas
+        )
+        contradicciones = self.analizador.construir_contradicciones(
+            texto_completo, coincidencias['contradicciones'], indice_paginas
+        )
+
+        tiempo_fusion = time.perf_counter() - tiempo_inicio
+        return {
+            'ruta_pdf': ruta,
+            'texto_completo': texto_completo,
+            'texto_por_pagina': texto_por_pagina,
+            'indice_paginas': indice_paginas,
+            'num_paginas': documento['num_paginas'],
+            'metadata': documento['metadata'],
+            'exito': True,
+            'detecciones_agresion': detecciones,
+            'menciones_victimas': menciones,
+            'contradicciones': contradicciones,
+            'criterios_legales': coincidencias['criterios'],
+            'tiempos': {
+                'extraccion': sum(p['tiempos']['extraccion'] for p in documento['partes']),
+                'deteccion': sum(p['tiempos']['deteccion'] for p in documento['partes']),
+                'fusion': tiempo_fusion,
+                'total': time.perf_counter() - documento['tiempo_inicio']
+            }
+        }
+
+    @staticmethod
+    def _resultado_fallido(ruta: str, error: Exception, segundos: float) -> Dict[str, Any]:
+        """Resultado de un documento que no se pudo analizar"""
+        return {
+            'ruta_pdf': ruta,
+            'texto_completo': '',
+            'texto_por_pagina': [],
+            'indice_paginas': IndicePaginas([]),
+            'num_paginas': 0,
+            'metadata': {},
+            'exito': False,
+            'error': str(error),
+            'tiempos': {'total': segundos}
+        }
@@ -0,0 +1,231 @@
+"""
+Motores de inferencia intercambiables para WhisperTranscriber
+Todos los motores devuelven el resultado con el esquema de whisper.transcribe()
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+import logging
+
+import numpy as np
+
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+
+class MotorInferencia(ABC):
+    """
+    Interfaz común de los motores: cargar un modelo y transcribir audio decodificado
+    """
+
+    # Nombre del motor (clave en MOTORES y parte de la clave del registro de modelos)
+    nombre = ''
+
+    # True si el motor expone el modelo de openai-whisper (codificador, whisper.decode),
+    # necesario para la traducción con codificador compartido y la decodificación en lote
+    decodificacion_directa = False
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    @abstractmethod
+    def precision_por_defecto(self, dispositivo: str) -> str:
+        """
+        Precisión de los pesos cuando el usuario no la indica
+
+        Args:
+            dispositivo: 'cuda' o 'cpu'
+
+        Returns:
+            Nombre de la precisión
+        """
+
+    def normalizar_precision(self, precision: Optional[str], dispositivo: str) -> str:
+        """
+        Precisión con la que se cargarán realmente los pesos
+
+        Forma parte de la clave del registro de modelos: dos nombres que cargan el mismo
+        modelo deben normalizarse al mismo valor para no duplicarlo en memoria.
+
+        Args:
+            precision: Precisión pedida por el usuario, o None
+            dispositivo: 'cuda' o 'cpu'
+
+        Returns:
+            Nombre de la precisión
+
+        Raises:
+            ValueError: Si el motor no admite la precisión
+        """
+        return precision or self.precision_por_defecto(dispositivo)
+
+    @abstractmethod
+    def cargar(self, modelo: str, dispositivo: str, precision: str) -> Any:
+        """
+        Carga un modelo
+
+        Args:
+            modelo: Nombre del modelo (tiny, base, small, medium, large-v3)
+            dispositivo: 'cuda' o 'cpu'
+            precision: Precisión de los pesos
+
+        Returns:
+            Modelo cargado
+        """
+
+    @abstractmethod
+    def transcribir(self, modelo: Any, audio: np.ndarray, **opciones) -> Dict[str, Any]:
+        """
+        Transcribe audio decodificado a 16 kHz
+
+        Args:
+            modelo: Modelo devuelto por cargar()
+            audio: Audio mono float32 a 16 kHz
+            **opciones: Opciones con los nombres de whisper.transcribe() (task, language, fp16...)
+
+        Returns:
+            Diccionario con 'text', 'segments' y 'language'
+        """
+
+
+class MotorWhisper(MotorInferencia):
+    """
+    Motor openai-whisper (PyTorch)
+    """
+
+    nombre = 'whisper'
+    decodificacion_directa = True
+
+    # Nombres aceptados para cada precisión de los pesos
+    PRECISIONES = {
+        'fp32': 'fp32', 'float32': 'fp32',
+        'fp16': 'fp16', 'float16': 'fp16'
+    }
+
+    def precision_por_defecto(self, dispositivo: str) -> str:
+        return 'fp32'
+
+    def normalizar_precision(self, precision: Optional[str], dispositivo: str) -> str:
+        if not precision:
+            return self.precision_por_defecto(dispositivo)
+        if precision not in self.PRECISIONES:
+            raise ValueError(
+                f"Precisión no admitida por el motor whisper: {precision}. "
+                f"Opciones: {', '.join(self.PRECISIONES)}"
+            )
+        normalizada = self.PRECISIONES[precision]
+        if normalizada == 'fp16' and not dispositivo.startswith('cuda'):
+            # PyTorch no tiene kernels fp16 para CPU: se cargaría fp32 igualmente
+            self.logger.warning("La precisión fp16 solo se aplica en GPU; se usará fp32 en CPU")
+            normalizada = 'fp32'
+        return normalizada
+
+    def cargar(self, modelo: str, dispositivo: str, precision: str) -> Any:
+        import whisper
+        modelo_cargado = whisper.load_model(modelo, device=dispositivo)
+        if precision == 'fp16':
+            # Las capas de whisper convierten los pesos al tipo de la entrada, así que el
+            # modelo en fp16 sigue funcionando con transcribe(fp16=False)
+            modelo_cargado = modelo_cargado.half()
+        return modelo_cargado
+
+    def transcribir(self, modelo: Any, audio: np.ndarray, **opciones) -> Dict[str, Any]:
+        return modelo.transcribe(audio, **opciones)
+
+
+class MotorFasterWhisper(MotorInferencia):
+    """
+    Motor faster-whisper (CTranslate2), con pesos cuantizados int8 en CPU
+    """
+
+    nombre = 'faster-whisper'
+
+    # Opciones de whisper.transcribe() con otro nombre en faster-whisper
+    OPCIONES_RENOMBRADAS = {
+        'logprob_threshold': 'log_prob_threshold'
+    }
+
+    # Opciones de whisper.transcribe() que faster-whisper no admite
+    OPCIONES_IGNORADAS = {'verbose', 'fp16'}
+
+    def __init__(self):
+        super().__init__()
+        if not FASTER_WHISPER_AVAILABLE:
+            raise ImportError("faster-whisper no está instalado. Instala con: pip install faster-whisper")
+
+    def precision_por_defecto(self, dispositivo: str) -> str:
+        return 'float16' if dispositivo.startswith('cuda') else 'int8'
+
+    def cargar(self, modelo: str, dispositivo: str, precision: str) -> Any:
+        # 0 = valor por defecto de CTranslate2; los workers del pool fijan OMP_NUM_THREADS
+        hilos = int(os.getenv('OMP_NUM_THREADS', '0'))
+        return WhisperModel(modelo, device=dispositivo, compute_type=precision, cpu_threads=hilos)
+
+    def transcribir(self, modelo: Any, audio: np.ndarray, **opciones) -> Dict[str, Any]:
+        argumentos = {
+            self.OPCIONES_RENOMBRADAS.get(nombre, nombre): valor
+            for nombre, valor in opciones.items()
+            if nombre not in self.OPCIONES_IGNORADAS
+        }
+
+        segmentos_fw, info = modelo.transcribe(np.asarray(audio, dtype=np.float32), **argumentos)
+
+        # faster-whisper devuelve un generador: la transcripción ocurre al recorrerlo
+        segmentos = []
+        for segmento in segmentos_fw:
+            convertido = {
+                'id': len(segmentos),
+                'seek': segmento.seek,
+                'start': segmento.start,
+                'end': segmento.end,
+                'text': segmento.text,
+                'tokens': list(segmento.tokens),
+                'temperature': getattr(segmento, 'temperature', 0.0),
+                'avg_logprob': segmento.avg_logprob,
+                'compression_ratio': segmento.compression_ratio,
+                'no_speech_prob': segmento.no_speech_prob
+            }
+            if segmento.words:
+                convertido['words'] = [
+                    {
+                        'word': palabra.word,
+                        'start': palabra.start,
+                        'end': palabra.end,
+                        'probability': palabra.probability
+                    }
+                    for palabra in segmento.words
+                ]
+            segmentos.append(convertido)
+
+        return {
+            'text': ''.join(s['text'] for s in segmentos),
+            'segments': segmentos,
+            'language': info.language
+        }
+
+
+# Motores disponibles por nombre
+MOTORES = {
+    MotorWhisper.nombre: MotorWhisper,
+    MotorFasterWhisper.nombre: MotorFasterWhisper
+}
+
+
+def crear_motor(nombre: Optional[str] = None) -> MotorInferencia:
+    """
+    Crea un motor de inferencia por nombre
+
+    Args:
+        nombre: 'whisper' o 'faster-whisper'. Si None, 'whisper'
+
+    Returns:
+        Motor de inferencia
+    """
+    nombre = nombre or MotorWhisper.nombre
+    if nombre not in MOTORES:
+        raise ValueError(f"Motor de inferencia desconocido: {nombre}. Opciones: {', '.join(MOTORES)}")
+    return MOTORES[nombre]()
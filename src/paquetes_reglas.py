@@ -0,0 +1,444 @@
+"""
+Paquetes de reglas versionados para los analizadores de texto
+Los patrones viven en reglas/<idioma>/<paquete>.json; cada paquete se carga una vez
+por proceso, su forma compilada se guarda en disco (invalidada por el hash del archivo)
+y los analizadores pueden recargarlo en caliente sin reiniciar el proceso
+"""
+
+import os
+import re
+import json
+import pickle
+import hashlib
+import weakref
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from .motor_patrones import MotorPatrones
+from .prefiltro_literales import AHOCORASICK_AVAILABLE, PrefiltroLiterales
+
+
+# Versión del formato de los archivos de reglas que entiende este módulo
+FORMATO_PAQUETE = 1
+
+# Se incrementa cuando cambia la estructura de MotorPatrones o PrefiltroLiterales,
+# para que no se carguen formas compiladas de versiones anteriores
+VERSION_CACHE = 1
+
+CARPETA_REGLAS = str(Path(__file__).resolve().parent.parent / 'reglas')
+
+
+class PaqueteReglas:
+    """
+    Paquete de reglas cargado y compilado
+
+    Un paquete tiene uno o varios conjuntos; cada conjunto es una lista ordenada de
+    categorías (nombre, patrones y metadatos como severidad o descripción) y se
+    compila según su campo 'compilar':
+        'motor': MotorPatrones con todas las categorías, en su orden
+        'prefiltro': PrefiltroLiterales con los patrones de todas las categorías
+        'ninguno': el analizador usa los patrones directamente
+    """
+
+    def __init__(self, contenido: Dict[str, Any], ruta: str, sha256: str):
+        """
+        Valida y compila el paquete
+
+        Args:
+            contenido: JSON del archivo de reglas
+            ruta: Ruta del archivo
+            sha256: Hash del contenido del archivo
+
+        Raises:
+            ValueError: Si el paquete no tiene el formato esperado o un patrón no compila
+        """
+        self.ruta = ruta
+        self.sha256 = sha256
+
+        formato = contenido.get('formato')
+        if formato != FORMATO_PAQUETE:
+            raise ValueError(f"{ruta}: formato {formato} no soportado (se esperaba {FORMATO_PAQUETE})")
+
+        self.nombre: str = contenido['paquete']
+        self.idioma: str = contenido['idioma']
+        self.version: str = contenido.get('version', '0')
+        self.descripcion: str = contenido.get('descripcion', '')
+        self.datos: Dict[str, Any] = contenido.get('datos', {})
+        self.conjuntos: Dict[str, List[Dict[str, Any]]] = {}
+        self.compilados: Dict[str, Any] = {}
+        self._derivados: Dict[Any, Any] = {}
+
+        for nombre_conjunto, conjunto in contenido.get('conjuntos', {}).items():
+            categorias = conjunto.get('categorias', [])
+            flags = _flags(conjunto.get('flags', []), ruta)
+
+            for categoria in categorias:
+                for patron in categoria.get('patrones', []):
+                    try:
+                        re.compile(patron, flags)
+                    except re.error as e:
+                        raise ValueError(
+                            f"{ruta}: patrón inválido en {nombre_conjunto}/{categoria.get('nombre')}: "
+                            f"{patron!r} ({e})"
+                        )
+
+            self.conjuntos[nombre_conjunto] = categorias
+
+            modo = conjunto.get('compilar', 'ninguno')
+            if modo == 'motor':
+                self.compilados[nombre_conjunto] = MotorPatrones(
+                    [(c['nombre'], c['patrones']) for c in categorias],
+                    flags=flags
+                )
+            elif modo == 'prefiltro':
+                self.compilados[nombre_conjunto] = PrefiltroLiterales(
+                    [patron for c in categorias for patron in c['patrones']],
+                    flags
+                )
+            elif modo != 'ninguno':
+                raise ValueError(f"{ruta}: modo de compilación desconocido en {nombre_conjunto}: {modo}")
+
+    @property
+    def clave(self) -> Tuple[str, str]:
+        return self.idioma, self.nombre
+
+    def categorias(self, conjunto: str) -> List[Tuple[str, List[str]]]:
+        """
+        Categorías de un conjunto, en su orden
+
+        Args:
+            conjunto: Nombre del conjunto
+
+        Returns:
+            Lista de (nombre de categoría, patrones)
+        """
+        return [(c['nombre'], list(c['patrones'])) for c in self.conjuntos[conjunto]]
+
+    def metadatos(self, conjunto: str, campo: str) -> List[Tuple[str, Any]]:
+        """
+        Un campo adicional de cada categoría de un conjunto (severidad, descripción...)
+
+        Args:
+            conjunto: Nombre del conjunto
+            campo: Campo de la categoría
+
+        Returns:
+            Lista de (nombre de categoría, valor del campo o None)
+        """
+        return [(c['nombre'], c.get(campo)) for c in self.conjuntos[conjunto]]
+
+    def compilado(self, conjunto: str) -> Any:
+        """Forma compilada de un conjunto (MotorPatrones o PrefiltroLiterales)"""
+        return self.compilados[conjunto]
+
+    def derivado(self, clave: Any, crear: Callable[[], Any]) -> Any:
+        """
+        Objeto construido a partir del paquete y compartido por todos sus usuarios
+
+        Sirve para compilaciones que dependen de datos de cada analizador (por ejemplo,
+        los motores especializados por víctima). Se descartan al recargar el paquete y
+        no se guardan en la caché en disco.
+
+        Args:
+            clave: Identificador del objeto dentro del paquete
+            crear: Función que lo construye la primera vez
+
+        Returns:
+            Objeto construido
+        """
+        objeto = self._derivados.get(clave)
+        if objeto is None:
+            objeto = self._derivados[clave] = crear()
+        return objeto
+
+    def __getstate__(self) -> Dict[str, Any]:
+        estado = self.__dict__.copy()
+        estado['_derivados'] = {}
+        return estado
+
+
+class GestorPaquetesReglas:
+    """
+    Carga, cachea y recarga paquetes de reglas
+
+    Los paquetes cargados se comparten entre todas las instancias de los analizadores.
+    Su forma compilada se guarda con pickle en la carpeta de caché junto con el hash del
+    archivo JSON: si el archivo no cambia, la siguiente ejecución no vuelve a analizar
+    ni validar los patrones.
+    """
+
+    def __init__(
+        self,
+        carpeta_reglas: str = CARPETA_REGLAS,
+        carpeta_cache: Optional[str] = os.path.join('cache', 'reglas')
+    ):
+        """
+        Inicializa el gestor
+
+        Args:
+            carpeta_reglas: Carpeta con subcarpetas por idioma
+            carpeta_cache: Carpeta para las formas compiladas. Si None, no se guardan
+        """
+        self.logger = logging.getLogger(__name__)
+        self.carpeta_reglas = carpeta_reglas
+        self.carpeta_cache = carpeta_cache
+
+        self._paquetes: Dict[Tuple[str, str], PaqueteReglas] = {}
+        self._firmas: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._suscriptores: Dict[Tuple[str, str], List[Any]] = {}
+        self._lock = threading.RLock()
+        self._vigilancia: Optional[threading.Thread] = None
+        self._detener_vigilancia = threading.Event()
+
+    def _ruta(self, idioma: str, nombre: str) -> str:
+        return os.path.join(self.carpeta_reglas, idioma, f"{nombre}.json")
+
+    def _ruta_cache(self, idioma: str, nombre: str) -> Optional[str]:
+        if not self.carpeta_cache:
+            return None
+        return os.path.join(self.carpeta_cache, f"{idioma}_{nombre}.pkl")
+
+    def obtener(self, idioma: str, nombre: str) -> PaqueteReglas:
+        """
+        Devuelve un paquete, cargándolo la primera vez
+
+        Args:
+            idioma: Código de idioma (subcarpeta de reglas/)
+            nombre: Nombre del paquete (archivo sin extensión)
+
+        Returns:
+            Paquete compilado
+
+        Raises:
+            FileNotFoundError: Si el archivo de reglas no existe
+            ValueError: Si el paquete no es válido
+        """
+        clave = (idioma, nombre)
+        with self._lock:
+            paquete = self._paquetes.get(clave)
+            if paquete is None:
+                paquete, firma = self._cargar(idioma, nombre)
+                self._paquetes[clave] = paquete
+                self._firmas[clave] = firma
+            return paquete
+
+    def _cargar(self, idioma: str, nombre: str) -> Tuple[PaqueteReglas, Tuple[int, int]]:
+        """
+        Lee un paquete desde la caché compilada o desde su archivo JSON
+
+        Returns:
+            Tupla (paquete, firma (mtime, tamaño) del archivo leído)
+        """
+        ruta = self._ruta(idioma, nombre)
+        estado = os.stat(ruta)
+        with open(ruta, 'rb') as f:
+            contenido = f.read()
+        sha256 = hashlib.sha256(contenido).hexdigest()
+        firma = (estado.st_mtime_ns, estado.st_size)
+
+        paquete = self._leer_cache(idioma, nombre, sha256)
+        if paquete is not None:
+            return paquete, firma
+
+        paquete = PaqueteReglas(json.loads(contenido.decode('utf-8')), ruta, sha256)
+        if (paquete.idioma, paquete.nombre) != (idioma, nombre):
+            raise ValueError(
+                f"{ruta}: declara {paquete.idioma}/{paquete.nombre} pero está en {idioma}/{nombre}"
+            )
+
+        self._guardar_cache(paquete)
+        self.logger.info(f"Paquete de reglas {idioma}/{nombre} v{paquete.version} compilado")
+        return paquete, firma
+
+    def _leer_cache(self, idioma: str, nombre: str, sha256: str) -> Optional[PaqueteReglas]:
+        """Forma compilada guardada, si corresponde al mismo contenido del archivo"""
+        ruta_cache = self._ruta_cache(idioma, nombre)
+        if not ruta_cache or not os.path.exists(ruta_cache):
+            return None
+
+        try:
+            with open(ruta_cache, 'rb') as f:
+                entrada = pickle.load(f)
+        except Exception as e:
+            self.logger.warning(f"Caché de reglas ilegible ({ruta_cache}): {e}")
+            return None
+
+        if (
+            entrada.get('version_cache') != VERSION_CACHE
+            or entrada.get('sha256') != sha256
+            or entrada.get('acelerado') != AHOCORASICK_AVAILABLE
+        ):
+            return None
+        return entrada['paquete']
+
+    def _guardar_cache(self, paquete: PaqueteReglas):
+        """Guarda la forma compilada del paquete (escritura atómica)"""
+        ruta_cache = self._ruta_cache(paquete.idioma, paquete.nombre)
+        if not ruta_cache:
+            return
+
+        entrada = {
+            'version_cache': VERSION_CACHE,
+            'sha256': paquete.sha256,
+            'acelerado': AHOCORASICK_AVAILABLE,
+            'paquete': paquete
+        }
+        try:
+            os.makedirs(self.carpeta_cache, exist_ok=True)
+            ruta_temporal = f"{ruta_cache}.{os.getpid()}.tmp"
+            with open(ruta_temporal, 'wb') as f:
+                pickle.dump(entrada, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(ruta_temporal, ruta_cache)
+        except Exception as e:
+            self.logger.warning(f"No se pudo guardar la caché de reglas: {e}")
+
+    def suscribir(self, idioma: str, nombre: str, callback: Callable[[PaqueteReglas], None]):
+        """
+        Registra una función a la que se pasa el paquete nuevo cada vez que se recarga
+
+        Los métodos de instancia se guardan con referencia débil: suscribir un analizador
+        no impide que se libere.
+
+        Args:
+            idioma: Código de idioma del paquete
+            nombre: Nombre del paquete
+            callback: Función que recibe el PaqueteReglas recargado
+        """
+        if hasattr(callback, '__self__'):
+            referencia = weakref.WeakMethod(callback)
+        else:
+            referencia = lambda: callback
+        with self._lock:
+            self._suscriptores.setdefault((idioma, nombre), []).append(referencia)
+
+    def recargar_si_cambiaron(self) -> List[Tuple[str, str]]:
+        """
+        Recarga los paquetes cuyo archivo ha cambiado y avisa a los suscriptores
+
+        Si un paquete modificado no es válido se mantiene la versión anterior.
+
+        Returns:
+            Lista de (idioma, nombre) de los paquetes recargados
+        """
+        recargados = []
+
+        with self._lock:
+            claves = list(self._paquetes)
+
+        for clave in claves:
+            ruta = self._ruta(*clave)
+            try:
+                estado = os.stat(ruta)
+            except OSError:
+                continue
+            if (estado.st_mtime_ns, estado.st_size) == self._firmas.get(clave):
+                continue
+
+            try:
+                paquete, firma = self._cargar(*clave)
+            except Exception as e:
+                self.logger.error(f"No se recarga {clave[0]}/{clave[1]}, se mantiene la versión anterior: {e}")
+                # No volver a intentarlo hasta el próximo cambio del archivo
+                with self._lock:
+                    self._firmas[clave] = (estado.st_mtime_ns, estado.st_size)
+                continue
+
+            with self._lock:
+                anterior = self._paquetes[clave]
+                self._paquetes[clave] = paquete
+                self._firmas[clave] = firma
+                suscriptores = list(self._suscriptores.get(clave, []))
+
+            if paquete.sha256 == anterior.sha256:
+                continue
+
+            self.logger.info(
+                f"Paquete de reglas {clave[0]}/{clave[1]} recargado: v{anterior.version} -> v{paquete.version}"
+            )
+            for referencia in suscriptores:
+                callback = referencia()
+                if callback is not None:
+                    callback(paquete)
+            recargados.append(clave)
+
+        # Olvidar suscriptores ya liberados
+        with self._lock:
+            for clave, referencias in self._suscriptores.items():
+                self._suscriptores[clave] = [r for r in referencias if r() is not None]
+
+        return recargados
+
+    def vigilar(self, intervalo_s: float = 5.0) -> threading.Thread:
+        """
+        Comprueba periódicamente los archivos de reglas en un hilo en segundo plano
+
+        Las recargas se aplican entre dos análisis de un mismo analizador, pero un
+        análisis en curso en otro hilo puede ver las reglas cambiar a mitad; para
+        cambios siempre entre archivos, llamar a recargar_si_cambiaron() en el bucle.
+
+        Args:
+            intervalo_s: Segundos entre comprobaciones
+
+        Returns:
+            Hilo de vigilancia (daemon)
+        """
+        if self._vigilancia is not None and self._vigilancia.is_alive():
+            return self._vigilancia
+
+        self._detener_vigilancia.clear()
+
+        def bucle():
+            while not self._detener_vigilancia.wait(intervalo_s):
+                try:
+                    self.recargar_si_cambiaron()
+                except Exception as e:
+                    self.logger.error(f"Error vigilando reglas: {e}")
+
+        self._vigilancia = threading.Thread(target=bucle, name='vigilancia-reglas', daemon=True)
+        self._vigilancia.start()
+        return self._vigilancia
+
+    def detener_vigilancia(self):
+        """Detiene el hilo de vigilancia"""
+        self._detener_vigilancia.set()
+        if self._vigilancia is not None:
+            self._vigilancia.join()
+            self._vigilancia = None
+
+
+def _flags(nombres: List[str], ruta: str) -> int:
+    """Convierte nombres de flags de re ('IGNORECASE', 'MULTILINE'...) en su valor"""
+    flags = 0
+    for nombre in nombres:
+        flag = getattr(re, nombre, None)
+        if not isinstance(flag, re.RegexFlag):
+            raise ValueError(f"{ruta}: flag de re desconocido: {nombre}")
+        flags |= flag
+    return flags
+
+
+_gestor_global: Optional[GestorPaquetesReglas] = None
+_lock_global = threading.Lock()
+
+
+def obtener_gestor_reglas() -> GestorPaquetesReglas:
+    """
+    Devuelve el gestor de paquetes de reglas del proceso
+
+    Las carpetas se configuran con WHISPER_REGLAS (por defecto reglas/ del proyecto)
+    y WHISPER_CACHE_REGLAS (por defecto cache/reglas)
+
+    Returns:
+        Gestor compartido
+    """
+    global _gestor_global
+
+    with _lock_global:
+        if _gestor_global is None:
+            _gestor_global = GestorPaquetesReglas(
+                carpeta_reglas=os.getenv('WHISPER_REGLAS', CARPETA_REGLAS),
+                carpeta_cache=os.getenv('WHISPER_CACHE_REGLAS', os.path.join('cache', 'reglas'))
+            )
+        return _gestor_global
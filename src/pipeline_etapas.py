@@ -0,0 +1,192 @@
+"""
+Pipeline de etapas concurrentes con colas acotadas
+Cada etapa se ejecuta en su propio hilo, de modo que el elemento i+1 puede estar en
+una etapa mientras el elemento i está en la siguiente
+"""
+
+import time
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+
+# Marca de fin de flujo entre etapas
+_FIN = object()
+
+
+class PipelineEtapas:
+    """
+    Encadena funciones (una por etapa) con colas acotadas y mide el tiempo de cada etapa
+    """
+
+    def __init__(
+        self,
+        etapas: List[Tuple[str, Callable[[Any], Any]]],
+        capacidad_cola: int = 1
+    ):
+        """
+        Inicializa el pipeline
+
+        Args:
+            etapas: Lista de (nombre, función). Cada función recibe la salida de la anterior
+            capacidad_cola: Elementos máximos en espera entre dos etapas (limita la memoria)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.etapas = etapas
+        self.capacidad_cola = max(1, capacidad_cola)
+        self.tiempos: Dict[str, Dict[str, float]] = {}
+        self.tiempo_total = 0.0
+
+    def ejecutar(
+        self,
+        elementos: Iterable[Any]
+    ) -> Iterator[Tuple[Any, Optional[Any], Optional[Exception]]]:
+        """
+        Procesa los elementos a través de todas las etapas
+
+        Si una etapa falla para un elemento, las etapas siguientes lo dejan pasar sin procesarlo.
+
+        Args:
+            elementos: Entradas de la primera etapa
+
+        Returns:
+            Iterador de tuplas (elemento, resultado de la última etapa, error) en orden de entrada
+        """
+        self.tiempos = {
+            nombre: {'ocupado_s': 0.0, 'espera_s': 0.0, 'elementos': 0}
+            for nombre, _ in self.etapas
+        }
+
+        colas = [queue.Queue(maxsize=self.capacidad_cola) for _ in range(len(self.etapas) + 1)]
+        detener = threading.Event()
+
+        hilos = [
+            threading.Thread(
+                target=self._ejecutar_etapa,
+                args=(nombre, funcion, colas[i], colas[i + 1], detener),
+                name=f"etapa-{nombre}",
+                daemon=True
+            )
+            for i, (nombre, funcion) in enumerate(self.etapas)
+        ]
+        alimentador = threading.Thread(
+            target=self._alimentar,
+            args=(elementos, colas[0], detener),
+            name="etapa-entrada",
+            daemon=True
+        )
+
+        tiempo_inicio = time.time()
+        alimentador.start()
+        for hilo in hilos:
+            hilo.start()
+
+        try:
+            while True:
+                item = colas[-1].get()
+                if item is _FIN:
+                    break
+                yield item
+        finally:
+            detener.set()
+            # Vaciar colas para desbloquear etapas si el consumidor se detuvo antes de tiempo
+            for cola in colas:
+                while not cola.empty():
+                    try:
+                        cola.get_nowait()
+                    except queue.Empty:
+                        break
+            alimentador.join(timeout=1)
+            for hilo in hilos:
+                hilo.join(timeout=1)
+            self.tiempo_total = time.time() - tiempo_inicio
+
+    def _alimentar(self, elementos: Iterable[Any], salida: queue.Queue, detener: threading.Event):
+        """Introduce los elementos en la primera cola"""
+        for elemento in elementos:
+            if detener.is_set():
+                break
+            self._poner(salida, (elemento, elemento, None), detener)
+        self._poner(salida, _FIN, detener)
+
+    def _ejecutar_etapa(
+        self,
+        nombre: str,
+        funcion: Callable[[Any], Any],
+        entrada: queue.Queue,
+        salida: queue.Queue,
+        detener: threading.Event
+    ):
+        """Bucle de una etapa: toma un elemento, lo procesa y lo pasa a la siguiente cola"""
+        tiempos = self.tiempos[nombre]
+
+        while not detener.is_set():
+            inicio_espera = time.time()
+            try:
+                item = entrada.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            finally:
+                tiempos['espera_s'] += time.time() - inicio_espera
+
+            if item is _FIN:
+                self._poner(salida, _FIN, detener)
+                return
+
+            elemento, valor, error = item
+            if error is None:
+                inicio = time.time()
+                try:
+                    valor = funcion(valor)
+                except Exception as e:
+                    self.logger.error(f"Error en etapa '{nombre}': {str(e)}")
+                    valor, error = None, e
+                tiempos['ocupado_s'] += time.time() - inicio
+                tiempos['elementos'] += 1
+
+            self._poner(salida, (elemento, valor, error), detener)
+
+    def _poner(self, cola: queue.Queue, item: Any, detener: threading.Event):
+        """Pone un elemento en una cola acotada sin bloquearse si el pipeline se detiene"""
+        while not detener.is_set():
+            try:
+                cola.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def resumen_tiempos(self) -> List[Dict[str, Any]]:
+        """
+        Tiempo ocupado y en espera de cada etapa en la última ejecución
+
+        Returns:
+            Lista de diccionarios por etapa, en orden del pipeline
+        """
+        return [
+            {
+                'etapa': nombre,
+                'elementos': int(t['elementos']),
+                'ocupado_s': t['ocupado_s'],
+                'espera_s': t['espera_s'],
+                'promedio_s': t['ocupado_s'] / t['elementos'] if t['elementos'] else 0.0
+            }
+            for nombre, t in self.tiempos.items()
+        ]
+
+    def registrar_resumen(self):
+        """Escribe en el log el tiempo de cada etapa y la etapa cuello de botella"""
+        resumen = self.resumen_tiempos()
+        if not resumen:
+            return
+
+        self.logger.info("Tiempos por etapa del pipeline:")
+        for etapa in resumen:
+            self.logger.info(
+                f"  {etapa['etapa']:<20} {etapa['ocupado_s']:8.2f} s ocupada, "
+                f"{etapa['espera_s']:8.2f} s esperando, "
+                f"{etapa['promedio_s']:.2f} s por elemento ({etapa['elementos']} elementos)"
+            )
+
+        cuello = max(resumen, key=lambda e: e['ocupado_s'])
+        self.logger.info(f"Cuello de botella: etapa '{cuello['etapa']}' ({cuello['ocupado_s']:.2f} s ocupada)")
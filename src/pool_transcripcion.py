@@ -0,0 +1,218 @@
+"""
+Pool de procesos para transcribir varios archivos en paralelo
+Cada proceso mantiene su propia copia del modelo y un número fijo de hilos de PyTorch
+"""
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+
+# Transcriptor del proceso worker (uno por proceso, creado en el inicializador)
+_transcriptor_worker = None
+
+
+def _inicializar_worker(modelo: str, dispositivo: Optional[str], hilos: int, motor: str = 'whisper'):
+    """
+    Inicializa un proceso worker: limita los hilos de PyTorch y carga el modelo
+
+    Args:
+        modelo: Nombre del modelo Whisper
+        dispositivo: 'cuda', 'cpu' o None para detección automática
+        hilos: Hilos de PyTorch para este worker
+        motor: Motor de inferencia ('whisper' o 'faster-whisper')
+    """
+    global _transcriptor_worker
+
+    # OMP_NUM_THREADS lo usa CTranslate2 (faster-whisper); PyTorch se limita explícitamente
+    os.environ['OMP_NUM_THREADS'] = str(hilos)
+    import torch
+    torch.set_num_threads(hilos)
+
+    from .transcriber import WhisperTranscriber
+    _transcriptor_worker = WhisperTranscriber(modelo=modelo, dispositivo=dispositivo, motor=motor)
+
+
+def _transcribir_en_worker(
+    ruta_audio: str,
+    idioma: Optional[str],
+    opciones: Dict[str, Any]
+) -> Tuple[Dict[str, Any], float]:
+    """
+    Transcribe un archivo en el proceso worker
+
+    Args:
+        ruta_audio: Ruta al archivo de audio
+        idioma: Código de idioma o None
+        opciones: Argumentos adicionales para WhisperTranscriber.transcribir()
+
+    Returns:
+        Tupla (resultado de Whisper, segundos de transcripción)
+    """
+    tiempo_inicio = time.time()
+    resultado = _transcriptor_worker.transcribir(ruta_audio, idioma=idioma, **opciones)
+    return resultado, time.time() - tiempo_inicio
+
+
+def _transcribir_fragmento_en_worker(
+    ruta_audio: str,
+    inicio: int,
+    fin: int,
+    idioma: Optional[str],
+    opciones: Dict[str, Any]
+) -> Tuple[Dict[str, Any], float]:
+    """
+    Transcribe un fragmento [inicio, fin) del audio decodificado de un archivo
+
+    El worker lee el fragmento del buffer mapeado en memoria de la caché de audio,
+    así que el audio no se copia entre procesos.
+
+    Args:
+        ruta_audio: Ruta al archivo de audio (ya decodificado en la caché)
+        inicio: Primera muestra del fragmento
+        fin: Muestra final del fragmento (exclusiva)
+        idioma: Código de idioma o None
+        opciones: Argumentos adicionales para WhisperTranscriber.transcribir()
+
+    Returns:
+        Tupla (resultado de Whisper con tiempos relativos al fragmento, segundos)
+    """
+    tiempo_inicio = time.time()
+    audio = _transcriptor_worker.cache_audio.obtener(ruta_audio)[inicio:fin]
+    resultado = _transcriptor_worker.transcribir(
+        ruta_audio, idioma=idioma, audio=audio, usar_cache=False, **opciones
+    )
+    return resultado, time.time() - tiempo_inicio
+
+
+class PoolTranscripcion:
+    """
+    Ejecuta N transcriptores en procesos separados y entrega los resultados según terminan
+    """
+
+    def __init__(
+        self,
+        modelo: str = 'base',
+        num_workers: int = 2,
+        hilos_por_worker: Optional[int] = None,
+        dispositivo: Optional[str] = None,
+        motor: str = 'whisper'
+    ):
+        """
+        Inicializa el pool (los procesos se crean al entrar en el contexto)
+
+        Args:
+            modelo: Nombre del modelo Whisper
+            num_workers: Número de procesos transcriptores
+            hilos_por_worker: Hilos de PyTorch por proceso. Si None, reparte los núcleos
+            dispositivo: 'cuda', 'cpu' o None para detección automática
+            motor: Motor de inferencia ('whisper' o 'faster-whisper')
+        """
+        self.logger = logging.getLogger(__name__)
+        self.modelo = modelo
+        self.num_workers = max(1, num_workers)
+        self.hilos_por_worker = hilos_por_worker or max(1, (os.cpu_count() or 1) // self.num_workers)
+        self.dispositivo = dispositivo
+        self.motor = motor
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'PoolTranscripcion':
+        self.iniciar()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
+
+    def iniciar(self):
+        """Arranca los procesos worker"""
+        if self._executor is not None:
+            return
+
+        self.logger.info(
+            f"Iniciando pool de transcripción: {self.num_workers} workers, "
+            f"{self.hilos_por_worker} hilos por worker, modelo {self.modelo} ({self.motor})"
+        )
+        # spawn evita heredar estado de CUDA/PyTorch del proceso padre
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_inicializar_worker,
+            initargs=(self.modelo, self.dispositivo, self.hilos_por_worker, self.motor)
+        )
+
+    def cerrar(self):
+        """Detiene los procesos worker"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def transcribir(
+        self,
+        rutas_audio: List[str],
+        idioma: Optional[str] = None,
+        **opciones
+    ) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception], float]]:
+        """
+        Transcribe varios archivos en paralelo
+
+        Args:
+            rutas_audio: Rutas de los archivos de audio
+            idioma: Código de idioma o None para detección automática
+            **opciones: Argumentos adicionales para WhisperTranscriber.transcribir()
+
+        Returns:
+            Iterador de tuplas (ruta, resultado, error, segundos) en orden de finalización.
+            Si la transcripción falla, resultado es None y error contiene la excepción
+        """
+        self.iniciar()
+
+        futuros = {
+            self._executor.submit(_transcribir_en_worker, ruta, idioma, opciones): ruta
+            for ruta in rutas_audio
+        }
+
+        for futuro in as_completed(futuros):
+            ruta = futuros[futuro]
+            try:
+                resultado, segundos = futuro.result()
+                yield ruta, resultado, None, segundos
+            except Exception as e:
+                yield ruta, None, e, 0.0
+
+    def transcribir_fragmentos(
+        self,
+        ruta_audio: str,
+        fragmentos: List[Tuple[int, int]],
+        idioma: Optional[str] = None,
+        **opciones
+    ) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[Exception], float]]:
+        """
+        Transcribe en paralelo varios fragmentos de un mismo archivo
+
+        Args:
+            ruta_audio: Ruta al archivo de audio
+            fragmentos: Lista de (inicio, fin) en muestras a 16 kHz
+            idioma: Código de idioma o None para detección automática
+            **opciones: Argumentos adicionales para WhisperTranscriber.transcribir()
+
+        Returns:
+            Iterador de tuplas (índice del fragmento, resultado, error, segundos)
+            en orden de finalización
+        """
+        self.iniciar()
+
+        futuros = {
+            self._executor.submit(_transcribir_fragmento_en_worker, ruta_audio, inicio, fin, idioma, opciones): i
+            for i, (inicio, fin) in enumerate(fragmentos)
+        }
+
+        for futuro in as_completed(futuros):
+            indice = futuros[futuro]
+            try:
+                resultado, segundos = futuro.result()
+                yield indice, resultado, None, segundos
+            except Exception as e:
+                yield indice, None, e, 0.0
@@ -0,0 +1,413 @@
+"""
+Prefiltro de literales para los analizadores basados en expresiones regulares
+Extrae de cada patrón las palabras que toda coincidencia tiene que contener y las busca
+todas a la vez con un autómata Aho-Corasick; las expresiones completas solo se evalúan
+en los textos (o tramos de texto) donde aparece alguno de sus literales
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    import re._parser as _parser_re
+except ImportError:  # Python < 3.11
+    import sre_parse as _parser_re
+
+try:
+    from re._casefix import _EXTRA_CASES as _CASOS_EXTRA
+except ImportError:  # Python < 3.11
+    try:
+        from sre_compile import _equivalences as _equivalencias
+        _CASOS_EXTRA = {
+            c: tuple(o for o in clase if o != c) for clase in _equivalencias for c in clase
+        }
+    except ImportError:
+        _CASOS_EXTRA = {}
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# Equivalencias adicionales de IGNORECASE (i/ı, s/ſ, µ/μ...): cada carácter se lleva
+# al menor de su clase para que el plegado coincida con lo que acepta re
+_EQUIVALENCIAS = {
+    c: min((c,) + otros) for c, otros in _CASOS_EXTRA.items() if min((c,) + otros) != c
+}
+
+
+def plegar_mayusculas(texto: str) -> str:
+    """
+    Pasa el texto a minúsculas conservando su longitud
+
+    Dos caracteres que re.IGNORECASE considera iguales quedan iguales tras el plegado,
+    y las posiciones del texto plegado son las del original.
+
+    Args:
+        texto: Texto original
+
+    Returns:
+        Texto plegado, de la misma longitud
+    """
+    plegado = texto.lower()
+    if len(plegado) != len(texto):
+        # lower() expande algunos caracteres ('İ' -> 'i̇'); se toma su minúscula simple
+        plegado = ''.join(c.lower()[0] for c in texto)
+    return plegado.translate(_EQUIVALENCIAS) if _EQUIVALENCIAS else plegado
+
+
+class AutomataAhoCorasick:
+    """
+    Búsqueda simultánea de un conjunto de palabras en una sola pasada por el texto
+
+    Usa pyahocorasick si está instalado; si no, una implementación en Python puro.
+    """
+
+    def __init__(self, palabras: Iterable[str], acelerado: Optional[bool] = None):
+        """
+        Construye el autómata
+
+        Args:
+            palabras: Palabras a buscar (se ignoran las vacías)
+            acelerado: Usar pyahocorasick. Si None, se usa cuando está disponible
+        """
+        self.palabras = sorted({p for p in palabras if p})
+        self.acelerado = AHOCORASICK_AVAILABLE if acelerado is None else acelerado and AHOCORASICK_AVAILABLE
+
+        if self.acelerado:
+            self._automata = ahocorasick.Automaton()
+            for palabra in self.palabras:
+                self._automata.add_word(palabra, palabra)
+            if self.palabras:
+                self._automata.make_automaton()
+        else:
+            self._construir()
+
+    def _construir(self):
+        """Construye las tablas de transición, fallo y salida del autómata en Python"""
+        self._transiciones: List[Dict[str, int]] = [{}]
+        self._salidas: List[List[str]] = [[]]
+
+        for palabra in self.palabras:
+            estado = 0
+            for caracter in palabra:
+                siguiente = self._transiciones[estado].get(caracter)
+                if siguiente is None:
+                    siguiente = len(self._transiciones)
+                    self._transiciones[estado][caracter] = siguiente
+                    self._transiciones.append({})
+                    self._salidas.append([])
+                estado = siguiente
+            self._salidas[estado].append(palabra)
+
+        # Enlaces de fallo en anchura: el sufijo propio más largo que también es prefijo
+        self._fallos = [0] * len(self._transiciones)
+        cola = list(self._transiciones[0].values())
+        for estado in cola:
+            for caracter, siguiente in self._transiciones[estado].items():
+                cola.append(siguiente)
+                fallo = self._fallos[estado]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallos[fallo]
+                destino = self._transiciones[fallo].get(caracter, 0)
+                self._fallos[siguiente] = destino if destino != siguiente else 0
+                self._salidas[siguiente] = self._salidas[siguiente] + self._salidas[self._fallos[siguiente]]
+
+    def buscar(self, texto: str) -> Iterator[Tuple[int, str]]:
+        """
+        Todas las apariciones de las palabras en el texto, incluidas las solapadas
+
+        Args:
+            texto: Texto a recorrer
+
+        Returns:
+            Iterador de (posición de inicio, palabra) en orden de fin de la aparición
+        """
+        if not self.palabras:
+            return
+
+        if self.acelerado:
+            for fin, palabra in self._automata.iter(texto):
+                yield fin - len(palabra) + 1, palabra
+            return
+
+        transiciones, fallos, salidas = self._transiciones, self._fallos, self._salidas
+        estado = 0
+        for posicion, caracter in enumerate(texto):
+            while estado and caracter not in transiciones[estado]:
+                estado = fallos[estado]
+            estado = transiciones[estado].get(caracter, 0)
+            for palabra in salidas[estado]:
+                yield posicion - len(palabra) + 1, palabra
+
+    def presentes(self, texto: str) -> Set[str]:
+        """
+        Palabras que aparecen al menos una vez en el texto
+
+        Args:
+            texto: Texto a recorrer
+
+        Returns:
+            Conjunto de palabras encontradas
+        """
+        return {palabra for _, palabra in self.buscar(texto)}
+
+
+class PrefiltroLiterales:
+    """
+    Prefiltro para una lista de patrones
+
+    Cada patrón queda asociado a un conjunto de literales alternativos: toda coincidencia
+    del patrón contiene al menos uno. Los patrones de los que no se puede extraer ninguno
+    (clases como \\w, partes opcionales...) se consideran siempre candidatos.
+    """
+
+    def __init__(self, patrones: Sequence[str], flags: int = 0, acelerado: Optional[bool] = None):
+        """
+        Analiza los patrones y construye el autómata
+
+        Args:
+            patrones: Expresiones regulares, en el orden en que se evaluarán
+            flags: Flags con que se compilan las expresiones. Con IGNORECASE los
+                   literales y el texto se comparan plegados a minúsculas
+            acelerado: Usar pyahocorasick (ver AutomataAhoCorasick)
+        """
+        self.patrones = list(patrones)
+        self.compilados = [re.compile(patron, flags) for patron in self.patrones]
+        self._plegar = bool(flags & re.IGNORECASE)
+
+        arboles = [_analizar(patron, flags) for patron in self.patrones]
+        self.literales: List[Optional[FrozenSet[str]]] = []
+        for arbol in arboles:
+            literales = _literales_de_secuencia(arbol) if arbol is not None else None
+            if literales is not None and self._plegar:
+                literales = frozenset(plegar_mayusculas(l) for l in literales)
+            self.literales.append(literales)
+
+        self._patrones_por_literal: Dict[str, List[int]] = {}
+        for indice, literales in enumerate(self.literales):
+            for literal in literales or ():
+                self._patrones_por_literal.setdefault(literal, []).append(indice)
+        self._siempre = [i for i, literales in enumerate(self.literales) if literales is None]
+
+        self.automata = AutomataAhoCorasick(self._patrones_por_literal, acelerado)
+
+        # Caracteres que alguna coincidencia puede contener: cualquier otro carácter
+        # separa el texto en tramos que ninguna coincidencia puede atravesar
+        caracteres: Set[str] = set()
+        espacios = False
+        self._tramos: Optional[re.Pattern] = None
+        posibles = [_caracteres_posibles(arbol) if arbol is not None else None for arbol in arboles]
+        if self.patrones and all(p is not None for p in posibles):
+            for literales_patron, espacios_patron in posibles:
+                caracteres |= literales_patron
+                espacios = espacios or espacios_patron
+            clase = re.escape(''.join(sorted(caracteres))) + (r'\s' if espacios else '')
+            if clase:
+                self._tramos = re.compile(f"[{clase}]+", flags)
+
+    def _normalizar(self, texto: str) -> str:
+        return plegar_mayusculas(texto) if self._plegar else texto
+
+    def candidatos(self, texto: str) -> Set[int]:
+        """
+        Índices de los patrones que pueden coincidir en el texto
+
+        Args:
+            texto: Texto a analizar (el mismo que recibirán las expresiones)
+
+        Returns:
+            Conjunto de índices en self.patrones
+        """
+        indices = set(self._siempre)
+        for literal in self.automata.presentes(self._normalizar(texto)):
+            indices.update(self._patrones_por_literal[literal])
+        return indices
+
+    def ventanas(self, texto: str) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Tramos del texto en los que hay que evaluar cada patrón
+
+        Un tramo es una zona sin caracteres que los patrones no puedan contener, con
+        un carácter de margen a cada lado para que \\b y similares vean sus vecinos.
+        Evaluar un patrón con finditer(texto, inicio, fin) en cada uno de sus tramos
+        da las mismas coincidencias que evaluarlo sobre el texto entero.
+
+        Args:
+            texto: Texto a analizar (el mismo que recibirán las expresiones)
+
+        Returns:
+            Diccionario índice de patrón -> lista ordenada de (inicio, fin). Los patrones
+            sin literales en el texto no aparecen
+        """
+        longitud = len(texto)
+        resultado: Dict[int, List[Tuple[int, int]]] = {i: [(0, longitud)] for i in self._siempre}
+
+        aciertos = list(self.automata.buscar(self._normalizar(texto)))
+        if not aciertos:
+            return resultado
+
+        if self._tramos is None:
+            for _, literal in aciertos:
+                for indice in self._patrones_por_literal[literal]:
+                    resultado[indice] = [(0, longitud)]
+            return resultado
+
+        # Tramo que contiene cada acierto; un literal siempre cae dentro de un tramo
+        inicios, fines = [], []
+        for m in self._tramos.finditer(texto):
+            inicios.append(m.start())
+            fines.append(m.end())
+
+        tramos_por_patron: Dict[int, Set[int]] = {}
+        for posicion, literal in aciertos:
+            tramo = bisect_right(inicios, posicion) - 1
+            if tramo < 0 or fines[tramo] < posicion + len(literal):
+                continue
+            for indice in self._patrones_por_literal[literal]:
+                tramos_por_patron.setdefault(indice, set()).add(tramo)
+
+        for indice, tramos in tramos_por_patron.items():
+            resultado[indice] = [
+                (max(0, inicios[t] - 1), min(longitud, fines[t] + 1)) for t in sorted(tramos)
+            ]
+        return resultado
+
+    def coincidencias(self, texto: str) -> List[List[re.Match]]:
+        """
+        Coincidencias de cada patrón, evaluando solo en sus ventanas
+
+        Equivale a [list(re.finditer(p, texto, flags)) for p in patrones].
+
+        Args:
+            texto: Texto a analizar
+
+        Returns:
+            Lista, en el orden de self.patrones, con las coincidencias de cada patrón
+        """
+        ventanas = self.ventanas(texto)
+        return [
+            [m for inicio, fin in ventanas.get(indice, ()) for m in compilado.finditer(texto, inicio, fin)]
+            for indice, compilado in enumerate(self.compilados)
+        ]
+
+
+def _analizar(patron: str, flags: int):
+    """Árbol de sre_parse del patrón, o None si no se puede analizar"""
+    try:
+        return list(_parser_re.parse(patron, flags))
+    except Exception:
+        return None
+
+
+def literales_requeridos(patron: str, flags: int = 0) -> Optional[FrozenSet[str]]:
+    """
+    Literales alternativos que toda coincidencia del patrón contiene
+
+    Args:
+        patron: Expresión regular
+        flags: Flags de compilación
+
+    Returns:
+        Conjunto de literales (basta con que aparezca uno), o None si no se puede acotar
+    """
+    arbol = _analizar(patron, flags)
+    return _literales_de_secuencia(arbol) if arbol is not None else None
+
+
+def _mejor(a: Optional[FrozenSet[str]], b: Optional[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    """El conjunto más selectivo: el de literal más corto más largo y, a igualdad, el menor"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    clave_a = (min(map(len, a)), -len(a))
+    clave_b = (min(map(len, b)), -len(b))
+    return b if clave_b > clave_a else a
+
+
+def _literales_de_secuencia(elementos) -> Optional[FrozenSet[str]]:
+    """Literales requeridos de una secuencia del árbol de sre_parse"""
+    mejor: Optional[FrozenSet[str]] = None
+    tramo: List[str] = []
+
+    for operacion, argumento in elementos:
+        nombre = str(operacion)
+
+        if nombre == 'LITERAL':
+            tramo.append(chr(argumento))
+            continue
+        if nombre == 'AT':
+            # Las anclas no consumen caracteres: el literal sigue siendo contiguo
+            continue
+
+        if tramo:
+            mejor = _mejor(mejor, frozenset([''.join(tramo)]))
+            tramo = []
+
+        if nombre == 'SUBPATTERN':
+            mejor = _mejor(mejor, _literales_de_secuencia(list(argumento[-1])))
+        elif nombre == 'BRANCH':
+            ramas = [_literales_de_secuencia(list(rama)) for rama in argumento[1]]
+            if all(ramas):
+                mejor = _mejor(mejor, frozenset().union(*ramas))
+        elif nombre in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT') and argumento[0] >= 1:
+            mejor = _mejor(mejor, _literales_de_secuencia(list(argumento[2])))
+
+    if tramo:
+        mejor = _mejor(mejor, frozenset([''.join(tramo)]))
+    return mejor
+
+
+def _caracteres_posibles(elementos) -> Optional[Tuple[Set[str], bool]]:
+    """
+    Caracteres que puede consumir una secuencia del árbol de sre_parse
+
+    Returns:
+        (caracteres literales, si admite espacios en blanco), o None si la secuencia
+        admite otras clases (\\w, ., negaciones...) o contiene aserciones
+    """
+    caracteres: Set[str] = set()
+    espacios = False
+
+    for operacion, argumento in elementos:
+        nombre = str(operacion)
+
+        if nombre == 'AT':
+            continue
+        if nombre == 'LITERAL':
+            caracteres.add(chr(argumento))
+            continue
+
+        if nombre == 'SUBPATTERN':
+            partes = [list(argumento[-1])]
+        elif nombre == 'BRANCH':
+            partes = [list(rama) for rama in argumento[1]]
+        elif nombre in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            partes = [list(argumento[2])]
+        elif nombre == 'IN':
+            for operacion_clase, valor in argumento:
+                clase = str(operacion_clase)
+                if clase == 'LITERAL':
+                    caracteres.add(chr(valor))
+                elif clase == 'RANGE' and valor[1] - valor[0] < 64:
+                    caracteres.update(chr(c) for c in range(valor[0], valor[1] + 1))
+                elif clase == 'CATEGORY' and str(valor) == 'CATEGORY_SPACE':
+                    espacios = True
+                else:
+                    return None
+            continue
+        else:
+            return None
+
+        for parte in partes:
+            posibles = _caracteres_posibles(parte)
+            if posibles is None:
+                return None
+            caracteres |= posibles[0]
+            espacios = espacios or posibles[1]
+
+    return caracteres, espacios
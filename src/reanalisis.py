@@ -0,0 +1,331 @@
+"""
+Manifiesto de análisis para el reanálisis incremental de transcripciones
+Por cada audio analizado se guarda la clave de su transcripción en la caché de
+transcripciones y el análisis de voz, junto con los hashes de la transcripción y de las
+reglas con que se generó su informe único; reanalizar.py regenera solo los informes cuyas
+reglas o transcripción han cambiado
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+import logging
+
+from .generador_informe_unico import GeneradorInformeUnico
+from .cache_transcripciones import CacheTranscripciones, obtener_cache_transcripciones
+
+
+class ManifiestoAnalisis:
+    """
+    Índice de los audios analizados y de los informes generados a partir de ellos
+
+    indice/<clave>.json guarda por audio los hashes y la ruta del informe (un archivo por
+    audio, de modo que registrar uno no reescribe el de los demás); entradas/<clave>.json
+    guarda el análisis de voz y la clave de la transcripción en CacheTranscripciones.
+    """
+
+    def __init__(
+        self,
+        carpeta: str = os.path.join('cache', 'analisis'),
+        cache_transcripciones: Optional[CacheTranscripciones] = None
+    ):
+        """
+        Inicializa el manifiesto
+
+        Args:
+            carpeta: Carpeta del índice y de las entradas
+            cache_transcripciones: Caché de donde se leen las transcripciones. Si None, la del proceso
+        """
+        self.logger = logging.getLogger(__name__)
+        self.carpeta = carpeta
+        self.cache_transcripciones = cache_transcripciones or obtener_cache_transcripciones()
+        self._lock = threading.Lock()
+
+    @property
+    def carpeta_indice(self) -> str:
+        return os.path.join(self.carpeta, 'indice')
+
+    def _ruta_indice(self, clave: str) -> str:
+        return os.path.join(self.carpeta_indice, f"{clave}.json")
+
+    def _ruta_entrada(self, clave: str) -> str:
+        return os.path.join(self.carpeta, 'entradas', f"{clave}.json")
+
+    @staticmethod
+    def calcular_clave(archivo_audio: str) -> str:
+        """Clave de un audio: hash de su ruta absoluta"""
+        return hashlib.sha256(os.path.abspath(archivo_audio).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_transcripcion(resultado: Dict[str, Any]) -> str:
+        """Hash del contenido de una transcripción (el mismo con el que la caché la indexa)"""
+        return CacheTranscripciones.hash_contenido(resultado)
+
+    def entradas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Índice completo
+
+        Returns:
+            Diccionario clave -> {'archivo_audio', 'carpeta_salida', 'hash_transcripcion',
+            'clave_transcripcion', 'informe': {'ruta', 'hash_transcripcion', 'huella_reglas', 'fecha'}}
+        """
+        if not os.path.isdir(self.carpeta_indice):
+            return {}
+
+        indice = {}
+        for nombre in sorted(os.listdir(self.carpeta_indice)):
+            if not nombre.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.carpeta_indice, nombre), 'r', encoding='utf-8') as f:
+                    indice[nombre[:-5]] = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                self.logger.warning(f"Entrada del índice de análisis ilegible ({nombre}): {e}")
+        return indice
+
+    def claves_transcripcion(self) -> Set[str]:
+        """
+        Claves de la caché de transcripciones que usan las entradas registradas
+
+        La poda y la invalidación de la caché deben conservarlas para que reanalizar.py
+        pueda cargarlas.
+
+        Returns:
+            Conjunto de claves
+        """
+        claves = set()
+        for clave, info in self.entradas().items():
+            clave_transcripcion = info.get('clave_transcripcion')
+            if not clave_transcripcion:
+                # Índices anteriores sin la clave: se lee de la entrada
+                try:
+                    with open(self._ruta_entrada(clave), 'r', encoding='utf-8') as f:
+                        clave_transcripcion = json.load(f).get('clave_transcripcion')
+                except (OSError, json.JSONDecodeError):
+                    continue
+            if clave_transcripcion:
+                claves.add(clave_transcripcion)
+        return claves
+
+    def cargar(self, clave: str) -> Optional[Dict[str, Any]]:
+        """
+        Datos guardados de un audio
+
+        Args:
+            clave: Clave del audio en el índice
+
+        Returns:
+            Diccionario con 'archivo_audio', 'resultado' y 'analisis_voz', o None si la
+            entrada no se puede leer o su transcripción ya no está en la caché
+        """
+        try:
+            with open(self._ruta_entrada(clave), 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Entrada de análisis ilegible ({clave[:12]}): {e}")
+            return None
+
+        resultado = self.cache_transcripciones.obtener(datos.get('clave_transcripcion', ''))
+        if resultado is None:
+            self.logger.warning(
+                f"La transcripción de {os.path.basename(datos.get('archivo_audio', ''))} ya no está "
+                f"en la caché de transcripciones; vuelve a transcribir el audio"
+            )
+            return None
+        datos['resultado'] = resultado
+        return datos
+
+    def registrar(
+        self,
+        archivo_audio: str,
+        resultado: Dict[str, Any],
+        analisis_voz: List[Dict[str, Any]],
+        carpeta_salida: str,
+        ruta_informe: str,
+        huella_reglas: str
+    ) -> str:
+        """
+        Guarda los datos de un audio recién transcrito y el informe generado con ellos
+
+        La transcripción no se copia: se guarda su clave en la caché de transcripciones,
+        que se busca por el hash de su contenido. Solo si no estaba en caché (transcrita con
+        usar_cache=False) se añade a la caché, con ese hash como clave.
+
+        Args:
+            archivo_audio: Ruta al archivo de audio
+            resultado: Resultado de Whisper
+            analisis_voz: Salida de VoiceStressDetector.analizar_audio()
+            carpeta_salida: Carpeta donde se guardó el informe
+            ruta_informe: Ruta del informe único generado
+            huella_reglas: Huella de las reglas de análisis (AnalizadorUnificado.huella_reglas())
+
+        Returns:
+            Clave del audio
+        """
+        clave = self.calcular_clave(archivo_audio)
+        hash_transcripcion = self.hash_transcripcion(resultado)
+
+        clave_transcripcion = self.cache_transcripciones.clave_por_contenido(hash_transcripcion)
+        if not clave_transcripcion:
+            clave_transcripcion = hash_transcripcion
+            metadatos = {'archivo': os.path.basename(archivo_audio), 'origen': 'reanalisis'}
+            if self.cache_transcripciones.guardar(clave_transcripcion, resultado, metadatos) is None:
+                raise OSError("No se pudo guardar la transcripción en la caché de transcripciones")
+
+        _escribir_json(self._ruta_entrada(clave), {
+            'archivo_audio': archivo_audio,
+            'fecha': datetime.now().isoformat(),
+            'clave_transcripcion': clave_transcripcion,
+            'analisis_voz': analisis_voz
+        })
+
+        _escribir_json(self._ruta_indice(clave), {
+            'archivo_audio': archivo_audio,
+            'carpeta_salida': carpeta_salida,
+            'hash_transcripcion': hash_transcripcion,
+            'clave_transcripcion': clave_transcripcion,
+            'informe': _descripcion_informe(ruta_informe, hash_transcripcion, huella_reglas)
+        }, indentar=True)
+        return clave
+
+    def registrar_informe(self, clave: str, ruta_informe: str, hash_transcripcion: str, huella_reglas: str):
+        """
+        Anota el informe generado para un audio ya registrado
+
+        Args:
+            clave: Clave del audio
+            ruta_informe: Ruta del informe único
+            hash_transcripcion: Hash de la transcripción analizada
+            huella_reglas: Huella de las reglas usadas
+        """
+        with self._lock:
+            ruta = self._ruta_indice(clave)
+            try:
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    info = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                self.logger.warning(f"Entrada del índice de análisis ilegible ({clave[:12]}): {e}")
+                return
+            info['informe'] = _descripcion_informe(ruta_informe, hash_transcripcion, huella_reglas)
+            _escribir_json(ruta, info, indentar=True)
+
+    def esta_al_dia(self, info: Dict[str, Any], huella_reglas: str) -> bool:
+        """
+        Indica si el informe de una entrada del índice corresponde a su transcripción y a las reglas actuales
+
+        Args:
+            info: Entrada del índice (valor de entradas())
+            huella_reglas: Huella de las reglas actuales
+
+        Returns:
+            True si el informe existe y no hay que regenerarlo
+        """
+        informe = info.get('informe') or {}
+        return (
+            informe.get('hash_transcripcion') == info.get('hash_transcripcion')
+            and informe.get('huella_reglas') == huella_reglas
+            and bool(informe.get('ruta'))
+            and os.path.exists(informe['ruta'])
+        )
+
+
+def generar_informe_audio(
+    generador: GeneradorInformeUnico,
+    archivo_audio: str,
+    resultado: Dict[str, Any],
+    analisis_texto: Dict[str, Any],
+    analisis_voz: List[Dict[str, Any]],
+    carpeta_salida: str
+) -> str:
+    """
+    Genera y guarda el informe único de un audio
+
+    Args:
+        generador: Generador de informes
+        archivo_audio: Ruta al archivo de audio
+        resultado: Resultado de Whisper
+        analisis_texto: Salida de AnalizadorUnificado.analizar()
+        analisis_voz: Salida de VoiceStressDetector.analizar_audio()
+        carpeta_salida: Carpeta donde guardar el informe
+
+    Returns:
+        Ruta del informe guardado
+    """
+    segmentos = resultado.get('segments', [])
+    duracion_audio = segmentos[-1].get('end', 0) if segmentos else 0
+
+    # Generar identificador único
+    timestamp = int(time.time())
+    identificador_unico = f"ID_{timestamp}_{os.path.splitext(os.path.basename(archivo_audio))[0]}"
+    fecha_analisis = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    contenido_informe = generador.generar_informe(
+        nombre_archivo=os.path.basename(archivo_audio),
+        duracion_audio=duracion_audio,
+        fecha_analisis=fecha_analisis,
+        identificador_unico=identificador_unico,
+        resultado_whisper=resultado,
+        analisis_agresion=analisis_texto['agresion'],
+        analisis_voz=analisis_voz,
+        analisis_victimas=analisis_texto['victimas'],
+        analisis_forense_dk=analisis_texto['forense_dk']
+    )
+
+    return generador.guardar_informe(
+        contenido=contenido_informe,
+        nombre_archivo_audio=os.path.basename(archivo_audio),
+        carpeta_salida=carpeta_salida
+    )
+
+
+def _descripcion_informe(ruta_informe: str, hash_transcripcion: str, huella_reglas: str) -> Dict[str, Any]:
+    """Campo 'informe' de una entrada del índice"""
+    return {
+        'ruta': ruta_informe,
+        'hash_transcripcion': hash_transcripcion,
+        'huella_reglas': huella_reglas,
+        'fecha': datetime.now().isoformat()
+    }
+
+
+def _a_json(objeto: Any) -> Any:
+    """Convierte escalares de numpy y otros tipos no serializables"""
+    if hasattr(objeto, 'item'):
+        return objeto.item()
+    return str(objeto)
+
+
+def _escribir_json(ruta: str, datos: Any, indentar: bool = False):
+    """Escribe un JSON de forma atómica"""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    ruta_temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(ruta_temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2 if indentar else None, default=_a_json)
+    os.replace(ruta_temporal, ruta)
+
+
+_manifiesto_global: Optional[ManifiestoAnalisis] = None
+_lock_global = threading.Lock()
+
+
+def obtener_manifiesto_analisis() -> ManifiestoAnalisis:
+    """
+    Devuelve el manifiesto de análisis del proceso
+
+    La carpeta se configura con la variable WHISPER_CACHE_ANALISIS (por defecto cache/analisis)
+
+    Returns:
+        Manifiesto compartido
+    """
+    global _manifiesto_global
+
+    with _lock_global:
+        if _manifiesto_global is None:
+            _manifiesto_global = ManifiestoAnalisis(
+                carpeta=os.getenv('WHISPER_CACHE_ANALISIS', os.path.join('cache', 'analisis'))
+            )
+        return _manifiesto_global
@@ -0,0 +1,259 @@
+"""
+Registro de modelos Whisper compartido por todo el proceso
+Mantiene los modelos cargados en memoria y los reutiliza entre transcriptores
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+# Clave del registro: (nombre del modelo, dispositivo, precisión, motor de inferencia)
+ClaveModelo = Tuple[str, str, str, str]
+
+
+class RegistroModelos:
+    """
+    Pool de modelos cargados, con expulsión LRU bajo un presupuesto de memoria
+    """
+
+    def __init__(self, memoria_max_gb: Optional[float] = None):
+        """
+        Inicializa el registro
+
+        Args:
+            memoria_max_gb: Presupuesto de memoria para modelos en GB. None o 0 = sin límite
+        """
+        self.logger = logging.getLogger(__name__)
+        self.memoria_max_bytes = int(memoria_max_gb * 1024**3) if memoria_max_gb else 0
+        self._modelos: "OrderedDict[ClaveModelo, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def obtener(self, clave: ClaveModelo, cargador: Callable[[], Any]) -> Any:
+        """
+        Devuelve el modelo para la clave, cargándolo si no está en memoria
+
+        Args:
+            clave: Tupla (modelo, dispositivo, precisión, motor)
+            cargador: Función sin argumentos que carga y devuelve el modelo
+
+        Returns:
+            Modelo cargado
+        """
+        with self._lock:
+            entrada = self._modelos.get(clave)
+            if entrada is not None:
+                self._modelos.move_to_end(clave)
+                entrada['usos'] += 1
+                return entrada['modelo']
+
+            self.logger.info(f"Cargando modelo {clave[0]} ({clave[1]}, {clave[2]}, {clave[3]})...")
+            tiempo_inicio = time.time()
+            memoria_antes = _memoria_en_uso_bytes(clave[1])
+            modelo = cargador()
+            tiempo_carga = time.time() - tiempo_inicio
+            tamano = _estimar_tamano_bytes(modelo)
+            if not tamano:
+                # Modelos sin tensores de PyTorch (CTranslate2): lo que creció el proceso al cargarlo
+                tamano = max(0, _memoria_en_uso_bytes(clave[1]) - memoria_antes)
+            if not tamano and self.memoria_max_bytes:
+                self.logger.warning(
+                    f"No se pudo medir la memoria del modelo {clave[0]} ({clave[3]}): "
+                    f"WHISPER_MEMORIA_MAX_GB no se puede aplicar a este modelo"
+                )
+
+            self._modelos[clave] = {
+                'modelo': modelo,
+                'tiempo_carga': tiempo_carga,
+                'tamano_bytes': tamano,
+                'usos': 1
+            }
+            self.logger.info(
+                f"Modelo {clave[0]} cargado en {tiempo_carga:.2f} segundos "
+                f"({tamano / 1024**2:.1f} MB residentes)"
+            )
+
+            self._expulsar_si_excede(clave)
+            return modelo
+
+    def _expulsar_si_excede(self, clave_protegida: ClaveModelo):
+        """Expulsa los modelos menos usados recientemente hasta respetar el presupuesto"""
+        if not self.memoria_max_bytes:
+            return
+
+        while self.memoria_total_bytes() > self.memoria_max_bytes:
+            clave_lru = next(iter(self._modelos))
+            if clave_lru == clave_protegida:
+                # El modelo recién cargado no cabe solo; se mantiene igualmente
+                self.logger.warning(
+                    f"El modelo {clave_protegida[0]} excede el presupuesto de memoria "
+                    f"({self.memoria_max_bytes / 1024**3:.2f} GB)"
+                )
+                break
+            self.expulsar(clave_lru)
+
+    def expulsar(self, clave: ClaveModelo) -> bool:
+        """
+        Elimina un modelo del registro
+
+        Args:
+            clave: Clave del modelo
+
+        Returns:
+            True si el modelo estaba cargado
+        """
+        with self._lock:
+            entrada = self._modelos.pop(clave, None)
+
+        if entrada is None:
+            return False
+
+        self.logger.info(
+            f"Modelo {clave[0]} ({clave[1]}, {clave[2]}, {clave[3]}) expulsado del registro "
+            f"({entrada['tamano_bytes'] / 1024**2:.1f} MB liberados)"
+        )
+
+        if clave[1].startswith('cuda'):
+            try:
+                import torch
+                torch.cuda.empty_cache()
+            except ImportError:
+                pass
+
+        return True
+
+    def vaciar(self):
+        """Elimina todos los modelos del registro"""
+        with self._lock:
+            for clave in list(self._modelos):
+                self.expulsar(clave)
+
+    def memoria_total_bytes(self) -> int:
+        """Memoria ocupada por los modelos del registro"""
+        with self._lock:
+            return sum(e['tamano_bytes'] for e in self._modelos.values())
+
+    def info(self, clave: ClaveModelo) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene tiempo de carga y tamaño residente de un modelo
+
+        Args:
+            clave: Clave del modelo
+
+        Returns:
+            Diccionario con métricas o None si no está cargado
+        """
+        with self._lock:
+            entrada = self._modelos.get(clave)
+            if entrada is None:
+                return None
+            return {
+                'modelo': clave[0],
+                'dispositivo': clave[1],
+                'precision': clave[2],
+                'motor': clave[3],
+                'tiempo_carga_s': entrada['tiempo_carga'],
+                'tamano_mb': entrada['tamano_bytes'] / 1024**2,
+                'usos': entrada['usos']
+            }
+
+    def estadisticas(self) -> List[Dict[str, Any]]:
+        """
+        Lista los modelos cargados del menos al más usado recientemente
+
+        Returns:
+            Lista de diccionarios con métricas por modelo
+        """
+        with self._lock:
+            return [self.info(clave) for clave in self._modelos]
+
+
+def _estimar_tamano_bytes(modelo: Any) -> int:
+    """
+    Estima la memoria residente de un modelo
+
+    Args:
+        modelo: Modelo cargado
+
+    Returns:
+        Tamaño en bytes (0 si no se puede estimar)
+    """
+    tamano = 0
+
+    if hasattr(modelo, 'parameters'):
+        for tensor in modelo.parameters():
+            tamano += tensor.numel() * tensor.element_size()
+        if hasattr(modelo, 'buffers'):
+            for tensor in modelo.buffers():
+                tamano += tensor.numel() * tensor.element_size()
+
+    return tamano
+
+
+def _memoria_en_uso_bytes(dispositivo: str) -> int:
+    """
+    Memoria en uso por el proceso, para medir modelos que no exponen sus tensores
+
+    Suma la memoria residente del proceso (psutil o /proc/self/statm) y, en GPU,
+    la memoria ocupada del dispositivo según CUDA.
+
+    Args:
+        dispositivo: 'cuda' o 'cpu'
+
+    Returns:
+        Bytes en uso (0 si no se puede medir)
+    """
+    en_uso = 0
+
+    if PSUTIL_AVAILABLE:
+        en_uso += psutil.Process().memory_info().rss
+    else:
+        try:
+            with open('/proc/self/statm') as f:
+                en_uso += int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            pass
+
+    if dispositivo.startswith('cuda'):
+        try:
+            import torch
+            if torch.cuda.is_available():
+                libre, total = torch.cuda.mem_get_info()
+                en_uso += total - libre
+        except Exception:
+            pass
+
+    return en_uso
+
+
+_registro_global: Optional[RegistroModelos] = None
+_lock_global = threading.Lock()
+
+
+def obtener_registro() -> RegistroModelos:
+    """
+    Devuelve el registro de modelos del proceso
+
+    El presupuesto de memoria se configura con la variable WHISPER_MEMORIA_MAX_GB
+
+    Returns:
+        Registro compartido
+    """
+    global _registro_global
+
+    with _lock_global:
+        if _registro_global is None:
+            memoria_max = os.getenv('WHISPER_MEMORIA_MAX_GB')
+            _registro_global = RegistroModelos(
+                memoria_max_gb=float(memoria_max) if memoria_max else None
+            )
+        return _registro_global
@@ -0,0 +1,384 @@
+"""
+Servicio de traducción con caché persistente, deduplicación, lotes y concurrencia acotada
+Las líneas iguales se traducen una sola vez; las pendientes se agrupan en peticiones de
+varios miles de caracteres que se envían en paralelo a un backend intercambiable
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+try:
+    from deep_translator import GoogleTranslator
+    TRANSLATOR_AVAILABLE = True
+except ImportError:
+    TRANSLATOR_AVAILABLE = False
+    logging.warning("deep-translator no disponible. Instala con: pip install deep-translator")
+
+
+# Máximo de caracteres por traducción (límite de Google Translate)
+MAX_CARACTERES_TEXTO = 5000
+
+
+class BackendGoogle:
+    """
+    Traducción con Google Translate a través de deep-translator
+
+    Un lote se envía como una sola petición con las líneas separadas por saltos de línea.
+    """
+
+    nombre = 'google'
+    # Sus traducciones se guardan en la caché persistente
+    persistente = True
+
+    def __init__(self):
+        if not TRANSLATOR_AVAILABLE:
+            raise ImportError("deep-translator no está instalado. Instala con: pip install deep-translator")
+
+    def traducir_lote(self, textos: List[str], origen: str, destino: str) -> List[Optional[str]]:
+        """
+        Traduce varios textos de una línea en una petición
+
+        Args:
+            textos: Textos sin saltos de línea (o uno solo con ellos)
+            origen: Código de idioma origen
+            destino: Código de idioma destino
+
+        Returns:
+            Traducciones en el mismo orden (None si un texto no se pudo traducir)
+
+        Raises:
+            ValueError: Si la respuesta no tiene una línea por texto
+        """
+        traductor = GoogleTranslator(source=origen, target=destino)
+        if len(textos) == 1:
+            return [traductor.translate(textos[0]) or None]
+
+        traduccion = traductor.translate('\n'.join(textos)) or ''
+        lineas = traduccion.split('\n')
+        if len(lineas) != len(textos):
+            raise ValueError(f"El lote de {len(textos)} líneas volvió con {len(lineas)}")
+        return [linea.strip() or None for linea in lineas]
+
+
+class BackendDiccionario:
+    """
+    Traducción local sin red a partir de un diccionario de frases
+
+    Los textos que no están en el diccionario quedan sin traducir (el servicio devuelve
+    el original). Sirve para ejecutar y probar el análisis sin conexión.
+    """
+
+    nombre = 'local'
+    persistente = False
+
+    def __init__(self, ruta_diccionario: Optional[str] = None, frases: Optional[Dict[str, Dict[str, str]]] = None):
+        """
+        Inicializa el backend
+
+        Args:
+            ruta_diccionario: JSON {"da>en": {"texto": "traducción", ...}, ...}
+            frases: Diccionario con el mismo formato (se combina con el del archivo)
+        """
+        self.frases: Dict[str, Dict[str, str]] = {}
+        if ruta_diccionario:
+            with open(ruta_diccionario, 'r', encoding='utf-8') as f:
+                self.frases.update(json.load(f))
+        for par, traducciones in (frases or {}).items():
+            self.frases.setdefault(par, {}).update(traducciones)
+
+    def traducir_lote(self, textos: List[str], origen: str, destino: str) -> List[Optional[str]]:
+        traducciones = self.frases.get(f"{origen}>{destino}", {})
+        return [traducciones.get(texto) for texto in textos]
+
+
+class CacheTraducciones:
+    """
+    Caché SQLite de traducciones indexada por (origen, destino, hash del texto)
+    """
+
+    def __init__(self, carpeta_cache: str = os.path.join('cache', 'traducciones')):
+        """
+        Inicializa la caché
+
+        Args:
+            carpeta_cache: Carpeta de la base de datos
+        """
+        self.logger = logging.getLogger(__name__)
+        self.carpeta_cache = carpeta_cache
+        self._lock = threading.Lock()
+        self._conexion: Optional[sqlite3.Connection] = None
+
+    @property
+    def ruta(self) -> str:
+        return os.path.join(self.carpeta_cache, 'traducciones.sqlite')
+
+    @staticmethod
+    def hash_texto(texto: str) -> str:
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conexion is None:
+            os.makedirs(self.carpeta_cache, exist_ok=True)
+            self._conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS traducciones ("
+                "origen TEXT NOT NULL, destino TEXT NOT NULL, hash TEXT NOT NULL, "
+                "traduccion TEXT NOT NULL, PRIMARY KEY (origen, destino, hash))"
+            )
+        return self._conexion
+
+    def obtener(self, textos: Iterable[str], origen: str, destino: str) -> Dict[str, str]:
+        """
+        Traducciones guardadas
+
+        Args:
+            textos: Textos a buscar
+            origen: Código de idioma origen
+            destino: Código de idioma destino
+
+        Returns:
+            Diccionario texto -> traducción con los textos encontrados
+        """
+        por_hash = {self.hash_texto(texto): texto for texto in textos}
+        encontrados = {}
+        hashes = list(por_hash)
+        with self._lock:
+            conexion = self._conectar()
+            # Consultas de hasta 500 hashes (límite de parámetros de SQLite)
+            for i in range(0, len(hashes), 500):
+                grupo = hashes[i:i + 500]
+                filas = conexion.execute(
+                    "SELECT hash, traduccion FROM traducciones WHERE origen = ? AND destino = ? "
+                    f"AND hash IN ({','.join('?' * len(grupo))})",
+                    [origen, destino, *grupo]
+                )
+                for hash_texto, traduccion in filas:
+                    encontrados[por_hash[hash_texto]] = traduccion
+        return encontrados
+
+    def guardar(self, traducciones: Dict[str, str], origen: str, destino: str):
+        """
+        Guarda traducciones
+
+        Args:
+            traducciones: Diccionario texto -> traducción
+            origen: Código de idioma origen
+            destino: Código de idioma destino
+        """
+        if not traducciones:
+            return
+        filas = [(origen, destino, self.hash_texto(t), tr) for t, tr in traducciones.items()]
+        with self._lock:
+            conexion = self._conectar()
+            conexion.executemany("INSERT OR REPLACE INTO traducciones VALUES (?, ?, ?, ?)", filas)
+            conexion.commit()
+
+
+class ServicioTraduccion:
+    """
+    Traduce textos deduplicando, consultando la caché y enviando lotes en paralelo
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        cache: Optional[CacheTraducciones] = None,
+        max_caracteres_lote: int = 4500,
+        max_concurrentes: int = 4
+    ):
+        """
+        Inicializa el servicio
+
+        Args:
+            backend: Objeto con traducir_lote(textos, origen, destino) -> traducciones
+                     (None si un texto no se traduce) y atributos nombre y persistente.
+                     Si None, Google si deep-translator está instalado y, si no, el
+                     diccionario local
+            cache: Caché persistente (solo se usa con backends persistentes)
+            max_caracteres_lote: Caracteres máximos por petición al backend
+            max_concurrentes: Peticiones simultáneas como máximo
+        """
+        self.logger = logging.getLogger(__name__)
+        if backend is None:
+            if TRANSLATOR_AVAILABLE:
+                backend = BackendGoogle()
+            else:
+                self.logger.warning("Traductor no disponible, los textos se dejarán sin traducir")
+                backend = BackendDiccionario()
+        self.backend = backend
+        self.cache = cache if getattr(backend, 'persistente', False) else None
+        self.max_caracteres_lote = max_caracteres_lote
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrentes, thread_name_prefix='traduccion')
+        self._lock = threading.Lock()
+        self.estadisticas = {
+            'solicitados': 0,
+            'unicos': 0,
+            'en_cache': 0,
+            'traducidos': 0,
+            'peticiones': 0,
+            'errores': 0
+        }
+
+    def _contar(self, **incrementos: int):
+        with self._lock:
+            for clave, valor in incrementos.items():
+                self.estadisticas[clave] += valor
+
+    def traducir(self, texto: str, origen: str = 'da', destino: str = 'en') -> str:
+        """
+        Traduce un texto
+
+        Args:
+            texto: Texto a traducir
+            origen: Código de idioma origen
+            destino: Código de idioma destino
+
+        Returns:
+            Texto traducido o texto original si falla
+        """
+        return self.traducir_lote([texto], origen, destino)[0]
+
+    def traducir_lote(self, textos: Sequence[str], origen: str = 'da', destino: str = 'en') -> List[str]:
+        """
+        Traduce varios textos con una petición por lote de textos distintos no cacheados
+
+        Args:
+            textos: Textos a traducir
+            origen: Código de idioma origen
+            destino: Código de idioma destino
+
+        Returns:
+            Traducciones en el mismo orden (el texto original si falla o está vacío)
+        """
+        return self.traducir_pares(textos, [(origen, destino)])[(origen, destino)]
+
+    def traducir_pares(
+        self,
+        textos: Sequence[str],
+        pares: Sequence[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], List[str]]:
+        """
+        Traduce los mismos textos a varios idiomas, con las peticiones de todos en paralelo
+
+        Args:
+            textos: Textos a traducir
+            pares: Pares (origen, destino), p. ej. [('da', 'en'), ('da', 'es')]
+
+        Returns:
+            Diccionario par -> traducciones en el orden de textos
+        """
+        limpios = [texto.strip()[:MAX_CARACTERES_TEXTO] if texto and texto.strip() else '' for texto in textos]
+        unicos = list(dict.fromkeys(t for t in limpios if t))
+
+        pendientes_por_par = {}
+        traducciones_por_par = {}
+        for origen, destino in pares:
+            self._contar(solicitados=len(textos), unicos=len(unicos))
+            traducciones = self.cache.obtener(unicos, origen, destino) if self.cache else {}
+            self._contar(en_cache=len(traducciones))
+            traducciones_por_par[(origen, destino)] = traducciones
+            pendientes_por_par[(origen, destino)] = [
+                (lote, self._pool.submit(self._traducir_lote_seguro, lote, origen, destino))
+                for lote in self._agrupar([t for t in unicos if t not in traducciones])
+            ]
+
+        resultado = {}
+        for (origen, destino), pendientes in pendientes_por_par.items():
+            traducciones = traducciones_por_par[(origen, destino)]
+            nuevas = {}
+            for lote, futuro in pendientes:
+                for texto, traduccion in zip(lote, futuro.result()):
+                    if traduccion is not None:
+                        nuevas[texto] = traduccion
+            if self.cache:
+                self.cache.guardar(nuevas, origen, destino)
+            traducciones.update(nuevas)
+            resultado[(origen, destino)] = [
+                traducciones.get(limpio, original) if limpio else original
+                for limpio, original in zip(limpios, textos)
+            ]
+        return resultado
+
+    def _agrupar(self, textos: List[str]) -> List[List[str]]:
+        """Agrupa textos en lotes por número de caracteres; los textos con saltos de línea van solos"""
+        lotes = []
+        actual: List[str] = []
+        caracteres = 0
+        for texto in textos:
+            if '\n' in texto:
+                lotes.append([texto])
+                continue
+            if actual and caracteres + len(texto) + 1 > self.max_caracteres_lote:
+                lotes.append(actual)
+                actual, caracteres = [], 0
+            actual.append(texto)
+            caracteres += len(texto) + 1
+        if actual:
+            lotes.append(actual)
+        return lotes
+
+    def _traducir_lote_seguro(self, lote: List[str], origen: str, destino: str) -> List[Optional[str]]:
+        """
+        Traduce un lote; si falla, cada texto por separado
+
+        Returns:
+            Traducciones, con None en los textos que no se pudieron traducir
+        """
+        try:
+            self._contar(peticiones=1)
+            traducciones = self.backend.traducir_lote(lote, origen, destino)
+            self._contar(traducidos=len(lote))
+            return traducciones
+        except Exception as e:
+            if len(lote) == 1:
+                self.logger.warning(f"Error en traducción: {e}")
+                self._contar(errores=1)
+                return [None]
+            self.logger.debug(f"Lote de {len(lote)} textos fallido ({e}), traduciendo por separado")
+            return [self._traducir_lote_seguro([texto], origen, destino)[0] for texto in lote]
+
+    def cerrar(self):
+        """Termina el pool de traducción"""
+        self._pool.shutdown(wait=True)
+
+
+_servicio_global: Optional[ServicioTraduccion] = None
+_lock_global = threading.Lock()
+
+
+def obtener_servicio_traduccion() -> ServicioTraduccion:
+    """
+    Devuelve el servicio de traducción del proceso
+
+    El backend se elige con WHISPER_TRADUCTOR ('google' o 'local'; por defecto google, o
+    local si deep-translator no está instalado). El backend local usa el diccionario de
+    WHISPER_DICCIONARIO_TRADUCCION si existe. La caché se guarda en
+    WHISPER_CACHE_TRADUCCIONES (por defecto cache/traducciones).
+
+    Returns:
+        Servicio compartido
+    """
+    global _servicio_global
+
+    with _lock_global:
+        if _servicio_global is None:
+            nombre_backend = os.getenv('WHISPER_TRADUCTOR', 'google')
+            if nombre_backend == 'google' and TRANSLATOR_AVAILABLE:
+                backend = BackendGoogle()
+            else:
+                if nombre_backend == 'google':
+                    logging.getLogger(__name__).warning("Traductor no disponible, usando el diccionario local")
+                backend = BackendDiccionario(os.getenv('WHISPER_DICCIONARIO_TRADUCCION') or None)
+            _servicio_global = ServicioTraduccion(
+                backend=backend,
+                cache=CacheTraducciones(
+                    carpeta_cache=os.getenv('WHISPER_CACHE_TRADUCCIONES', os.path.join('cache', 'traducciones'))
+                )
+            )
+        return _servicio_global
@@ -0,0 +1,91 @@
+"""
+Pruebas del análisis de PDFs página a página frente al análisis del texto completo
+
+Uso:
+    python -m pytest -q src/test_analisis_pdf_streaming.py
+"""
+
+import pytest
+
+from src.analisis_pdf_streaming import DISTANCIA_DUPLICADOS, AnalizadorPDFStreaming
+from src.servicio_traduccion import BackendDiccionario, ServicioTraduccion
+
+
+def coincidencia(posicion: int):
+    """Coincidencia de agresión en bruto (orden, tipo, inicio, fin, grupo) en una posición"""
+    return (0, 'amenazas_directas', posicion, posicion + 7, 'amenaza')
+
+
+def test_grupo_final_espera_mientras_pueda_crecer():
+    streaming = AnalizadorPDFStreaming(analizador=None)
+    # 0 y 10 forman un grupo cerrado; 50, 60 y 75 siguen encadenados a menos de la distancia
+    streaming._agresion_pendiente = [coincidencia(p) for p in (0, 10, 50, 60, 75)]
+
+    assert [c[2] for c in streaming._agresion_completas(80)] == [0, 10]
+    assert len(streaming._agresion_completas(75 + DISTANCIA_DUPLICADOS)) == 5
+    assert len(streaming._agresion_completas(None)) == 5
+
+
+def test_sin_huecos_no_se_resuelve_nada_hasta_el_final():
+    streaming = AnalizadorPDFStreaming(analizador=None)
+    streaming._agresion_pendiente = [coincidencia(p) for p in (100, 110, 125)]
+
+    assert streaming._agresion_completas(130) == []
+
+
+@pytest.fixture
+def ruta_pdf(tmp_path):
+    fitz = pytest.importorskip('fitz')
+    relleno = 'Texto del expediente sin relevancia para el análisis.\n' * 8
+    paginas = [
+        relleno + 'Le dijo que era una amenaza',
+        'control total y sin dinero para nada.\n' + relleno + 'Claudia habló con Juan',
+        'Diego de lo ocurrido.\n' + relleno + 'pero antes dijo otra cosa; no puedes salir',
+        relleno,
+        'te voy a quitar todo, por tu culpa.\n' + relleno
+    ]
+    documento = fitz.open()
+    for texto in paginas:
+        documento.new_page().insert_textbox(fitz.Rect(30, 30, 580, 820), texto, fontsize=9)
+    ruta = str(tmp_path / 'expediente.pdf')
+    documento.save(ruta)
+    documento.close()
+    return ruta
+
+
+@pytest.fixture
+def analizador():
+    from src.analizador_pdf_forense import PYMUPDF_AVAILABLE, AnalizadorPDFForense
+    if not PYMUPDF_AVAILABLE:
+        pytest.skip("PyMuPDF no está instalado")
+    return AnalizadorPDFForense(servicio_traduccion=ServicioTraduccion(backend=BackendDiccionario()))
+
+
+def por_posicion(hallazgos):
+    return sorted(hallazgos, key=lambda h: (h['posicion'], str(h)))
+
+
+@pytest.mark.parametrize('solape', [200, 2000])
+def test_mismos_hallazgos_que_el_texto_completo(analizador, ruta_pdf, solape):
+    extraido = analizador.extraer_texto_pdf(ruta_pdf)
+    texto, indice = extraido['texto_completo'], extraido['indice_paginas']
+
+    streaming = AnalizadorPDFStreaming(analizador, solape=solape)
+    agresion, contradicciones = [], []
+    menciones = {victima: [] for victima in analizador.patrones_victimas}
+    for clase, hallazgo in streaming.analizar(ruta_pdf):
+        if clase == 'agresion':
+            agresion.append(hallazgo)
+        elif clase == 'victima':
+            menciones[hallazgo[0]].append(hallazgo[1])
+        else:
+            contradicciones.append(hallazgo)
+
+    esperadas = analizador.detectar_agresion(texto, indice_paginas=indice)
+    assert len(esperadas) > 1
+    assert por_posicion(agresion) == por_posicion(esperadas)
+    assert por_posicion(contradicciones) == por_posicion(analizador.detectar_contradicciones(texto, indice))
+    esperadas_victimas = analizador.detectar_menciones_victimas(texto, indice)
+    assert all(por_posicion(menciones[v]) == por_posicion(esperadas_victimas[v]) for v in menciones)
+    assert streaming.resumen['num_caracteres'] == len(texto)
+    assert streaming.resumen['num_paginas'] == 5
@@ -0,0 +1,43 @@
+"""
+Pruebas del índice de páginas de los PDFs
+
+Uso:
+    python -m pytest -q src/test_indice_paginas.py
+"""
+
+from src.indice_paginas import IndicePaginas
+
+
+PAGINAS = [
+    {'pagina': 1, 'texto': 'abc'},
+    {'pagina': 2, 'texto': ''},
+    {'pagina': 3, 'texto': 'defgh'}
+]
+
+
+def test_pagina_de_cada_posicion_incluye_el_separador():
+    indice = IndicePaginas(PAGINAS)
+    texto = '\n\n'.join(p['texto'] for p in PAGINAS)
+
+    # Página 1: 'abc\n\n' (0-4); página 2 vacía: '\n\n' (5-6); página 3: 'defgh' (7-)
+    esperadas = [1] * 5 + [2] * 2 + [3] * 5
+    assert [indice.pagina(pos) for pos in range(len(texto))] == esperadas
+    assert len(indice) == 3
+
+
+def test_posiciones_fuera_del_texto():
+    indice = IndicePaginas(PAGINAS)
+
+    assert indice.pagina(-1) == 0
+    assert indice.pagina(indice.fin) == 0
+    assert IndicePaginas([]).pagina(0) == 0
+
+
+def test_agregar_paginas_equivale_a_construirlo_entero():
+    completo = IndicePaginas(PAGINAS)
+    incremental = IndicePaginas([])
+    inicios = [incremental.agregar_pagina(p['pagina'], len(p['texto'])) for p in PAGINAS]
+
+    assert inicios == [0, 5, 7]
+    assert incremental.fin == completo.fin
+    assert [incremental.pagina(pos) for pos in range(completo.fin)] == [completo.pagina(pos) for pos in range(completo.fin)]
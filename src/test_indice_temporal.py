@@ -0,0 +1,87 @@
+"""
+Pruebas del índice temporal frente a recorrer la lista original
+
+Uso:
+    python -m pytest -q src/test_indice_temporal.py
+"""
+
+import random
+
+import pytest
+
+from src.indice_temporal import IndiceTemporal
+
+
+def elementos_aleatorios(semilla: int, n: int = 60):
+    """Elementos desordenados con inicios repetidos y algunos sin fin"""
+    aleatorio = random.Random(semilla)
+    elementos = []
+    for i in range(n):
+        inicio = aleatorio.choice([aleatorio.randint(0, 40) / 2, aleatorio.uniform(0, 20)])
+        elemento = {'id': i, 'inicio': inicio}
+        if aleatorio.random() < 0.8:
+            elemento['fin'] = inicio + aleatorio.choice([0, 0.5, aleatorio.uniform(0, 6)])
+        elementos.append(elemento)
+    return elementos
+
+
+def consultas(semilla: int):
+    aleatorio = random.Random(semilla + 1000)
+    # Tiempos sobre los inicios (medios segundos) y entre ellos
+    return [aleatorio.randint(-4, 44) / 2 for _ in range(40)] + [aleatorio.uniform(-2, 22) for _ in range(40)]
+
+
+def ids(elementos):
+    return [e['id'] for e in elementos]
+
+
+@pytest.mark.parametrize('semilla', range(5))
+def test_ventana_y_primero_como_recorrido_lineal(semilla):
+    elementos = elementos_aleatorios(semilla)
+    indice = IndiceTemporal(elementos)
+
+    for t in consultas(semilla):
+        for radio in (0.5, 1.0, 3.0):
+            esperados = [e for e in elementos if abs(e['inicio'] - t) < radio]
+            assert ids(indice.en_ventana(t, radio)) == ids(esperados)
+            primero = indice.primero_en_ventana(t, radio)
+            assert (primero['id'] if primero else None) == (esperados[0]['id'] if esperados else None)
+
+
+@pytest.mark.parametrize('semilla', range(5))
+def test_mas_cercano_como_recorrido_lineal(semilla):
+    elementos = elementos_aleatorios(semilla)
+    indice = IndiceTemporal(elementos)
+
+    for t in consultas(semilla):
+        # min() se queda con el primero de la lista original en caso de empate
+        esperado = min(elementos, key=lambda e: abs(e['inicio'] - t))
+        assert indice.mas_cercano(t)['id'] == esperado['id']
+        cercano = indice.mas_cercano(t, distancia_max=0.25)
+        assert (cercano['id'] if cercano else None) == (
+            esperado['id'] if abs(esperado['inicio'] - t) <= 0.25 else None
+        )
+
+
+@pytest.mark.parametrize('semilla', range(5))
+def test_solapados_como_recorrido_lineal(semilla):
+    elementos = elementos_aleatorios(semilla)
+    indice = IndiceTemporal(elementos)
+
+    for t in consultas(semilla):
+        for duracion in (0, 0.5, 4.0):
+            esperados = [
+                e for e in elementos
+                if e.get('fin', e['inicio']) >= t and e['inicio'] <= t + duracion
+            ]
+            assert sorted(ids(indice.solapados(t, t + duracion))) == sorted(ids(esperados))
+
+
+def test_indice_vacio_y_claves_de_segmentos():
+    assert IndiceTemporal([]).mas_cercano(3.0) is None
+    assert IndiceTemporal([]).en_ventana(3.0, 1.0) == []
+
+    segmentos = [{'start': 4.0, 'end': 6.0}, {'start': 1.0, 'end': 2.0}]
+    indice = IndiceTemporal(segmentos, clave_inicio='start', clave_fin='end')
+    assert indice.solapados(5.0, 5.5) == [segmentos[0]]
+    assert indice.mas_cercano(1.4) is segmentos[1]
@@ -0,0 +1,95 @@
+"""
+Pruebas del motor de patrones frente a evaluar cada patrón por separado con re
+
+Uso:
+    python -m pytest -q src/test_motor_patrones.py
+"""
+
+import random
+import re
+
+import pytest
+
+from src.motor_patrones import MotorPatrones
+from src.paquetes_reglas import GestorPaquetesReglas
+from src.prefiltro_literales import PrefiltroLiterales
+
+
+# Conjuntos compilados como motor en los paquetes de reglas incluidos
+CONJUNTOS = [
+    ('es', 'agresion', 'principal'),
+    ('es', 'violencia', 'principal'),
+    ('es', 'violencia', 'denigracion'),
+    ('da', 'forense_dk', 'kategorier')
+]
+
+TEXTOS = [
+    'Eres un inútil, no sirves para nada. Te voy a matar si no haces lo que digo.',
+    'no\nvales   nada; por tu culpa\tpasó todo',
+    'Du er værdiløs. Hvis du ikke gør det, så straffer jeg dig. KONTROL over alt.',
+    'İnútil, conſecuencias, SOLO YO, te voy a dejar',
+    'Claudia es una maldita mentirosa.\nclau, tonta',
+    'Texto neutro sin ninguna coincidencia, fechas 2023-05-01 y números 42.',
+    ''
+]
+
+
+def categorias_de(idioma: str, paquete: str, conjunto: str):
+    return GestorPaquetesReglas(carpeta_cache=None).obtener(idioma, paquete).categorias(conjunto)
+
+
+def texto_aleatorio(patrones, flags: int, semilla: int) -> str:
+    """Literales de los patrones con separadores al azar, para que haya coincidencias solapadas"""
+    aleatorio = random.Random(semilla)
+    literales = PrefiltroLiterales(patrones, flags).literales
+    palabras = sorted({literal for conjunto in literales for literal in conjunto or ()})
+    piezas = []
+    for _ in range(200):
+        piezas.append(aleatorio.choice(palabras + ['de', 'la', 'og', 'x']))
+        piezas.append(aleatorio.choice([' ', ' ', '  ', '\n', ', ', '. ', '-']))
+    return ''.join(piezas)
+
+
+def textos_para(categorias, flags: int):
+    patrones = [patron for _, lista in categorias for patron in lista]
+    textos = TEXTOS + [texto_aleatorio(patrones, flags, semilla) for semilla in range(4)]
+    # Los detectores pasan el texto en minúsculas; con IGNORECASE se prueba tal cual
+    return textos if flags & re.IGNORECASE else [texto.lower() for texto in textos]
+
+
+@pytest.mark.parametrize('idioma, paquete, conjunto', CONJUNTOS)
+@pytest.mark.parametrize('flags', [0, re.IGNORECASE])
+@pytest.mark.parametrize('prefiltro', [False, True])
+def test_equivale_a_evaluar_cada_patron(idioma, paquete, conjunto, flags, prefiltro):
+    categorias = categorias_de(idioma, paquete, conjunto)
+    motor = MotorPatrones(categorias, flags=flags, prefiltro=prefiltro)
+    compilados = [(nombre, [re.compile(p, flags) for p in patrones]) for nombre, patrones in categorias]
+    alternancia = re.compile('|'.join(f"(?:{p})" for _, patrones in categorias for p in patrones), flags)
+
+    for texto in textos_para(categorias, flags):
+        # Escaneo: mismas coincidencias que la alternancia sin optimizar
+        assert [(c.inicio, c.fin, c.texto) for c in motor.escanear(texto)] == [
+            (m.start(), m.end(), m.group()) for m in alternancia.finditer(texto)
+        ]
+        for c in motor.escanear(texto):
+            assert re.compile(c.patron, flags).match(texto, c.inicio).end() == c.fin
+
+        presentes = {nombre for nombre, patrones in compilados if any(p.search(texto) for p in patrones)}
+        assert motor.categorias_presentes(texto) == presentes
+
+        primera = next((nombre for nombre, _ in categorias if nombre in presentes), None)
+        resultado = motor.primera_por_prioridad(texto)
+        assert (resultado[0] if resultado else None) == primera
+        if resultado:
+            assert resultado[1] in motor.patrones_de(primera)
+            assert re.search(resultado[1], texto, flags)
+
+
+def test_categoria_oculta_por_un_solape():
+    # 'amenaza' queda dentro de la coincidencia de 'insulto' y solo se ve al verificar
+    motor = MotorPatrones([('amenaza', [r'te\s+mato']), ('insulto', [r'idiota\s+te'])], flags=0)
+    texto = 'idiota te mato'
+
+    assert [c.categoria for c in motor.escanear(texto)] == ['insulto']
+    assert motor.categorias_presentes(texto) == {'amenaza', 'insulto'}
+    assert motor.primera_por_prioridad(texto) == ('amenaza', r'te\s+mato')
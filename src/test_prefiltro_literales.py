@@ -0,0 +1,93 @@
+"""
+Pruebas del prefiltro de literales frente a evaluar cada patrón sobre el texto entero
+
+Uso:
+    python -m pytest -q src/test_prefiltro_literales.py
+"""
+
+import random
+
+import pytest
+
+from src.paquetes_reglas import GestorPaquetesReglas
+from src.prefiltro_literales import AHOCORASICK_AVAILABLE, PrefiltroLiterales, plegar_mayusculas
+
+
+TEXTOS = [
+    'Le dijo: TE VOY A quitar todo. Consecuencias graves.\nNo puedes salir sin mi permiso.',
+    # Palabras de un patrón separadas por saltos de línea y espacios múltiples
+    'te\nvoy   a\n\nver; por tu\tculpa\nno\n tienes dinero',
+    # ſ (s larga) e İ (I con punto) coinciden con s/i bajo IGNORECASE
+    'conſecuencias, AMENAZA, İnútil, aİslamiento, Sİ NO HACES lo que digo',
+    'PSYKISK VOLD og ØKONOMISK PRES; hvis du ikke gør det, KONTROL over penge',
+    'Han sagde: hvİs ikke du kommer, er det en truſſel. Nedværdigende.\n',
+    'Sin coincidencias en este texto: solo palabras neutras, fechas 2023-05-01 y números.',
+    ''
+]
+
+
+def paquetes():
+    gestor = GestorPaquetesReglas(carpeta_cache=None)
+    return [
+        gestor.obtener('es', 'pdf_forense').compilado('agresion'),
+        gestor.obtener('da', 'pdf_criterios_legales').compilado('criterios')
+    ]
+
+
+def texto_aleatorio(prefiltro: PrefiltroLiterales, semilla: int) -> str:
+    """Literales de los patrones con mayúsculas, separadores y caracteres equivalentes al azar"""
+    aleatorio = random.Random(semilla)
+    palabras = sorted({literal for literales in prefiltro.literales for literal in literales or ()})
+    piezas = []
+    for _ in range(300):
+        palabra = aleatorio.choice(palabras + ['de', 'la', 'og', 'ikke', 'x'])
+        forma = aleatorio.random()
+        if forma < 0.2:
+            palabra = palabra.upper()
+        elif forma < 0.3:
+            palabra = palabra.replace('s', 'ſ').replace('i', 'İ')
+        piezas.append(palabra)
+        piezas.append(aleatorio.choice([' ', ' ', '  ', '\n', '\n\n', ', ', '. ', '_', '-']))
+    return ''.join(piezas)
+
+
+def por_patron(listas):
+    return [[(m.start(), m.end(), m.group()) for m in lista] for lista in listas]
+
+
+@pytest.mark.parametrize('acelerado', [False, True] if AHOCORASICK_AVAILABLE else [False])
+def test_mismas_coincidencias_que_finditer(acelerado):
+    for compilado in paquetes():
+        prefiltro = PrefiltroLiterales(compilado.patrones, compilado.compilados[0].flags, acelerado=acelerado)
+        textos = TEXTOS + [texto_aleatorio(prefiltro, semilla) for semilla in range(5)]
+
+        encontradas = 0
+        for texto in textos:
+            esperadas = [list(patron.finditer(texto)) for patron in prefiltro.compilados]
+            assert por_patron(prefiltro.coincidencias(texto)) == por_patron(esperadas)
+            encontradas += sum(len(lista) for lista in esperadas)
+            # El analizador de PDFs le pasa el texto en minúsculas
+            minusculas = texto.lower()
+            esperadas = [list(patron.finditer(minusculas)) for patron in prefiltro.compilados]
+            assert por_patron(prefiltro.coincidencias(minusculas)) == por_patron(esperadas)
+
+        assert encontradas > 50
+
+
+def test_s_larga_y_saltos_de_linea():
+    prefiltro = paquetes()[0]
+
+    textos = [m.group() for lista in prefiltro.coincidencias(TEXTOS[1] + '\n' + TEXTOS[2]) for m in lista]
+
+    assert 'conſecuencias' in textos
+    assert 'te\nvoy   a' in textos
+
+
+def test_plegado_conserva_longitud_y_equivalencias():
+    texto = 'İstanbul ſolo AMENAZA'
+
+    plegado = plegar_mayusculas(texto)
+
+    assert len(plegado) == len(texto)
+    assert plegado[0] == 'i'
+    assert plegado[9] == plegar_mayusculas('s')
@@ -0,0 +1,108 @@
+"""
+Pruebas del servicio de traducción sin red (backend de diccionario y backends simulados)
+
+Uso:
+    python -m pytest -q src/test_servicio_traduccion.py
+"""
+
+from typing import List, Optional
+
+import pytest
+
+from src.servicio_traduccion import BackendDiccionario, CacheTraducciones, ServicioTraduccion
+
+
+FRASES = {
+    'da>en': {'god morgen': 'good morning', 'tak': 'thank you'},
+    'da>es': {'god morgen': 'buenos días', 'tak': 'gracias'}
+}
+
+
+class BackendContador(BackendDiccionario):
+    """Diccionario local que guarda en caché y anota los lotes que recibe"""
+
+    nombre = 'contador'
+    persistente = True
+
+    def __init__(self, frases=FRASES, fallar_lotes: bool = False, fallar_textos=()):
+        super().__init__(frases=frases)
+        self.lotes: List[List[str]] = []
+        self.fallar_lotes = fallar_lotes
+        self.fallar_textos = set(fallar_textos)
+
+    def traducir_lote(self, textos: List[str], origen: str, destino: str) -> List[Optional[str]]:
+        self.lotes.append(list(textos))
+        if self.fallar_lotes and len(textos) > 1:
+            raise ValueError("respuesta con distinto número de líneas")
+        if self.fallar_textos.intersection(textos):
+            raise ConnectionError("sin conexión")
+        return super().traducir_lote(textos, origen, destino)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheTraducciones(carpeta_cache=str(tmp_path / 'traducciones'))
+
+
+def crear_servicio(backend, cache=None) -> ServicioTraduccion:
+    return ServicioTraduccion(backend=backend, cache=cache, max_concurrentes=2)
+
+
+def test_diccionario_local_traduce_sin_red():
+    servicio = crear_servicio(BackendDiccionario(frases=FRASES))
+
+    assert servicio.traducir('god morgen', 'da', 'es') == 'buenos días'
+    # Los backends no persistentes no usan la caché
+    assert servicio.cache is None
+
+
+def test_textos_repetidos_se_traducen_una_vez(cache):
+    backend = BackendContador()
+    servicio = crear_servicio(backend, cache)
+
+    traducciones = servicio.traducir_lote(['tak', 'god morgen', '  tak  ', 'tak'], 'da', 'en')
+
+    assert traducciones == ['thank you', 'good morning', 'thank you', 'thank you']
+    assert backend.lotes == [['tak', 'god morgen']]
+    assert servicio.estadisticas['solicitados'] == 4
+    assert servicio.estadisticas['unicos'] == 2
+
+
+def test_segunda_llamada_sale_de_la_cache(cache):
+    backend = BackendContador()
+    crear_servicio(backend, cache).traducir_pares(['tak', 'god morgen'], [('da', 'en'), ('da', 'es')])
+    peticiones = len(backend.lotes)
+
+    # Otro servicio con la misma caché en disco no vuelve a llamar al backend
+    servicio = crear_servicio(backend, cache)
+    traducciones = servicio.traducir_pares(['god morgen', 'tak'], [('da', 'en'), ('da', 'es')])
+
+    assert traducciones[('da', 'en')] == ['good morning', 'thank you']
+    assert traducciones[('da', 'es')] == ['buenos días', 'gracias']
+    assert len(backend.lotes) == peticiones
+    assert servicio.estadisticas['en_cache'] == 4
+    assert servicio.estadisticas['peticiones'] == 0
+
+
+def test_lote_fallido_se_reintenta_linea_a_linea(cache):
+    backend = BackendContador(fallar_lotes=True)
+    servicio = crear_servicio(backend, cache)
+
+    traducciones = servicio.traducir_lote(['tak', 'god morgen'], 'da', 'en')
+
+    assert traducciones == ['thank you', 'good morning']
+    assert backend.lotes == [['tak', 'god morgen'], ['tak'], ['god morgen']]
+    assert servicio.estadisticas['errores'] == 0
+
+
+def test_error_devuelve_el_texto_original_y_no_se_cachea(cache):
+    backend = BackendContador(fallar_textos={'tak'})
+    servicio = crear_servicio(backend, cache)
+
+    traducciones = servicio.traducir_lote(['tak', 'god morgen', 'ukendt', ''], 'da', 'en')
+
+    # Error de red, texto fuera del diccionario y texto vacío conservan el original
+    assert traducciones == ['tak', 'good morning', 'ukendt', '']
+    assert servicio.estadisticas['errores'] == 1
+    assert cache.obtener(['tak', 'ukendt'], 'da', 'en') == {}
+    assert cache.obtener(['god morgen'], 'da', 'en') == {'god morgen': 'good morning'}
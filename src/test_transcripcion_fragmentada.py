@@ -0,0 +1,65 @@
+"""
+Pruebas de la unión de fragmentos en las costuras de la transcripción fragmentada
+
+Uso:
+    python -m pytest -q src/test_transcripcion_fragmentada.py
+"""
+
+import pytest
+
+from src.audio_decodificado import FRECUENCIA_MUESTREO
+from src.transcripcion_fragmentada import TranscripcionFragmentada, _eliminar_repeticion_costura
+
+
+def segmento(inicio: float, fin: float, texto: str) -> dict:
+    return {'start': inicio, 'end': fin, 'text': texto}
+
+
+def test_costura_elimina_las_palabras_repetidas():
+    anterior = segmento(8.0, 10.0, ' no vuelvas a hacer eso nunca')
+    siguientes = [segmento(9.5, 12.0, ' hacer eso, nunca más me hables')]
+
+    _eliminar_repeticion_costura(anterior, siguientes)
+
+    assert siguientes[0]['text'] == ' más me hables'
+    # El segmento siguiente empieza donde termina el anterior
+    assert siguientes[0]['start'] == 10.0
+
+
+def test_costura_sin_repeticion_suficiente_no_cambia_el_texto():
+    anterior = segmento(8.0, 10.0, ' ya te lo dije')
+    siguientes = [segmento(10.5, 12.0, ' dije que no')]
+
+    _eliminar_repeticion_costura(anterior, siguientes)
+
+    assert siguientes[0]['text'] == ' dije que no'
+    assert siguientes[0]['start'] == 10.5
+
+
+def test_unir_fragmentos_solapados_en_tiempo_original():
+    # Dos fragmentos cortados a los 10 s con 2 s de solape: 0-12 s y 8-20 s
+    sr = FRECUENCIA_MUESTREO
+    limites = [0, 10 * sr, 20 * sr]
+    fragmentos = [(0, 12 * sr), (8 * sr, 20 * sr)]
+    resultados = [
+        {'segments': [
+            segmento(0.0, 4.0, ' hola qué tal'),
+            segmento(4.0, 9.5, ' no vuelvas a hacer eso nunca'),
+            segmento(10.5, 12.0, ' texto tras el corte')
+        ]},
+        {'segments': [
+            segmento(0.0, 1.0, ' texto antes del corte'),
+            segmento(1.5, 4.0, ' hacer eso nunca más me hables'),
+            segmento(4.0, 6.0, ' adiós')
+        ]}
+    ]
+
+    unido = TranscripcionFragmentada.__new__(TranscripcionFragmentada)._unir(resultados, fragmentos, limites, 'es')
+
+    tiempos = [(s['start'], s['end']) for s in unido['segments']]
+    assert [s['text'] for s in unido['segments']] == [
+        ' hola qué tal', ' no vuelvas a hacer eso nunca', ' más me hables', ' adiós'
+    ]
+    assert tiempos == pytest.approx([(0.0, 4.0), (4.0, 9.5), (9.5, 12.0), (12.0, 14.0)])
+    assert [s['id'] for s in unido['segments']] == [0, 1, 2, 3]
+    assert unido['language'] == 'es'
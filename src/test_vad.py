@@ -0,0 +1,53 @@
+"""
+Pruebas del mapa de tiempos del VAD (audio recortado -> archivo original)
+
+Uso:
+    python -m pytest -q src/test_vad.py
+"""
+
+import pytest
+
+from src.vad import MapaTiempos, remapear_resultado
+
+
+SR = 100
+
+# Voz en 1-3 s y 5-6 s del original: 0-2 s y 2-3 s del audio recortado
+TRAMOS = [(1 * SR, 3 * SR), (5 * SR, 6 * SR)]
+
+
+def test_tiempos_dentro_de_cada_tramo():
+    mapa = MapaTiempos(TRAMOS, SR)
+
+    assert mapa.duracion_recortada == pytest.approx(3.0)
+    assert mapa.a_original(0.0) == pytest.approx(1.0)
+    assert mapa.a_original(1.5) == pytest.approx(2.5)
+    assert mapa.a_original(2.5) == pytest.approx(5.5)
+
+
+def test_union_de_tramos_segun_inicio_o_fin():
+    mapa = MapaTiempos(TRAMOS, SR)
+
+    # El instante 2 s recortado es a la vez el fin del primer tramo y el inicio del segundo
+    assert mapa.a_original(2.0) == pytest.approx(5.0)
+    assert mapa.a_original(2.0, es_fin=True) == pytest.approx(3.0)
+
+
+def test_sin_tramos_no_cambia_los_tiempos():
+    assert MapaTiempos([], SR).a_original(4.2) == 4.2
+
+
+def test_remapear_resultado_segmentos_y_palabras():
+    resultado = {
+        'segments': [
+            {'start': 0.5, 'end': 2.0, 'words': [{'start': 0.5, 'end': 1.0}]},
+            {'start': 2.0, 'end': 3.0}
+        ]
+    }
+
+    remapear_resultado(resultado, MapaTiempos(TRAMOS, SR))
+
+    primero, segundo = resultado['segments']
+    assert (primero['start'], primero['end']) == pytest.approx((1.5, 3.0))
+    assert (primero['words'][0]['start'], primero['words'][0]['end']) == pytest.approx((1.5, 2.0))
+    assert (segundo['start'], segundo['end']) == pytest.approx((5.0, 6.0))
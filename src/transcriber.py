@@ -4,11 +4,142 @@ Soporta GPU (CUDA) y CPU automáticamente
 """
 
 import os
+import time
+import copy
+import numpy as np
 import torch
 import whisper
-from typing import Optional, Dict, Any
+from whisper.tokenizer import get_tokenizer
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 
+from .registro_modelos import obtener_registro
+from .audio_decodificado import obtener_cache_audio
+from .cache_transcripciones import obtener_cache_transcripciones
+from .vad import DetectorActividadVoz, remapear_resultado
+from .motores_inferencia import crear_motor
+
+
+# Esquema de reintentos de whisper.transcribe() para la decodificación de traducciones
+TEMPERATURAS_DECODIFICACION = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+UMBRAL_COMPRESION = 2.4
+UMBRAL_LOGPROB = -1.0
+UMBRAL_SIN_VOZ = 0.6
+
+
+class _CodificadorCompartido(torch.nn.Module):
+    """
+    Envoltorio del codificador de Whisper que guarda la salida de cada ventana
+
+    whisper.transcribe() vuelve a codificar la misma ventana en cada reintento de
+    temperatura; mientras se pase el mismo tensor se reutiliza la salida. Las salidas
+    quedan en orden para que la traducción las busque por ventana con buscar().
+    """
+
+    def __init__(self, codificador: torch.nn.Module):
+        super().__init__()
+        self.codificador = codificador
+        self.ventanas: List[Tuple[torch.Tensor, torch.Tensor]] = []
+        self._por_tensor: Dict[Tuple, torch.Tensor] = {}
+        self._siguiente = 0
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        # Las entradas se conservan en self.ventanas, así que su dirección no se reutiliza
+        clave = (x.data_ptr(), tuple(x.shape), x.dtype)
+        if clave not in self._por_tensor:
+            salida = self.codificador(x)
+            self.ventanas.append((x, salida))
+            self._por_tensor[clave] = salida
+        return self._por_tensor[clave]
+
+    def buscar(self, mel_ventana: torch.Tensor) -> Optional[torch.Tensor]:
+        """
+        Salida guardada para un espectrograma igual, buscando en orden desde la última encontrada
+
+        Args:
+            mel_ventana: Espectrograma de la ventana (n_mels, N_FRAMES)
+
+        Returns:
+            Salida del codificador (n_audio_ctx, n_audio_state) o None si la ventana no se codificó
+        """
+        mel_ventana = mel_ventana.unsqueeze(0)
+        for posicion in range(self._siguiente, len(self.ventanas)):
+            entrada, salida = self.ventanas[posicion]
+            if entrada.shape == mel_ventana.shape and entrada.dtype == mel_ventana.dtype \
+                    and torch.equal(entrada, mel_ventana):
+                self._siguiente = posicion + 1
+                return salida[0]
+        return None
+
+
+def _compartir_codificador(modelo: Any) -> Tuple[Any, _CodificadorCompartido]:
+    """
+    Copia superficial del modelo cuyo codificador guarda la salida de cada ventana
+
+    Los pesos son los del modelo original, que no se modifica: otros hilos pueden
+    seguir usándolo mientras tanto.
+
+    Args:
+        modelo: Modelo Whisper cargado
+
+    Returns:
+        Tupla (copia del modelo, codificador compartido)
+    """
+    codificador = _CodificadorCompartido(modelo.encoder)
+    copia = copy.copy(modelo)
+    copia._modules = dict(modelo._modules)
+    copia.encoder = codificador
+    return copia, codificador
+
+
+def _segmentos_desde_tokens(decodificado: Any, tokenizer: Any, duracion: float) -> List[Dict[str, Any]]:
+    """
+    Separa en segmentos una decodificación con timestamps de una ventana de 30 segundos
+
+    Args:
+        decodificado: DecodingResult de whisper.decode()
+        tokenizer: Tokenizer de Whisper
+        duracion: Duración real del clip en segundos
+
+    Returns:
+        Segmentos con el formato de whisper.transcribe()
+    """
+    segmentos = []
+    inicio = None
+    tokens_texto: List[int] = []
+
+    def cerrar(fin: float):
+        texto = tokenizer.decode(tokens_texto)
+        if texto.strip():
+            segmentos.append({
+                'id': len(segmentos),
+                'seek': 0,
+                'start': inicio if inicio is not None else 0.0,
+                'end': min(fin, duracion),
+                'text': texto,
+                'tokens': list(tokens_texto),
+                'temperature': decodificado.temperature,
+                'avg_logprob': decodificado.avg_logprob,
+                'compression_ratio': decodificado.compression_ratio,
+                'no_speech_prob': decodificado.no_speech_prob
+            })
+
+    for token in decodificado.tokens:
+        if token >= tokenizer.timestamp_begin:
+            tiempo = (token - tokenizer.timestamp_begin) * 0.02
+            if inicio is not None and tokens_texto:
+                cerrar(tiempo)
+                inicio, tokens_texto = None, []
+            else:
+                inicio = tiempo
+        else:
+            tokens_texto.append(token)
+
+    if tokens_texto:
+        cerrar(duracion)
+
+    return segmentos
+
 
 class WhisperTranscriber:
     """
@@ -24,21 +155,50 @@ class WhisperTranscriber:
         'large-v3': 'large-v3'
     }
     
-    def __init__(self, modelo: str = 'base', dispositivo: Optional[str] = None):
+    def __init__(
+        self,
+        modelo: str = 'base',
+        dispositivo: Optional[str] = None,
+        precision: Optional[str] = None,
+        motor: str = 'whisper'
+    ):
         """
         Inicializa el transcriptor Whisper
         
         Args:
             modelo: Nombre del modelo a usar (tiny, base, small, medium, large-v3)
             dispositivo: Dispositivo forzado ('cuda' o 'cpu'). Si None, detecta automáticamente
+            precision: Precisión de los pesos cargados. Si None, la del motor para el dispositivo
+                       (fp32 en whisper, que admite fp16 solo en GPU; int8 en CPU y float16
+                       en GPU en faster-whisper)
+            motor: Motor de inferencia ('whisper' o 'faster-whisper')
         """
         self.modelo_nombre = modelo
-        self.modelo = None
         self.logger = logging.getLogger(__name__)
+        self.motor = crear_motor(motor)
         self.dispositivo = self._detectar_dispositivo(dispositivo)
+        self.precision = self.motor.normalizar_precision(precision, self.dispositivo)
+        self.registro = obtener_registro()
+        self.cache_audio = obtener_cache_audio()
+        self.cache_transcripciones = obtener_cache_transcripciones()
+        self.detector_vad = DetectorActividadVoz()
         
         self._cargar_modelo()
     
+    @property
+    def clave_modelo(self) -> tuple:
+        """Clave del modelo en el registro compartido"""
+        return (self.modelo_nombre, self.dispositivo, self.precision, self.motor.nombre)
+    
+    @property
+    def modelo(self):
+        """
+        Modelo Whisper compartido por el proceso
+        
+        Si el registro lo expulsó por falta de memoria, se vuelve a cargar
+        """
+        return self.registro.obtener(self.clave_modelo, self._crear_modelo)
+    
     def _detectar_dispositivo(self, dispositivo_forzado: Optional[str] = None) -> str:
         """
         Detecta automáticamente si hay GPU disponible
@@ -60,24 +220,72 @@ class WhisperTranscriber:
             self.logger.info("No se detectó GPU, usando CPU")
             return 'cpu'
     
+    def _crear_modelo(self):
+        """Carga el modelo desde disco con el motor configurado (lo invoca el registro)"""
+        return self.motor.cargar(self.modelo_nombre, self.dispositivo, self.precision)
+    
     def _cargar_modelo(self):
-        """Carga el modelo Whisper en el dispositivo correspondiente"""
+        """Carga el modelo Whisper en el dispositivo correspondiente, o lo reutiliza si ya está en el registro"""
         try:
-            self.logger.info(f"Cargando modelo '{self.modelo_nombre}' en {self.dispositivo}...")
-            
-            # Whisper detecta automáticamente el dispositivo según torch
-            # pero podemos forzarlo moviendo el modelo después
-            self.modelo = whisper.load_model(
-                self.modelo_nombre,
-                device=self.dispositivo
+            self.logger.info(
+                f"Preparando modelo '{self.modelo_nombre}' en {self.dispositivo} "
+                f"(motor {self.motor.nombre}, precisión {self.precision})..."
             )
             
-            self.logger.info(f"Modelo '{self.modelo_nombre}' cargado exitosamente en {self.dispositivo}")
+            self.registro.obtener(self.clave_modelo, self._crear_modelo)
+            
+            self.logger.info(f"Modelo '{self.modelo_nombre}' listo en {self.dispositivo}")
             
         except Exception as e:
             self.logger.error(f"Error al cargar el modelo: {str(e)}")
             raise
     
+    def _clave_cache(
+        self,
+        ruta_audio: str,
+        idioma: Optional[str],
+        task: str,
+        fp16: bool,
+        opciones: Dict[str, Any],
+        vad: bool = False
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Calcula la clave de la caché de transcripciones para un archivo
+
+        Args:
+            ruta_audio: Ruta al archivo de audio
+            idioma: Idioma forzado o None
+            task: Tarea de Whisper
+            fp16: Media precisión solicitada
+            opciones: Opciones de decodificación adicionales
+            vad: Si se recortan silencios antes de transcribir
+
+        Returns:
+            Tupla (clave, metadatos descriptivos de la entrada)
+        """
+        sha256_audio = self.cache_audio.hash_archivo(ruta_audio)
+        # En CPU Whisper ignora fp16, así que no debe cambiar la clave
+        opciones_clave = {
+            'motor': self.motor.nombre,
+            'precision': self.precision,
+            'fp16': fp16 and self.dispositivo != 'cpu',
+            **opciones
+        }
+        if vad:
+            opciones_clave['vad'] = self.detector_vad.configuracion()
+        clave = self.cache_transcripciones.calcular_clave(
+            sha256_audio, self.modelo_nombre, idioma, task, opciones_clave
+        )
+        metadatos = {
+            'archivo': os.path.basename(ruta_audio),
+            'sha256_audio': sha256_audio,
+            'modelo': self.modelo_nombre,
+            'idioma': idioma,
+            'task': task,
+            'opciones': opciones_clave
+        }
+        return clave, metadatos
+
     def transcribir(
         self,
         ruta_audio: str,
@@ -85,6 +293,9 @@ class WhisperTranscriber:
         task: str = 'transcribe',
         verbose: bool = False,
         fp16: bool = True,
+        audio: Optional[np.ndarray] = None,
+        usar_cache: bool = True,
+        vad: bool = False,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -95,6 +306,10 @@ class WhisperTranscriber:
             idioma: Código de idioma (es, en, pt, etc.). None para detección automática
             task: 'transcribe' o 'translate' (traducir a inglés)
             verbose: Mostrar progreso detallado
+            audio: Audio ya decodificado a 16 kHz. Si None, se obtiene de la caché de audio
+            usar_cache: Reutilizar/guardar el resultado en la caché de transcripciones
+            vad: Transcribir solo los tramos con voz; los timestamps se devuelven en
+                 tiempo del archivo original
             **kwargs: Argumentos adicionales para whisper.transcribe()
             
         Returns:
@@ -104,6 +319,14 @@ class WhisperTranscriber:
             raise FileNotFoundError(f"El archivo no existe: {ruta_audio}")
         
         try:
+            clave_cache = None
+            if usar_cache:
+                clave_cache, metadatos_cache = self._clave_cache(ruta_audio, idioma, task, fp16, kwargs, vad)
+                resultado = self.cache_transcripciones.obtener(clave_cache)
+                if resultado is not None:
+                    self.logger.info(f"Transcripción en caché: {os.path.basename(ruta_audio)}")
+                    return resultado
+            
             self.logger.info(f"Transcribiendo: {os.path.basename(ruta_audio)}")
             
             # Opciones de transcripción
@@ -121,22 +344,458 @@ class WhisperTranscriber:
             else:
                 self.logger.info("Detección automática de idioma")
             
+            # Audio decodificado una sola vez y compartido con los analizadores
+            if audio is None:
+                audio = self.cache_audio.obtener(ruta_audio)
+            
+            # Recortar silencios antes del modelo
+            mapa_tiempos = None
+            if vad:
+                audio, mapa_tiempos = self.detector_vad.recortar(audio)
+            
             # Realizar transcripción
-            resultado = self.modelo.transcribe(
-                ruta_audio,
-                **opciones
-            )
+            if mapa_tiempos is not None and len(audio) == 0:
+                resultado = {'text': '', 'segments': [], 'language': idioma}
+            else:
+                resultado = self.motor.transcribir(
+                    self.modelo,
+                    audio,
+                    **opciones
+                )
+            
+            if mapa_tiempos is not None:
+                remapear_resultado(resultado, mapa_tiempos)
             
             # Log del idioma detectado
             idioma_detectado = resultado.get('language', 'desconocido')
             self.logger.info(f"Idioma detectado: {idioma_detectado}")
             
+            if clave_cache:
+                self.cache_transcripciones.guardar(clave_cache, resultado, metadatos_cache)
+            
             return resultado
             
         except Exception as e:
             self.logger.error(f"Error al transcribir {ruta_audio}: {str(e)}")
             raise
     
+    def transcribir_y_traducir(
+        self,
+        ruta_audio: str,
+        idioma: Optional[str] = None,
+        verbose: bool = False,
+        fp16: bool = True,
+        audio: Optional[np.ndarray] = None,
+        usar_cache: bool = True,
+        vad: bool = False,
+        **kwargs
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Transcribe y traduce al inglés un archivo en una sola pasada del codificador
+
+        El audio se decodifica una vez y la salida del codificador de cada ventana
+        de 30 segundos se reutiliza para decodificar la traducción. Las salidas del
+        codificador se mantienen en memoria hasta terminar el archivo (unos 7 MB por
+        ventana con large-v3).
+
+        Args:
+            ruta_audio: Ruta al archivo de audio
+            idioma: Código de idioma del audio. None para detección automática
+            verbose: Mostrar progreso detallado
+            fp16: Usar media precisión (solo GPU)
+            audio: Audio ya decodificado a 16 kHz. Si None, se obtiene de la caché de audio
+            usar_cache: Reutilizar/guardar los resultados en la caché de transcripciones
+            vad: Procesar solo los tramos con voz (timestamps en tiempo original)
+            **kwargs: Argumentos adicionales para whisper.transcribe()
+
+        Returns:
+            Tupla (transcripción, traducción al inglés) con el formato de transcribir()
+        """
+        if not os.path.exists(ruta_audio):
+            raise FileNotFoundError(f"El archivo no existe: {ruta_audio}")
+
+        try:
+            if not self.motor.decodificacion_directa:
+                # El motor no expone el codificador: dos pasadas sobre el mismo audio decodificado
+                if audio is None:
+                    audio = self.cache_audio.obtener(ruta_audio)
+                opciones = {'verbose': verbose, 'fp16': fp16, 'audio': audio, 'usar_cache': usar_cache, 'vad': vad, **kwargs}
+                transcripcion = self.transcribir(ruta_audio, idioma=idioma, task='transcribe', **opciones)
+                traduccion = self.transcribir(
+                    ruta_audio, idioma=idioma or transcripcion.get('language'), task='translate', **opciones
+                )
+                return transcripcion, traduccion
+
+            if usar_cache:
+                # La transcripción comparte clave con transcribir(); la traducción por
+                # ventanas tiene su propia tarea porque no equivale a task='translate'
+                # ('_ts': segmentos con timestamps, no un segmento por ventana)
+                clave_es, metadatos_es = self._clave_cache(ruta_audio, idioma, 'transcribe', fp16, kwargs, vad)
+                clave_en, metadatos_en = self._clave_cache(ruta_audio, idioma, 'translate_ventanas_ts', fp16, kwargs, vad)
+                transcripcion = self.cache_transcripciones.obtener(clave_es)
+                traduccion = self.cache_transcripciones.obtener(clave_en)
+                if transcripcion is not None and traduccion is not None:
+                    self.logger.info(f"Transcripción y traducción en caché: {os.path.basename(ruta_audio)}")
+                    return transcripcion, traduccion
+
+            self.logger.info(f"Transcribiendo y traduciendo: {os.path.basename(ruta_audio)}")
+
+            modelo = self.modelo
+            if modelo.device == torch.device('cpu'):
+                fp16 = False
+
+            # Decodificación única del audio
+            if audio is None:
+                audio = self.cache_audio.obtener(ruta_audio)
+
+            mapa_tiempos = None
+            if vad:
+                audio, mapa_tiempos = self.detector_vad.recortar(audio)
+
+            opciones = {'task': 'transcribe', 'verbose': verbose, 'fp16': fp16, **kwargs}
+            if idioma:
+                opciones['language'] = idioma
+
+            if mapa_tiempos is not None and len(audio) == 0:
+                transcripcion = {'text': '', 'segments': [], 'language': idioma}
+                traduccion = {'text': '', 'segments': [], 'language': idioma}
+            else:
+                modelo_compartido, codificador = _compartir_codificador(modelo)
+                transcripcion = modelo_compartido.transcribe(audio, **opciones)
+                idioma_audio = idioma or transcripcion.get('language')
+                traduccion = self._traducir_ventanas(
+                    modelo, codificador, audio, transcripcion, idioma_audio, fp16,
+                    condicionar=kwargs.get('condition_on_previous_text', True)
+                )
+
+            if mapa_tiempos is not None:
+                remapear_resultado(transcripcion, mapa_tiempos)
+                remapear_resultado(traduccion, mapa_tiempos)
+
+            self.logger.info(f"Idioma detectado: {transcripcion.get('language', 'desconocido')}")
+
+            if usar_cache:
+                self.cache_transcripciones.guardar(clave_es, transcripcion, metadatos_es)
+                self.cache_transcripciones.guardar(clave_en, traduccion, metadatos_en)
+
+            return transcripcion, traduccion
+
+        except Exception as e:
+            self.logger.error(f"Error al transcribir y traducir {ruta_audio}: {str(e)}")
+            raise
+
+    def _traducir_ventanas(
+        self,
+        modelo: Any,
+        codificador: _CodificadorCompartido,
+        audio: np.ndarray,
+        transcripcion: Dict[str, Any],
+        idioma: Optional[str],
+        fp16: bool,
+        condicionar: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Decodifica la traducción de las mismas ventanas usadas en la transcripción
+
+        Cada ventana reutiliza la salida del codificador de la transcripción (o se
+        codifica una vez si no está) y se decodifica con timestamps, así que la
+        traducción conserva segmentos con sus propios tiempos.
+
+        Args:
+            modelo: Modelo Whisper
+            codificador: Codificador compartido con el que se hizo la transcripción
+            audio: Audio decodificado a 16 kHz
+            transcripcion: Resultado de la transcripción (segmentos con 'seek')
+            idioma: Idioma del audio
+            fp16: Usar media precisión
+            condicionar: Usar la traducción de la ventana anterior como contexto
+                         (condition_on_previous_text de whisper.transcribe())
+
+        Returns:
+            Diccionario con el formato de whisper.transcribe()
+        """
+        from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE
+
+        # Mismo espectrograma y mismos cortes que whisper.transcribe()
+        mel = whisper.log_mel_spectrogram(audio, modelo.dims.n_mels, padding=N_SAMPLES)
+        frames_contenido = mel.shape[-1] - N_FRAMES
+        dtype = torch.float16 if fp16 else torch.float32
+        tokenizer = get_tokenizer(
+            modelo.is_multilingual,
+            num_languages=modelo.num_languages,
+            language=idioma,
+            task='translate'
+        )
+
+        # Ventanas con segmentos transcritos
+        ventanas = sorted({segmento['seek'] for segmento in transcripcion.get('segments', [])})
+
+        segmentos = []
+        tokens_previos: List[int] = []
+        for seek in ventanas:
+            tamano = min(N_FRAMES, frames_contenido - seek)
+            mel_ventana = mel[:, seek:seek + tamano]
+            mel_ventana = whisper.pad_or_trim(mel_ventana, N_FRAMES).to(modelo.device).to(dtype)
+
+            caracteristicas = codificador.buscar(mel_ventana)
+            if caracteristicas is None:
+                caracteristicas = modelo.embed_audio(mel_ventana.unsqueeze(0))[0]
+
+            resultado = self._decodificar_con_reintentos(modelo, caracteristicas, idioma, fp16, tokens_previos)
+
+            # Mismo criterio que whisper.transcribe(): ventana sin voz, se omite
+            if resultado.no_speech_prob > UMBRAL_SIN_VOZ and resultado.avg_logprob < UMBRAL_LOGPROB:
+                continue
+
+            desplazamiento = seek * HOP_LENGTH / SAMPLE_RATE
+            for segmento in _segmentos_desde_tokens(resultado, tokenizer, duracion=tamano * HOP_LENGTH / SAMPLE_RATE):
+                segmento.update(
+                    id=len(segmentos),
+                    seek=seek,
+                    start=segmento['start'] + desplazamiento,
+                    end=segmento['end'] + desplazamiento
+                )
+                segmentos.append(segmento)
+
+            if condicionar and resultado.temperature <= 0.5:
+                tokens_previos.extend(resultado.tokens)
+            else:
+                tokens_previos = []
+
+        return {
+            'text': ''.join(s['text'] for s in segmentos),
+            'segments': segmentos,
+            'language': idioma
+        }
+
+    def _decodificar_con_reintentos(
+        self,
+        modelo: Any,
+        caracteristicas: torch.Tensor,
+        idioma: Optional[str],
+        fp16: bool,
+        tokens_previos: List[int]
+    ) -> Any:
+        """
+        Decodifica una ventana en modo traducción con el mismo esquema de
+        temperaturas de whisper.transcribe()
+
+        Args:
+            modelo: Modelo Whisper
+            caracteristicas: Salida del codificador para la ventana (n_audio_ctx, n_audio_state)
+            idioma: Idioma del audio
+            fp16: Usar media precisión
+            tokens_previos: Tokens de las ventanas anteriores usados como contexto
+
+        Returns:
+            DecodingResult de la mejor decodificación
+        """
+        resultado = None
+        for temperatura in TEMPERATURAS_DECODIFICACION:
+            opciones = whisper.DecodingOptions(
+                task='translate',
+                language=idioma,
+                temperature=temperatura,
+                prompt=tokens_previos or None,
+                fp16=fp16
+            )
+            resultado = whisper.decode(modelo, caracteristicas, opciones)
+
+            reintentar = (
+                resultado.compression_ratio > UMBRAL_COMPRESION
+                or resultado.avg_logprob < UMBRAL_LOGPROB
+            )
+            # Una ventana probablemente sin voz no se reintenta
+            if resultado.no_speech_prob > UMBRAL_SIN_VOZ:
+                reintentar = False
+            if not reintentar:
+                break
+
+        return resultado
+
+    def transcribir_lote(
+        self,
+        rutas_audio: List[str],
+        idioma: Optional[str] = None,
+        fp16: bool = True,
+        tamano_lote: int = 8,
+        usar_cache: bool = True,
+        vad: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Transcribe varios archivos cortos en lotes, con una sola pasada del modelo por lote
+
+        Los clips de hasta 30 segundos se rellenan a la ventana mel completa y se
+        decodifican juntos. Los archivos más largos, y los clips cuya decodificación
+        en lote no supera los umbrales de calidad de Whisper, se transcriben
+        individualmente con transcribir().
+
+        Args:
+            rutas_audio: Rutas de los archivos de audio
+            idioma: Código de idioma. None para detección automática por archivo
+            fp16: Usar media precisión (solo GPU)
+            tamano_lote: Clips por pasada del modelo
+            usar_cache: Reutilizar/guardar los resultados en la caché de transcripciones. Los
+                        clips decodificados en lote tienen su propia entrada; si falta, se
+                        reutiliza la de transcribir()
+            vad: Recortar los silencios antes de agrupar los clips; los timestamps se
+                 devuelven en tiempo del archivo original
+
+        Returns:
+            Lista de resultados con el formato de transcribir(), en el orden de rutas_audio
+        """
+        from whisper.audio import N_SAMPLES
+
+        if not self.motor.decodificacion_directa:
+            return [
+                self.transcribir(ruta, idioma=idioma, fp16=fp16, usar_cache=usar_cache, vad=vad)
+                for ruta in rutas_audio
+            ]
+
+        resultados: List[Optional[Dict[str, Any]]] = [None] * len(rutas_audio)
+        claves: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        mapas: Dict[int, Any] = {}
+        cortos: List[Tuple[int, np.ndarray]] = []
+        largos: List[int] = []
+
+        for i, ruta in enumerate(rutas_audio):
+            if not os.path.exists(ruta):
+                raise FileNotFoundError(f"El archivo no existe: {ruta}")
+
+            if usar_cache:
+                # La decodificación en lote (temperatura 0, sin contexto previo) no da el mismo
+                # resultado que transcribir(): clave propia, pero vale el resultado de transcribir()
+                claves[i] = self._clave_cache(ruta, idioma, 'transcribe_lote', fp16, {}, vad)
+                resultado = self.cache_transcripciones.obtener(claves[i][0])
+                if resultado is None:
+                    resultado = self.cache_transcripciones.obtener(
+                        self._clave_cache(ruta, idioma, 'transcribe', fp16, {}, vad)[0]
+                    )
+                if resultado is not None:
+                    resultados[i] = resultado
+                    continue
+
+            audio = self.cache_audio.obtener(ruta)
+            if vad:
+                audio, mapas[i] = self.detector_vad.recortar(audio)
+                if len(audio) == 0:
+                    resultados[i] = {'text': '', 'segments': [], 'language': idioma}
+                    if usar_cache:
+                        self.cache_transcripciones.guardar(claves[i][0], resultados[i], claves[i][1])
+                    continue
+            if len(audio) <= N_SAMPLES:
+                cortos.append((i, audio))
+            else:
+                largos.append(i)
+
+        self.logger.info(
+            f"Transcripción en lote: {len(cortos)} clips cortos, {len(largos)} archivos largos, "
+            f"{len(rutas_audio) - len(cortos) - len(largos)} en caché"
+        )
+
+        modelo = self.modelo
+        if modelo.device == torch.device('cpu'):
+            fp16 = False
+
+        for inicio in range(0, len(cortos), tamano_lote):
+            lote = cortos[inicio:inicio + tamano_lote]
+            tiempo_inicio = time.time()
+            decodificados = self._decodificar_lote(modelo, [audio for _, audio in lote], idioma, fp16)
+            self.logger.info(f"Lote de {len(lote)} clips decodificado en {time.time() - tiempo_inicio:.2f} segundos")
+
+            for (i, _), resultado in zip(lote, decodificados):
+                if resultado is None:
+                    # Calidad insuficiente: transcripción individual con reintentos de temperatura
+                    largos.append(i)
+                    continue
+                if i in mapas:
+                    remapear_resultado(resultado, mapas[i])
+                resultados[i] = resultado
+                if usar_cache:
+                    self.cache_transcripciones.guardar(claves[i][0], resultado, claves[i][1])
+
+        # transcribir() guarda estos resultados con su propia clave
+        for i in sorted(largos):
+            resultados[i] = self.transcribir(rutas_audio[i], idioma=idioma, fp16=fp16, usar_cache=usar_cache, vad=vad)
+
+        return resultados
+
+    def _decodificar_lote(
+        self,
+        modelo: Any,
+        audios: List[np.ndarray],
+        idioma: Optional[str],
+        fp16: bool
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Decodifica un lote de clips de hasta 30 segundos en una sola llamada al modelo
+
+        Args:
+            modelo: Modelo Whisper
+            audios: Clips a 16 kHz
+            idioma: Idioma forzado o None para detectarlo por clip
+            fp16: Usar media precisión
+
+        Returns:
+            Resultado por clip (vacío si no hay voz), o None si no supera los umbrales de calidad
+        """
+        from whisper.audio import SAMPLE_RATE
+
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(np.asarray(audio)), modelo.dims.n_mels)
+            for audio in audios
+        ]).to(modelo.device)
+
+        if idioma:
+            idiomas = [idioma] * len(audios)
+        elif modelo.is_multilingual:
+            _, probabilidades = modelo.detect_language(mel)
+            idiomas = [max(p, key=p.get) for p in probabilidades]
+        else:
+            idiomas = ['en'] * len(audios)
+
+        # Una llamada a decode por idioma presente en el lote
+        decodificados: List[Optional[Any]] = [None] * len(audios)
+        for idioma_grupo in sorted(set(idiomas)):
+            indices = [i for i, idioma_clip in enumerate(idiomas) if idioma_clip == idioma_grupo]
+            opciones = whisper.DecodingOptions(
+                task='transcribe',
+                language=idioma_grupo,
+                temperature=0.0,
+                fp16=fp16
+            )
+            for i, resultado in zip(indices, whisper.decode(modelo, mel[indices], opciones)):
+                decodificados[i] = resultado
+
+        tokenizer = get_tokenizer(
+            modelo.is_multilingual,
+            num_languages=modelo.num_languages,
+            task='transcribe'
+        )
+
+        resultados: List[Optional[Dict[str, Any]]] = []
+        for audio, idioma_clip, decodificado in zip(audios, idiomas, decodificados):
+            # Mismo criterio que whisper.transcribe(): ventana sin voz, se omite
+            if decodificado.no_speech_prob > UMBRAL_SIN_VOZ and decodificado.avg_logprob < UMBRAL_LOGPROB:
+                resultados.append({'text': '', 'segments': [], 'language': idioma_clip})
+                continue
+
+            if (decodificado.compression_ratio > UMBRAL_COMPRESION
+                    or decodificado.avg_logprob < UMBRAL_LOGPROB):
+                resultados.append(None)
+                continue
+
+            segmentos = _segmentos_desde_tokens(
+                decodificado, tokenizer, duracion=len(audio) / SAMPLE_RATE
+            )
+            resultados.append({
+                'text': ''.join(s['text'] for s in segmentos),
+                'segments': segmentos,
+                'language': idioma_clip
+            })
+
+        return resultados
+
     def obtener_info_modelo(self) -> Dict[str, Any]:
         """
         Obtiene información sobre el modelo y dispositivo actual
@@ -147,9 +806,17 @@ class WhisperTranscriber:
         info = {
             'modelo': self.modelo_nombre,
             'dispositivo': self.dispositivo,
+            'precision': self.precision,
+            'motor': self.motor.nombre,
             'gpu_disponible': torch.cuda.is_available()
         }
         
+        # Tiempo de carga y memoria residente según el registro
+        info_registro = self.registro.info(self.clave_modelo)
+        if info_registro:
+            info['tiempo_carga_s'] = info_registro['tiempo_carga_s']
+            info['tamano_mb'] = info_registro['tamano_mb']
+        
         if torch.cuda.is_available():
             info['gpu_nombre'] = torch.cuda.get_device_name(0)
             info['gpu_memoria_total_gb'] = torch.cuda.get_device_properties(0).total_memory / 1024**3
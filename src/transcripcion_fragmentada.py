@@ -0,0 +1,314 @@
+"""
+Transcripción de audios largos por fragmentos en paralelo
+El audio se corta en pausas detectadas por VAD, los fragmentos se transcriben en un pool
+de procesos y los segmentos se unen eliminando el texto duplicado en las costuras
+"""
+
+import os
+import re
+import time
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from .audio_decodificado import obtener_cache_audio, FRECUENCIA_MUESTREO
+from .cache_transcripciones import obtener_cache_transcripciones
+from .pool_transcripcion import PoolTranscripcion
+from .vad import DetectorActividadVoz
+
+
+# Tramas mel de Whisper por segundo (campo 'seek' de los segmentos)
+TRAMAS_POR_SEGUNDO = 100
+
+# Palabras mínimas en común para considerar que el inicio de un fragmento repite el final del anterior
+PALABRAS_MIN_COSTURA = 3
+
+
+class TranscripcionFragmentada:
+    """
+    Divide audios largos en fragmentos cortados en pausas y los transcribe en paralelo
+    """
+
+    def __init__(
+        self,
+        pool: PoolTranscripcion,
+        duracion_objetivo_s: float = 120.0,
+        tolerancia_s: float = 30.0,
+        solape_s: float = 2.0,
+        detector_vad: Optional[DetectorActividadVoz] = None
+    ):
+        """
+        Inicializa el transcriptor fragmentado
+
+        Args:
+            pool: Pool de procesos transcriptores
+            duracion_objetivo_s: Duración aproximada de cada fragmento
+            tolerancia_s: Distancia máxima al punto objetivo para buscar una pausa donde cortar
+            solape_s: Audio compartido por fragmentos consecutivos a cada lado del corte
+            detector_vad: Detector de pausas. Si None, se usa uno con la configuración por defecto
+        """
+        self.logger = logging.getLogger(__name__)
+        self.pool = pool
+        self.duracion_objetivo_s = duracion_objetivo_s
+        self.tolerancia_s = tolerancia_s
+        self.solape_s = solape_s
+        self.detector_vad = detector_vad or DetectorActividadVoz()
+        self.cache_audio = obtener_cache_audio()
+        self.cache_transcripciones = obtener_cache_transcripciones()
+
+    def planificar_cortes(self, audio) -> List[int]:
+        """
+        Elige los puntos de corte, preferentemente en el centro de una pausa
+
+        Args:
+            audio: Audio mono a 16 kHz
+
+        Returns:
+            Muestras de corte (sin incluir 0 ni el final)
+        """
+        sr = FRECUENCIA_MUESTREO
+        total = len(audio)
+        paso = int(self.duracion_objetivo_s * sr)
+        if total <= paso * 1.5:
+            return []
+
+        # Centros de las pausas entre tramos de voz
+        tramos = self.detector_vad.detectar(audio)
+        pausas = [(fin + inicio_siguiente) // 2 for (_, fin), (inicio_siguiente, _) in zip(tramos, tramos[1:])]
+
+        cortes = []
+        tolerancia = int(self.tolerancia_s * sr)
+        objetivo = paso
+        while objetivo < total - paso // 2:
+            candidatas = [p for p in pausas if abs(p - objetivo) <= tolerancia and (not cortes or p > cortes[-1])]
+            corte = min(candidatas, key=lambda p: abs(p - objetivo)) if candidatas else objetivo
+            cortes.append(corte)
+            objetivo = corte + paso
+
+        return cortes
+
+    def transcribir(
+        self,
+        ruta_audio: str,
+        idioma: Optional[str] = None,
+        usar_cache: bool = True,
+        **opciones
+    ) -> Dict[str, Any]:
+        """
+        Transcribe un archivo largo por fragmentos en paralelo
+
+        Args:
+            ruta_audio: Ruta al archivo de audio
+            idioma: Código de idioma o None para detección automática
+            usar_cache: Reutilizar/guardar el resultado en la caché de transcripciones
+            **opciones: Argumentos adicionales para WhisperTranscriber.transcribir()
+
+        Returns:
+            Resultado con el formato de whisper.transcribe() y timestamps del archivo original
+        """
+        clave = None
+        if usar_cache:
+            clave, metadatos = self._clave_cache(ruta_audio, idioma, opciones)
+            resultado = self.cache_transcripciones.obtener(clave)
+            if resultado is not None:
+                self.logger.info(f"Transcripción en caché: {os.path.basename(ruta_audio)}")
+                return resultado
+
+        audio = self.cache_audio.obtener(ruta_audio)
+        cortes = self.planificar_cortes(audio)
+        limites = [0] + cortes + [len(audio)]
+        solape = int(self.solape_s * FRECUENCIA_MUESTREO)
+        fragmentos = [
+            (max(0, limites[i] - solape), min(len(audio), limites[i + 1] + solape))
+            for i in range(len(limites) - 1)
+        ]
+
+        self.logger.info(
+            f"Transcribiendo {os.path.basename(ruta_audio)} en {len(fragmentos)} fragmento(s) "
+            f"con {self.pool.num_workers} workers"
+        )
+        tiempo_inicio = time.time()
+        resultados = self._transcribir_fragmentos(ruta_audio, fragmentos, idioma, opciones)
+
+        # Idioma del archivo: voto ponderado por duración de voz de cada fragmento
+        idioma_final = idioma or self._votar_idioma(resultados)
+        discrepantes = [i for i, r in enumerate(resultados) if r.get('language') != idioma_final]
+        if discrepantes and not idioma:
+            self.logger.info(
+                f"Idioma mayoritario: {idioma_final}. Retranscribiendo {len(discrepantes)} fragmento(s) "
+                f"detectados en otro idioma"
+            )
+            corregidos = self._transcribir_fragmentos(
+                ruta_audio, [fragmentos[i] for i in discrepantes], idioma_final, opciones
+            )
+            for i, resultado in zip(discrepantes, corregidos):
+                resultados[i] = resultado
+
+        resultado = self._unir(resultados, fragmentos, limites, idioma_final)
+        self.logger.info(
+            f"Transcripción fragmentada completada en {time.time() - tiempo_inicio:.2f} segundos "
+            f"({len(resultado['segments'])} segmentos)"
+        )
+
+        if clave:
+            self.cache_transcripciones.guardar(clave, resultado, metadatos)
+        return resultado
+
+    def _transcribir_fragmentos(
+        self,
+        ruta_audio: str,
+        fragmentos: List[Tuple[int, int]],
+        idioma: Optional[str],
+        opciones: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Transcribe los fragmentos en el pool y los devuelve en orden"""
+        resultados: List[Optional[Dict[str, Any]]] = [None] * len(fragmentos)
+        for indice, resultado, error, segundos in self.pool.transcribir_fragmentos(
+            ruta_audio, fragmentos, idioma, **opciones
+        ):
+            if error is not None:
+                raise RuntimeError(f"Error en el fragmento {indice + 1}/{len(fragmentos)}: {str(error)}") from error
+            inicio, fin = fragmentos[indice]
+            self.logger.info(
+                f"  Fragmento {indice + 1}/{len(fragmentos)} "
+                f"({inicio / FRECUENCIA_MUESTREO:.0f}-{fin / FRECUENCIA_MUESTREO:.0f} s) en {segundos:.2f} segundos"
+            )
+            resultados[indice] = resultado
+        return resultados
+
+    def _votar_idioma(self, resultados: List[Dict[str, Any]]) -> Optional[str]:
+        """Idioma con más segundos transcritos entre todos los fragmentos"""
+        segundos_por_idioma: Dict[str, float] = defaultdict(float)
+        for resultado in resultados:
+            duracion = sum(s['end'] - s['start'] for s in resultado.get('segments', []))
+            if resultado.get('language'):
+                segundos_por_idioma[resultado['language']] += duracion
+        if not segundos_por_idioma:
+            return resultados[0].get('language') if resultados else None
+        return max(segundos_por_idioma, key=segundos_por_idioma.get)
+
+    def _unir(
+        self,
+        resultados: List[Dict[str, Any]],
+        fragmentos: List[Tuple[int, int]],
+        limites: List[int],
+        idioma: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Une los segmentos de todos los fragmentos en tiempo del archivo original
+
+        Cada costura se sitúa en el punto de corte: del fragmento anterior se conservan
+        los segmentos que empiezan antes del corte y del siguiente los que terminan
+        después. El texto repetido en el solape se elimina por coincidencia de palabras.
+        """
+        segmentos: List[Dict[str, Any]] = []
+
+        for i, (resultado, (inicio, _)) in enumerate(zip(resultados, fragmentos)):
+            desplazamiento = inicio / FRECUENCIA_MUESTREO
+            corte_inicio = limites[i] / FRECUENCIA_MUESTREO
+            corte_fin = limites[i + 1] / FRECUENCIA_MUESTREO
+
+            nuevos = []
+            for segmento in resultado.get('segments', []):
+                segmento = _desplazar_segmento(segmento, desplazamiento)
+                if i > 0 and segmento['end'] <= corte_inicio:
+                    continue
+                if i < len(resultados) - 1 and segmento['start'] >= corte_fin:
+                    continue
+                nuevos.append(segmento)
+
+            if segmentos and nuevos:
+                _eliminar_repeticion_costura(segmentos[-1], nuevos)
+            segmentos.extend(s for s in nuevos if s['text'].strip())
+
+        for i, segmento in enumerate(segmentos):
+            segmento['id'] = i
+
+        return {
+            'text': ''.join(s['text'] for s in segmentos),
+            'segments': segmentos,
+            'language': idioma
+        }
+
+    def _clave_cache(
+        self,
+        ruta_audio: str,
+        idioma: Optional[str],
+        opciones: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Clave de caché del resultado unido (depende también de la fragmentación)"""
+        sha256_audio = self.cache_audio.hash_archivo(ruta_audio)
+        opciones_clave = {
+            'motor': self.pool.motor,
+            'fragmentado': {
+                'duracion_objetivo_s': self.duracion_objetivo_s,
+                'tolerancia_s': self.tolerancia_s,
+                'solape_s': self.solape_s,
+                'vad': self.detector_vad.configuracion()
+            },
+            **opciones
+        }
+        clave = self.cache_transcripciones.calcular_clave(
+            sha256_audio, self.pool.modelo, idioma, 'transcribe', opciones_clave
+        )
+        metadatos = {
+            'archivo': os.path.basename(ruta_audio),
+            'sha256_audio': sha256_audio,
+            'modelo': self.pool.modelo,
+            'idioma': idioma,
+            'task': 'transcribe',
+            'opciones': opciones_clave
+        }
+        return clave, metadatos
+
+
+def _desplazar_segmento(segmento: Dict[str, Any], desplazamiento: float) -> Dict[str, Any]:
+    """Copia de un segmento con los tiempos desplazados al archivo original"""
+    nuevo = dict(segmento)
+    nuevo['start'] = segmento['start'] + desplazamiento
+    nuevo['end'] = segmento['end'] + desplazamiento
+    nuevo['seek'] = segmento.get('seek', 0) + int(round(desplazamiento * TRAMAS_POR_SEGUNDO))
+    if 'words' in segmento:
+        nuevo['words'] = [
+            {**palabra, 'start': palabra['start'] + desplazamiento, 'end': palabra['end'] + desplazamiento}
+            for palabra in segmento['words']
+        ]
+    return nuevo
+
+
+def _normalizar_palabra(palabra: str) -> str:
+    """Palabra en minúsculas y sin puntuación, para comparar transcripciones"""
+    return re.sub(r'[^\w]', '', palabra.lower())
+
+
+def _eliminar_repeticion_costura(anterior: Dict[str, Any], siguientes: List[Dict[str, Any]]):
+    """
+    Elimina del primer segmento siguiente las palabras que repiten el final del anterior
+
+    Args:
+        anterior: Último segmento conservado antes de la costura
+        siguientes: Segmentos después de la costura (el primero se modifica en el sitio)
+    """
+    primero = siguientes[0]
+    palabras_anterior = anterior['text'].split()
+    palabras_siguiente = primero['text'].split()
+    if not palabras_anterior or not palabras_siguiente:
+        return
+
+    a = [_normalizar_palabra(p) for p in palabras_anterior]
+    b = [_normalizar_palabra(p) for p in palabras_siguiente]
+    coincidencia = SequenceMatcher(None, a, b, autojunk=False).find_longest_match(0, len(a), 0, len(b))
+
+    # La coincidencia debe cerrar el segmento anterior y abrir (casi) el siguiente
+    minimo = min(PALABRAS_MIN_COSTURA, len(b))
+    if (coincidencia.size >= minimo
+            and coincidencia.a + coincidencia.size == len(a)
+            and coincidencia.b <= 2):
+        restantes = palabras_siguiente[coincidencia.b + coincidencia.size:]
+        primero['text'] = (' ' + ' '.join(restantes)) if restantes else ''
+        if 'words' in primero:
+            primero['words'] = primero['words'][coincidencia.b + coincidencia.size:]
+
+    if primero['start'] < anterior['end']:
+        primero['start'] = min(anterior['end'], primero['end'])
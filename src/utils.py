@@ -5,6 +5,7 @@ Utilidades generales para el proyecto
 import os
 import re
 import json
+import hashlib
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -273,6 +274,19 @@ def obtener_tamaño_archivo(ruta: str) -> str:
     return f"{tamaño_bytes:.2f} TB"
 
 
-
-
-
+def calcular_sha256_archivo(ruta: str, tamano_bloque: int = 1024 * 1024) -> str:
+    """
+    Calcula el hash SHA-256 del contenido de un archivo
+    
+    Args:
+        ruta: Ruta al archivo
+        tamano_bloque: Bytes leídos por iteración
+        
+    Returns:
+        Hash hexadecimal
+    """
+    sha256 = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            sha256.update(bloque)
+    return sha256.hexdigest()
@@ -0,0 +1,209 @@
+"""
+Detección de actividad de voz (VAD) por energía
+Recorta los silencios del audio antes de Whisper y devuelve los timestamps al tiempo original
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Tuple
+import logging
+
+import numpy as np
+
+from .audio_decodificado import FRECUENCIA_MUESTREO
+
+
+class MapaTiempos:
+    """
+    Correspondencia entre el tiempo del audio recortado y el del archivo original
+    """
+
+    def __init__(self, tramos: List[Tuple[int, int]], sr: int = FRECUENCIA_MUESTREO):
+        """
+        Inicializa el mapa
+
+        Args:
+            tramos: Tramos de voz (inicio, fin) en muestras del audio original, ordenados
+            sr: Frecuencia de muestreo
+        """
+        self.inicios_original = [inicio / sr for inicio, _ in tramos]
+        self.inicios_recortado = []
+        acumulado = 0
+        for inicio, fin in tramos:
+            self.inicios_recortado.append(acumulado / sr)
+            acumulado += fin - inicio
+        self.duracion_recortada = acumulado / sr
+
+    def a_original(self, t: float, es_fin: bool = False) -> float:
+        """
+        Convierte un tiempo del audio recortado al tiempo del archivo original
+
+        Args:
+            t: Segundos en el audio recortado
+            es_fin: True para tiempos de fin; en la unión de dos tramos se asigna al
+                    final del tramo anterior en lugar de al inicio del siguiente
+
+        Returns:
+            Segundos en el archivo original
+        """
+        if not self.inicios_recortado:
+            return t
+
+        if es_fin:
+            indice = max(bisect_left(self.inicios_recortado, t) - 1, 0)
+        else:
+            indice = max(bisect_right(self.inicios_recortado, t) - 1, 0)
+
+        return float(self.inicios_original[indice] + (t - self.inicios_recortado[indice]))
+
+
+class DetectorActividadVoz:
+    """
+    VAD por energía de tramas con umbral adaptativo al ruido de fondo de cada archivo
+    """
+
+    def __init__(
+        self,
+        duracion_trama_s: float = 0.03,
+        margen_db: float = 10.0,
+        umbral_max_db: float = -35.0,
+        silencio_min_s: float = 0.6,
+        voz_min_s: float = 0.25,
+        relleno_s: float = 0.3,
+        sr: int = FRECUENCIA_MUESTREO
+    ):
+        """
+        Inicializa el detector
+
+        Args:
+            duracion_trama_s: Duración de cada trama de energía
+            margen_db: dB sobre el ruido de fondo (percentil 10) para considerar voz
+            umbral_max_db: Umbral máximo en dBFS; evita recortar voz baja en audios sin silencios
+            silencio_min_s: Silencios más cortos se consideran parte de la voz
+            voz_min_s: Tramos de voz más cortos se descartan
+            relleno_s: Margen añadido a cada lado de los tramos de voz
+            sr: Frecuencia de muestreo del audio
+        """
+        self.logger = logging.getLogger(__name__)
+        self.duracion_trama_s = duracion_trama_s
+        self.margen_db = margen_db
+        self.umbral_max_db = umbral_max_db
+        self.silencio_min_s = silencio_min_s
+        self.voz_min_s = voz_min_s
+        self.relleno_s = relleno_s
+        self.sr = sr
+
+    def configuracion(self) -> Dict[str, float]:
+        """Parámetros del detector (forman parte de la clave de caché de transcripciones)"""
+        return {
+            'duracion_trama_s': self.duracion_trama_s,
+            'margen_db': self.margen_db,
+            'umbral_max_db': self.umbral_max_db,
+            'silencio_min_s': self.silencio_min_s,
+            'voz_min_s': self.voz_min_s,
+            'relleno_s': self.relleno_s
+        }
+
+    def detectar(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Detecta los tramos de voz
+
+        Args:
+            audio: Audio mono
+
+        Returns:
+            Lista de tramos (inicio, fin) en muestras, ordenados y sin solapes
+        """
+        muestras_trama = max(1, int(self.duracion_trama_s * self.sr))
+        num_tramas = len(audio) // muestras_trama
+        if num_tramas == 0:
+            return []
+
+        tramas = np.asarray(audio[:num_tramas * muestras_trama], dtype=np.float32).reshape(num_tramas, muestras_trama)
+        rms = np.sqrt(np.mean(tramas ** 2, axis=1))
+        db = 20 * np.log10(rms + 1e-10)
+
+        piso_ruido = np.percentile(db, 10)
+        umbral = min(piso_ruido + self.margen_db, self.umbral_max_db)
+        es_voz = db > umbral
+
+        if not es_voz.any():
+            return []
+
+        # Bordes de los tramos de voz en índices de trama
+        bordes = np.diff(np.concatenate(([0], es_voz.astype(np.int8), [0])))
+        inicios = np.flatnonzero(bordes == 1)
+        fines = np.flatnonzero(bordes == -1)
+
+        tramas_silencio_min = self.silencio_min_s / self.duracion_trama_s
+        tramas_voz_min = self.voz_min_s / self.duracion_trama_s
+
+        # Unir tramos separados por silencios cortos
+        tramos: List[List[int]] = [[inicios[0], fines[0]]]
+        for inicio, fin in zip(inicios[1:], fines[1:]):
+            if inicio - tramos[-1][1] < tramas_silencio_min:
+                tramos[-1][1] = fin
+            else:
+                tramos.append([inicio, fin])
+
+        # Descartar tramos cortos, añadir relleno y convertir a muestras
+        relleno = int(self.relleno_s * self.sr)
+        resultado: List[Tuple[int, int]] = []
+        for inicio, fin in tramos:
+            if fin - inicio < tramas_voz_min:
+                continue
+            inicio_muestra = int(max(0, inicio * muestras_trama - relleno))
+            fin_muestra = int(min(len(audio), fin * muestras_trama + relleno))
+            if resultado and inicio_muestra <= resultado[-1][1]:
+                resultado[-1] = (resultado[-1][0], fin_muestra)
+            else:
+                resultado.append((inicio_muestra, fin_muestra))
+
+        return resultado
+
+    def recortar(self, audio: np.ndarray) -> Tuple[np.ndarray, MapaTiempos]:
+        """
+        Elimina los tramos sin voz del audio
+
+        Args:
+            audio: Audio mono
+
+        Returns:
+            Tupla (audio solo con voz, mapa de tiempos al audio original)
+        """
+        tramos = self.detectar(audio)
+        mapa = MapaTiempos(tramos, self.sr)
+
+        if tramos:
+            audio_voz = np.concatenate([audio[inicio:fin] for inicio, fin in tramos])
+        else:
+            audio_voz = np.zeros(0, dtype=np.float32)
+
+        duracion = len(audio) / self.sr
+        if duracion > 0:
+            self.logger.info(
+                f"VAD: {len(tramos)} tramos de voz, {mapa.duracion_recortada:.1f} de {duracion:.1f} segundos "
+                f"({100 * (1 - mapa.duracion_recortada / duracion):.0f}% de silencio recortado)"
+            )
+
+        return audio_voz.astype(np.float32, copy=False), mapa
+
+
+def remapear_resultado(resultado: Dict[str, Any], mapa: MapaTiempos) -> Dict[str, Any]:
+    """
+    Devuelve los timestamps de un resultado de Whisper al tiempo del archivo original
+
+    Args:
+        resultado: Resultado de Whisper sobre el audio recortado (se modifica en el sitio)
+        mapa: Mapa de tiempos generado por DetectorActividadVoz.recortar()
+
+    Returns:
+        El mismo resultado con los timestamps remapeados
+    """
+    for segmento in resultado.get('segments', []):
+        segmento['start'] = mapa.a_original(segmento['start'])
+        segmento['end'] = mapa.a_original(segmento['end'], es_fin=True)
+        for palabra in segmento.get('words', []):
+            palabra['start'] = mapa.a_original(palabra['start'])
+            palabra['end'] = mapa.a_original(palabra['end'], es_fin=True)
+
+    return resultado
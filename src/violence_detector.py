@@ -3,78 +3,49 @@ Módulo para detectar violencia verbal en transcripciones
 Detecta insultos, manipulación, gaslighting, amenazas y denigración
 """
 
-import re
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
 
+from .paquetes_reglas import GestorPaquetesReglas, PaqueteReglas, obtener_gestor_reglas
+
 
 class ViolenceDetector:
     """
     Clase para detectar diferentes tipos de violencia verbal en transcripciones
     """
     
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self._inicializar_patrones()
+    # Paquete de reglas (idioma, nombre) en reglas/
+    PAQUETE_REGLAS = ('es', 'violencia')
     
-    def _inicializar_patrones(self):
-        """Inicializa los patrones de detección"""
-        
-        # Insultos comunes (español)
-        self.insultos = [
-            r'\b(puta|puto|hijo de puta|hdp|maldito|maldita|imbécil|idiota|estúpido|estúpida|tonto|tonta|tarado|tarada|retrasado|retrasada)\b',
-            r'\b(maricón|marica|joto|jota|culero|culera|pendejo|pendeja|mamón|mamona)\b',
-            r'\b(chinga|chingado|chingada|verga|pinche|pinchi|joder|jodido|jodida)\b',
-            r'\b(cabrón|cabrona|hijueputa|hijueputo|malparido|malparida)\b',
-            r'\b(desgraciado|desgraciada|sinvergüenza|sinverguenza|canalla|basura)\b'
-        ]
-        
-        # Patrones de manipulación emocional
-        self.manipulacion = [
-            r'\b(no me quieres|no me amas|si me quisieras|si me amaras)\b',
-            r'\b(eres egoísta|solo piensas en ti|nunca me escuchas)\b',
-            r'\b(me haces sentir mal|me haces daño|me lastimas)\b',
-            r'\b(es tu culpa|tú tienes la culpa|por tu culpa)\b',
-            r'\b(no entiendes|nunca entiendes|no me entiendes)\b',
-            r'\b(estás loca|estás loco|estás mal de la cabeza)\b',
-            r'\b(exageras|siempre exageras|estás exagerando)\b'
-        ]
+    def __init__(self, gestor_reglas: Optional[GestorPaquetesReglas] = None):
+        """
+        Inicializa el detector
         
-        # Patrones de gaslighting
-        self.gaslighting = [
-            r'\b(eso nunca pasó|no pasó así|te lo estás inventando)\b',
-            r'\b(estás confundida|estás confundido|no fue así)\b',
-            r'\b(lo estás recordando mal|tienes mala memoria)\b',
-            r'\b(estás loca|estás loco|estás alucinando)\b',
-            r'\b(eso no es verdad|eso es mentira|mientes)\b',
-            r'\b(no dije eso|nunca dije eso|te lo inventaste)\b'
-        ]
+        Args:
+            gestor_reglas: Gestor de paquetes de reglas. Si None, el del proceso
+        """
+        self.logger = logging.getLogger(__name__)
+        gestor_reglas = gestor_reglas or obtener_gestor_reglas()
+        self._aplicar_reglas(gestor_reglas.obtener(*self.PAQUETE_REGLAS))
+        gestor_reglas.suscribir(*self.PAQUETE_REGLAS, self._aplicar_reglas)
+    
+    def _aplicar_reglas(self, paquete: PaqueteReglas):
+        """
+        Toma los patrones del paquete de reglas (al crear el detector y al recargarlo)
         
-        # Patrones de amenazas
-        self.amenazas = [
-            r'\b(te voy a|vas a ver|te haré|te haré pagar)\b',
-            r'\b(te mato|te mataré|te voy a matar)\b',
-            r'\b(te voy a golpear|te golpeo|te pego)\b',
-            r'\b(te voy a dejar|te dejo|me voy)\b',
-            r'\b(vas a arrepentirte|te arrepentirás)\b',
-            r'\b(te voy a denunciar|te denuncio|te denunciaré)\b',
-            r'\b(vas a pagar|pagarás|lo pagarás)\b'
-        ]
+        Args:
+            paquete: Paquete 'violencia' con las categorías en orden de prioridad,
+                     la denigración hacia Claudia y los nombres de víctimas
+        """
+        self.reglas = paquete
         
         # Nombres de víctimas
-        self.victimas = {
-            'claudia': ['claudia', 'clau'],
-            'juan_diego': ['juan diego', 'juan', 'diego'],
-            'jose_carlos': ['josé carlos', 'jose carlos', 'josé', 'jose', 'carlos']
-        }
+        self.victimas = paquete.datos.get('victimas', {})
         
-        # Patrones de denigración hacia Claudia
-        self.denigracion_claudia = [
-            r'\b(claudia.*puta|claudia.*maldita|claudia.*desgraciada)\b',
-            r'\b(claudia.*estúpida|claudia.*idiota|claudia.*tonta)\b',
-            r'\b(clau.*puta|clau.*maldita)\b'
-        ]
+        # Patrones compilados una vez; el orden de las categorías es su prioridad
+        self.motor_patrones = paquete.compilado('principal')
+        self.motor_denigracion = paquete.compilado('denigracion')
     
     def detectar_violencia(
         self,
@@ -101,33 +72,11 @@ class ViolenceDetector:
             'texto': texto.strip()
         }
         
-        # Detectar insultos
-        for patron in self.insultos:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                resultado['violencia'] = True
-                resultado['tipo'] = 'insulto'
-                return resultado
-        
-        # Detectar amenazas
-        for patron in self.amenazas:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                resultado['violencia'] = True
-                resultado['tipo'] = 'amenaza'
-                return resultado
-        
-        # Detectar gaslighting
-        for patron in self.gaslighting:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                resultado['violencia'] = True
-                resultado['tipo'] = 'gaslighting'
-                return resultado
-        
-        # Detectar manipulación
-        for patron in self.manipulacion:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                resultado['violencia'] = True
-                resultado['tipo'] = 'manipulación'
-                return resultado
+        # Una pasada sobre el texto; si hay varias categorías gana la de mayor prioridad
+        deteccion = self.motor_patrones.primera_por_prioridad(texto_lower)
+        if deteccion:
+            resultado['violencia'] = True
+            resultado['tipo'] = deteccion[0]
         
         return resultado
     
@@ -164,13 +113,7 @@ class ViolenceDetector:
         Returns:
             True si se detecta denigración hacia Claudia
         """
-        texto_lower = texto.lower()
-        
-        for patron in self.denigracion_claudia:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                return True
-        
-        return False
+        return bool(self.motor_denigracion.escanear(texto.lower()))
     
     def analizar_segmento(
         self,
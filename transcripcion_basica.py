@@ -66,6 +66,8 @@ def main():
         # Mostrar información del dispositivo
         info = transcriptor.obtener_info_modelo()
         logger.info(f"Dispositivo: {info['dispositivo']}")
+        if 'tiempo_carga_s' in info:
+            logger.info(f"Modelo cargado en {info['tiempo_carga_s']:.2f} segundos ({info['tamano_mb']:.1f} MB en memoria)")
         if info['gpu_disponible']:
             logger.info(f"GPU: {info.get('gpu_nombre', 'N/A')}")
             logger.info(f"Memoria GPU: {info.get('gpu_memoria_total_gb', 0):.2f} GB")